@@ -5,15 +5,14 @@
 # 日期: 2026-01-09
 # ===========================================
 
-import subprocess
-import time
 import os
-import json
 import sys
-import tkinter as tk
-import tkinter.ttk as ttk
-from tkinter import filedialog, messagebox
-from ctypes import windll, byref, c_int, sizeof
+
+import config_store
+
+# 注意: 启动流程在 launcher_core.py (在 main() 中才导入，单实例转交时无需加载)，后端 (OpenList 服务 / AlistHelper / rclone / 通用命令) 由 backends 下的插件实现
+# tkinter / ctypes 只在需要弹窗或提权时才导入 (见 launcher_ui.py 与 __main__)
+# 正常启动路径不会触碰 Tk，节省解释器及打包后 Tcl/Tk 解压的开销
 
 # ================= 配置区域 =================
 # 确定配置文件路径 (兼容打包后的 exe 环境)
@@ -26,244 +25,78 @@ else:
 
 CONFIG_FILE = os.path.join(base_path, "launcher_config.json")
 
+# 配置读写 (自动迁移旧版结构；可用 --profile NAME 选择配置)
+config_file = config_store.ConfigStore(CONFIG_FILE, profile=config_store.profile_from_argv(sys.argv[1:]))
+
 def load_config():
-    """加载配置文件"""
-    if os.path.exists(CONFIG_FILE):
-        try:
-            with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except Exception:
-            pass
-    return {}
+    """加载当前 profile 的有效配置"""
+    return config_file.load()
 
 def save_config(config):
-    """保存配置文件"""
+    """保存配置文件 (原子写入)"""
     try:
-        with open(CONFIG_FILE, 'w', encoding='utf-8') as f:
-            json.dump(config, f, ensure_ascii=False, indent=2)
+        config_file.save(config)
     except Exception as e:
         print(f"无法保存配置: {e}")
 
-def initial_setup_dialog(config):
-    """
-    弹出配置窗口，允许用户手动输入或选择路径
-    如果是第一次运行或配置文件丢失，将会调用此函数
-    """
-    # 预读取当前配置，如果没有则为空字符串
-    current_pot = config.get("potplayer_path", "")
-    
-    # (不再重置无效路径为空，而是保留并在后续界面中标记为红色)
-
-    # 创建 GUI 主窗口 (tkinter)
-    root = tk.Tk()
-    root.title("PotPlayer Link OpenList    By：H_Knight")
-    
-    # --- Windows 11 风格优化 ---
-    # 尝试开启 Windows 11 窗口圆角 (DWMWA_WINDOW_CORNER_PREFERENCE = 33, DWMWCP_ROUND = 2)
-    try:
-        DWMWA_WINDOW_CORNER_PREFERENCE = 33
-        VAL = c_int(2)
-        windll.dwmapi.DwmSetWindowAttribute(c_int(root.winfo_id()), DWMWA_WINDOW_CORNER_PREFERENCE, byref(VAL), sizeof(VAL))
-    except Exception:
-        pass
-    
-    # 配置 ttk 样式
-    style = ttk.Style()
-    # 'vista' 主题在 Windows 上通常对应较现代的系统控件样式
-    if 'vista' in style.theme_names():
-        style.theme_use('vista')
-    
-    # 配置通用字体
-    default_font = ("Microsoft YaHei", 9)
-    style.configure(".", font=default_font)
-    style.configure("TButton", font=default_font)
-    style.configure("TLabel", font=default_font)
-    style.configure("TEntry", font=default_font)
-
-    # 计算屏幕中心位置，使窗口居中显示
-    window_w, window_h = 600, 160                         # 窗口尺寸 (调整以适应更少的内容)
-    screen_w = root.winfo_screenwidth()                   # 屏幕宽度
-    screen_h = root.winfo_screenheight()                  # 屏幕高度
-    x = (screen_w - window_w) // 2                        # 计算居中位置的 X 坐标
-    y = (screen_h - window_h) // 2                        # 计算居中位置的 Y 坐标
-    root.geometry(f"{window_w}x{window_h}+{x}+{y}")       # 设置窗口大小和位置
-    
-    # 禁止调整窗口大小，并保持窗口在最前端
-    root.resizable(False, False)
-    root.attributes("-topmost", True)
-
-    # 定义 tkinter 变量，用于绑定输入框内容
-    pot_var = tk.StringVar(value=current_pot)
-    
-    # 创建布局容器 Frame
-    frame = tk.Frame(root, padx=20, pady=20)
-    frame.pack(fill=tk.BOTH, expand=True)
-    
-    # Grid 网格布局配置，让输入框(column 1)自动拉伸
-    frame.columnconfigure(1, weight=1)
-
-    # --- 第一行: PotPlayer 设置 ---
-    ttk.Label(frame, text="PotPlayer 路径:").grid(row=0, column=0, sticky="w", pady=5)
-    e2 = tk.Entry(frame, textvariable=pot_var, font=("Microsoft YaHei", 9), relief="flat", bd=1, highlightthickness=1, highlightcolor="#0067C0")
-    e2.grid(row=0, column=1, sticky="ew", padx=5, pady=5, ipady=4)
-    
-    # 如果初始路径无效且非空，显示为红色
-    if current_pot and not os.path.exists(current_pot):
-        e2.config(fg="#E81123")
-    
-    # 当用户修改时恢复黑色
-    def on_pot_change(*args):
-        e2.config(fg="#000000")
-    pot_var.trace("w", on_pot_change)
-    
-    # PotPlayer 选择文件按钮的回调函数
-    def sel_pot():
-        p = filedialog.askopenfilename(title="选择 PotPlayer.exe", filetypes=[("Executable", "*.exe")])
-        if p: pot_var.set(os.path.normpath(p)) # 规范化路径分隔符
-    
-    ttk.Button(frame, text="选择...", command=sel_pot).grid(row=0, column=2, padx=5, pady=5)
-
-    # --- 说明文字 ---
-    # 第一句红色提示
-    ttk.Label(frame, text="请重新指定 PotPlayer 的执行文件路径 (.exe)", foreground="#E81123").grid(row=2, column=0, columnspan=3, pady=(5, 0), sticky="w")
-    # 第二句黑色/深灰色说明
-    ttk.Label(frame, text="注：指定后将自动保存配置并在下次直接运行,不再显示此窗口。", foreground="#6A6A6A").grid(row=3, column=0, columnspan=3, pady=(0, 5), sticky="w")
-
-    # --- 底部按钮 ---
-    btn_frame = ttk.Frame(frame)
-    btn_frame.grid(row=4, column=0, columnspan=3, pady=10)
-
-    # 用于在闭包中保存结果状态
-    result_state = {"saved": False}
-
-    # "保存并启动" 按钮的回调函数
-    def on_confirm():
-        # 获取输入框内容并去除首尾空白和引号
-        p2 = pot_var.get().strip().strip('"')
-        
-        err_msgs = []
-        # 简单验证路径是否存在
-        if not (p2 and os.path.exists(p2)):
-            err_msgs.append("PotPlayer 路径无效或不存在。")
-        if err_msgs:
-            messagebox.showwarning("路径错误", "\n".join(err_msgs), parent=root)
-            return
-
-        # 更新配置字典
-        config["potplayer_path"] = p2
-        # 保存到本地 JSON 文件
-        save_config(config)
-        result_state["saved"] = True
-        root.destroy() # 关闭窗口
-
-    # "取消" 按钮的回调函数
-    def on_cancel():
-        root.destroy()
-
-    # 放置按钮
-    ttk.Button(btn_frame, text="保存并启动", command=on_confirm, width=15).pack(side=tk.LEFT, padx=10)
-    ttk.Button(btn_frame, text="取消", command=on_cancel, width=15).pack(side=tk.LEFT, padx=10)
-
-    # 处理窗口右上角关闭按钮事件，等同于取消
-    root.protocol("WM_DELETE_WINDOW", on_cancel)
-    
-    # 进入 GUI 事件循环，等待用户操作
-    root.mainloop()
-    
-    # 返回保存状态：True 表示已保存配置可继续，False 表示用户取消
-    return result_state["saved"]
-
-def manage_service(action, service_name):
-    """
-    管理 Windows 服务 (需要管理员权限或足够权限)
-    action: "start" | "stop"
-    使用 net start / net stop 命令
-    """
-    try:
-        cmd = f"net {action} {service_name}"
-        
-        # 尝试隐藏控制台窗口 (针对 Windows)
-        startupinfo = None
-        if os.name == 'nt':
-            startupinfo = subprocess.STARTUPINFO()
-            startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
-            
-        subprocess.run(cmd, shell=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, startupinfo=startupinfo)
-        print(f"[-] 已执行服务命令: {cmd}")
-    except Exception as e:
-        print(f"[!] 执行服务命令 {cmd} 时发生错误: {e}")
-
 def main():
-    # 1. 加载配置
-    config = load_config()
-    
-    # 2. 验证路径 (如果路径缺失或无效，则统一弹出设置窗口)
-    potplayer_path = config.get("potplayer_path", "")
-    # alist_helper_path 已经不需要了
-
-    is_pot_valid = potplayer_path and os.path.exists(potplayer_path)
+    """启动后端与 PotPlayer，PotPlayer 关闭后关闭后端 (后端类型由配置 backend 决定)"""
+    import launcher_core
+    launcher_core.launch(load_config, save_config, base_path)
 
-    if not is_pot_valid:
-        # 路径无效，弹出配置窗口进行设置
-        success = initial_setup_dialog(config)
-        if not success:
-            sys.exit(0) # 用户取消或关闭窗口
-            
-        # 重新从更新后的配置中获取路径
-        potplayer_path = config.get("potplayer_path")
+if __name__ == "__main__":
+    if "--keepwarm-daemon" in sys.argv:
+        # 由已提权的启动器拉起的保温守护进程，直接运行
+        import launcher_core
+        launcher_core.run_keepwarm_daemon(load_config, base_path)
+        sys.exit(0)
+
+    if "--broker" in sys.argv:
+        # 常驻的特权代理 (由计划任务以最高权限启动，见 broker.py)
+        import broker
+        broker.serve(broker.policy_from_argv(sys.argv))
+        sys.exit(0)
+
+    # 单实例: 已有启动器在运行时，把文件 / URL 参数转交给它后立即退出 (不再启动后端、提权)；
+    # 安装 / 卸载代理与不带文件参数的启动不转交
+    import instance
+    if instance.forward(base_path, sys.argv[1:]):
+        sys.exit(0)
 
     try:
-        # 3. 启动 OpenList Desktop Service
-        service_name = "openlist_desktop_service"
-        print(f"[+] 正在启动服务: {service_name}")
-        manage_service("start", service_name)
-        
-        # 等待几秒钟，确保服务启动
-        time.sleep(0.1)
-
-        # 4. 启动 PotPlayer
-        print(f"[+] 正在启动 PotPlayer: {potplayer_path}")
-        potplayer_process = subprocess.Popen(potplayer_path, cwd=os.path.dirname(potplayer_path))
+        from ctypes import windll
+    except ImportError:
+        # 非 Windows 环境 (使用替身程序测试时) 无需提权
+        windll = None
 
-        print(f"[*] PotPlayer (PID: {potplayer_process.pid}) 运行中... 脚本正在监控状态")
-        
-        # 5. 阻塞等待 PotPlayer 关闭
-        potplayer_process.wait()
-
-        print("\n[*] 检测到 PotPlayer 已关闭")
-
-    except KeyboardInterrupt:
-        print("\n[!] 用户中断操作")
-    except Exception as e:
-
-        root = tk.Tk()
-        root.withdraw()
-        root.attributes("-topmost", True)
-        messagebox.showerror("运行错误", f"程序运行过程中发生错误:\n{e}")
-        root.destroy()
-    finally:
-        # 6. 执行清理操作 (关闭服务)
-        print("\n[+] 正在关闭服务...")
-        manage_service("stop", "openlist_desktop_service")
-        
-        print("[*] 全部完成，脚本退出。")
-        time.sleep(1)
-
-if __name__ == "__main__":
     def is_admin():
         try:
             return windll.shell32.IsUserAnAdmin()
         except:
             return False
 
-    if is_admin():
-        main()
+    # 安装 / 卸载特权代理: 需要管理员权限，只需执行一次
+    setup_broker = "--install-broker" in sys.argv or "--uninstall-broker" in sys.argv
+
+    # 已安装特权代理时服务由代理控制，直接运行，不再提权重启
+    import launcher_core
+    if windll is None or is_admin() or (not setup_broker and not launcher_core.needs_elevation(load_config(), base_path)):
+        if setup_broker:
+            import broker, keepwarm
+            if "--install-broker" in sys.argv:
+                broker.install(keepwarm.daemon_command("--broker"), config_file,
+                               broker.policy_from_argv(sys.argv))
+            else:
+                broker.uninstall(broker.policy_from_argv(sys.argv))
+        else:
+            main()
     else:
-        # 以管理员权限重新运行程序
+        # 以管理员权限重新运行程序 (保留命令行参数，并带上当前时间用于统计提权耗时)
+        import subprocess, time
+        args = subprocess.list2cmdline(sys.argv[1:] + [f"--launch-t0={time.time():.6f}"])
         if getattr(sys, 'frozen', False):
              #针对已编译的 exe（pyinstaller --onefile 等）
-            windll.shell32.ShellExecuteW(None, "runas", sys.executable, "", None, 1)
+            windll.shell32.ShellExecuteW(None, "runas", sys.executable, args, None, 1)
         else:
              # 用于 Python 脚本
-            windll.shell32.ShellExecuteW(None, "runas", sys.executable, f'"{os.path.abspath(__file__)}"', None, 1)
-
+            windll.shell32.ShellExecuteW(None, "runas", sys.executable, f'"{os.path.abspath(__file__)}" {args}', None, 1)
@@ -0,0 +1,156 @@
+# ================= 代码说明 =================
+# 文件名: backend_watchdog.py
+# 功能: 播放期间的后端健康看门狗
+#       PotPlayer 运行期间在后台线程中按自适应间隔探测后端: 健康时间隔逐步拉长 (几乎不占 CPU)，
+#       进程退出立即视为故障；探测失败则缩短间隔连续确认，确认故障后原地重启后端 (不影响播放器)
+#       重启时先等后端完全停止 (服务进入 STOPPED) 再启动，避免向正在停止的服务发送启动请求
+#       默认关闭，配置 watchdog.enabled: true 启用
+#       区分两种故障: 进程已退出 (exit) 与进程仍在但不响应 (hang，探测超时)
+#       每次恢复记录 检测耗时 (上次健康 -> 确认故障) 与 恢复耗时 (确认故障 -> 重新就绪)
+#       配置项 watchdog: {"enabled": false, "min_interval": 1, "max_interval": 5, "confirm_interval": 0.5,
+#                         "failures": 2, "max_restarts": 3, "probes": [与 readiness.probes 相同的格式]}
+# 作者: H_Knight
+# 日期: 2026-10-18
+# ===========================================
+
+import threading
+import time
+
+import readiness
+
+MIN_INTERVAL = 1.0          # 刚启动 / 刚恢复后的探测间隔 (秒)
+MAX_INTERVAL = 5.0          # 持续健康时的最大探测间隔
+GROWTH = 1.5                # 每次健康后间隔放大的倍数
+CONFIRM_INTERVAL = 0.5      # 探测失败后的确认间隔
+FAILURES = 2                # 连续失败多少次视为故障
+MAX_RESTARTS = 3            # 一次会话中最多自动重启的次数
+
+
+class RecoveryEvent:
+    """一次故障与恢复的记录 (时间为 perf_counter)"""
+
+    def __init__(self, kind, detail, last_ok, first_fail, declared):
+        self.kind = kind            # "exit" / "hang"
+        self.detail = detail
+        self.last_ok = last_ok
+        self.first_fail = first_fail
+        self.declared = declared
+        self.recovered = None
+        self.ok = False
+        self.error = None
+
+    @property
+    def detect(self):
+        """检测耗时: 最后一次健康探测到确认故障"""
+        return self.declared - self.last_ok
+
+    @property
+    def recover(self):
+        """恢复耗时: 确认故障到后端重新就绪"""
+        return None if self.recovered is None else self.recovered - self.declared
+
+    def as_dict(self):
+        return {"kind": self.kind, "detail": self.detail, "detect": round(self.detect, 4),
+                "recover": None if self.recover is None else round(self.recover, 4), "ok": self.ok,
+                "error": self.error}
+
+
+class Watchdog:
+    """
+    后端健康看门狗
+    plugin: 后端插件 (使用其 start / stop / is_running 与就绪探测)
+    """
+
+    def __init__(self, plugin, config=None, log=print):
+        cfg = (config or {}).get("watchdog", {})
+        self.plugin = plugin
+        self.log = log
+        self.min_interval = float(cfg.get("min_interval", MIN_INTERVAL))
+        self.max_interval = float(cfg.get("max_interval", MAX_INTERVAL))
+        self.confirm_interval = float(cfg.get("confirm_interval", CONFIRM_INTERVAL))
+        self.failures = int(cfg.get("failures", FAILURES))
+        self.max_restarts = int(cfg.get("max_restarts", MAX_RESTARTS))
+        self.ready_deadline = float((config or {}).get("readiness", {}).get("deadline", readiness.DEFAULT_DEADLINE))
+        specs = cfg.get("probes")
+        self.probes = (readiness.build_probes(specs, plugin.service_name, plugin.service_query())
+                       if specs is not None else plugin.readiness_probes())
+        self.events = []
+        self.checks = 0
+        self.cpu_time = 0.0         # 看门狗线程自身消耗的 CPU 时间
+        self._stop = threading.Event()
+        self._thread = None
+
+    def check(self):
+        """探测一次，返回 (是否健康, 故障类型, 说明)"""
+        self.checks += 1
+        if not self.plugin.is_running():
+            return False, "exit", "后端进程已退出"
+        for probe in self.probes:
+            try:
+                ok, detail = probe.check()
+            except Exception as e:
+                ok, detail = False, str(e)
+            if not ok:
+                return False, "hang", f"{probe.name}: {detail}"
+        return True, None, "健康"
+
+    def _recover(self, event):
+        """原地重启后端并等待重新就绪"""
+        self.log(f"[!] 看门狗: 后端故障 ({event.kind}: {event.detail})，正在重启...")
+        try:
+            self.plugin.stop(wait=True)
+            self.plugin.start()
+            report = readiness.wait_until_ready(self.plugin.readiness_probes(), deadline=self.ready_deadline)
+            event.ok = report.ready
+            if not report.ready:
+                event.error = "重启后等待就绪超时"
+        except Exception as e:
+            event.error = str(e)
+        event.recovered = time.perf_counter()
+        if event.ok:
+            self.log(f"[+] 看门狗: 后端已恢复 (检测 {event.detect:.3f}s, 恢复 {event.recover:.3f}s)")
+        else:
+            self.log(f"[!] 看门狗: 后端恢复失败: {event.error}")
+
+    def _run(self):
+        t_cpu = time.thread_time()
+        interval = self.min_interval
+        last_ok = time.perf_counter()
+        fails, first_fail = 0, None
+        while not self._stop.wait(interval):
+            ok, kind, detail = self.check()
+            now = time.perf_counter()
+            self.cpu_time = time.thread_time() - t_cpu
+            if self._stop.is_set():
+                return
+            if ok:
+                last_ok, fails = now, 0
+                interval = min(interval * GROWTH, self.max_interval)
+                continue
+            fails += 1
+            if fails == 1:
+                first_fail = now
+            # 进程已退出是确定的故障，无需再确认；探测失败可能只是偶发超时，需连续失败才算
+            if kind == "hang" and fails < self.failures:
+                interval = self.confirm_interval
+                continue
+            event = RecoveryEvent(kind, detail, last_ok, first_fail, now)
+            if len(self.events) >= self.max_restarts:
+                event.error = "已达到自动重启次数上限"
+                self.events.append(event)
+                self.log(f"[!] 看门狗: 后端故障 ({kind}: {detail})，已达到自动重启次数上限，不再重启")
+                return
+            self.events.append(event)
+            self._recover(event)
+            last_ok, fails = time.perf_counter(), 0
+            interval = self.min_interval
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=None):
+        """停止看门狗 (关闭后端前调用，避免把正常关闭当成故障)；正在进行的重启会等它完成"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
@@ -0,0 +1,30 @@
+# ================= 代码说明 =================
+# 文件名: backends/__init__.py
+# 功能: 后端插件注册表
+#       配置中的 backend 字段决定使用哪个插件，启动时只导入被选中的插件模块
+#       (PyInstaller 打包时需加 --collect-submodules backends，否则动态导入的插件不会被打包)
+# 作者: H_Knight
+# 日期: 2026-10-18
+# ===========================================
+
+import importlib
+
+# 插件名 -> (模块, 类名)
+PLUGINS = {
+    "openlist_service": ("backends.openlist_service", "OpenListServiceBackend"),
+    "alisthelper": ("backends.alisthelper", "AlistHelperBackend"),
+    "rclone_mount": ("backends.rclone_mount", "RcloneMountBackend"),
+    "command": ("backends.command", "CommandBackend"),
+}
+
+
+def load_backend(name, config, log=print, state_dir=None):
+    """
+    按名称导入并实例化后端插件
+    state_dir: 启动器的状态目录 (配置文件所在目录，特权代理等的通信地址位于此处)
+    """
+    if name not in PLUGINS:
+        raise ValueError(f"未知的后端类型: {name} (可选: {', '.join(sorted(PLUGINS))})")
+    module_name, class_name = PLUGINS[name]
+    module = importlib.import_module(module_name)
+    return getattr(module, class_name)(config, log, state_dir)
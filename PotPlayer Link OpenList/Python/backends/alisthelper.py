@@ -0,0 +1,25 @@
+# ================= 代码说明 =================
+# 文件名: backends/alisthelper.py
+# 功能: AlistHelper 后端 (原 .Old.Alist 版启动器)
+#       以 autostart 参数静默启动 AlistHelper，由它拉起 alist / rclone；关闭时连同三者一起关闭
+# 作者: H_Knight
+# 日期: 2026-10-18
+# ===========================================
+
+import readiness
+from backends.base import ProcessBackendPlugin
+
+
+class AlistHelperBackend(ProcessBackendPlugin):
+    name = "alisthelper"
+    title = "PotPlayer & AlistHelper    By：H_Knight"
+    required_paths = (("alist_helper_path", "AlistHelper 路径:", "选择 AlistHelper.exe"),)
+    stop_images = ("AlistHelper.exe", "alist.exe", "rclone.exe")
+
+    def command(self):
+        # 添加 "autostart" 参数以实现静默启动/自动开始
+        return [self.config["alist_helper_path"], "autostart"]
+
+    def default_probe_specs(self):
+        # alist 与 OpenList 使用相同的端口与 /ping 接口
+        return [{"type": "http", "url": readiness.DEFAULT_PING_URL}]
@@ -0,0 +1,157 @@
+# ================= 代码说明 =================
+# 文件名: backends/base.py
+# 功能: 后端插件接口
+#       每个插件负责: 启动 (start)、就绪探测 (readiness_probes)、停止 (stop)、健康检查 (health)
+#       以子进程形式运行的后端可直接继承 ProcessBackendPlugin
+# 作者: H_Knight
+# 日期: 2026-10-18
+# ===========================================
+
+import os
+import subprocess
+
+import readiness
+import shutdown
+
+
+class BackendPlugin:
+    """
+    后端插件基类
+    required_paths: 启动前必须有效的路径 [(配置键, 界面标签, 文件选择框标题)]，无效时弹出设置窗口
+    """
+
+    name = ""
+    title = "PotPlayer Link OpenList    By：H_Knight"
+    required_paths = ()
+    service_name = None      # "service" 类型探测使用的服务名
+
+    def __init__(self, config, log=print, state_dir=None):
+        self.config = config
+        self.log = log
+        self.state_dir = state_dir
+
+    def start(self):
+        """启动后端，不等待就绪"""
+        raise NotImplementedError
+
+    def stop(self, wait=False):
+        """停止后端；wait=True 时等后端完全停止后才返回 (停止失败抛出异常)，用于随后立即重启"""
+        raise NotImplementedError
+
+    def is_running(self):
+        raise NotImplementedError
+
+    def needs_admin(self):
+        """启动/停止后端是否需要管理员权限 (决定启动器是否提权重启)"""
+        return False
+
+    def default_probe_specs(self):
+        """插件默认的就绪探测配置，可被 readiness.probes 覆盖"""
+        return []
+
+    def service_query(self):
+        """服务状态查询函数 (供 "service" 类型探测使用)，没有服务的插件返回 None"""
+        return None
+
+    def readiness_probes(self):
+        specs = self.config.get("readiness", {}).get("probes", self.default_probe_specs())
+        return readiness.build_probes(specs, self.service_name, self.service_query())
+
+    def health(self):
+        """执行一次全部就绪探测，返回 (是否健康, 说明)"""
+        details = []
+        for probe in self.readiness_probes():
+            try:
+                ok, detail = probe.check()
+            except Exception as e:
+                ok, detail = False, str(e)
+            if not ok:
+                return False, f"{probe.name}: {detail}"
+            details.append(f"{probe.name}: {detail}")
+        if not self.is_running():
+            return False, "后端未运行"
+        return True, "; ".join(details) or "运行中"
+
+
+class ProcessBackendPlugin(BackendPlugin):
+    """
+    以子进程形式运行的后端
+    子类实现 command() 返回启动命令
+    stop_images: 后端会自行派生子进程时 (如 AlistHelper -> alist / rclone)，按映像名关闭，
+                 可由配置 backend_stop_images 覆盖
+    popen_kwargs / spawn_hooks: 启动器附加的 Popen 参数与进程创建后的回调 (调度策略、会话记录、输出捕获)，
+                                看门狗原地重启时同样生效
+    Windows 下后端以 CREATE_NEW_PROCESS_GROUP 启动: 没有窗口的控制台后端关闭时可收到 CTRL_BREAK_EVENT
+    (代价是控制台中的 Ctrl+C 不再直接传给后端，由启动器捕获后统一关闭)
+    """
+
+    stop_images = ()
+
+    def __init__(self, config, log=print, state_dir=None):
+        super().__init__(config, log, state_dir)
+        self.process = None
+        self.popen_kwargs = {}
+        self.spawn_hooks = []
+
+    def command(self):
+        raise NotImplementedError
+
+    def cwd(self):
+        return self.config.get("backend_cwd") or os.path.dirname(self.command()[0]) or None
+
+    def images(self):
+        return self.config.get("backend_stop_images", list(self.stop_images))
+
+    def start(self):
+        args = self.command()
+        self.log(f"[+] 正在启动后端: {' '.join(args)}")
+        kwargs = dict(self.popen_kwargs)
+        if os.name == 'nt':
+            kwargs["creationflags"] = kwargs.get("creationflags", 0) | subprocess.CREATE_NEW_PROCESS_GROUP
+        self.process = subprocess.Popen(args, cwd=self.cwd(), **kwargs)
+        for hook in self.spawn_hooks:
+            hook(self.process)
+        return self.process
+
+    def adopt(self, pid, started):
+        """认领上次启动器遗留的后端进程 (见 session_journal.py)，之后的健康检查与关闭都作用于它"""
+        import session_journal
+        self.process = session_journal.AdoptedProcess(pid, started)
+        return self.process
+
+    def is_running(self):
+        if self.process is not None and self.process.poll() is None:
+            return True
+        images = self.images()
+        if images:
+            import proc_watch
+            return bool(proc_watch.find_pids_by_image(images))
+        return False
+
+    def stop(self, wait=False):
+        """
+        按映像名选出的进程与自己拉起的进程树 (映像名未覆盖到，如 Linux 替身程序) 合并为一组，
+        在同一个截止时间内一起关闭 (总是等到进程退出或被强制结束，wait 无需区分)
+        """
+        deadline = self.config.get("shutdown_deadline", shutdown.DEFAULT_DEADLINE)
+        table, parents = shutdown.shutdown_table()
+        found = {}
+        images = self.images()
+        if images:
+            found.update(shutdown.image_targets(images, table))
+        groups = ()
+        if self.process is not None and self.process.poll() is None:
+            found.update(shutdown.tree_targets(self.name, self.process.pid, table))
+            if isinstance(self.process, subprocess.Popen):
+                # 本次启动的进程才与启动器共用控制台 (认领的遗留进程属于已退出的旧控制台)
+                groups = {self.process.pid}
+        results = []
+        if found:
+            targets = [(found[pid], pid) for pid in sorted(found)]
+            results = shutdown.shutdown_processes(targets, deadline, parents=parents, groups=groups, log=self.log)
+        else:
+            self.log("[-] 没有需要关闭的后端进程")
+        self.process = None
+        total, forced = shutdown.summarize(results)
+        self.log(f"[-] 后端进程已全部关闭，耗时 {total * 1000:.0f} ms，强制结束 {forced} 个")
+        return results
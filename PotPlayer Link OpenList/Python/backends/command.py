@@ -0,0 +1,21 @@
+# ================= 代码说明 =================
+# 文件名: backends/command.py
+# 功能: 通用命令后端
+#       backend_command: 启动命令 (列表)，backend_cwd: 工作目录 (可选)
+#       就绪探测通过 readiness.probes 配置，默认不探测
+# 作者: H_Knight
+# 日期: 2026-10-18
+# ===========================================
+
+from backends.base import ProcessBackendPlugin
+
+
+class CommandBackend(ProcessBackendPlugin):
+    name = "command"
+    title = "PotPlayer & Backend    By：H_Knight"
+
+    def command(self):
+        args = self.config.get("backend_command")
+        if not args:
+            raise ValueError("command 后端需要配置 backend_command")
+        return list(args)
@@ -0,0 +1,95 @@
+# ================= 代码说明 =================
+# 文件名: backends/openlist_service.py
+# 功能: OpenList Desktop Service 后端 (Windows 服务)
+#       通过 SCM 启动/停止服务；已安装特权代理 (broker.py) 时经由代理控制，启动器无需提权
+#       Linux 下配置 service_backend: "fake" 使用模拟服务测试
+# 作者: H_Knight
+# 日期: 2026-10-18
+# ===========================================
+
+import os
+
+import readiness
+import service_control
+from backends.base import BackendPlugin
+
+SERVICE_NAME = "openlist_desktop_service"
+SERVICE_TIMEOUT = 10.0      # 启动/停止服务 (含等待 PENDING 状态结束) 的超时
+
+
+class OpenListServiceBackend(BackendPlugin):
+    name = "openlist_service"
+    title = "PotPlayer Link OpenList    By：H_Knight"
+
+    def __init__(self, config, log=print, state_dir=None):
+        super().__init__(config, log, state_dir)
+        self.service_name = config.get("service_name", SERVICE_NAME)
+        self._controller = None
+        self._kind = None
+
+    def controller_kind(self):
+        """
+        实际使用的服务控制方式: service_backend 未配置时，特权代理在运行则经由代理，否则 Windows 下为 "scm"
+        ("scm" / "fake" / "broker"；其他平台未配置时为 None，创建控制器时报错)
+        """
+        if self._kind is None:
+            kind = self.config.get("service_backend")
+            if kind is None and self.state_dir:
+                import broker
+                if broker.available(broker.runtime_dir()):
+                    kind = "broker"
+            if kind is None and os.name == 'nt':
+                kind = "scm"
+            self._kind = kind
+        return self._kind
+
+    @property
+    def controller(self):
+        """按配置创建服务控制器，同一插件内复用"""
+        if self._controller is None:
+            kind = self.controller_kind()
+            if kind == "broker":
+                import broker
+                self._controller = broker.BrokerController(broker.runtime_dir())
+            else:
+                self._controller = service_control.create_controller(kind)
+        return self._controller
+
+    def needs_admin(self):
+        return self.controller_kind() == "scm"
+
+    def manage(self, action, wait=False):
+        """
+        action: "start" | "stop"
+        直接调用 SCM 接口；wait=False 时请求发出后立即返回，不等待状态切换完成
+        """
+        result = getattr(self.controller, action)(self.service_name, wait=wait, timeout=SERVICE_TIMEOUT)
+        if not result.ok:
+            self.log(f"[!] 服务 {action} {self.service_name} 失败: {result.error} ({result.elapsed * 1000:.1f} ms)")
+        elif result.already:
+            self.log(f"[-] 服务 {self.service_name} 已处于 {result.state} 状态，无需 {action}")
+        else:
+            self.log(f"[-] 已发送服务 {action} 请求: {self.service_name} -> {result.state} ({result.elapsed * 1000:.1f} ms)")
+        return result
+
+    def start(self):
+        self.log(f"[+] 正在启动服务: {self.service_name}")
+        result = self.manage("start")
+        if not result.ok:
+            raise result.error
+        return result
+
+    def stop(self, wait=False):
+        result = self.manage("stop", wait=wait)
+        if wait and not result.ok:
+            raise result.error
+        return result
+
+    def is_running(self):
+        return self.controller.query_state(self.service_name) in ("RUNNING", "START_PENDING")
+
+    def default_probe_specs(self):
+        return readiness.default_probe_specs()
+
+    def service_query(self):
+        return self.controller.query_state
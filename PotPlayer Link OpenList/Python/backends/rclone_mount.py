@@ -0,0 +1,28 @@
+# ================= 代码说明 =================
+# 文件名: backends/rclone_mount.py
+# 功能: 直接运行 rclone mount 的后端 (不经过 AlistHelper)
+#       需配置 rclone_path、rclone_remote (如 "openlist:")、mount_point (如 "X:")，rclone_args 可选
+# 作者: H_Knight
+# 日期: 2026-10-18
+# ===========================================
+
+from backends.base import ProcessBackendPlugin
+
+# 播放场景下的默认挂载参数: 完整 VFS 缓存，支持拖动进度条时的随机读取
+DEFAULT_ARGS = ["--vfs-cache-mode", "full"]
+
+
+class RcloneMountBackend(ProcessBackendPlugin):
+    name = "rclone_mount"
+    title = "PotPlayer & rclone    By：H_Knight"
+    required_paths = (("rclone_path", "rclone 路径:", "选择 rclone.exe"),)
+
+    def command(self):
+        remote = self.config.get("rclone_remote")
+        mount_point = self.config.get("mount_point")
+        if not remote or not mount_point:
+            raise ValueError("rclone_mount 需要配置 rclone_remote 与 mount_point")
+        return [self.config["rclone_path"], "mount", remote, mount_point] + self.config.get("rclone_args", DEFAULT_ARGS)
+
+    def default_probe_specs(self):
+        return [{"type": "mount", "path": self.config.get("mount_point", "")}]
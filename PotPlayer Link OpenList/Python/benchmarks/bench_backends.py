@@ -0,0 +1,96 @@
+# ================= 代码说明 =================
+# 文件名: bench_backends.py
+# 功能: 后端插件测试与计时
+#       对每个插件使用替身程序 (stub_backend.py) 依次执行 启动 -> 等待就绪 -> 健康检查 -> 停止，
+#       报告各阶段耗时，并确认加载一个插件时不会导入其他插件
+# 作者: H_Knight
+# 日期: 2026-10-18
+# 用法: python bench_backends.py [-n 次数] [--delay 替身启动延迟秒数] [--only 插件名]
+# ===========================================
+
+import argparse
+import os
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+LAUNCHER_DIR = os.path.dirname(HERE)
+sys.path.insert(0, LAUNCHER_DIR)
+sys.path.insert(0, HERE)
+
+import backends
+import launcher_core
+import stub_backend
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def quiet(msg):
+    pass
+
+
+def run_once(name, workdir, delay):
+    config = stub_backend.standin_config(name, workdir, free_port(), delay)
+    plugin = backends.load_backend(name, config, log=quiet)
+    t0 = time.perf_counter()
+    plugin.start()
+    t1 = time.perf_counter()
+    report = launcher_core.readiness.wait_until_ready(plugin.readiness_probes())
+    t2 = time.perf_counter()
+    healthy, detail = plugin.health()
+    t3 = time.perf_counter()
+    plugin.stop()
+    t4 = time.perf_counter()
+    if not report.ready or not healthy:
+        raise RuntimeError(f"{name}: 就绪 {report.ready}, 健康 {healthy} ({detail})")
+    if name != "openlist_service" and plugin.is_running():
+        raise RuntimeError(f"{name}: 停止后仍在运行")
+    return {"start": t1 - t0, "ready": t2 - t1, "health": t3 - t2, "stop": t4 - t3}
+
+
+def check_lazy_import(name):
+    """在子进程中只加载一个插件，返回被导入的插件模块列表"""
+    code = ("import sys, backends; backends.load_backend(%r, {}, log=lambda m: None); "
+            "print(' '.join(sorted(m for m in sys.modules if m.startswith('backends.'))))") % name
+    out = subprocess.run([sys.executable, "-c", code], cwd=LAUNCHER_DIR, capture_output=True, text=True, check=True)
+    return out.stdout.split()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="后端插件测试与计时")
+    parser.add_argument("-n", type=int, default=5, help="每个插件的重复次数")
+    parser.add_argument("--delay", type=float, default=0.2, help="替身程序开始监听前的延迟 (秒)")
+    parser.add_argument("--only", choices=sorted(backends.PLUGINS), help="只测试指定插件")
+    args = parser.parse_args()
+
+    names = [args.only] if args.only else list(backends.PLUGINS)
+    failed = False
+    workdir = tempfile.mkdtemp(prefix="bench_backends_")
+    try:
+        for name in names:
+            loaded = check_lazy_import(name)
+            extra = [m for m in loaded if m not in ("backends.base", backends.PLUGINS[name][0])]
+            runs = [run_once(name, workdir, args.delay) for _ in range(args.n)]
+            print(f"[*] {name}: 次数 {args.n}, 导入的插件模块 {' '.join(loaded)}")
+            for phase in ("start", "ready", "health", "stop"):
+                values = [r[phase] * 1000 for r in runs]
+                print(f"    {phase:<7} 中位数 {statistics.median(values):8.1f} ms, 最大 {max(values):8.1f} ms")
+            if extra:
+                print(f"[!] 加载 {name} 时额外导入了 {' '.join(extra)}")
+                failed = True
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+# ================= 代码说明 =================
+# 文件名: bench_elevation.py
+# 功能: 提权重启 vs 特权代理 的启动延迟对比
+#       relaunch: 模拟未提权时的旧流程 —— 第一个解释器导入启动器、读取配置后重新执行自身 (代替 ShellExecuteW runas)，
+#                 由第二个解释器控制服务 (UAC 弹窗的人工确认时间不计入)
+#       broker:   特权代理常驻 (Linux 下为 Unix socket + 模拟服务)，启动器直接运行，经由代理启动/停止服务
+#       启动延迟 = 从启动第一个进程到 "播放器已启动且服务已就绪"，各阶段耗时取自 launcher_timings.jsonl
+# 作者: H_Knight
+# 日期: 2026-10-18
+# 用法: python bench_elevation.py [-n 次数]
+# ===========================================
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+
+import bench_launch
+from bench_launch import ENTRY, PROFILE, percentile
+
+# 模拟旧流程的第一个 (未提权) 进程: 完成导入与配置加载后重新执行自身并立即退出
+RELAUNCH_DRIVER = r"""
+import subprocess, sys, time
+sys.argv = [{entry!r}, "--profile", {profile!r}]
+sys.path.insert(0, {workdir!r})
+import PotPlayer_OpenLlist_Merged as m
+m.load_config()
+subprocess.Popen([sys.executable, {entry!r}, "--profile", {profile!r}, f"--launch-t0={{time.time():.6f}}"])
+"""
+
+
+def policy_file(workdir):
+    """测试用的代理策略文件位置 (代理目录为其所在目录)"""
+    return os.path.join(workdir, "broker", "broker_policy.json")
+
+
+def prepare(workdir, service_backend):
+    """复制启动器并写入使用 OpenList 服务插件的配置"""
+    bench_launch.prepare(workdir, 0.0, False)
+    player = os.path.join(workdir, "PotPlayerMini64")
+    profile = {"backend": "openlist_service", "potplayer_path": player}
+    if service_backend:
+        profile["service_backend"] = service_backend
+    config = {
+        "version": 2,
+        "active_profile": PROFILE,
+        "profiles": {PROFILE: profile},
+        "readiness": {"probes": [{"type": "service"}]},
+        "player_requires_backend": True,
+    }
+    with open(os.path.join(workdir, "launcher_config.json"), 'w', encoding='utf-8') as f:
+        json.dump(config, f)
+
+
+def wait_session(log_path, seen, timeout=30.0):
+    """等待启动器写出新会话的耗时记录"""
+    end = time.time() + timeout
+    while time.time() < end:
+        new = {k: v for k, v in bench_launch.read_sessions(log_path).items() if k not in seen}
+        if new:
+            session, spans = new.popitem()
+            seen.add(session)
+            return spans
+        time.sleep(0.02)
+    raise RuntimeError("启动器未写出耗时记录")
+
+
+def run_once(workdir, mode, seen):
+    entry = os.path.join(workdir, ENTRY)
+    log_path = os.path.join(workdir, "launcher_timings.jsonl")
+    t_spawn = time.time()
+    if mode == "relaunch":
+        code = RELAUNCH_DRIVER.format(entry=entry, profile=PROFILE, workdir=workdir)
+        subprocess.run([sys.executable, "-c", code], cwd=workdir, check=True, capture_output=True)
+    else:
+        # 启动器与代理使用同一策略文件位置，从而找到代理目录中的端口文件与密钥
+        subprocess.run([sys.executable, entry, "--profile", PROFILE, f"--broker-policy={policy_file(workdir)}"],
+                       cwd=workdir, check=True, capture_output=True)
+    spans = wait_session(log_path, seen)
+    launch = spans.get("launch")
+    if launch is None or not launch["ok"]:
+        raise RuntimeError(f"{mode}: 启动未成功 {spans}")
+    return {
+        "latency": launch["ts"] - t_spawn + launch["duration"],
+        "first_process": spans["elevation"]["duration"] if "elevation" in spans else 0.0,
+        "backend_start": spans["backend_start"]["duration"],
+        "shutdown": spans["shutdown"]["duration"],
+    }
+
+
+def bench(mode, n):
+    workdir = tempfile.mkdtemp(prefix=f"bench_elevation_{mode}_")
+    broker_proc = None
+    try:
+        # relaunch: 第二个进程视为已提权，直接控制 (模拟) 服务；broker: 由代理控制
+        prepare(workdir, "fake" if mode == "relaunch" else None)
+        if mode == "broker":
+            sys.path.insert(0, workdir)
+            import broker
+            # 代理只按策略文件工作: 测试时写在临时目录中，并显式使用模拟服务
+            policy = broker.write_policy({"services": ["openlist_desktop_service"], "service_backend": "fake"},
+                                         policy_file(workdir))
+            broker_proc = subprocess.Popen([sys.executable, os.path.join(workdir, ENTRY), "--broker",
+                                            f"--broker-policy={policy}"], cwd=workdir, stdout=subprocess.DEVNULL)
+            end = time.time() + 10
+            while not broker.available(broker.runtime_dir(policy), refresh=True):
+                if time.time() > end:
+                    raise RuntimeError("特权代理未能启动")
+                time.sleep(0.02)
+        seen = set()
+        runs = [run_once(workdir, mode, seen) for _ in range(n)]
+    finally:
+        if broker_proc is not None:
+            import broker
+            broker.stop(broker.runtime_dir(policy_file(workdir)))
+            broker_proc.wait(timeout=5)
+        shutil.rmtree(workdir, ignore_errors=True)
+    return runs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="提权重启与特权代理的启动延迟对比")
+    parser.add_argument("-n", type=int, default=20, help="每种模式的重复次数")
+    args = parser.parse_args()
+
+    results = {}
+    for mode in ("relaunch", "broker"):
+        runs = bench(mode, args.n)
+        lat = [r["latency"] * 1000 for r in runs]
+        results[mode] = statistics.median(lat)
+        print(f"[*] {mode} ({args.n} 次)")
+        print(f"    启动延迟  p50 {percentile(lat, 50):8.1f} ms   p95 {percentile(lat, 95):8.1f} ms")
+        for key in ("first_process", "backend_start", "shutdown"):
+            values = [r[key] * 1000 for r in runs]
+            if any(values):
+                print(f"    - {key:<14} 中位数 {statistics.median(values):8.1f} ms")
+    print(f"[*] 特权代理节省 (p50): {results['relaunch'] - results['broker']:.1f} ms (不含 UAC 弹窗的人工确认时间)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+# ================= 代码说明 =================
+# 文件名: bench_handoff.py
+# 功能: 单实例转交耗时基准测试
+#       先运行一个启动器 (替身播放器保持运行)，再反复以带媒体参数的方式启动第二个启动器，
+#       统计其从进程启动到转交完成并退出的耗时，并确认媒体参数原样到达了播放器
+# 作者: H_Knight
+# 日期: 2026-10-18
+# 用法: python bench_handoff.py [-n 次数]
+# ===========================================
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+
+import bench_launch
+from bench_launch import ENTRY, PROFILE, percentile
+
+
+def make_player(workdir):
+    """替身播放器: 记录收到的参数，直到 stop 文件出现才退出"""
+    player = os.path.join(workdir, "PotPlayerMini64")
+    with open(player, 'w') as f:
+        f.write(f'#!/bin/sh\necho "$@" >> "{workdir}/player_args.log"\n'
+                f'while [ ! -f "{workdir}/stop" ]; do sleep 0.05; done\n')
+    os.chmod(player, 0o755)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="单实例转交耗时基准测试")
+    parser.add_argument("-n", type=int, default=20, help="转交次数")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench_handoff_")
+    entry = os.path.join(workdir, ENTRY)
+    first = None
+    try:
+        bench_launch.prepare(workdir, 0.0, False)
+        config_path = os.path.join(workdir, "launcher_config.json")
+        with open(config_path, encoding='utf-8') as f:
+            config = json.load(f)
+        config["single_instance"] = True
+        with open(config_path, 'w', encoding='utf-8') as f:
+            json.dump(config, f)
+        make_player(workdir)
+        first = subprocess.Popen([sys.executable, entry, "--profile", PROFILE, "first.mkv"],
+                                 cwd=workdir, stdout=subprocess.DEVNULL)
+        sock = os.path.join(workdir, ".instance.sock")
+        end = time.time() + 10
+        while not os.path.exists(sock):
+            if time.time() > end:
+                raise RuntimeError("第一个启动器未能开始监听")
+            time.sleep(0.01)
+
+        # 进程内直接转交 (不含解释器启动与导入)，即转交本身的通信耗时
+        sys.path.insert(0, workdir)
+        import instance
+        direct = []
+        for i in range(args.n):
+            t0 = time.perf_counter()
+            if not instance.forward(workdir, [f"direct_{i}.mkv", "http://127.0.0.1/list.dpl"]):
+                raise RuntimeError("转交失败")
+            direct.append((time.perf_counter() - t0) * 1000)
+
+        times = []
+        for i in range(args.n):
+            t0 = time.perf_counter()
+            subprocess.run([sys.executable, entry, "--profile", PROFILE, f"episode_{i}.mkv",
+                            "http://127.0.0.1/list.dpl"], cwd=workdir, check=True, capture_output=True)
+            times.append((time.perf_counter() - t0) * 1000)
+
+        # 转交来的播放器也由第一个启动器监控，stop 后它应当随之退出
+        open(os.path.join(workdir, "stop"), 'w').close()
+        first.wait(timeout=30)
+        with open(os.path.join(workdir, "player_args.log")) as f:
+            received = f.read().splitlines()
+    finally:
+        if first is not None and first.poll() is None:
+            open(os.path.join(workdir, "stop"), 'w').close()
+            first.kill()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print(f"[*] 转交 {args.n} 次")
+    print(f"    第二个启动器从启动到退出: p50 {percentile(times, 50):.1f} ms   p95 {percentile(times, 95):.1f} ms")
+    print(f"    其中转交通信 (进程内):   p50 {percentile(direct, 50):.1f} ms   p95 {percentile(direct, 95):.1f} ms")
+    # 第一个启动器的播放器可能晚于转交来的播放器启动，不按顺序比较
+    expected = 1 + 2 * args.n
+    ok = (len(received) == expected and sum(line.endswith("first.mkv") for line in received) == 1
+          and sum(line.endswith("list.dpl") for line in received) == 2 * args.n)
+    print(f"    播放器收到 {len(received)}/{expected} 次启动，参数{'完整' if ok else '不完整'}")
+    if not ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
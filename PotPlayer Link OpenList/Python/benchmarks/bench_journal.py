@@ -0,0 +1,183 @@
+# ================= 代码说明 =================
+# 文件名: bench_journal.py
+# 功能: 会话记录与遗留后端认领测试 (后端为 stub_backend.py 替身，Linux 下运行)
+#       每个场景先正常启动一次启动器 (PotPlayer 替身持续运行)，待后端就绪后 SIGKILL 启动器，
+#       模拟关闭控制台 / 崩溃，此时后端进程树遗留下来；再关闭遗留的 PotPlayer 替身，重新启动启动器，检查:
+#         认领:     遗留后端健康 -> 沿用同一进程，不再冷启动
+#         无响应:   遗留后端挂起 (SIGUSR1) -> 关闭遗留进程树并重新启动
+#         已退出:   遗留后端也已被结束 -> 清除过期记录，照常启动
+#         旧行为:   关闭会话记录 (session_journal.enabled=false)，新后端与遗留后端争抢端口
+#       报告重新启动时等待后端就绪的耗时、启动器总耗时，以及会话结束后仍在运行的替身后端进程数
+# 作者: H_Knight
+# 日期: 2026-10-18
+# 用法: python bench_journal.py [--backend alisthelper|command|rclone_mount] [--backend-delay 秒]
+# ===========================================
+
+import argparse
+import json
+import os
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+
+import session_journal
+from bench_launch import ENTRY, PROFILE, free_port, read_sessions
+
+STUB = os.path.join(HERE, "stub_backend.py")
+
+
+def stub_pids():
+    """正在运行的替身后端进程 (含其子进程)"""
+    pids = []
+    for d in os.listdir("/proc"):
+        if not d.isdigit():
+            continue
+        try:
+            with open(f"/proc/{d}/cmdline", 'rb') as f:
+                args = f.read().split(b"\0")
+        except OSError:
+            continue
+        if STUB.encode() in args and session_journal.process_start_time(int(d)) is not None:
+            pids.append(int(d))
+    return pids
+
+
+def kill_all(pids, sig=signal.SIGKILL):
+    for pid in pids:
+        try:
+            os.kill(pid, sig)
+        except OSError:
+            pass
+
+
+def prepare(workdir, backend, delay, journal):
+    """复制启动器，生成替身与配置 (与 bench_launch.prepare 相同，后端可选)"""
+    import stub_backend
+    launcher_dir = os.path.dirname(HERE)
+    for fn in os.listdir(launcher_dir):
+        if fn.endswith(".py"):
+            shutil.copy(os.path.join(launcher_dir, fn), workdir)
+    shutil.copytree(os.path.join(launcher_dir, "backends"), os.path.join(workdir, "backends"),
+                    ignore=shutil.ignore_patterns("__pycache__"))
+    profile = stub_backend.standin_config(backend, workdir, free_port(), delay)
+    profile["potplayer_path"] = os.path.join(workdir, "PotPlayerMini64")
+    config = {"version": 2, "active_profile": PROFILE,
+              "profiles": {PROFILE: {k: v for k, v in profile.items() if k != "readiness"}},
+              "readiness": profile["readiness"], "player_requires_backend": True,
+              "single_instance": False, "watchdog": {"enabled": False},
+              "session_journal": {"enabled": journal, "adopt_deadline": 1.0}}
+    with open(os.path.join(workdir, "launcher_config.json"), 'w', encoding='utf-8') as f:
+        json.dump(config, f)
+
+
+def set_player(workdir, seconds):
+    """PotPlayer 替身: 写下自己的 PID 后运行 seconds 秒"""
+    path = os.path.join(workdir, "PotPlayerMini64")
+    with open(path, 'w') as f:
+        f.write(f"#!/bin/sh\necho $$ > {workdir}/player.pid\nexec sleep {seconds}\n")
+    os.chmod(path, 0o755)
+
+
+def launcher(workdir):
+    return subprocess.Popen([sys.executable, os.path.join(workdir, ENTRY), "--profile", PROFILE], cwd=workdir,
+                            stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+
+
+def crash_session(workdir, journal):
+    """启动后等后端就绪，SIGKILL 启动器与 PotPlayer 替身，返回遗留的后端进程"""
+    set_player(workdir, 60)
+    proc = launcher(workdir)
+    deadline = time.time() + 20
+    if journal:
+        path = os.path.join(workdir, session_journal.JOURNAL_NAME)
+        while time.time() < deadline:
+            data = session_journal.SessionJournal(workdir).read() if os.path.exists(path) else None
+            if data and data.get("state") == "running":
+                break
+            time.sleep(0.05)
+        else:
+            raise RuntimeError("会话记录未进入 running 状态")
+    else:
+        while time.time() < deadline and not os.path.exists(os.path.join(workdir, "player.pid")):
+            time.sleep(0.05)
+        time.sleep(1.0)
+    proc.kill()
+    proc.wait()
+    with open(os.path.join(workdir, "player.pid")) as f:
+        kill_all([int(f.read())])
+    return stub_pids()
+
+
+def relaunch(workdir):
+    """PotPlayer 替身立即退出，返回 (启动器输出, 本次会话的耗时记录)"""
+    set_player(workdir, 0)
+    seen = set(read_sessions(os.path.join(workdir, "launcher_timings.jsonl")))
+    out = launcher(workdir).communicate(timeout=60)[0]
+    sessions = {k: v for k, v in read_sessions(os.path.join(workdir, "launcher_timings.jsonl")).items()
+                if k not in seen}
+    if len(sessions) != 1:
+        raise RuntimeError(f"启动器运行失败:\n{out}")
+    return out, sessions.popitem()[1]
+
+
+def scenario(args, name, journal, before_relaunch=None):
+    workdir = tempfile.mkdtemp(prefix="bench_journal_")
+    try:
+        prepare(workdir, args.backend, args.backend_delay, journal)
+        orphans = crash_session(workdir, journal)
+        if before_relaunch is not None:
+            before_relaunch(orphans)
+        t0 = time.perf_counter()
+        out, spans = relaunch(workdir)
+        elapsed = time.perf_counter() - t0
+        stray = stub_pids()
+        adopted_same = bool(orphans) and "沿用" in out
+        left = os.path.exists(os.path.join(workdir, session_journal.JOURNAL_NAME))
+        return {"name": name, "orphans": len(orphans), "elapsed": elapsed,
+                "backend_ready": spans.get("backend_ready", {}).get("duration"),
+                "action": spans.get("orphan_check", {}).get("action"), "adopted": adopted_same,
+                "stray": len(stray), "journal_left": left}
+    finally:
+        kill_all(stub_pids())
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="会话记录与遗留后端认领测试")
+    parser.add_argument("--backend", default="alisthelper", choices=("alisthelper", "command", "rclone_mount"))
+    parser.add_argument("--backend-delay", type=float, default=1.0, help="替身后端开始监听前的延迟 (秒)")
+    args = parser.parse_args()
+    if os.name == 'nt':
+        sys.exit("[-] 本测试依赖 /proc 与信号，请在 Linux 下运行")
+
+    results = [
+        scenario(args, "认领 (遗留后端健康)", True),
+        scenario(args, "无响应 (遗留后端挂起)", True, lambda pids: kill_all(pids, signal.SIGUSR1)),
+        scenario(args, "已退出 (遗留后端也被结束)", True, kill_all),
+        scenario(args, "旧行为 (不使用会话记录)", False),
+    ]
+    print(f"[*] 后端: {args.backend} 替身，冷启动延迟 {args.backend_delay:g}s")
+    ok = True
+    for r in results:
+        ready = f"{r['backend_ready'] * 1000:8.1f} ms" if r["backend_ready"] is not None else "     失败"
+        print(f"    {r['name']}")
+        print(f"      遗留进程 {r['orphans']} 个, 处理: {r['action'] or '无'}, 重新启动时等待后端就绪 {ready}, "
+              f"启动器总耗时 {r['elapsed']:.2f}s, 会话结束后仍在运行的后端进程 {r['stray']} 个"
+              + (", 会话记录未删除" if r["journal_left"] else ""))
+    expect = [("adopted", 0), ("reclaimed", 0), ("reclaimed", 0)]
+    for r, (action, stray) in zip(results, expect):
+        ok &= r["action"] == action and r["stray"] == stray and not r["journal_left"]
+    ok &= results[0]["adopted"]
+    print(f"    结果: {'符合预期' if ok else '不符合预期'}")
+    if not ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+# ================= 代码说明 =================
+# 文件名: bench_launch.py
+# 功能: 端到端启动延迟基准测试
+#       以独立进程反复运行启动器 main()，后端与播放器均为替身程序 (Linux 下可运行)，
+#       从启动器写出的耗时日志 (launcher_timings.jsonl) 读取各阶段耗时
+#       启动延迟 = 解释器启动与导入 + 启动器从加载配置到 "播放器已启动且后端已就绪"
+#       冷启动: 每次都由启动器拉起后端；热启动: 保温模式下后端由守护进程持有 (首次运行用于预热，不计入)
+# 作者: H_Knight
+# 日期: 2026-10-18
+# 用法: python bench_launch.py [-n 次数] [--backend-delay 后端启动延迟秒数] [--mode cold|warm|both]
+# ===========================================
+
+import argparse
+import json
+import os
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+LAUNCHER_DIR = os.path.dirname(HERE)
+sys.path.insert(0, HERE)
+
+import stub_backend
+
+ENTRY = "PotPlayer_OpenLlist_Merged.py"
+PROFILE = "bench"
+PHASES = ["config_load", "plugin_load", "backend_start", "backend_ready", "player_spawn", "shutdown"]
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def percentile(values, pct):
+    """最近秩法百分位数"""
+    ordered = sorted(values)
+    k = max(0, min(len(ordered) - 1, int(round(pct / 100.0 * len(ordered) + 0.5)) - 1))
+    return ordered[k]
+
+
+def prepare(workdir, backend_delay, keep_warm):
+    """复制启动器到临时目录，生成替身程序与配置"""
+    for fn in os.listdir(LAUNCHER_DIR):
+        if fn.endswith(".py"):
+            shutil.copy(os.path.join(LAUNCHER_DIR, fn), workdir)
+    shutil.copytree(os.path.join(LAUNCHER_DIR, "backends"), os.path.join(workdir, "backends"),
+                    ignore=shutil.ignore_patterns("__pycache__"))
+    player = os.path.join(workdir, "PotPlayerMini64")
+    with open(player, 'w') as f:
+        f.write("#!/bin/sh\nexit 0\n")
+    os.chmod(player, 0o755)
+
+    profile = stub_backend.standin_config("command", workdir, free_port(), backend_delay)
+    profile["potplayer_path"] = player
+    config = {
+        "version": 2,
+        "active_profile": PROFILE,
+        "profiles": {PROFILE: {k: v for k, v in profile.items() if k != "readiness"}},
+        "readiness": profile["readiness"],
+        "player_requires_backend": True,      # 启动延迟包含后端就绪
+        "keep_warm": {"enabled": keep_warm, "grace_minutes": 5},
+    }
+    with open(os.path.join(workdir, "launcher_config.json"), 'w', encoding='utf-8') as f:
+        json.dump(config, f)
+
+
+def read_sessions(log_path):
+    """按会话分组读取耗时日志，返回 {session: {span: 记录}}"""
+    sessions = {}
+    try:
+        with open(log_path, encoding='utf-8') as f:
+            for line in f:
+                r = json.loads(line)
+                sessions.setdefault(r["session"], {})[r["span"]] = r
+    except FileNotFoundError:
+        pass
+    return sessions
+
+
+def run_once(workdir, seen):
+    log_path = os.path.join(workdir, "launcher_timings.jsonl")
+    t_spawn = time.time()
+    proc = subprocess.run([sys.executable, os.path.join(workdir, ENTRY), "--profile", PROFILE],
+                          cwd=workdir, capture_output=True, text=True)
+    wall = time.time() - t_spawn
+    new = {k: v for k, v in read_sessions(log_path).items() if k not in seen}
+    if proc.returncode != 0 or len(new) != 1:
+        raise RuntimeError(f"启动器运行失败:\n{proc.stdout}\n{proc.stderr[-2000:]}")
+    session, spans = new.popitem()
+    seen.add(session)
+    launch = spans.get("launch")
+    if launch is None or not launch["ok"]:
+        raise RuntimeError(f"启动未成功:\n{proc.stdout}")
+    interp = launch["ts"] - t_spawn
+    result = {"latency": interp + launch["duration"], "interp": interp, "wall": wall, "cold": launch["cold"]}
+    for phase in PHASES:
+        if phase in spans:
+            result[phase] = spans[phase]["duration"]
+    return result
+
+
+def stop_keepwarm(workdir):
+    sys.path.insert(0, workdir)
+    import ipc, keepwarm
+    addr = ipc.address(keepwarm.CHANNEL_NAME, workdir)
+    keepwarm.stop_daemon(addr, ipc.load_authkey(os.path.join(workdir, ".launcher_ipc.key")))
+
+
+def bench(mode, n, backend_delay):
+    workdir = tempfile.mkdtemp(prefix=f"bench_launch_{mode}_")
+    warm = mode == "warm"
+    try:
+        prepare(workdir, backend_delay, warm)
+        seen = set()
+        if warm:
+            run_once(workdir, seen)      # 预热: 拉起守护进程与后端
+        runs = [run_once(workdir, seen) for _ in range(n)]
+    finally:
+        if warm:
+            stop_keepwarm(workdir)
+        shutil.rmtree(workdir, ignore_errors=True)
+    if warm and any(r["cold"] for r in runs):
+        print("[!] 热启动测试中出现了冷启动 (守护进程未能保持后端)")
+    return runs
+
+
+def report(mode, runs):
+    ms = lambda key: [r[key] * 1000 for r in runs if key in r]
+    lat = ms("latency")
+    print(f"[*] {'冷启动' if mode == 'cold' else '热启动'} ({len(runs)} 次)")
+    print(f"    启动延迟  p50 {percentile(lat, 50):8.1f} ms   p95 {percentile(lat, 95):8.1f} ms")
+    print(f"    其中解释器启动与导入 中位数 {statistics.median(ms('interp')):.1f} ms")
+    for phase in PHASES:
+        values = ms(phase)
+        if values:
+            print(f"    - {phase:<14} 中位数 {statistics.median(values):8.1f} ms   p95 {percentile(values, 95):8.1f} ms")
+    print(f"    进程总耗时 中位数 {statistics.median(ms('wall')):.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="端到端启动延迟基准测试")
+    parser.add_argument("-n", type=int, default=20, help="每种模式的重复次数")
+    parser.add_argument("--backend-delay", type=float, default=0.3, help="替身后端开始监听前的延迟 (秒)")
+    parser.add_argument("--mode", choices=["cold", "warm", "both"], default="both")
+    args = parser.parse_args()
+
+    modes = ["cold", "warm"] if args.mode == "both" else [args.mode]
+    for mode in modes:
+        report(mode, bench(mode, args.n, args.backend_delay))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+# ================= 代码说明 =================
+# 文件名: bench_media_proxy.py
+# 功能: 本地媒体代理基准测试 (源站为 stub_backend.py 的限速 /media/，带首字节延迟与带宽上限)
+#       首帧时间: 读取文件开头 head_mb (播放器探测格式、解码首帧所需的数据) 的耗时
+#         直连源站 / 代理 (缓存为空) / 代理 (重启后命中磁盘缓存) / 代理 (下一集已被预读)
+#       跳转延迟: 随机位置读取 256KB 的耗时
+#         直连源站 / 代理 (缓存为空) / 代理 (命中缓存)
+#       并校验经代理读到的数据与源站一致
+# 作者: H_Knight
+# 日期: 2026-10-18
+# 用法: python bench_media_proxy.py [-n 跳转次数] [--latency 秒] [--rate MB/s]
+# ===========================================
+
+import argparse
+import http.client
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from urllib.parse import urlsplit
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+
+import media_proxy
+from bench_launch import percentile
+from bench_prefetch import Stub
+from stub_backend import media_bytes
+
+MB = media_proxy.MB
+SEEK_SIZE = 256 * 1024
+
+
+def read_range(url, start, count):
+    """读取 [start, start + count)，返回 (耗时 ms, 数据)"""
+    parts = urlsplit(url)
+    t0 = time.perf_counter()
+    conn = http.client.HTTPConnection(parts.hostname, parts.port, timeout=30)
+    conn.request("GET", parts.path, headers={"Range": f"bytes={start}-{start + count - 1}"})
+    resp = conn.getresponse()
+    if resp.status in (301, 302):
+        conn.close()
+        return read_range(f"{parts.scheme}://{parts.netloc}{resp.headers['Location']}", start, count)
+    data = resp.read()
+    conn.close()
+    return (time.perf_counter() - t0) * 1000, data
+
+
+def new_proxy(cache_dir):
+    proxy = media_proxy.MediaProxy(media_proxy.ChunkCache(cache_dir, 1024 * MB), log=lambda *a: None)
+    proxy.start()
+    return proxy
+
+
+def main():
+    parser = argparse.ArgumentParser(description="本地媒体代理基准测试")
+    parser.add_argument("-n", type=int, default=10, help="跳转次数")
+    parser.add_argument("--latency", type=float, default=0.08, help="源站首字节延迟 (秒)")
+    parser.add_argument("--rate", type=float, default=20, help="源站带宽 (MB/s)")
+    parser.add_argument("--head-mb", type=float, default=4, help="首帧所需数据量 (MB)")
+    args = parser.parse_args()
+
+    size = 64 * MB
+    head = int(args.head_mb * MB)
+    stub = Stub({"STUB_MEDIA_LATENCY": args.latency, "STUB_MEDIA_RATE": int(args.rate * MB), "STUB_MEDIA_SIZE": size})
+    cache_dir = tempfile.mkdtemp(prefix="bench_media_proxy_")
+    rnd = random.Random(42)
+    offsets = [rnd.randrange(head, size - SEEK_SIZE) for _ in range(args.n)]
+    episodes = [f"{stub.base}/d/E{i:02d}.mkv" for i in range(1, 4)]
+    ok = True
+    try:
+        # 直连源站 (OpenList 的 /d/ 链接，先 302 跳转)
+        ttff_direct = read_range(episodes[0], 0, head)[0]
+        seek_direct = [read_range(episodes[0], off, SEEK_SIZE)[0] for off in offsets]
+
+        # 代理，缓存为空
+        proxy = new_proxy(cache_dir)
+        items = proxy.playlist([(os.path.basename(u), u) for u in episodes])
+        urls = [u for _, u in items]
+        ttff_cold, data = read_range(urls[0], 0, head)
+        ok &= data == media_bytes(0, head)
+        seek_cold = []
+        for off in offsets:
+            elapsed, data = read_range(urls[0], off, SEEK_SIZE)
+            seek_cold.append(elapsed)
+            ok &= data == media_bytes(off, SEEK_SIZE)
+        # 给下一集开头的预读留出时间 (相当于看了一会儿当前这一集)
+        deadline = time.time() + 30
+        while not all(proxy.cache.has(media_proxy.cache_key(episodes[1]), i)
+                      for i in range(proxy.next_head // proxy.cache.chunk_size)):
+            if time.time() > deadline:
+                break
+            time.sleep(0.05)
+        ttff_next = read_range(urls[1], 0, head)[0]
+        stats = dict(proxy.stats)
+        proxy.close()
+
+        # 代理重启 (模拟下次启动)，分块从磁盘缓存读取
+        proxy = new_proxy(cache_dir)
+        urls = [u for _, u in proxy.playlist([(os.path.basename(u), u) for u in episodes])]
+        ttff_warm, data = read_range(urls[0], 0, head)
+        ok &= data == media_bytes(0, head)
+        seek_warm = [read_range(urls[0], off, SEEK_SIZE)[0] for off in offsets]
+        cached_mb = proxy.cache.total / MB
+        proxy.close()
+    finally:
+        stub.close()
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+    print(f"[*] 源站: 首字节延迟 {args.latency * 1000:.0f} ms，带宽 {args.rate:.0f} MB/s；首帧数据 {args.head_mb:g} MB，"
+          f"分块 {media_proxy.CHUNK_SIZE // MB} MB")
+    print("    首帧时间:")
+    print(f"      直连源站               {ttff_direct:8.1f} ms")
+    print(f"      代理 (缓存为空)        {ttff_cold:8.1f} ms")
+    print(f"      代理 (下一集已预读)    {ttff_next:8.1f} ms")
+    print(f"      代理 (重启后命中缓存)  {ttff_warm:8.1f} ms")
+    print(f"    跳转延迟 ({args.n} 次随机位置读取 {SEEK_SIZE // 1024} KB):")
+    for label, values in (("直连源站", seek_direct), ("代理 (缓存为空)", seek_cold), ("代理 (命中缓存)", seek_warm)):
+        print(f"      {label:<14} p50 {percentile(values, 50):8.1f} ms   p95 {percentile(values, 95):8.1f} ms")
+    print(f"    首次会话: 命中缓存 {stats['hits']} 块, 回源 {stats['misses']} 块, 预读 {stats['readahead']} 块；"
+          f"磁盘缓存 {cached_mb:.0f} MB")
+    print(f"    数据校验: {'一致' if ok else '不一致'}")
+    if not ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
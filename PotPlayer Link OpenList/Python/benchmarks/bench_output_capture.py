@@ -0,0 +1,177 @@
+# ================= 代码说明 =================
+# 文件名: bench_output_capture.py
+# 功能: 输出捕获基准测试 (后端为 stub_backend.py 替身，Linux 下运行)
+#       以独立进程反复运行启动器 (与 bench_launch.py 相同)，三种情况轮流运行 (减少机器状态漂移的影响)，对比
+#       启动延迟以及创建进程的步骤 (backend_start / player_spawn，捕获时包含接管道与启动读取线程) 的耗时:
+#         安静后端 + 不捕获 / 多话后端 (每秒 --chatty 行) + 不捕获 (输出直接进控制台) / 多话后端 + 捕获
+#       捕获时 flush="always"，会话结束后从 launcher_output.jsonl 检查:
+#         后端与播放器的输出都已记录、时间戳落在本次会话内、每个环形缓冲的占用不超过上限 (多出的部分计为丢弃)
+#       另运行一次启动即失败的后端 (STUB_FAIL)，检查默认的 flush="error" 下错误信息被写入日志
+# 作者: H_Knight
+# 日期: 2026-10-18
+# 用法: python bench_output_capture.py [-n 次数] [--chatty 行每秒] [--max-kb 缓冲大小]
+# ===========================================
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+
+import output_capture
+import stub_backend
+from bench_launch import ENTRY, PROFILE, free_port, percentile, read_sessions, run_once
+
+FAIL_MESSAGE = "failed to open data/config.json: permission denied"
+
+
+def prepare(workdir, env, capture):
+    """复制启动器，生成替身与配置；capture 为 output_capture 配置 (None 表示关闭捕获)"""
+    launcher_dir = os.path.dirname(HERE)
+    for fn in os.listdir(launcher_dir):
+        if fn.endswith(".py"):
+            shutil.copy(os.path.join(launcher_dir, fn), workdir)
+    shutil.copytree(os.path.join(launcher_dir, "backends"), os.path.join(workdir, "backends"),
+                    ignore=shutil.ignore_patterns("__pycache__"))
+    player = os.path.join(workdir, "PotPlayerMini64")
+    with open(player, 'w') as f:
+        f.write("#!/bin/sh\necho \"PotPlayer stand-in $$ started\"\necho \"no media\" >&2\nexit 0\n")
+    os.chmod(player, 0o755)
+    profile = stub_backend.standin_config("command", workdir, free_port(), 0.3, env)
+    profile["potplayer_path"] = player
+    config = {"version": 2, "active_profile": PROFILE,
+              "profiles": {PROFILE: {k: v for k, v in profile.items() if k != "readiness"}},
+              "readiness": dict(profile["readiness"], deadline=2), "player_requires_backend": True,
+              "output_capture": capture if capture is not None else {"enabled": False}}
+    with open(os.path.join(workdir, "launcher_config.json"), 'w', encoding='utf-8') as f:
+        json.dump(config, f)
+
+
+def read_output(workdir):
+    try:
+        with open(os.path.join(workdir, output_capture.LOG_NAME), encoding='utf-8') as f:
+            return [json.loads(line) for line in f]
+    except FileNotFoundError:
+        return []
+
+
+def bench(n, cases):
+    """各情况轮流运行 n 轮，返回 {情况: {"runs": bench_launch.run_once 的结果, "outputs": 输出日志记录, "spans": 耗时记录}}"""
+    workdirs = {}
+    results = {label: {"runs": [], "outputs": [], "spans": []} for label, _, _ in cases}
+    try:
+        for label, env, capture in cases:
+            workdirs[label] = tempfile.mkdtemp(prefix="bench_output_")
+            prepare(workdirs[label], env, capture)
+        seen = set()
+        for _ in range(n):
+            for label, _, _ in cases:
+                workdir, r = workdirs[label], results[label]
+                known = set(seen)
+                r["runs"].append(run_once(workdir, seen))
+                session = (seen - known).pop()
+                r["spans"].append(read_sessions(os.path.join(workdir, "launcher_timings.jsonl"))[session])
+                # 输出日志超过大小上限会轮转，按会话筛选当前文件中的记录
+                r["outputs"].append([x for x in read_output(workdir) if x.get("session") == session])
+        return results
+    finally:
+        for workdir in workdirs.values():
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+def check_capture(outputs, spans, max_kb):
+    """检查每次会话写出的输出日志，返回问题列表"""
+    problems = []
+    for records, session in zip(outputs, spans):
+        heads = [r for r in records if r.get("event") == "flush"]
+        lines = [r for r in records if "line" in r]
+        sid = session["launch"]["session"]
+        end = max(s["start"] + s["duration"] for s in session.values())
+        if not heads or any(r["session"] != sid for r in records):
+            problems.append("输出日志缺少本次会话的记录")
+            continue
+        if not any(r["source"] == "backend" and r["stream"] == "stderr" for r in lines):
+            problems.append("未记录后端的 stderr")
+        if not any(r["source"] == "player" and "stand-in" in r["line"] for r in lines):
+            problems.append("未记录播放器的输出")
+        if any(not 0 <= r["t"] <= end + 1 for r in lines):
+            problems.append("输出时间戳不在本次会话内")
+        kept = sum(len(r["line"].encode()) + 1 for r in lines)
+        if kept > 2 * max_kb * 1024 * 1.05:
+            problems.append(f"写出的输出 {kept} 字节超过缓冲上限")
+        head = heads[-1]
+        if any(head["captured"][k] - head["dropped"][k] > max_kb * 1024 for k in head["captured"]):
+            problems.append("环形缓冲占用超过上限")
+    return problems
+
+
+def failing_backend():
+    """启动即失败的后端: 启用捕获 (其余为默认配置) 时错误信息应写入输出日志"""
+    workdir = tempfile.mkdtemp(prefix="bench_output_fail_")
+    try:
+        prepare(workdir, {"STUB_FAIL": FAIL_MESSAGE}, {"enabled": True})
+        out = subprocess.run([sys.executable, os.path.join(workdir, ENTRY), "--profile", PROFILE], cwd=workdir,
+                             capture_output=True, text=True, timeout=60).stdout
+        records = read_output(workdir)
+        logged = any(FAIL_MESSAGE in r.get("line", "") and r.get("stream") == "stderr" for r in records)
+        reason = next((r["reason"] for r in records if r.get("event") == "flush"), None)
+        return logged, FAIL_MESSAGE in out, reason
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="输出捕获基准测试")
+    parser.add_argument("-n", type=int, default=15, help="每种情况的启动次数")
+    parser.add_argument("--chatty", type=float, default=20000, help="多话后端每秒输出的行数")
+    parser.add_argument("--max-kb", type=float, default=output_capture.MAX_KB, help="环形缓冲大小 (KB)")
+    args = parser.parse_args()
+    if os.name == 'nt':
+        sys.exit("[-] 本测试使用 shell 替身程序，请在 Linux 下运行")
+
+    chatty = {"STUB_CHATTY": args.chatty}
+    capture = {"enabled": True, "flush": "always", "max_kb": args.max_kb, "max_bytes": 64 * 1024 * 1024}
+    cases = [("安静后端, 不捕获", {}, None), ("多话后端, 不捕获 (输出进控制台)", chatty, None),
+             ("多话后端, 捕获到环形缓冲", chatty, capture)]
+    print(f"[*] 多话后端每秒 {args.chatty:g} 行 (后端冷启动 300 ms)，环形缓冲 {args.max_kb:g} KB，每种情况 {args.n} 次")
+    results = bench(args.n, cases)
+    problems = []
+    for label, _, cfg in cases:
+        r = results[label]
+        ms = lambda key: [x[key] * 1000 for x in r["runs"]]
+        print(f"    {label}")
+        print(f"      启动延迟 p50 {percentile(ms('latency'), 50):7.1f} ms   p95 {percentile(ms('latency'), 95):7.1f} ms   "
+              f"backend_start p50 {percentile(ms('backend_start'), 50):5.1f} ms   "
+              f"player_spawn p50 {percentile(ms('player_spawn'), 50):5.1f} ms")
+        if cfg is not None:
+            outputs = r["outputs"]
+            problems = check_capture(outputs, r["spans"], args.max_kb)
+            head = [r for r in outputs[-1] if r.get("event") == "flush"][-1]
+            lines = [r for r in outputs[-1] if "line" in r]
+            got, dropped = head["captured"]["backend"], head["dropped"]["backend"]
+            print(f"      最后一次会话: 后端输出 {got / 1024:.0f} KB, 保留最后的 {(got - dropped) / 1024:.0f} KB, "
+                  f"丢弃最早的 {dropped / 1024:.0f} KB；共写出 {len(lines)} 行 "
+                  f"(播放器 {sum(1 for r in lines if r['source'] == 'player')} 行)")
+            for p in sorted(set(problems)):
+                print(f"      [!] {p}")
+
+    logged, shown, reason = failing_backend()
+    print(f"    启动失败的后端: 错误信息{'已' if logged else '未'}写入 {output_capture.LOG_NAME} (原因: {reason})，"
+          f"控制台{'已' if shown else '未'}显示")
+
+    p50 = lambda label: percentile([x["latency"] * 1000 for x in results[label]["runs"]], 50)
+    print(f"    捕获相对不捕获的启动延迟变化 (p50): {p50(cases[2][0]) - p50(cases[1][0]):+.1f} ms "
+          f"(安静与多话后端都不捕获时相差 {p50(cases[1][0]) - p50(cases[0][0]):+.1f} ms，可视为测量噪声)")
+    ok = logged and shown and not problems
+    print(f"    结果: {'符合预期' if ok else '不符合预期'}")
+    if not ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+# ================= 代码说明 =================
+# 文件名: bench_page_warm.py
+# 功能: 页缓存预热基准测试 (冷启动 vs 预热后启动)
+#       临时目录中生成 PotPlayer 替身: 若干 "模块" 文件 (启动时逐页映射读取，模拟加载 DLL / 解码器)，
+#       以及同样大小的启动时用不到的文件 (皮肤、语言包等，不应进入清单)
+#       1. 学习: 启动一次替身，由 PageWarmer 采样其映射的文件生成清单
+#       2. 每轮先用 posix_fadvise(DONTNEED) 把整个目录逐出页缓存，再分别测量
+#          冷启动: 不预热；预热: 与模拟的后端启动并行预热
+#          两种情况各自测量 PotPlayer 不等后端 (预热与替身同时进行) / 等后端就绪 (预热完成后启动替身) 两种启动方式
+#       启动耗时 = 启动器开始启动到替身加载完全部模块
+#       需要 posix_fadvise 逐出页缓存，只能在 Linux 下运行
+# 作者: H_Knight
+# 日期: 2026-10-18
+# 用法: python bench_page_warm.py [-n 轮数] [--modules 个数] [--module-mb 每个大小]
+# ===========================================
+
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+
+import page_warm
+from bench_launch import percentile
+
+PLAYER_NAME = "PotPlayerMini64.py"
+MODULE_LIST = "modules.txt"
+
+
+# ================= 替身播放器 =================
+# 逐页映射读取全部模块 (模拟加载 DLL 时的缺页)，输出就绪后保持映射 hold 秒 (供学习采样)
+PLAYER_SOURCE = """import mmap, os, sys, time
+root = os.path.dirname(os.path.abspath(__file__))
+maps = []
+with open(os.path.join(root, "modules.txt"), encoding="utf-8") as f:
+    for name in f.read().split():
+        with open(os.path.join(root, name), "rb") as mf:
+            m = mmap.mmap(mf.fileno(), 0, access=mmap.ACCESS_READ)
+        sum(m[i] for i in range(0, len(m), mmap.PAGESIZE))
+        maps.append(m)
+print("ready", flush=True)
+time.sleep(float(sys.argv[1]))
+"""
+
+
+def start_player(root, hold=0.0):
+    """启动替身，返回 (进程, 从启动到就绪的耗时)"""
+    t0 = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, os.path.join(root, PLAYER_NAME), str(hold)],
+                            stdout=subprocess.PIPE, text=True)
+    if proc.stdout.readline().strip() != "ready":
+        raise RuntimeError("替身播放器启动失败")
+    return proc, time.perf_counter() - t0
+
+
+# ================= 测试 =================
+def prepare(root, modules, module_mb):
+    with open(os.path.join(root, PLAYER_NAME), 'w', encoding='utf-8') as f:
+        f.write(PLAYER_SOURCE)
+    names = []
+    for sub, prefix, count in (("", "codec", modules), ("Skins", "skin", modules)):
+        os.makedirs(os.path.join(root, sub), exist_ok=True)
+        for i in range(count):
+            name = os.path.join(sub, f"{prefix}{i:02d}.dll")
+            with open(os.path.join(root, name), 'wb') as f:
+                f.write(os.urandom(int(module_mb * 1024 * 1024)))
+            if prefix == "codec":
+                names.append(name)
+    with open(os.path.join(root, MODULE_LIST), 'w', encoding='utf-8') as f:
+        f.write("\n".join(names))
+    os.sync()
+    return names
+
+
+def evict(root):
+    """把目录下的全部文件逐出页缓存"""
+    for dirpath, _, files in os.walk(root):
+        for fn in files:
+            fd = os.open(os.path.join(dirpath, fn), os.O_RDONLY)
+            try:
+                os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+            finally:
+                os.close(fd)
+
+
+def launch(root, warmer, backend_delay, gated):
+    """
+    与启动器相同: 预热与后端启动并行
+    gated: PotPlayer 要等后端就绪 (player_requires_backend)，此时预热完成后再启动；否则预热与 PotPlayer 同时进行
+    返回 (从开始启动到播放器加载完模块的耗时, 预热结果)
+    """
+    t0 = time.perf_counter()
+    backend = threading.Thread(target=time.sleep, args=(backend_delay,))
+    backend.start()
+    result = {}
+    warming = threading.Thread(target=lambda: result.update(r=warmer.warm())) if warmer is not None else None
+    if warming is not None:
+        warming.start()
+    if gated:
+        backend.join()
+        if warming is not None:
+            warming.join()
+    proc, _ = start_player(root)
+    elapsed = time.perf_counter() - t0
+    proc.wait()
+    backend.join()
+    if warming is not None:
+        warming.join()
+    return elapsed, result.get("r")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="页缓存预热基准测试")
+    parser.add_argument("-n", type=int, default=5, help="轮数")
+    parser.add_argument("--modules", type=int, default=40, help="启动时加载的模块数")
+    parser.add_argument("--module-mb", type=float, default=4, help="每个模块的大小 (MB)")
+    parser.add_argument("--backend-delay", type=float, default=0.3, help="模拟的后端启动耗时 (秒)")
+    args = parser.parse_args()
+
+    if not hasattr(os, "posix_fadvise"):
+        sys.exit("[-] 当前平台无法逐出页缓存 (需要 posix_fadvise)，请在 Linux 下运行")
+
+    workdir = tempfile.mkdtemp(prefix="bench_page_warm_")
+    root = os.path.join(workdir, "PotPlayer")
+    os.makedirs(root)
+    config = {"page_warm": {"learn_delays": [0.2], "deadline": 2}}
+    times = {(gated, kind): [] for gated in (False, True) for kind in ("cold", "warm")}
+    results = []
+    quiet = open(os.devnull, 'w')
+    try:
+        modules = prepare(root, args.modules, args.module_mb)
+        player = os.path.join(root, PLAYER_NAME)
+
+        # 1. 学习
+        warmer = page_warm.PageWarmer(config, workdir, player)
+        proc, _ = start_player(root, hold=0.5)
+        warmer.learn(lambda: [proc.pid])
+        proc.wait()
+        warmer.finish()
+        learned = page_warm.Manifest(os.path.join(workdir, page_warm.MANIFEST_NAME), root).files
+        expected = {os.path.normcase(m) for m in modules}
+
+        # 2. 冷启动 vs 预热，PotPlayer 分别 等 / 不等 后端就绪
+        for _ in range(args.n):
+            for gated in (False, True):
+                evict(root)
+                times[gated, "cold"].append(launch(root, None, args.backend_delay, gated)[0] * 1000)
+                evict(root)
+                warmer = page_warm.PageWarmer(config, workdir, player)
+                stdout, sys.stdout = sys.stdout, quiet
+                try:
+                    elapsed, result = launch(root, warmer, args.backend_delay, gated)
+                finally:
+                    sys.stdout = stdout
+                times[gated, "warm"].append(elapsed * 1000)
+                results.append(result)
+    finally:
+        quiet.close()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    total_mb = args.modules * args.module_mb
+    print(f"[*] 替身: {args.modules} 个模块共 {total_mb:g} MB (另有同样大小的启动时不加载的文件)，{args.n} 轮")
+    print(f"    学习: 清单 {len(learned)} 个文件，"
+          f"{'恰好是启动时加载的模块' if expected <= set(learned) and not any('skin' in f for f in learned) else '与预期不符'}")
+    for gated, label in ((False, "PotPlayer 不等后端"), (True, f"PotPlayer 等后端就绪 ({args.backend_delay * 1000:.0f} ms)")):
+        print(f"    {label}:")
+        for kind, name in (("cold", "冷启动    "), ("warm", "预热后启动")):
+            values = times[gated, kind]
+            print(f"      {name} p50 {percentile(values, 50):8.1f} ms   p95 {percentile(values, 95):8.1f} ms")
+    r = results[-1]
+    print(f"    预热: {r.done}/{r.files} 个文件 {r.size / 1024 / 1024:.0f} MB，"
+          f"耗时 p50 {percentile([x.elapsed * 1000 for x in results], 50):.1f} ms (与后端启动并行)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+# ================= 代码说明 =================
+# 文件名: bench_prefetch.py
+# 功能: 目录列表预热基准测试 (使用 stub_backend.py 提供的 WebDAV 替身)
+#       替身中每个目录首次列出有固定延迟 (模拟后端向网盘拉取列表)，之后命中缓存
+#       对比: 未预热时逐个浏览目录的耗时 / 预热本身的耗时 (串行新连接 vs 线程池 + 复用连接) / 预热后浏览的耗时
+#       并检查目录索引的 LRU 淘汰与持久化
+# 作者: H_Knight
+# 日期: 2026-10-18
+# 用法: python bench_prefetch.py [-n 目录数] [--delay 秒] [--workers 线程数]
+# ===========================================
+
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+
+import prefetch
+from bench_launch import free_port, percentile
+
+
+class Stub:
+    """在独立进程中运行的 WebDAV / API 替身 (每次启动缓存都是空的)，env 为替身的环境变量"""
+
+    def __init__(self, env):
+        self.port = free_port()
+        self.base = f"http://127.0.0.1:{self.port}"
+        self.url = f"{self.base}/dav"
+        env = dict(os.environ, STUB_PORT=str(self.port), **{k: str(v) for k, v in env.items()})
+        self.proc = subprocess.Popen([sys.executable, os.path.join(HERE, "stub_backend.py")], env=env)
+        end = time.time() + 10
+        while True:
+            try:
+                urllib.request.urlopen(f"{self.base}/ping", timeout=1).read()
+                return
+            except OSError:
+                if time.time() > end:
+                    raise RuntimeError("WebDAV 替身未能启动")
+                time.sleep(0.02)
+
+    def close(self):
+        self.proc.terminate()
+        self.proc.wait()
+
+
+def browse(url, folders):
+    """模拟 PotPlayer 逐个打开目录: 每个目录一次 PROPFIND，返回各目录耗时 (ms)"""
+    pool = prefetch.ConnectionPool(url, size=1)
+    try:
+        return [prefetch.propfind(pool, f).elapsed * 1000 for f in folders]
+    finally:
+        pool.close()
+
+
+def warm_serial(url, folders):
+    """对照组: 串行预热，每个目录新建一个连接"""
+    t0 = time.perf_counter()
+    for f in folders:
+        pool = prefetch.ConnectionPool(url, size=1)
+        prefetch.propfind(pool, f)
+        pool.close()
+    return (time.perf_counter() - t0) * 1000
+
+
+def warm_pooled(url, folders, workers):
+    """线程池 + 复用连接预热，返回 (耗时 ms, 结果)"""
+    t0 = time.perf_counter()
+    results = prefetch.warm(folders, url, workers)
+    return (time.perf_counter() - t0) * 1000, results
+
+
+def count_connections(url, folders, workers, rounds=4):
+    """同一连接池上并发发出 rounds 轮请求，返回新建的连接数"""
+    pool = prefetch.ConnectionPool(url, size=workers)
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            list(executor.map(lambda f: prefetch.propfind(pool, f), folders * rounds))
+    finally:
+        pool.close()
+    return pool.created
+
+
+def check_index(workdir):
+    """索引: 超出上限时淘汰最久未访问的目录，重新加载后顺序不变"""
+    path = os.path.join(workdir, prefetch.INDEX_NAME)
+    index = prefetch.FolderIndex(path, max_entries=5)
+    for i in range(8):
+        index.touch(f"/剧集/S{i:02d}")
+    index.touch("/剧集/S04")
+    index.save()
+    reloaded = prefetch.FolderIndex(path, max_entries=5)
+    expected = ["/剧集/S04", "/剧集/S07", "/剧集/S06", "/剧集/S05", "/剧集/S03"]
+    return reloaded.recent(10) == expected, reloaded.recent(10)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="目录列表预热基准测试")
+    parser.add_argument("-n", type=int, default=16, help="目录数")
+    parser.add_argument("--delay", type=float, default=0.2, help="目录首次列出的延迟 (秒)")
+    parser.add_argument("--workers", type=int, default=prefetch.WORKERS, help="预热线程数")
+    args = parser.parse_args()
+
+    folders = [f"/网盘/剧集/第{i:02d}季" for i in range(args.n)]
+    workdir = tempfile.mkdtemp(prefix="bench_prefetch_")
+    try:
+        stub = Stub({"STUB_LIST_DELAY": args.delay})
+        try:
+            cold = browse(stub.url, folders)
+        finally:
+            stub.close()
+
+        stub = Stub({"STUB_LIST_DELAY": args.delay})
+        try:
+            serial = warm_serial(stub.url, folders)
+        finally:
+            stub.close()
+
+        stub = Stub({"STUB_LIST_DELAY": args.delay})
+        try:
+            pooled, results = warm_pooled(stub.url, folders, args.workers)
+            warmed = browse(stub.url, folders)
+            created = count_connections(stub.url, folders, args.workers)
+        finally:
+            stub.close()
+
+        index_ok, order = check_index(workdir)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    ok = sum(r.ok for r in results)
+    print(f"[*] {args.n} 个目录，首次列出延迟 {args.delay * 1000:.0f} ms，预热线程 {args.workers}")
+    print(f"    未预热浏览:   p50 {percentile(cold, 50):8.1f} ms   p95 {percentile(cold, 95):8.1f} ms   合计 {sum(cold):8.1f} ms")
+    print(f"    预热 (串行新连接):        {serial:8.1f} ms")
+    print(f"    预热 (线程池 + 复用连接): {pooled:8.1f} ms   成功 {ok}/{len(results)}")
+    print(f"    连接复用: {args.n * 4} 次请求新建 {created} 个连接")
+    print(f"    预热后浏览:   p50 {percentile(warmed, 50):8.1f} ms   p95 {percentile(warmed, 95):8.1f} ms   合计 {sum(warmed):8.1f} ms")
+    print(f"    目录索引 LRU: {'正常' if index_ok else '异常'} {order}")
+    if not index_ok or ok != len(results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+# ================= 代码说明 =================
+# 文件名: bench_priority.py
+# 功能: 调度策略争用基准测试 (模拟核心数少的机器上后端与播放器争抢 CPU)
+#       播放器替身: 按 fps 逐帧 "解码" (每帧固定的 CPU 工作量)，记录每帧的完成时间，错过下一帧时刻即记为掉帧
+#       后端替身: 满载 CPU 并持续写缓存文件，启动后再派生子进程 (模拟 AlistHelper -> rclone)，
+#                 子进程需由调度器扫描时补上策略
+#       两者都限定在相同的 --cores 个核心上，对比三种情况的帧耗时与掉帧率:
+#         无负载 / 有负载 + 默认优先级 / 有负载 + 调度策略 (播放器 above_normal，后端 below_normal + IO low)
+#       Linux 下非 root 无法提高优先级 (above_normal 会失败并提示)，此时只有后端降级生效
+# 作者: H_Knight
+# 日期: 2026-10-18
+# 用法: python bench_priority.py [--cores 1] [--duration 秒] [--fps 60] [--work-ms 每帧毫秒]
+# ===========================================
+
+import argparse
+import json
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+
+import sched_policy
+import shutdown
+from bench_launch import percentile
+
+
+# ================= 替身进程 =================
+def spin(seconds):
+    end = time.perf_counter() + seconds
+    x = 0
+    while time.perf_counter() < end:
+        x += 1
+    return x
+
+
+def run_player(fps, work_ms, duration):
+    """
+    逐帧工作，输出 {"frames": 每帧耗时 (从该帧的预定时刻到完成，毫秒), "skipped": 跳过的帧数}
+    与真实播放器一样，落后超过一帧时直接跳到当前时刻对应的帧 (被跳过的帧计为掉帧)
+    """
+    interval = 1.0 / fps
+    total = int(duration * fps)
+    t0 = time.perf_counter() + interval
+    frames, skipped, i = [], 0, 0
+    while i < total:
+        due = t0 + i * interval
+        now = time.perf_counter()
+        if now < due:
+            time.sleep(due - now)
+        elif now >= due + interval:
+            behind = min(int((now - due) / interval), total - i)
+            skipped += behind
+            i += behind
+            continue
+        spin(work_ms / 1000)
+        frames.append((time.perf_counter() - due) * 1000)
+        i += 1
+    print(json.dumps({"frames": frames, "skipped": skipped}))
+
+
+def run_load(children, cache_dir):
+    """满载 CPU，间歇写入缓存文件，稍后派生子进程"""
+    procs = []
+    spin(0.2)
+    for _ in range(children):
+        procs.append(subprocess.Popen([sys.executable, __file__, "--role", "load", "--children", "0",
+                                       "--cache-dir", cache_dir]))
+    block = os.urandom(1024 * 1024)
+    path = os.path.join(cache_dir, f"cache_{os.getpid()}.bin")
+    try:
+        while True:
+            spin(0.05)
+            with open(path, 'wb') as f:
+                f.write(block)
+    finally:
+        for p in procs:
+            p.kill()
+
+
+# ================= 测试 =================
+def scenario(args, policy, load):
+    """运行一次，返回 (帧耗时列表, 跳过的帧数, 应用过后端策略的进程数, 未生效的策略)"""
+    cores = list(range(args.cores))
+    config = {"scheduling": {"interval": 0.2,
+                             "player": dict(policy["player"], affinity=cores),
+                             "backend": dict(policy["backend"], affinity=cores)}}
+    scheduler = sched_policy.Scheduler(config, log=lambda *a: None)
+    cache_dir = tempfile.mkdtemp(prefix="bench_priority_")
+    loads = []
+    try:
+        if load:
+            for _ in range(args.load):
+                proc = subprocess.Popen([sys.executable, __file__, "--role", "load", "--children", "1",
+                                         "--cache-dir", cache_dir], **scheduler.popen_kwargs("backend"))
+                scheduler.apply("backend", proc.pid)
+                loads.append(proc)
+            scheduler.watch("backend", lambda: [p.pid for p in loads])
+            scheduler.start()
+            # 等后端派生的子进程出现并被补上策略
+            time.sleep(1.0)
+        player = subprocess.Popen([sys.executable, __file__, "--role", "player", "--fps", str(args.fps),
+                                   "--work-ms", str(args.work_ms), "--duration", str(args.duration)],
+                                  stdout=subprocess.PIPE, **scheduler.popen_kwargs("player"))
+        scheduler.apply("player", player.pid)
+        result = json.loads(player.communicate()[0])
+    finally:
+        scheduler.stop()
+        table = [(pid, ppid) for pid, ppid, _ in shutdown._process_table()]
+        for pid in shutdown._descendants({p.pid for p in loads}, table):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except OSError:
+                pass
+        for proc in loads:
+            proc.kill()
+            proc.wait()
+        for name in os.listdir(cache_dir):
+            os.remove(os.path.join(cache_dir, name))
+        os.rmdir(cache_dir)
+    return result["frames"], result["skipped"], scheduler.counts.get("backend", 0), scheduler.failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="调度策略争用基准测试")
+    parser.add_argument("--role", choices=("player", "load"), help=argparse.SUPPRESS)
+    parser.add_argument("--children", type=int, default=1, help=argparse.SUPPRESS)
+    parser.add_argument("--cache-dir", help=argparse.SUPPRESS)
+    parser.add_argument("--cores", type=int, default=1, help="播放器与后端共用的核心数")
+    parser.add_argument("--load", type=int, default=2, help="后端替身进程数 (每个另派生 1 个子进程)")
+    parser.add_argument("--duration", type=float, default=5.0, help="每种情况的播放时长 (秒)")
+    parser.add_argument("--fps", type=float, default=60)
+    parser.add_argument("--work-ms", type=float, default=6.0, help="每帧的解码耗时 (毫秒)")
+    args = parser.parse_args()
+
+    if args.role == "player":
+        return run_player(args.fps, args.work_ms, args.duration)
+    if args.role == "load":
+        return run_load(args.children, args.cache_dir)
+
+    normal = {"player": {"cpu": "normal", "io": "normal"}, "backend": {"cpu": "normal", "io": "normal"}}
+    cases = [("无负载", normal, False), ("有负载 + 默认优先级", normal, True),
+             ("有负载 + 调度策略", sched_policy.DEFAULTS, True)]
+    budget = 1000 / args.fps
+    print(f"[*] {args.cores} 个核心, {args.fps:g} fps (帧间隔 {budget:.1f} ms), 每帧工作 {args.work_ms:g} ms, "
+          f"后端替身 {args.load} 个 (+ 子进程)")
+    for label, policy, load in cases:
+        frames, skipped, adjusted, failures = scenario(args, policy, load)
+        total = len(frames) + skipped
+        dropped = skipped + sum(1 for f in frames if f > budget)
+        print(f"    {label}" + (f" (后端进程 {adjusted} 个已应用策略)" if load else ""))
+        print(f"      帧耗时 p50 {percentile(frames, 50):7.1f} ms   p95 {percentile(frames, 95):7.1f} ms   "
+              f"p99 {percentile(frames, 99):7.1f} ms   掉帧 {dropped}/{total} ({dropped / total * 100:.1f}%)")
+        for (role, aspect), reason in failures.items():
+            print(f"      [!] {role}.{aspect} 未生效: {reason}")
+
+if __name__ == "__main__":
+    main()
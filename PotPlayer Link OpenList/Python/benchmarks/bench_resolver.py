@@ -0,0 +1,97 @@
+# ================= 代码说明 =================
+# 文件名: bench_resolver.py
+# 功能: 目录直链解析基准测试 (使用 stub_backend.py 提供的 OpenList API 替身)
+#       替身中每次获取直链有固定延迟 (模拟向网盘请求签名)
+#       对比: 逐个文件新建连接获取直链 (相当于播放时逐集解析) / 线程池 + 复用连接并发解析 / 命中直链缓存
+#       并检查生成的 .dpl 播放列表的条目与顺序
+# 作者: H_Knight
+# 日期: 2026-10-18
+# 用法: python bench_resolver.py [-n 重复次数] [--files 每个目录的视频数] [--delay 秒] [--workers 线程数]
+# ===========================================
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+
+import resolver
+from bench_launch import percentile
+from bench_prefetch import Stub
+
+
+def resolve_serial(api_url, folder):
+    """对照组: 逐个文件新建连接获取直链"""
+    t0 = time.perf_counter()
+    client = resolver.OpenListClient(api_url, workers=1)
+    names = [e["name"] for e in client.list_dir(folder) if not e["is_dir"]]
+    client.close()
+    for name in names:
+        client = resolver.OpenListClient(api_url, workers=1)
+        client.get(f"{folder}/{name}")
+        client.close()
+    return (time.perf_counter() - t0) * 1000
+
+
+def check_playlist(path, files):
+    """播放列表应包含全部视频 (不含字幕与子目录)，并按集数排序"""
+    with open(path, encoding='utf-8-sig') as f:
+        lines = f.read().splitlines()
+    titles = [line.split("*", 2)[2] for line in lines if "*title*" in line]
+    urls = [line.split("*", 2)[2] for line in lines if "*file*" in line]
+    return (lines[0] == "DAUMPLAYLIST" and titles == [f"E{i:02d}.mkv" for i in range(1, files + 1)]
+            and all("sign=" in u for u in urls))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="目录直链解析基准测试")
+    parser.add_argument("-n", type=int, default=10, help="每种方式的重复次数")
+    parser.add_argument("--files", type=int, default=24, help="每个目录的视频数")
+    parser.add_argument("--delay", type=float, default=0.05, help="获取单个直链的延迟 (秒)")
+    parser.add_argument("--workers", type=int, default=resolver.WORKERS, help="解析线程数")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench_resolver_")
+    stub = Stub({"STUB_API_DELAY": args.delay, "STUB_FILES": args.files})
+    config = {"resolver": {"enabled": True, "api_url": stub.base, "workers": args.workers}}
+    serial, parallel, cached = [], [], []
+    try:
+        for i in range(args.n):
+            folder = f"/网盘/剧集/第{i:02d}季"
+            serial.append(resolve_serial(stub.base, folder))
+
+            # 每次使用新的缓存文件，模拟首次解析
+            cache = os.path.join(workdir, resolver.CACHE_NAME)
+            if os.path.exists(cache):
+                os.unlink(cache)
+            r = resolver.Resolver(config, workdir, log=lambda *a: None)
+            t0 = time.perf_counter()
+            playlist = r.playlist_for(f"{stub.base}{folder}")
+            parallel.append((time.perf_counter() - t0) * 1000)
+            r.close()
+
+            # 新进程 (重新加载缓存文件) 再次解析同一目录
+            r = resolver.Resolver(config, workdir, log=lambda *a: None)
+            t0 = time.perf_counter()
+            r.playlist_for(f"{stub.base}{folder}")
+            cached.append((time.perf_counter() - t0) * 1000)
+            r.close()
+        playlist_ok = check_playlist(playlist, args.files)
+    finally:
+        stub.close()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print(f"[*] 每个目录 {args.files} 个视频，单个直链延迟 {args.delay * 1000:.0f} ms，解析线程 {args.workers}，重复 {args.n} 次")
+    for label, values in (("逐个新建连接", serial), ("并发 + 复用连接", parallel), ("命中直链缓存", cached)):
+        print(f"    {label:<10} p50 {percentile(values, 50):8.1f} ms   p95 {percentile(values, 95):8.1f} ms")
+    print(f"    播放列表: {'正常' if playlist_ok else '异常'}")
+    if not playlist_ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+# ================= 代码说明 =================
+# 文件名: bench_startup.py
+# 功能: 启动耗时基准测试
+#       1. 以 python -X importtime 运行启动器的正常启动路径，统计导入耗时，并确认没有加载 tkinter
+#       2. 统计从解释器启动到调用 Popen 启动播放器的墙钟时间
+#       播放器与后端均使用临时生成的替身程序，可在 Linux 下运行
+# 作者: H_Knight
+# 日期: 2026-10-18
+# 用法: python bench_startup.py [-n 次数] [--legacy]
+# ===========================================
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+LAUNCHER_DIR = os.path.dirname(HERE)
+LEGACY_DIR = os.path.join(os.path.dirname(LAUNCHER_DIR), ".Old.Alist", "Python")
+
+# 子进程中执行的驱动代码: 替换 Popen 记录首次调用时间，跑完 main() 后报告结果
+DRIVER = r"""
+import json, subprocess, sys, time
+sys.path.insert(0, {workdir!r})
+_popen = subprocess.Popen
+_first = []
+def _timed_popen(*a, **kw):
+    if not _first:
+        _first.append(time.time())
+    return _popen(*a, **kw)
+subprocess.Popen = _timed_popen
+time.sleep = lambda s: None   # 跳过退出前的固定等待
+import {module} as m
+m.main()
+print("BENCH_RESULT " + json.dumps({{
+    "popen_at": _first[0] if _first else None,
+    "tk_loaded": any(k == "tkinter" or k.startswith("tkinter.") or k == "_tkinter" for k in sys.modules),
+}}))
+"""
+
+
+def make_stub(workdir, name):
+    """生成一个立即退出的替身可执行文件"""
+    if os.name == 'nt':
+        path = os.path.join(workdir, name + ".cmd")
+        with open(path, 'w') as f:
+            f.write("@exit /b 0\n")
+    else:
+        path = os.path.join(workdir, name)
+        with open(path, 'w') as f:
+            f.write("#!/bin/sh\nexit 0\n")
+        os.chmod(path, 0o755)
+    return path
+
+
+def prepare(workdir, legacy):
+    """把启动器脚本复制到临时目录，并写入指向替身程序的有效配置"""
+    module = "PotPlayer_Alist_Merged" if legacy else "PotPlayer_OpenLlist_Merged"
+    # 旧版启动器也依赖 Python 目录下的公共模块，一并复制
+    src_dirs = [LAUNCHER_DIR, LEGACY_DIR] if legacy else [LAUNCHER_DIR]
+    for src_dir in src_dirs:
+        for fn in os.listdir(src_dir):
+            if fn.endswith(".py"):
+                shutil.copy(os.path.join(src_dir, fn), workdir)
+    # 后端插件包
+    shutil.copytree(os.path.join(LAUNCHER_DIR, "backends"), os.path.join(workdir, "backends"),
+                    ignore=shutil.ignore_patterns("__pycache__"))
+    # 没有真实后端，关闭就绪探测
+    config = {"potplayer_path": make_stub(workdir, "PotPlayerMini64"), "readiness": {"probes": []}}
+    if legacy:
+        config["alist_helper_path"] = make_stub(workdir, "alisthelper")
+    with open(os.path.join(workdir, "launcher_config.json"), 'w', encoding='utf-8') as f:
+        json.dump(config, f)
+    return module
+
+
+def parse_importtime(stderr):
+    """解析 -X importtime 输出，返回 (模块数, 累计导入耗时 ms, 模块名列表)"""
+    names, total_us = [], 0
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        parts = line.split("|")
+        if len(parts) != 3:
+            continue
+        total_us += int(parts[0].split(":")[1])
+        names.append(parts[2].strip())
+    return len(names), total_us / 1000.0, names
+
+
+def run_once(workdir, module):
+    code = DRIVER.format(workdir=workdir, module=module)
+    t0 = time.time()
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                          cwd=workdir, capture_output=True, text=True)
+    result = None
+    for line in proc.stdout.splitlines():
+        if line.startswith("BENCH_RESULT "):
+            result = json.loads(line[len("BENCH_RESULT "):])
+    if result is None or result["popen_at"] is None:
+        raise RuntimeError(f"启动器未调用 Popen:\n{proc.stdout}\n{proc.stderr[-2000:]}")
+    count, import_ms, names = parse_importtime(proc.stderr)
+    tk_imported = any(n.lstrip().split(".")[0] in ("tkinter", "_tkinter") for n in names)
+    return {
+        "to_popen_ms": (result["popen_at"] - t0) * 1000.0,
+        "import_ms": import_ms,
+        "modules": count,
+        "tk": result["tk_loaded"] or tk_imported,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="启动器启动耗时基准测试")
+    parser.add_argument("-n", type=int, default=10, help="重复次数")
+    parser.add_argument("--legacy", action="store_true", help="测试 .Old.Alist 旧版启动器")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench_startup_")
+    try:
+        module = prepare(workdir, args.legacy)
+        runs = [run_once(workdir, module) for _ in range(args.n)]
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    to_popen = [r["to_popen_ms"] for r in runs]
+    imports = [r["import_ms"] for r in runs]
+    print(f"[*] 启动器: {module}  次数: {args.n}")
+    print(f"    解释器启动 -> Popen: 中位数 {statistics.median(to_popen):.1f} ms, 最小 {min(to_popen):.1f} ms")
+    print(f"    导入耗时 (importtime 累计): 中位数 {statistics.median(imports):.1f} ms, 模块数 {runs[0]['modules']}")
+    if any(r["tk"] for r in runs):
+        print("[!] 正常启动路径加载了 tkinter")
+        sys.exit(1)
+    print("[*] 正常启动路径未加载 tkinter")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+# ================= 代码说明 =================
+# 文件名: bench_watchdog.py
+# 功能: 后端看门狗基准测试 (后端为 stub_backend.py 替身，由 command 插件启动)
+#       健康阶段: 统计看门狗线程的 CPU 占用与探测次数
+#       故障阶段: 交替制造崩溃 (SIGKILL) 与无响应 (SIGUSR1，进程仍在但请求挂起)，
+#                 统计 从制造故障到确认故障 的检测耗时 与 从确认故障到重新就绪 的恢复耗时
+# 作者: H_Knight
+# 日期: 2026-10-18
+# 用法: python bench_watchdog.py [-n 故障次数] [--idle 健康阶段秒数]
+# ===========================================
+
+import argparse
+import os
+import random
+import shutil
+import signal
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+
+import backend_watchdog
+import backends
+import readiness
+import stub_backend
+from bench_launch import free_port, percentile
+
+
+def wait_event(dog, count, timeout=30.0):
+    """等待第 count 次故障恢复完成"""
+    end = time.time() + timeout
+    while time.time() < end:
+        if len(dog.events) >= count and dog.events[count - 1].recovered is not None:
+            return dog.events[count - 1]
+        time.sleep(0.01)
+    raise RuntimeError("看门狗未能在超时前完成恢复")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="后端看门狗基准测试")
+    parser.add_argument("-n", type=int, default=10, help="故障次数 (崩溃与无响应交替)")
+    parser.add_argument("--idle", type=float, default=10.0, help="健康阶段时长 (秒)")
+    parser.add_argument("--backend-delay", type=float, default=0.2, help="后端重启后开始监听前的延迟 (秒)")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench_watchdog_")
+    port = free_port()
+    config = stub_backend.standin_config("command", workdir, port, args.backend_delay)
+    for probe in config["readiness"]["probes"]:
+        probe["timeout"] = 0.5
+    config["watchdog"] = {"min_interval": 0.5, "max_interval": 2.0, "confirm_interval": 0.25,
+                          "failures": 2, "max_restarts": args.n}
+    quiet = lambda *a: None
+    plugin = backends.load_backend("command", config, quiet)
+    rnd = random.Random(7)
+    dog = None
+    runs = []
+    try:
+        plugin.start()
+        if not readiness.wait_until_ready(plugin.readiness_probes(), deadline=10).ready:
+            raise RuntimeError("替身后端未能就绪")
+        dog = backend_watchdog.Watchdog(plugin, config, quiet)
+        dog.start()
+
+        time.sleep(args.idle)
+        idle_cpu, idle_checks = dog.cpu_time, dog.checks
+
+        for i in range(args.n):
+            kind = "exit" if i % 2 == 0 else "hang"
+            # 故障落在探测间隔内的任意位置
+            time.sleep(rnd.uniform(0.5, 3.0))
+            t_fault = time.perf_counter()
+            os.kill(plugin.process.pid, signal.SIGKILL if kind == "exit" else signal.SIGUSR1)
+            event = wait_event(dog, i + 1)
+            if not event.ok or event.kind != kind:
+                raise RuntimeError(f"第 {i + 1} 次恢复异常: {event.as_dict()}")
+            runs.append((kind, event.declared - t_fault, event.recover))
+    finally:
+        if dog is not None:
+            dog.stop()
+        plugin.stop()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print(f"[*] 健康阶段 {args.idle:.0f}s: 探测 {idle_checks} 次，看门狗线程 CPU {idle_cpu * 1000:.1f} ms "
+          f"({idle_cpu / args.idle * 100:.3f}%)")
+    for kind, label in (("exit", "崩溃"), ("hang", "无响应")):
+        detect = [d * 1000 for k, d, _ in runs if k == kind]
+        recover = [r * 1000 for k, _, r in runs if k == kind]
+        if detect:
+            print(f"[*] {label} ({len(detect)} 次)")
+            print(f"    检测耗时  p50 {percentile(detect, 50):8.1f} ms   p95 {percentile(detect, 95):8.1f} ms")
+            print(f"    恢复耗时  p50 {percentile(recover, 50):8.1f} ms   p95 {percentile(recover, 95):8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
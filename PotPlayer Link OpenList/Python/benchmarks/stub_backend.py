@@ -0,0 +1,257 @@
+# ================= 代码说明 =================
+# 文件名: stub_backend.py
+# 功能: 后端替身程序 (Linux 下测试后端插件用)
+#       模拟 OpenList / alist 的 /ping 接口与 WebDAV 目录列表 (PROPFIND)，
+#       忽略全部命令行参数 (可替代 AlistHelper / rclone / 任意命令)
+#       通过环境变量控制行为:
+#         STUB_PORT      监听端口 (默认 5244，0 表示不监听)
+#         STUB_DELAY     开始监听前的延迟秒数 (模拟冷启动)
+#         STUB_CHILDREN  额外派生的子进程数 (模拟 AlistHelper 拉起 alist / rclone)
+#         STUB_LIST_DELAY  目录首次列出的延迟秒数 (模拟向网盘拉取列表)，之后命中缓存立即返回
+#         STUB_API_DELAY   /api/fs/get 获取直链的延迟秒数 (模拟向网盘请求签名)
+#         STUB_CHATTY    每秒输出的日志行数 (默认 0，每 10 行有 1 行写到 stderr，模拟输出很多的后端)
+#         STUB_FAIL      非空时把它作为错误信息写到 stderr 后以返回码 1 退出 (模拟启动失败)
+#       OpenList API 替身: /api/fs/list 每个目录返回 STUB_FILES 个视频 (默认 12) 与若干非视频条目，
+#       /api/fs/get 返回带 sign=xxx:过期时间 的直链
+#       限速源站: /media/<文件名> 支持 Range，内容由位置决定 (见 media_bytes)，/d/<文件名> 302 跳转到 /media/
+#         STUB_MEDIA_SIZE     每个文件的大小 (字节，默认 64MB)
+#         STUB_MEDIA_LATENCY  每个请求的首字节延迟秒数
+#         STUB_MEDIA_RATE     每个请求的带宽上限 (字节/秒，0 为不限)
+#       模拟无响应: 收到 SIGUSR1 后所有请求挂起不回应 (进程仍在，端口仍可连接)，SIGUSR2 恢复
+#       standin_config() 为每个插件生成使用替身程序的配置
+# 作者: H_Knight
+# 日期: 2026-10-18
+# 用法: python stub_backend.py [任意参数]
+# ===========================================
+
+import json
+import os
+import re
+import shlex
+import signal
+import subprocess
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+LISTING = ('<?xml version="1.0" encoding="utf-8"?><D:multistatus xmlns:D="DAV:">'
+           '<D:response><D:href>{path}</D:href><D:propstat><D:prop><D:resourcetype><D:collection/></D:resourcetype>'
+           '</D:prop><D:status>HTTP/1.1 200 OK</D:status></D:propstat></D:response>{children}</D:multistatus>')
+ENTRY = ('<D:response><D:href>{path}E{i:02d}.mkv</D:href><D:propstat><D:prop><D:resourcetype/>'
+         '<D:getcontentlength>1073741824</D:getcontentlength></D:prop><D:status>HTTP/1.1 200 OK</D:status>'
+         '</D:propstat></D:response>')
+
+MEDIA_BLOCK = bytes((i * 7 + i // 251) % 256 for i in range(65536))
+
+
+def media_bytes(offset, count):
+    """限速源站的文件内容: 第 p 字节为 MEDIA_BLOCK[p % 65536] (用于校验经代理读到的数据)"""
+    out = bytearray()
+    while count > 0:
+        pos = offset % len(MEDIA_BLOCK)
+        piece = MEDIA_BLOCK[pos:pos + count]
+        out += piece
+        offset += len(piece)
+        count -= len(piece)
+    return bytes(out)
+
+
+class PingHandler(BaseHTTPRequestHandler):
+    # HTTP/1.1 保持连接，便于测试连接复用
+    protocol_version = "HTTP/1.1"
+    # 响应头与响应体分两次写出，不关闭 Nagle 时保持连接下每个请求会多出约 40ms 的延迟确认等待
+    disable_nagle_algorithm = True
+    list_delay = 0.0
+    api_delay = 0.0
+    files = 12
+    media_size = 64 * 1024 * 1024
+    media_latency = 0.0
+    media_rate = 0
+    hung = threading.Event()
+
+    def handle_one_request(self):
+        # 模拟无响应: 连接已建立，但在恢复之前不处理请求
+        while self.hung.is_set():
+            time.sleep(0.05)
+        super().handle_one_request()
+    listed = set()      # 已 "缓存" 的目录
+    lock = threading.Lock()
+
+    def _reply(self, status, body, content_type="text/plain"):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path.startswith("/media/"):
+            self._media()
+        elif self.path.startswith("/d/"):
+            self.send_response(302)
+            self.send_header("Location", "/media/" + self.path[3:])
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+        else:
+            self._reply(200, b"pong" if self.path.startswith("/ping") else b"stub")
+
+    def _media(self):
+        size = self.media_size
+        start, end = 0, size - 1
+        m = re.fullmatch(r"bytes=(\d+)-(\d*)", self.headers.get("Range", ""))
+        if m:
+            start = int(m.group(1))
+            end = min(int(m.group(2)), size - 1) if m.group(2) else size - 1
+        time.sleep(self.media_latency)
+        if start >= size:
+            self.send_response(416)
+            self.send_header("Content-Range", f"bytes */{size}")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self.send_response(206 if m else 200)
+        self.send_header("Content-Length", str(end - start + 1))
+        if m:
+            self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+        self.end_headers()
+        t0 = time.perf_counter()
+        sent, piece = 0, 65536
+        try:
+            while start + sent <= end:
+                n = min(piece, end - start - sent + 1)
+                self.wfile.write(media_bytes(start + sent, n))
+                sent += n
+                if self.media_rate:
+                    # 按带宽上限限速
+                    ahead = sent / self.media_rate - (time.perf_counter() - t0)
+                    if ahead > 0:
+                        time.sleep(ahead)
+        except (ConnectionError, OSError):
+            self.close_connection = True
+
+    def do_PROPFIND(self):
+        length = int(self.headers.get("Content-Length", 0))
+        self.rfile.read(length)
+        with self.lock:
+            cold = self.path not in self.listed
+            self.listed.add(self.path)
+        if cold:
+            time.sleep(self.list_delay)
+        body = LISTING.format(path=self.path, children="".join(ENTRY.format(path=self.path, i=i) for i in range(12)))
+        self._reply(207, body.encode(), "application/xml; charset=utf-8")
+
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        path = payload.get("path", "/").rstrip("/")
+        if self.path == "/api/fs/list":
+            content = [{"name": f"E{i:02d}.mkv", "is_dir": False, "size": 1073741824}
+                       for i in range(self.files, 0, -1)]
+            content += [{"name": "字幕", "is_dir": True, "size": 0}, {"name": "E01.ass", "is_dir": False, "size": 1024}]
+            reply = {"code": 200, "message": "success", "data": {"content": content, "total": len(content)}}
+        elif self.path == "/api/fs/get":
+            time.sleep(self.api_delay)
+            port = self.server.server_address[1]
+            reply = {"code": 200, "message": "success",
+                     "data": {"name": path.rsplit("/", 1)[-1], "is_dir": False,
+                              "raw_url": f"http://127.0.0.1:{port}/p{path}?sign=stub:{int(time.time()) + 1800}"}}
+        else:
+            reply = {"code": 404, "message": "not found"}
+        self._reply(200, json.dumps(reply, ensure_ascii=False).encode(), "application/json; charset=utf-8")
+
+    def log_message(self, *args):
+        pass
+
+
+def chatter(rate):
+    """按 rate 行/秒持续输出日志，输出端关闭后停止"""
+    n = 0
+    batch = max(1, int(rate / 100))
+    while True:
+        t = time.time()
+        try:
+            for _ in range(batch):
+                n += 1
+                stream = sys.stderr if n % 10 == 0 else sys.stdout
+                stream.write(f"{time.strftime('%H:%M:%S')} INFO [stub] request #{n} handled in 0.{n % 1000:03d}ms "
+                             f"path=/dav/video/E{n % 100:02d}.mkv\n")
+            sys.stdout.flush()
+            sys.stderr.flush()
+        except (OSError, ValueError):
+            return
+        time.sleep(max(0.0, batch / rate - (time.time() - t)))
+
+
+def run():
+    if os.environ.get("STUB_FAIL"):
+        sys.stderr.write(f"FATAL {os.environ['STUB_FAIL']}\n")
+        sys.exit(1)
+    port = int(os.environ.get("STUB_PORT", "5244"))
+    delay = float(os.environ.get("STUB_DELAY", "0"))
+    children = int(os.environ.get("STUB_CHILDREN", "0"))
+    PingHandler.list_delay = float(os.environ.get("STUB_LIST_DELAY", "0"))
+    PingHandler.api_delay = float(os.environ.get("STUB_API_DELAY", "0"))
+    PingHandler.files = int(os.environ.get("STUB_FILES", "12"))
+    PingHandler.media_size = int(os.environ.get("STUB_MEDIA_SIZE", str(64 * 1024 * 1024)))
+    PingHandler.media_latency = float(os.environ.get("STUB_MEDIA_LATENCY", "0"))
+    PingHandler.media_rate = int(os.environ.get("STUB_MEDIA_RATE", "0"))
+    # SIGTERM 视为正常关闭请求
+    signal.signal(signal.SIGTERM, lambda *a: sys.exit(0))
+    if hasattr(signal, "SIGUSR1"):
+        signal.signal(signal.SIGUSR1, lambda *a: PingHandler.hung.set())
+        signal.signal(signal.SIGUSR2, lambda *a: PingHandler.hung.clear())
+
+    chatty = float(os.environ.get("STUB_CHATTY", "0"))
+    if chatty > 0:
+        threading.Thread(target=chatter, args=(chatty,), daemon=True).start()
+
+    env = dict(os.environ, STUB_PORT="0", STUB_CHILDREN="0", STUB_DELAY="0", STUB_CHATTY="0")
+    procs = [subprocess.Popen([sys.executable, os.path.abspath(__file__), "child"], env=env)
+             for _ in range(children)]
+    try:
+        time.sleep(delay)
+        if port:
+            ThreadingHTTPServer(("127.0.0.1", port), PingHandler).serve_forever()
+        else:
+            while True:
+                time.sleep(3600)
+    finally:
+        for p in procs:
+            p.terminate()
+
+
+def make_launcher(workdir, name, env=None):
+    """生成调用本替身程序的可执行文件 (插件以 [路径, 参数...] 的形式启动后端)"""
+    path = os.path.join(workdir, name)
+    exports = "".join(f"export {k}={shlex.quote(str(v))}\n" for k, v in (env or {}).items())
+    script = shlex.quote(os.path.abspath(__file__))
+    with open(path, 'w') as f:
+        f.write(f"#!/bin/sh\n{exports}exec {shlex.quote(sys.executable)} {script} \"$@\"\n")
+    os.chmod(path, 0o755)
+    return path
+
+
+def standin_config(backend, workdir, port, delay=0.0, env=None):
+    """返回使用替身程序运行指定插件的配置 (Linux 下可直接运行)，env 为额外的替身环境变量"""
+    env = dict(env or {}, STUB_PORT=port, STUB_DELAY=delay)
+    ping = [{"type": "http", "url": f"http://127.0.0.1:{port}/ping"}]
+    if backend == "openlist_service":
+        # 服务由模拟 SCM 提供 (启动延迟即服务 START_PENDING 的时长)
+        return {"backend": backend, "service_backend": "fake", "readiness": {"probes": [{"type": "service"}]}}
+    if backend == "alisthelper":
+        env["STUB_CHILDREN"] = 2
+        return {"backend": backend, "alist_helper_path": make_launcher(workdir, "AlistHelper", env),
+                "backend_stop_images": [], "readiness": {"probes": ping}}
+    if backend == "rclone_mount":
+        # Linux 下无法免权限挂载，用替身的 HTTP 端口代替挂载点探测
+        return {"backend": backend, "rclone_path": make_launcher(workdir, "rclone", env),
+                "rclone_remote": "openlist:", "mount_point": os.path.join(workdir, "mnt"),
+                "readiness": {"probes": ping}}
+    if backend == "command":
+        return {"backend": backend, "backend_command": [make_launcher(workdir, "backend", env), "serve"],
+                "readiness": {"probes": ping}}
+    raise ValueError(f"未知的后端类型: {backend}")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,441 @@
+# ================= 代码说明 =================
+# 文件名: broker.py
+# 功能: 常驻的特权代理 (服务控制)
+#       只需安装一次: 以计划任务 (登录时、最高权限) 运行 "--broker"，之后启动器无需提权即可启动/停止服务，
+#       省去每次启动时的 UAC 弹窗与提权重启 (两次解释器启动 / 两次 onefile 解压)
+#       通信: Windows 为 127.0.0.1 上的 TCP (端口写入 broker.port；高权限进程创建的命名管道默认不允许普通权限连接)，
+#             其他平台为 Unix socket；均使用共享密钥 broker.key 做 HMAC 认证
+#       代理只接受安装时固定下来的 OpenList 服务名的请求，不能被用来控制任意服务:
+#         --install-broker (管理员) 把当时配置文件中的服务名与服务控制方式写入策略文件 broker_policy.json，
+#         策略文件位于 ProgramData 下仅管理员可写的目录 (其他平台为 /etc 下仅 root 可写)，
+#         代理运行时只读取策略文件，不再读取普通用户可写的 launcher_config.json；修改服务名后需重新安装
+#       端口文件、密钥 (与 socket) 同样放在策略文件所在目录 (代理目录) 中: 高权限的代理不读写普通用户可写的位置；
+#         普通用户只能读取密钥，密钥只用于连接代理，而代理只接受策略中的服务
+#       代理目录默认由 policy_path() 决定，--broker-policy=PATH 时为 PATH 所在目录 (代理与启动器使用同一参数)
+# 作者: H_Knight
+# 日期: 2026-10-18
+# ===========================================
+
+import os
+import threading
+
+import service_control
+from service_control import ServiceError, ServiceResult
+
+CHANNEL_NAME = "broker"
+PORT_FILE = "broker.port"
+KEY_NAME = "broker.key"
+POLICY_NAME = "broker_policy.json"
+POLICY_FLAG = "--broker-policy="
+TASK_NAME = "PotPlayerLinkOpenList_Broker"
+OPS = ("start", "stop", "status")
+
+_available = set()          # 本进程内已确认在运行的代理目录 (一次启动中多处检查时不重复连接)
+
+
+def _authkey(broker_dir):
+    """读取代理密钥，没有时返回 None (启动器一侧不创建密钥)"""
+    try:
+        with open(os.path.join(broker_dir, KEY_NAME), 'rb') as f:
+            key = f.read()
+    except OSError:
+        return None
+    return key if len(key) >= 16 else None
+
+
+def _create_key(broker_dir):
+    """代理一侧 (管理员): 生成密钥；权限继承代理目录 (Windows) 或设为 0644，普通用户可读不可写"""
+    import secrets
+    path = os.path.join(broker_dir, KEY_NAME)
+    key = secrets.token_bytes(32)
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    with os.fdopen(fd, 'wb') as f:
+        f.write(key)
+    if os.name != 'nt':
+        os.chmod(path, 0o644)
+    return key
+
+
+def address(broker_dir):
+    """返回代理的通信地址，代理未运行 (Windows 下无端口文件) 时返回 None"""
+    if os.name == 'nt':
+        try:
+            with open(os.path.join(broker_dir, PORT_FILE), encoding='utf-8') as f:
+                return ("127.0.0.1", int(f.read().strip()))
+        except (OSError, ValueError):
+            return None
+    import ipc
+    return ipc.address(CHANNEL_NAME, broker_dir)
+
+
+def _address_exists(broker_dir):
+    """不导入 IPC 模块的快速检查: 端口文件 / socket 文件是否存在"""
+    name = PORT_FILE if os.name == 'nt' else f".{CHANNEL_NAME}.sock"
+    return os.path.exists(os.path.join(broker_dir, name))
+
+
+def available(broker_dir, refresh=False):
+    """
+    代理是否在运行 (先检查地址文件，存在时再实际连接确认)
+    确认在运行的结果在本进程内缓存 (提权判断与启动各检查一次)，refresh=True 时重新连接确认
+    """
+    if not refresh and broker_dir in _available:
+        return True
+    _available.discard(broker_dir)
+    if not _address_exists(broker_dir):
+        return False
+    authkey = _authkey(broker_dir)
+    if authkey is None:
+        return False
+    import ipc
+    conn = ipc.connect(address(broker_dir), authkey)
+    if conn is None:
+        return False
+    try:
+        conn.send({"op": "ping"})
+        ok = bool(conn.recv().get("ok"))
+    except (EOFError, OSError):
+        return False
+    finally:
+        conn.close()
+    if ok:
+        _available.add(broker_dir)
+    return ok
+
+
+# ================= 启动器一侧 =================
+class BrokerController:
+    """
+    经由代理的服务控制器，接口与 service_control.ServiceController 相同
+    连接在首次请求时建立并复用，断开后自动重连一次
+    """
+
+    def __init__(self, broker_dir):
+        self.broker_dir = broker_dir
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        import ipc
+        addr = address(self.broker_dir)
+        authkey = _authkey(self.broker_dir)
+        conn = ipc.connect(addr, authkey) if addr is not None and authkey is not None else None
+        if conn is None:
+            raise ServiceError("无法连接到特权代理 (未安装或未运行)")
+        return conn
+
+    def _request(self, msg):
+        with self._lock:
+            for attempt in (0, 1):
+                if self._conn is None:
+                    self._conn = self._connect()
+                try:
+                    self._conn.send(msg)
+                    return self._conn.recv()
+                except (EOFError, OSError):
+                    self._conn.close()
+                    self._conn = None
+                    if attempt:
+                        raise ServiceError("与特权代理的连接已断开")
+
+    def _call(self, action, name, wait=False, timeout=10.0):
+        try:
+            reply = self._request({"op": action, "service": name, "wait": wait, "timeout": timeout})
+        except ServiceError as e:
+            return ServiceResult(action, name, False, error=e)
+        if "action" not in reply:
+            return ServiceResult(action, name, False, error=ServiceError(reply.get("error", "代理拒绝了请求")))
+        error = reply.get("error")
+        return ServiceResult(reply["action"], reply["service"], reply["ok"], reply["state"], reply["pid"],
+                             reply["already"], reply["elapsed"], ServiceError(error) if error else None)
+
+    def query_state(self, name):
+        return self.status(name).state
+
+    def status(self, name):
+        return self._call("status", name)
+
+    def start(self, name, wait=False, timeout=10.0):
+        return self._call("start", name, wait, timeout)
+
+    def stop(self, name, wait=False, timeout=10.0):
+        return self._call("stop", name, wait, timeout)
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+# ================= 策略文件 =================
+def policy_dir():
+    """策略文件所在目录: 仅管理员 / root 可写"""
+    if os.name == 'nt':
+        return os.path.join(os.environ.get("ProgramData", r"C:\ProgramData"), "PotPlayerLinkOpenList")
+    return "/etc/potplayer-link-openlist"
+
+
+def policy_path():
+    return os.path.join(policy_dir(), POLICY_NAME)
+
+
+def policy_from_argv(argv):
+    """从命令行读取 --broker-policy=PATH (测试时使用非默认位置)，未指定时返回 None"""
+    for arg in argv:
+        if arg.startswith(POLICY_FLAG):
+            return arg[len(POLICY_FLAG):]
+    return None
+
+
+def runtime_dir(policy_file=None):
+    """代理目录 (策略文件、密钥、端口文件所在目录)；未指定策略文件时按命令行 --broker-policy= 或默认位置"""
+    import sys
+    path = policy_file or policy_from_argv(sys.argv) or policy_path()
+    return os.path.dirname(os.path.abspath(path))
+
+
+def allowed_services(store):
+    """配置文件中所有 OpenList 服务类 profile 的服务名 (仅在安装时读取)"""
+    names = set()
+    for profile in store.data().get("profiles", {}).values():
+        if profile.get("backend", "openlist_service") == "openlist_service":
+            names.add(profile.get("service_name", "openlist_desktop_service"))
+    return names
+
+
+def freeze_policy(store):
+    """安装时从配置生成策略: 允许控制的服务名与代理使用的服务控制方式"""
+    kind = store.load().get("service_backend")
+    return {"services": sorted(allowed_services(store)), "service_backend": None if kind == "broker" else kind}
+
+
+def write_policy(policy, path=None):
+    """写入策略文件并限制为仅管理员 (其他平台为所有者) 可写，返回文件路径"""
+    import config_store
+    import ipc
+    path = path or policy_path()
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    if os.name == 'nt':
+        # 目录也要收紧: ProgramData 下新建的目录默认允许普通用户创建文件，
+        # 且目录可能是普通用户事先建好的 (所有者可改 ACL)，所有者一并改为管理员组
+        admin_only = [ipc.SID_SYSTEM + ":(OI)(CI)F", ipc.SID_ADMINS + ":(OI)(CI)F", ipc.SID_USERS + ":(OI)(CI)RX"]
+        if not ipc.restrict_acl(directory, admin_only, owner=ipc.SID_ADMINS):
+            raise ServiceError(f"无法限制策略目录 {directory} 的访问权限")
+    else:
+        os.chmod(directory, 0o755)
+    config_store.atomic_write_json(path, policy)
+    if os.name != 'nt':
+        os.chmod(path, 0o644)
+    if _authkey(directory) is None:
+        _create_key(directory)
+    return path
+
+
+def _check_owner(path):
+    """其他平台: 策略文件及其目录须属于 root 或代理自身，且组和其他用户不可写"""
+    st = os.stat(path)
+    if st.st_uid not in (0, os.geteuid()) or st.st_mode & 0o022:
+        raise ServiceError(f"{path} 可被其他用户修改，拒绝使用")
+
+
+def load_policy(path=None):
+    """读取并校验策略文件，返回 {"services": [...], "service_backend": ...}；不可用时抛出 ServiceError"""
+    import json
+    path = path or policy_path()
+    try:
+        if os.name != 'nt':
+            _check_owner(os.path.dirname(os.path.abspath(path)))
+            _check_owner(path)
+        with open(path, encoding='utf-8') as f:
+            policy = json.load(f)
+    except (OSError, ValueError) as e:
+        raise ServiceError(f"无法读取代理策略 {path} ({e})，请以管理员身份运行 --install-broker")
+    services = policy.get("services") if isinstance(policy, dict) else None
+    kind = policy.get("service_backend") if isinstance(policy, dict) else None
+    if not isinstance(services, list) or not all(isinstance(n, str) for n in services) \
+            or not (kind is None or isinstance(kind, str)):
+        raise ServiceError(f"代理策略 {path} 内容无效")
+    return {"services": services, "service_backend": kind}
+
+
+# ================= 代理一侧 =================
+class Broker:
+    """
+    特权代理
+    allowed: 允许控制的服务名 (来自安装时写入的策略文件，运行期间不变)
+    broker_dir: 代理目录 (仅管理员可写)，密钥、端口文件 / socket 位于此处
+    """
+
+    def __init__(self, allowed, broker_dir, controller=None, log=print):
+        self.allowed = frozenset(allowed)
+        self.broker_dir = broker_dir
+        self.controller = controller
+        self.log = log
+        self._listener = None
+        self._exiting = False
+
+    def _handle(self, msg):
+        op = msg.get("op")
+        if op == "ping":
+            return {"ok": True, "pid": os.getpid()}
+        if op == "shutdown":
+            self._exiting = True
+            return {"ok": True}
+        if op not in OPS:
+            return {"ok": False, "error": f"未知的请求: {op}"}
+        name = msg.get("service")
+        if name not in self.allowed:
+            self.log(f"[!] 特权代理: 拒绝控制未授权的服务 {name}")
+            return {"ok": False, "error": f"服务 {name} 不在代理策略中 (修改服务名后需重新安装代理)"}
+        if op == "status":
+            result = self.controller.status(name)
+        else:
+            result = getattr(self.controller, op)(name, wait=bool(msg.get("wait")),
+                                                  timeout=float(msg.get("timeout", 10.0)))
+        self.log(f"[-] 特权代理: {op} {name} -> {result.state} ({result.elapsed * 1000:.1f} ms)")
+        return result.as_dict()
+
+    def _serve_conn(self, conn):
+        try:
+            while not self._exiting:
+                try:
+                    msg = conn.recv()
+                except (EOFError, OSError):
+                    return
+                conn.send(self._handle(msg))
+                if self._exiting:
+                    self._wake_listener()
+                    return
+        finally:
+            conn.close()
+
+    def _wake_listener(self):
+        import ipc
+        conn = ipc.connect(address(self.broker_dir), _authkey(self.broker_dir))
+        if conn is not None:
+            conn.close()
+
+    def serve_forever(self):
+        """监听并处理请求；已有代理在运行时返回 False"""
+        import ipc
+        if available(self.broker_dir, refresh=True):
+            return False
+        authkey = _authkey(self.broker_dir) or _create_key(self.broker_dir)
+        if os.name == 'nt':
+            self._listener = ipc.listen(("127.0.0.1", 0), authkey)
+        else:
+            self._listener = ipc.listen(address(self.broker_dir), authkey)
+        if self._listener is None:
+            return False
+        port_file = os.path.join(self.broker_dir, PORT_FILE)
+        if os.name == 'nt':
+            import config_store
+            config_store.atomic_write_json(port_file, self._listener.address[1])
+        else:
+            # 以 root 运行时启动器 (普通用户) 也要能连接；能否使用由密钥认证决定
+            os.chmod(self._listener.address, 0o666)
+        self.log(f"[*] 特权代理已启动 (PID: {os.getpid()}, 地址: {self._listener.address})")
+        try:
+            while not self._exiting:
+                try:
+                    conn = self._listener.accept()
+                except Exception:
+                    # 认证失败等，忽略该连接
+                    continue
+                if self._exiting:
+                    conn.close()
+                    break
+                threading.Thread(target=self._serve_conn, args=(conn,), daemon=True).start()
+        finally:
+            self._listener.close()
+            if os.name == 'nt':
+                try:
+                    os.unlink(port_file)
+                except OSError:
+                    pass
+        self.log("[*] 特权代理已退出")
+        return True
+
+
+def serve(policy_file=None):
+    """代理进程入口 ("--broker")；只按策略文件工作，没有策略时拒绝启动"""
+    try:
+        policy = load_policy(policy_file)
+        controller = service_control.create_controller(policy["service_backend"])
+    except ServiceError as e:
+        print(f"[!] 特权代理未启动: {e}")
+        return False
+    return Broker(policy["services"], runtime_dir(policy_file), controller).serve_forever()
+
+
+def stop(broker_dir):
+    """请求正在运行的代理退出，未运行时返回 False"""
+    import ipc
+    _available.discard(broker_dir)
+    addr = address(broker_dir)
+    authkey = _authkey(broker_dir)
+    conn = ipc.connect(addr, authkey) if addr is not None and authkey is not None else None
+    if conn is None:
+        return False
+    try:
+        conn.send({"op": "shutdown"})
+        return bool(conn.recv().get("ok"))
+    except (EOFError, OSError):
+        return False
+    finally:
+        conn.close()
+
+
+# ================= 安装 / 卸载 (需管理员权限) =================
+def _schtasks(args):
+    import subprocess
+    startupinfo = subprocess.STARTUPINFO()
+    startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+    return subprocess.run(["schtasks"] + args, capture_output=True, text=True, startupinfo=startupinfo)
+
+
+def install(command, store, policy_file=None):
+    """
+    固定代理策略 (当前配置中的服务名)，注册登录时以最高权限运行的计划任务，并立即启动代理
+    command: 启动代理的命令行 (列表)
+    """
+    policy = freeze_policy(store)
+    try:
+        path = write_policy(policy, policy_file)
+    except (OSError, ServiceError) as e:
+        print(f"[!] 无法写入代理策略: {e}")
+        return False
+    print(f"[+] 已写入代理策略 {path}: 允许控制 {', '.join(policy['services']) or '(无)'}")
+    if policy_file:
+        command = command + [POLICY_FLAG + policy_file]
+    if os.name != 'nt':
+        print("[!] 计划任务安装仅支持 Windows，其他平台请直接运行 --broker")
+        return False
+    import subprocess
+    # 脚本方式运行时使用 pythonw，避免常驻一个控制台窗口
+    pythonw = os.path.join(os.path.dirname(command[0]), "pythonw.exe")
+    if command[0].lower().endswith("python.exe") and os.path.exists(pythonw):
+        command = [pythonw] + command[1:]
+    r = _schtasks(["/Create", "/F", "/TN", TASK_NAME, "/SC", "ONLOGON", "/RL", "HIGHEST",
+                   "/TR", subprocess.list2cmdline(command)])
+    if r.returncode != 0:
+        print(f"[!] 创建计划任务失败: {r.stderr.strip() or r.stdout.strip()}")
+        return False
+    _schtasks(["/Run", "/TN", TASK_NAME])
+    print(f"[+] 已安装特权代理 (计划任务 {TASK_NAME})，之后启动无需再提权")
+    return True
+
+
+def uninstall(policy_file=None):
+    """停止代理并删除计划任务"""
+    stop(runtime_dir(policy_file))
+    if os.name != 'nt':
+        return True
+    r = _schtasks(["/Delete", "/F", "/TN", TASK_NAME])
+    if r.returncode != 0:
+        print(f"[!] 删除计划任务失败: {r.stderr.strip() or r.stdout.strip()}")
+        return False
+    print("[-] 已卸载特权代理")
+    return True
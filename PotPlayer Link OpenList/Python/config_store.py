@@ -0,0 +1,254 @@
+# ================= 代码说明 =================
+# 文件名: config_store.py
+# 功能: 启动器配置
+#       - 带类型校验的配置结构，支持多套配置 (profile，如 OpenList / Alist、不同播放器)
+#       - 旧版 launcher_config.json (OpenList 版 / Alist 版) 读取时自动迁移
+#       - 写入采用 临时文件 + 重命名 的原子方式，中途崩溃不会留下半截 JSON
+#       - 同一进程内按配置文件 (mtime, size) 复用解析与校验结果 (一次启动中多处读取配置只解析一次)；
+#         每次启动都是新进程，仍会读取并解析一次配置文件 (仅几 KB，不另设跨进程缓存)
+# 作者: H_Knight
+# 日期: 2026-10-18
+# ===========================================
+
+import json
+import os
+import stat as stat_mod
+
+CONFIG_VERSION = 2
+
+# 每套配置 (profile) 独立的字段
+PROFILE_SCHEMA = {
+    "backend": (str, "openlist_service"),       # 后端类型
+    "potplayer_path": (str, ""),
+    "alist_helper_path": (str, ""),
+    "service_name": (str, "openlist_desktop_service"),
+    "player_image_names": (list, None),
+    # rclone_mount 插件
+    "rclone_path": (str, None),
+    "rclone_remote": (str, None),            # 如 "openlist:"
+    "mount_point": (str, None),              # 如 "X:"
+    "rclone_args": (list, None),
+    # command 插件 (通用命令)
+    "backend_command": (list, None),
+    "backend_cwd": (str, None),
+    # 以子进程运行的插件: 按映像名关闭的进程列表
+    "backend_stop_images": (list, None),
+}
+
+# 所有 profile 共享的字段
+SHARED_SCHEMA = {
+    "player_requires_backend": (bool, False),
+    "single_instance": (bool, False),
+    "service_backend": (str, None),
+    "readiness": (dict, None),
+    "keep_warm": (dict, None),
+    "shutdown_deadline": ((int, float), None),
+    "telemetry": (dict, None),
+    "prefetch": (dict, None),
+    "resolver": (dict, None),
+    "media_proxy": (dict, None),
+    "watchdog": (dict, None),
+    "scheduling": (dict, None),
+    "page_warm": (dict, None),
+    "session_journal": (dict, None),
+    "output_capture": (dict, None),
+}
+
+# 旧版配置的识别与迁移: 含 alist_helper_path 的是 Alist 版，否则为 OpenList 版
+LEGACY_PROFILES = {
+    "openlist": "openlist_service",
+    "alist": "alisthelper",
+}
+
+
+class ConfigError(Exception):
+    """配置文件内容错误"""
+
+
+def _check_fields(data, schema, where, warn):
+    """按 schema 校验字段类型，类型不符的字段丢弃 (使用默认值) 并给出提示"""
+    clean = {}
+    for key, value in data.items():
+        if key in schema and value is not None:
+            expected = schema[key][0]
+            if not isinstance(value, expected) or (expected is int and isinstance(value, bool)):
+                warn(f"[!] 配置项 {where}.{key} 类型错误 ({type(value).__name__})，已忽略")
+                continue
+        clean[key] = value
+    return clean
+
+
+def migrate(data):
+    """把任意版本的配置转换为当前版本的结构"""
+    if not isinstance(data, dict):
+        raise ConfigError("配置文件顶层必须是 JSON 对象")
+    version = data.get("version", 1)
+    if isinstance(version, bool) or not isinstance(version, int):
+        raise ConfigError(f"配置文件版本号无效: {version!r}")
+    if version > CONFIG_VERSION:
+        raise ConfigError(f"配置文件版本 {version} 高于当前程序支持的版本")
+    if version == CONFIG_VERSION:
+        profiles = data.get("profiles", {})
+        if not isinstance(profiles, dict) or not all(isinstance(p, dict) for p in profiles.values()):
+            raise ConfigError("配置项 profiles 必须是 {名称: 对象}")
+        return data
+    # 版本 1: 扁平结构，只有一套配置
+    name = "alist" if "alist_helper_path" in data else "openlist"
+    profile = {"backend": LEGACY_PROFILES[name]}
+    shared = {}
+    for key, value in data.items():
+        if key in PROFILE_SCHEMA:
+            profile[key] = value
+        else:
+            shared[key] = value
+    return {"version": CONFIG_VERSION, "active_profile": name, "profiles": {name: profile}, **shared}
+
+
+def atomic_write_json(path, data):
+    """写入同目录下的临时文件，fsync 后重命名覆盖目标文件"""
+    import tempfile      # 只在写入时需要，不拖慢读取配置的启动路径
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(prefix=".tmp_", suffix=".json", dir=directory)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def is_valid_file(path):
+    """路径是否为存在的普通文件 (一次 stat)"""
+    if not path:
+        return False
+    try:
+        return stat_mod.S_ISREG(os.stat(path).st_mode)
+    except (OSError, ValueError):
+        return False
+
+
+class ConfigStore:
+    """
+    配置文件的读写入口
+    profile: 指定使用的配置名；为 None 时使用文件中的 active_profile
+    default_profile: 新建配置文件时的配置名 ("openlist" / "alist")
+    """
+
+    def __init__(self, path, profile=None, default_profile="openlist", warn=print):
+        self.path = path
+        self.profile = profile
+        self.default_profile = default_profile
+        self.warn = warn
+        self._cache_key = None
+        self._data = None
+        self._effective = None       # (签名, profile 名, 有效配置)
+
+    # ---------- 读取 ----------
+    def _signature(self):
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def _read(self):
+        """读取并迁移配置文件，返回 (数据, 签名)；文件不存在或损坏时数据为 None"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                st = os.fstat(f.fileno())
+                key = (st.st_mtime_ns, st.st_size)
+                data = migrate(json.load(f))
+        except FileNotFoundError:
+            return None, None
+        except (OSError, ValueError, ConfigError) as e:
+            # 保留损坏的文件以便排查，而不是悄悄当作空配置
+            broken = self.path + ".corrupt"
+            try:
+                os.replace(self.path, broken)
+            except OSError:
+                broken = None
+            self.warn(f"[!] 配置文件无法解析 ({e})" + (f"，已另存为 {broken}" if broken else ""))
+            return None, None
+        return data, key
+
+    def _empty(self):
+        name = self.profile or self.default_profile
+        return {"version": CONFIG_VERSION, "active_profile": name,
+                "profiles": {name: {"backend": LEGACY_PROFILES.get(name, "openlist_service")}}}
+
+    def data(self):
+        """
+        返回迁移后的完整配置结构
+        同一进程内再次调用时只 stat 一次配置文件，(mtime, size) 未变化则直接返回上次的结果
+        """
+        if self._data is not None:
+            if self._signature() == self._cache_key:
+                return self._data
+        data, key = self._read()
+        if data is None:
+            data = self._empty()
+        self._data = data
+        self._cache_key = key
+        return data
+
+    def active_name(self):
+        data = self.data()
+        return self.profile or data.get("active_profile") or self.default_profile
+
+    def profiles(self):
+        return sorted(self.data().get("profiles", {}))
+
+    def load(self):
+        """返回当前 profile 的有效配置 (共享字段 + profile 字段)，已套用默认值与类型校验"""
+        data = self.data()
+        name = self.active_name()
+        if self._effective is not None and self._effective[:2] == (self._cache_key, name):
+            return dict(self._effective[2])
+        profile = data.get("profiles", {}).get(name)
+        if profile is None:
+            profile = {"backend": LEGACY_PROFILES.get(name, "openlist_service")}
+        shared = {k: v for k, v in data.items() if k not in ("version", "active_profile", "profiles")}
+        effective = {key: default for key, (_, default) in SHARED_SCHEMA.items() if default is not None}
+        effective.update(_check_fields(shared, SHARED_SCHEMA, "shared", self.warn))
+        effective.update({key: default for key, (_, default) in PROFILE_SCHEMA.items() if default is not None})
+        effective.update(_check_fields(profile, PROFILE_SCHEMA, name, self.warn))
+        effective["profile"] = name
+        self._effective = (self._cache_key, name, effective)
+        return dict(effective)
+
+    # ---------- 写入 ----------
+    def save(self, effective):
+        """把有效配置写回: profile 字段写入当前 profile，其余写入共享部分"""
+        data = json.loads(json.dumps(self.data()))
+        name = effective.get("profile") or self.active_name()
+        profile = data.setdefault("profiles", {}).setdefault(name, {})
+        for key, value in effective.items():
+            if key == "profile":
+                continue
+            target = profile if key in PROFILE_SCHEMA else data
+            schema = PROFILE_SCHEMA if key in PROFILE_SCHEMA else SHARED_SCHEMA
+            # 与默认值相同且文件中原本没有的字段不写入，保持配置文件简洁
+            if key not in target and key in schema and schema[key][1] == value:
+                continue
+            target[key] = value
+        data["version"] = CONFIG_VERSION
+        data.setdefault("active_profile", name)
+        atomic_write_json(self.path, data)
+        self._data = data
+        self._cache_key = self._signature()
+
+
+def profile_from_argv(argv):
+    """从命令行读取 --profile NAME / --profile=NAME"""
+    for i, arg in enumerate(argv):
+        if arg == "--profile" and i + 1 < len(argv):
+            return argv[i + 1]
+        if arg.startswith("--profile="):
+            return arg.split("=", 1)[1]
+    return None
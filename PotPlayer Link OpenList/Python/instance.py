@@ -0,0 +1,185 @@
+# ================= 代码说明 =================
+# 文件名: instance.py
+# 功能: 单实例与媒体参数转交
+#       第一个启动器监听命名管道 (Linux 下为 Unix socket)；之后的启动 (如双击关联的视频 / .dpl 播放列表)
+#       只把文件 / URL 参数转交给它后立即退出，不再重复启动后端、提权
+#       本模块在入口脚本最前面导入，只依赖标准库的轻量模块，IPC 模块在真正连接时才导入
+#       默认关闭，配置 "single_instance": true 启用 (启用后再次打开视频会交给已运行的启动器，而不是另开一套)
+# 作者: H_Knight
+# 日期: 2026-10-18
+# ===========================================
+
+import os
+import threading
+
+CHANNEL_NAME = "instance"
+AUTHKEY_NAME = ".launcher_ipc.key"
+
+# 启动器自身的参数 (不转交给播放器)
+LAUNCHER_FLAGS = ("--keepwarm-daemon", "--broker", "--install-broker", "--uninstall-broker")
+VALUE_FLAGS = ("--profile",)
+PREFIX_FLAGS = ("--profile=", "--launch-t0=", "--broker-policy=")
+
+
+def media_args(argv, cwd=None):
+    """
+    从命令行中取出要交给播放器的文件 / URL，去掉启动器自身的参数
+    相对路径按 cwd (默认当前目录) 转为绝对路径，转交给另一个进程后仍然有效
+    """
+    cwd = cwd or os.getcwd()
+    media, skip = [], False
+    for arg in argv:
+        if skip:
+            skip = False
+            continue
+        if arg in VALUE_FLAGS:
+            skip = True
+            continue
+        if arg in LAUNCHER_FLAGS or arg.startswith(PREFIX_FLAGS):
+            continue
+        # URL 与播放器自身的开关 (PotPlayer 的 /add、/current 等) 原样转交
+        if "://" not in arg and not arg.startswith(("/", "-")) and not os.path.isabs(arg):
+            arg = os.path.normpath(os.path.join(cwd, arg))
+        media.append(arg)
+    return media
+
+
+def _address(state_dir):
+    """与 ipc.address(CHANNEL_NAME, state_dir) 相同 (管道名含 state_dir 的哈希)，这里不导入 ipc 以保持转交路径轻量"""
+    if os.name == 'nt':
+        import hashlib
+        digest = hashlib.sha1(os.path.normcase(os.path.abspath(state_dir)).encode('utf-8')).hexdigest()[:12]
+        return rf"\\.\pipe\PotPlayerLinkOpenList_{CHANNEL_NAME}_{digest}"
+    return os.path.join(state_dir, f".{CHANNEL_NAME}.sock")
+
+
+def _maybe_running(state_dir):
+    """不导入 IPC 模块的快速检查: 是否可能有启动器在监听"""
+    addr = _address(state_dir)
+    if os.name != 'nt':
+        return os.path.exists(addr)
+    import _winapi
+    try:
+        # 管道不存在时立即失败；存在但暂时没有空闲实例时等待 1ms 后超时，也视为存在
+        _winapi.WaitNamedPipe(addr, 1)
+    except FileNotFoundError:
+        return False
+    except OSError:
+        pass
+    return True
+
+
+def _authkey(state_dir):
+    import ipc
+    return ipc.load_authkey(os.path.join(state_dir, AUTHKEY_NAME))
+
+
+def forward(state_dir, argv, cwd=None):
+    """
+    把媒体参数转交给正在运行的启动器
+    返回 True 表示已转交 (本进程应直接退出)，没有运行中的启动器时返回 False
+    安装 / 卸载代理等启动器自身的操作、以及没有文件 / URL 参数时不转交 (返回 False，由本进程照常处理)
+    """
+    if any(arg in LAUNCHER_FLAGS for arg in argv):
+        return False
+    media = media_args(argv, cwd)
+    if not media or not _maybe_running(state_dir):
+        return False
+    import ipc
+    conn = ipc.connect(_address(state_dir), _authkey(state_dir))
+    if conn is None:
+        return False
+    try:
+        conn.send({"op": "open", "args": media})
+        reply = conn.recv()
+    except (EOFError, OSError):
+        return False
+    finally:
+        conn.close()
+    if reply.get("ok"):
+        print(f"[-] 已转交给运行中的启动器 (PID: {reply.get('pid')}，第 {reply.get('sessions')} 个会话)")
+    return bool(reply.get("ok"))
+
+
+class InstanceServer:
+    """
+    第一个启动器一侧: 接收后续启动转交来的媒体参数
+    on_open(args): 在监听线程中调用，负责把媒体交给播放器
+    """
+
+    def __init__(self, state_dir, on_open, log=print):
+        self.state_dir = state_dir
+        self.on_open = on_open
+        self.log = log
+        self.sessions = 1        # 本启动器负责的播放会话数 (首次启动 + 转交)
+        self._listener = None
+        self._closing = False
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def start(self):
+        """在后台线程中开始监听，导入 IPC 模块与建立监听不占用启动流程的时间"""
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        import ipc
+        listener = ipc.listen(_address(self.state_dir), _authkey(self.state_dir))
+        with self._lock:
+            if listener is None:
+                # 与另一个启动器几乎同时启动、对方已抢先监听，本进程照常运行但不接收转交
+                self.log("[!] 已有启动器在接收转交，本实例独立运行")
+                return
+            if self._closing:
+                listener.close()
+                return
+            self._listener = listener
+        self._serve()
+
+    def _serve(self):
+        while not self._closing:
+            try:
+                conn = self._listener.accept()
+            except Exception:
+                # 认证失败 (AuthenticationError，如其他目录的启动器用另一份密钥连错了管道) 或监听已关闭，
+                # 只丢弃这个连接，不能让监听线程退出
+                if self._closing:
+                    return
+                continue
+            try:
+                msg = conn.recv()
+                if not isinstance(msg, dict) or msg.get("op") != "open" or self._closing:
+                    conn.send({"ok": False})
+                    continue
+                try:
+                    self.on_open(list(msg.get("args", [])))
+                except Exception as e:
+                    self.log(f"[!] 无法打开转交的媒体: {e}")
+                    conn.send({"ok": False, "error": str(e)})
+                    continue
+                self.sessions += 1
+                self.log(f"[+] 收到转交的媒体 ({len(msg.get('args', []))} 项)，当前第 {self.sessions} 个会话")
+                conn.send({"ok": True, "pid": os.getpid(), "sessions": self.sessions})
+            except (EOFError, OSError):
+                pass
+            finally:
+                conn.close()
+
+    def close(self):
+        """停止接收转交 (关闭后端前调用，之后的启动会自行启动后端)"""
+        with self._lock:
+            self._closing = True
+            if self._listener is None:
+                return
+        # 主动连接一次，使阻塞在 accept() 的线程醒来
+        import ipc
+        conn = ipc.connect(_address(self.state_dir), _authkey(self.state_dir))
+        if conn is not None:
+            conn.close()
+        self._listener.close()
+        if os.name != 'nt':
+            try:
+                os.unlink(_address(self.state_dir))
+            except OSError:
+                pass
+        self._listener = None
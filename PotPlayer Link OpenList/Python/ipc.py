@@ -0,0 +1,113 @@
+# ================= 代码说明 =================
+# 文件名: ipc.py
+# 功能: 本机进程间通信的公共部分
+#       Windows 使用命名管道，其他平台使用 Unix socket (均基于 multiprocessing.connection)
+#       连接时通过共享密钥做 HMAC 认证，密钥保存在仅当前用户可读的文件中
+#       (Windows 下文件权限位不起作用，创建时用 icacls 去掉继承的权限，只授予当前用户、SYSTEM 与管理员)
+#       Windows 命名管道的名字是全局的，按 state_dir 的哈希区分，不同安装目录 (各自的密钥) 互不干扰
+# 作者: H_Knight
+# 日期: 2026-10-18
+# ===========================================
+
+import hashlib
+import os
+import secrets
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Listener, Client
+
+PIPE_PREFIX = "PotPlayerLinkOpenList_"
+
+# icacls 使用的众所周知 SID (与系统语言无关)
+SID_SYSTEM = "*S-1-5-18"
+SID_ADMINS = "*S-1-5-32-544"
+SID_USERS = "*S-1-5-32-545"
+
+
+def address(name, state_dir):
+    """返回通道地址: Windows 为命名管道 (名字含 state_dir 的哈希)，其他平台为 state_dir 下的 socket 文件"""
+    if os.name == 'nt':
+        return rf"\\.\pipe\{PIPE_PREFIX}{name}_{dir_hash(state_dir)}"
+    return os.path.join(state_dir, f".{name}.sock")
+
+
+def dir_hash(state_dir):
+    """state_dir 规范化后的短哈希 (Windows 下不区分大小写)"""
+    path = os.path.normcase(os.path.abspath(state_dir))
+    return hashlib.sha1(path.encode('utf-8')).hexdigest()[:12]
+
+
+def restrict_acl(path, grants, owner=None):
+    """
+    Windows: 去掉 path 继承来的权限，只保留 grants 中的授权 (如 [SID_ADMINS + ":F"])，返回是否成功
+    owner: 先把所有者 (含目录下已有的文件) 改为该账户，原所有者即使不在 grants 中也能修改 ACL
+    其他平台直接返回 True (由调用方设置权限位)
+    """
+    if os.name != 'nt':
+        return True
+    import subprocess
+    commands = [["icacls", path, "/setowner", owner, "/T", "/C"]] if owner else []
+    commands.append(["icacls", path, "/inheritance:r", "/grant:r"] + list(grants))
+    for args in commands:
+        r = subprocess.run(args, capture_output=True, text=True, creationflags=subprocess.CREATE_NO_WINDOW)
+        if r.returncode != 0:
+            break
+    if r.returncode != 0:
+        print(f"[!] 无法设置 {path} 的访问权限: {r.stderr.strip() or r.stdout.strip()}")
+    return r.returncode == 0
+
+
+def restrict_key(path):
+    """密钥文件只允许当前用户、SYSTEM 与管理员访问"""
+    grants = [SID_SYSTEM + ":F", SID_ADMINS + ":F"]
+    user = os.environ.get("USERNAME")
+    if user:
+        domain = os.environ.get("USERDOMAIN")
+        grants.append((f"{domain}\\{user}" if domain else user) + ":F")
+    return restrict_acl(path, grants)
+
+
+def load_authkey(path):
+    """读取共享密钥，不存在时生成 32 字节随机密钥并以 0600 权限 (Windows 下为 ACL) 保存"""
+    try:
+        with open(path, 'rb') as f:
+            key = f.read()
+        if len(key) >= 16:
+            return key
+    except OSError:
+        pass
+    key = secrets.token_bytes(32)
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, 'wb') as f:
+        f.write(key)
+    restrict_key(path)
+    return key
+
+
+def connect(addr, authkey):
+    """连接到监听端，对端不存在或认证失败 (密钥不一致) 时返回 None"""
+    try:
+        return Client(addr, authkey=authkey)
+    except (OSError, EOFError, AuthenticationError):
+        return None
+
+
+def listen(addr, authkey):
+    """
+    在 addr 上监听；已有存活的监听端时返回 None
+    Unix socket 文件残留 (上次进程崩溃) 时先清理再监听
+    """
+    try:
+        Client(addr, authkey=authkey).close()
+        return None
+    except AuthenticationError:
+        # 地址上有存活的监听端，只是密钥不同: 不抢占，也不删除它的 socket 文件
+        return None
+    except (OSError, EOFError):
+        pass
+    if os.name != 'nt' and os.path.exists(addr):
+        os.unlink(addr)
+    try:
+        return Listener(addr, authkey=authkey)
+    except OSError:
+        # 与其他进程同时抢占同一地址，由对方负责
+        return None
@@ -0,0 +1,274 @@
+# ================= 代码说明 =================
+# 文件名: keepwarm.py
+# 功能: 保温模式 (keep-warm)
+#       由常驻的守护进程负责后端的启动与停止，每个启动器实例持有一个租约 (引用计数)
+#       最后一个播放器退出后，后端再保持 grace 秒，期间重新打开播放器无需冷启动
+#       启动器异常退出时连接断开，租约自动释放
+# 作者: H_Knight
+# 日期: 2026-10-18
+# ===========================================
+
+import os
+import subprocess
+import sys
+import threading
+import time
+import uuid
+
+import ipc
+
+CHANNEL_NAME = "keepwarm"
+DEFAULT_GRACE = 300.0      # 默认保温 5 分钟
+
+
+class KeepWarmDaemon:
+    """
+    保温守护进程
+    backend 为后端插件 (backends.base.BackendPlugin)，使用其 start() / stop() / is_running()
+    """
+
+    def __init__(self, backend, addr, authkey, grace=DEFAULT_GRACE, log=print):
+        self.backend = backend
+        self.addr = addr
+        self.authkey = authkey
+        self.grace = grace
+        self.log = log
+        self._lock = threading.Lock()
+        self._leases = set()
+        self._idle_timer = None
+        self._idle_since = None
+        self._exiting = False
+        self._listener = None
+
+    # ---------- 引用计数 ----------
+    def _acquire(self, session):
+        with self._lock:
+            if self._exiting:
+                # 已因空闲关闭后端、即将退出: 不能再启动后端 (退出后它将无人管理)，让启动器重新连接新的守护进程
+                return {"ok": False, "retry": True, "error": "守护进程正在退出", "refs": len(self._leases)}
+            self._leases.add(session)
+            self._cancel_idle()
+            started = False
+            if not self.backend.is_running():
+                self.log(f"[+] 保温守护: 启动后端 (会话 {session})")
+                try:
+                    self.backend.start()
+                except Exception as e:
+                    # 启动失败不保留租约，回复错误而不是让连接处理线程退出
+                    self.log(f"[-] 保温守护: 启动后端失败: {e}")
+                    self._leases.discard(session)
+                    if not self._leases and not self._exiting:
+                        self._schedule_idle()
+                    return {"ok": False, "error": str(e) or type(e).__name__, "refs": len(self._leases)}
+                started = True
+            return {"ok": True, "started": started, "refs": len(self._leases)}
+
+    def _release(self, session):
+        with self._lock:
+            self._leases.discard(session)
+            if not self._leases and not self._exiting:
+                self._schedule_idle()
+            return {"ok": True, "refs": len(self._leases)}
+
+    def _schedule_idle(self):
+        self._idle_since = time.monotonic()
+        self.log(f"[*] 保温守护: 已无播放器运行，{self.grace:.0f}s 后关闭后端")
+        self._idle_timer = threading.Timer(self.grace, self._on_idle)
+        self._idle_timer.daemon = True
+        self._idle_timer.start()
+
+    def _cancel_idle(self):
+        if self._idle_timer is not None:
+            self._idle_timer.cancel()
+            self._idle_timer = None
+            self._idle_since = None
+
+    def _on_idle(self):
+        with self._lock:
+            if self._leases or self._exiting:
+                return
+            self.log("[+] 保温守护: 空闲超时，关闭后端")
+            self.backend.stop()
+            self._exiting = True
+        self._wake_listener()
+
+    def _status(self):
+        with self._lock:
+            idle_left = None
+            if self._idle_since is not None:
+                idle_left = max(self.grace - (time.monotonic() - self._idle_since), 0.0)
+            return {"ok": True, "refs": len(self._leases), "backend_running": self.backend.is_running(),
+                    "idle_left": idle_left}
+
+    # ---------- 连接处理 ----------
+    def _serve_conn(self, conn):
+        """一个连接对应一个启动器实例；连接断开时释放其持有的租约"""
+        held = set()
+        try:
+            while True:
+                msg = conn.recv()
+                op = msg.get("op")
+                if op == "acquire":
+                    reply = self._acquire(msg["session"])
+                    if reply["ok"]:
+                        held.add(msg["session"])
+                    conn.send(reply)
+                elif op == "release":
+                    held.discard(msg["session"])
+                    conn.send(self._release(msg["session"]))
+                elif op == "status":
+                    conn.send(self._status())
+                elif op == "shutdown":
+                    conn.send({"ok": True})
+                    self.shutdown()
+                    return
+                else:
+                    conn.send({"ok": False, "error": f"未知操作: {op}"})
+        except (EOFError, OSError):
+            pass
+        finally:
+            for session in held:
+                self._release(session)
+            conn.close()
+
+    def _wake_listener(self):
+        """主动连接一次自身，使阻塞在 accept() 的主循环醒来并退出"""
+        conn = ipc.connect(self.addr, self.authkey)
+        if conn is not None:
+            conn.close()
+
+    def shutdown(self):
+        """立即停止后端并退出"""
+        with self._lock:
+            self._cancel_idle()
+            if self.backend.is_running():
+                self.backend.stop()
+            self._exiting = True
+        self._wake_listener()
+
+    def serve_forever(self):
+        """监听并处理请求，后端因空闲关闭后返回；已有守护进程在运行时直接返回 False"""
+        self._listener = ipc.listen(self.addr, self.authkey)
+        if self._listener is None:
+            return False
+        try:
+            while not self._exiting:
+                try:
+                    conn = self._listener.accept()
+                except Exception:
+                    # 认证失败等，忽略该连接
+                    continue
+                if self._exiting:
+                    conn.close()
+                    break
+                threading.Thread(target=self._serve_conn, args=(conn,), daemon=True).start()
+        finally:
+            self._listener.close()
+        return True
+
+
+class Lease:
+    """启动器一侧持有的租约，release() 或进程退出时归还"""
+
+    def __init__(self, conn, session, reply):
+        self.conn = conn
+        self.session = session
+        self.started = reply.get("started", False)
+        self.refs = reply.get("refs", 1)
+
+    def release(self):
+        if self.conn is None:
+            return
+        try:
+            self.conn.send({"op": "release", "session": self.session})
+            self.conn.recv()
+        except (EOFError, OSError):
+            pass
+        finally:
+            self.conn.close()
+            self.conn = None
+
+
+def spawn_daemon(command):
+    """以脱离当前控制台的方式启动守护进程"""
+    kwargs = {"stdin": subprocess.DEVNULL, "stdout": subprocess.DEVNULL, "stderr": subprocess.DEVNULL}
+    if os.name == 'nt':
+        kwargs["creationflags"] = (subprocess.DETACHED_PROCESS | subprocess.CREATE_NEW_PROCESS_GROUP
+                                   | subprocess.CREATE_NO_WINDOW)
+    else:
+        kwargs["start_new_session"] = True
+    return subprocess.Popen(command, **kwargs)
+
+
+def _connect_or_spawn(addr, authkey, daemon_command, timeout):
+    conn = ipc.connect(addr, authkey)
+    if conn is not None:
+        return conn
+    spawn_daemon(daemon_command)
+    deadline = time.monotonic() + timeout
+    delay = 0.01
+    while conn is None and time.monotonic() < deadline:
+        time.sleep(delay)
+        delay = min(delay * 2, 0.2)
+        conn = ipc.connect(addr, authkey)
+    if conn is None:
+        raise TimeoutError("保温守护进程启动超时")
+    return conn
+
+
+def acquire_lease(addr, authkey, daemon_command, timeout=5.0):
+    """
+    向守护进程申请租约；守护进程不存在时先启动它
+    恰好连上正在因空闲退出的守护进程时 (连接断开或回复 retry)，等它退出后重新连接 / 启动新的守护进程
+    返回 Lease，超时仍连不上时抛出 TimeoutError，守护进程启动后端失败时抛出 RuntimeError
+    """
+    session = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+    deadline = time.monotonic() + timeout
+    while True:
+        conn = _connect_or_spawn(addr, authkey, daemon_command, timeout)
+        try:
+            conn.send({"op": "acquire", "session": session})
+            reply = conn.recv()
+        except (EOFError, OSError):
+            reply = {"ok": False, "retry": True, "error": "连接已断开"}
+        if reply.get("ok"):
+            return Lease(conn, session, reply)
+        conn.close()
+        if not reply.get("retry"):
+            raise RuntimeError(f"保温守护进程启动后端失败: {reply.get('error')}")
+        if time.monotonic() >= deadline:
+            raise TimeoutError(f"保温守护进程正在退出，重新连接超时 ({reply.get('error')})")
+        time.sleep(0.05)
+
+
+def query_status(addr, authkey):
+    """查询守护进程状态，未运行时返回 None"""
+    conn = ipc.connect(addr, authkey)
+    if conn is None:
+        return None
+    try:
+        conn.send({"op": "status"})
+        return conn.recv()
+    finally:
+        conn.close()
+
+
+def stop_daemon(addr, authkey):
+    """请求守护进程立即关闭后端并退出，未运行时返回 False"""
+    conn = ipc.connect(addr, authkey)
+    if conn is None:
+        return False
+    try:
+        conn.send({"op": "shutdown"})
+        return bool(conn.recv().get("ok"))
+    except (EOFError, OSError):
+        return False
+    finally:
+        conn.close()
+
+
+def daemon_command(flag="--keepwarm-daemon"):
+    """返回启动守护进程的命令行 (兼容打包后的 exe 环境)"""
+    if getattr(sys, 'frozen', False):
+        return [sys.executable, flag]
+    return [sys.executable, os.path.abspath(sys.argv[0]), flag]
@@ -0,0 +1,441 @@
+# ================= 代码说明 =================
+# 文件名: launcher_core.py
+# 功能: 启动器核心流程 (OpenList 版与 Alist 版共用)
+#       启动后端 -> 等待就绪 -> 启动并监控 PotPlayer -> 关闭后端
+#       后端的启动 / 就绪探测 / 停止 / 健康检查由 backends 下的插件实现，
+#       按配置的 backend 字段只导入选中的插件
+#       各阶段耗时记录到 launcher_timings.jsonl (见 telemetry.py)
+#       启用 prefetch 时，后端就绪后在后台预热最近播放目录的列表 (见 prefetch.py)
+#       启用 resolver 时，OpenList 目录链接先解析为直链播放列表再交给 PotPlayer (见 resolver.py)
+#       启用 media_proxy 时，网盘视频经由本地分块缓存代理播放 (见 media_proxy.py)
+#       播放期间由看门狗监视后端，崩溃或无响应时原地重启 (见 backend_watchdog.py)
+#       启用 page_warm 时，后端启动的同时把 PotPlayer 启动要加载的文件预读进页缓存 (见 page_warm.py)
+#       启动器异常退出后遗留的后端，下次启动时经会话记录认领或清理 (见 session_journal.py)
+#       启用 scheduling 时，按策略调整播放器与后端 (含子孙进程) 的 CPU / IO 优先级与亲和性 (见 sched_policy.py)
+#       后端与播放器的输出捕获到内存环形缓冲，出错时写入 launcher_output.jsonl (见 output_capture.py)
+# 作者: H_Knight
+# 日期: 2026-10-18
+# ===========================================
+
+import os
+import sys
+import time
+
+import backends
+import config_store
+import instance
+import orchestrator
+import proc_watch
+import readiness
+import telemetry
+
+# 注意: tkinter / ctypes 只在需要弹窗时才导入 (见 launcher_ui.py)
+# 可选功能 (保温模式、目录预热、直链解析、媒体代理等) 的模块也只在启用时导入
+
+# 本机进程间通信 (保温守护进程等) 使用的认证密钥文件名，位于配置文件所在目录
+AUTHKEY_NAME = ".launcher_ipc.key"
+
+
+def load_plugin(config, base_path=None, log=print):
+    """按配置加载后端插件"""
+    return backends.load_backend(config.get("backend", "openlist_service"), config, log, base_path)
+
+
+def needs_elevation(config, base_path):
+    """当前配置的后端是否需要管理员权限 (已安装特权代理时不需要)"""
+    return load_plugin(config, base_path).needs_admin()
+
+
+def setup_fields(plugin):
+    """启动前必须有效的路径: PotPlayer + 插件声明的路径"""
+    return [("potplayer_path", "PotPlayer 路径:", "选择 PotPlayer.exe")] + list(plugin.required_paths)
+
+
+def wait_backend_ready(config, plugin):
+    """等待后端真正就绪 (按插件的探测器)，返回 ReadinessReport"""
+    probes = plugin.readiness_probes()
+    report = readiness.wait_until_ready(probes, deadline=config.get("readiness", {}).get("deadline", readiness.DEFAULT_DEADLINE))
+    if report.ready:
+        print(f"[*] 后端已就绪，耗时 {report.elapsed:.3f}s")
+    else:
+        print(f"[!] 等待后端就绪超时 ({report.elapsed:.3f}s)")
+    for st in report.stats:
+        print(f"    - {st.name}: 尝试 {st.attempts} 次, 累计 {st.total_time:.3f}s, {st.last_detail}")
+    return report
+
+
+def spawn_player(potplayer_path, supervisor, media=(), scheduler=None, capture=None):
+    """启动 PotPlayer (带上要打开的文件 / URL) 并交给进程监控器跟踪，返回 Popen 对象"""
+    kwargs = scheduler.popen_kwargs("player") if scheduler is not None else {}
+    if capture is not None:
+        kwargs.update(capture.popen_kwargs())
+    proc = supervisor.spawn([potplayer_path] + list(media), cwd=os.path.dirname(potplayer_path), **kwargs)
+    if scheduler is not None:
+        scheduler.apply("player", proc.pid)
+    if capture is not None:
+        capture.attach("player", proc)
+    return proc
+
+
+def keep_warm_enabled(config):
+    """是否启用保温模式 (keep_warm.enabled)"""
+    return bool(config.get("keep_warm", {}).get("enabled", False))
+
+
+def keepwarm_channel(base_path):
+    """返回保温守护进程的 (通道地址, 认证密钥)"""
+    import ipc, keepwarm
+    return ipc.address(keepwarm.CHANNEL_NAME, base_path), ipc.load_authkey(os.path.join(base_path, AUTHKEY_NAME))
+
+
+def run_keepwarm_daemon(load_config, base_path):
+    """保温守护进程入口: 持有后端直到最后一个播放器退出 grace_minutes 分钟后"""
+    import keepwarm
+    config = load_config()
+    grace = float(config.get("keep_warm", {}).get("grace_minutes", keepwarm.DEFAULT_GRACE / 60)) * 60
+    addr, authkey = keepwarm_channel(base_path)
+    keepwarm.KeepWarmDaemon(load_plugin(config, base_path), addr, authkey, grace).serve_forever()
+
+
+def prefetch_enabled(config):
+    """是否启用目录预热 (prefetch.enabled)"""
+    return bool(config.get("prefetch", {}).get("enabled", False))
+
+
+def start_prefetch(prefetcher, report):
+    """后端就绪后开始预热；未就绪时预热只会得到错误，直接跳过"""
+    if not report.ready:
+        print("[!] 后端未就绪，跳过目录预热")
+        return None
+    return prefetcher.start()
+
+
+def resolver_enabled(config):
+    """是否启用目录直链解析 (resolver.enabled)"""
+    return bool(config.get("resolver", {}).get("enabled", False))
+
+
+def media_proxy_enabled(config):
+    """是否启用本地媒体代理 (media_proxy.enabled)"""
+    return bool(config.get("media_proxy", {}).get("enabled", False))
+
+
+def watchdog_enabled(config):
+    """是否启用播放期间的后端看门狗 (watchdog.enabled，默认关闭)"""
+    return bool(config.get("watchdog", {}).get("enabled", False))
+
+
+def journal_enabled(config):
+    """是否启用会话记录与遗留后端认领 (session_journal.enabled，默认关闭；保温模式下不使用)"""
+    return bool(config.get("session_journal", {}).get("enabled", False)) and not keep_warm_enabled(config)
+
+
+def open_journal(base_path, plugin):
+    """取得会话记录的文件锁，另一个启动器正在运行时返回 None"""
+    import session_journal
+    journal = session_journal.SessionJournal(base_path)
+    if not journal.acquire():
+        print("[!] 另一个启动器正在运行，本次不使用会话记录")
+        return None
+    if hasattr(plugin, "spawn_hooks"):
+        # 后端一启动就写入 PID，启动器在等待就绪期间被结束也能在下次找回
+        plugin.spawn_hooks.append(lambda proc: journal.record_backend(plugin))
+    return journal
+
+
+def page_warm_enabled(config):
+    """是否启用 PotPlayer 程序文件的页缓存预热 (page_warm.enabled)"""
+    return bool(config.get("page_warm", {}).get("enabled", False))
+
+
+def capture_enabled(config):
+    """是否捕获后端与播放器的输出 (output_capture.enabled，默认关闭)"""
+    return bool(config.get("output_capture", {}).get("enabled", False))
+
+
+def start_capture(config, base_path, plugin, recorder):
+    """后端每次启动 (含看门狗重启) 都接到同一个环形缓冲"""
+    import output_capture
+    capture = output_capture.OutputCapture(config, base_path, recorder)
+    if hasattr(plugin, "spawn_hooks"):
+        plugin.popen_kwargs.update(capture.popen_kwargs(ignore_sigpipe=True))
+        plugin.spawn_hooks.append(lambda proc: capture.attach("backend", proc))
+    return capture
+
+
+def scheduling_enabled(config):
+    """是否启用进程调度策略 (scheduling.enabled)"""
+    return bool(config.get("scheduling", {}).get("enabled", False))
+
+
+def start_scheduler(config, plugin, supervisor, image_names):
+    """播放器按 PotPlayer 进程树 + 映像名匹配，后端按插件拉起的进程 (+ 配置的映像名) 匹配"""
+    import sched_policy
+    scheduler = sched_policy.Scheduler(config)
+    scheduler.watch("player", lambda: list(supervisor.seen), image_names)
+    process = lambda: [plugin.process.pid] if getattr(plugin, "process", None) is not None else []
+    scheduler.watch("backend", process, plugin.images() if hasattr(plugin, "images") else ())
+    if hasattr(plugin, "spawn_hooks"):
+        plugin.popen_kwargs.update(scheduler.popen_kwargs("backend"))
+        plugin.spawn_hooks.append(lambda proc: scheduler.apply("backend", proc.pid))
+    return scheduler.start()
+
+
+def launch(load_config, save_config, base_path):
+    """
+    启动器主流程
+    load_config / save_config: 入口脚本提供的配置读写函数
+    base_path: 配置文件所在目录 (保温模式的通信地址与密钥按此目录区分)
+    """
+    rec = telemetry.SpanRecorder()
+    # 提权重启: 从原进程发起重启到本进程开始执行的耗时
+    launch_t0 = telemetry.launch_t0_from_argv(sys.argv[1:])
+    if launch_t0 is not None:
+        rec.add_offset("elevation", launch_t0 - rec.ts, rec.ts - launch_t0)
+
+    # 1. 加载配置与后端插件
+    with rec.span("config_load"):
+        config = load_config()
+    with rec.span("plugin_load"):
+        plugin = load_plugin(config, base_path)
+    rec.attrs.update(profile=config.get("profile"), backend=plugin.name, keep_warm=keep_warm_enabled(config))
+    log_file = telemetry.open_log(config, base_path)
+
+    # 2. 验证路径 (如果路径缺失或无效，则统一弹出设置窗口)
+    fields = setup_fields(plugin)
+    if not all(config_store.is_valid_file(config.get(key, "")) for key, _, _ in fields):
+        # 路径无效，弹出配置窗口进行设置 (此时才加载 GUI 模块)
+        import launcher_ui
+        with rec.span("setup_dialog"):
+            success = launcher_ui.initial_setup_dialog(config, save_config, fields, plugin.title)
+        if not success:
+            telemetry.flush(rec, log_file)
+            sys.exit(0) # 用户取消或关闭窗口
+        # 插件按更新后的配置重新创建
+        plugin = load_plugin(config, base_path)
+
+    # 重新从更新后的配置中获取路径
+    potplayer_path = config.get("potplayer_path")
+    # 命令行中的文件 / URL (关联视频或 .dpl 播放列表时由系统传入) 原样交给 PotPlayer
+    media = instance.media_args(sys.argv[1:])
+    # 跟踪 PotPlayer 的整棵进程树，以及它转交启动请求的同名实例 (player_image_names 可覆盖)
+    image_names = config.get("player_image_names", [os.path.basename(potplayer_path)])
+    supervisor = proc_watch.ProcessSupervisor(image_names)
+    scheduler = None
+    capture = start_capture(config, base_path, plugin, rec) if capture_enabled(config) else None
+
+    warmer = None
+    if page_warm_enabled(config):
+        # 页缓存预热: 按上次学到的清单预读 PotPlayer 的程序文件，播放器启动后继续学习
+        import page_warm
+        warmer = page_warm.PageWarmer(config, base_path, potplayer_path)
+
+    prefetcher = None
+    if prefetch_enabled(config):
+        # 目录预热: 记下本次播放的 WebDAV 目录，后端就绪后预热最近播放过的目录列表
+        import prefetch
+        prefetcher = prefetch.Prefetcher(config, base_path)
+        prefetcher.record(media)
+
+    resolver = None
+    if resolver_enabled(config):
+        # 直链解析: OpenList 目录 / 分享链接解析为 .dpl 播放列表 (需要后端已就绪)
+        import resolver as resolver_mod
+        resolver = resolver_mod.Resolver(config, base_path)
+
+    proxy = None
+
+    def prepare_media(args):
+        """目录链接解析为播放列表，网盘视频改为经由媒体代理访问"""
+        if resolver is not None:
+            args = resolver.expand(args)
+        if proxy is not None:
+            args = proxy.rewrite(args)
+        return args
+
+    def open_media(args):
+        if prefetcher is not None:
+            prefetcher.record(args)
+        # 转交时后端早已就绪，直接在监听线程中解析
+        return spawn_player(potplayer_path, supervisor, prepare_media(args), scheduler, capture)
+
+    server = None
+    if config.get("single_instance", False):
+        # 单实例: 之后的启动把媒体参数转交过来，由本进程交给 PotPlayer 并一起监控
+        server = instance.InstanceServer(base_path, open_media)
+        server.start()
+
+    journal = open_journal(base_path, plugin) if journal_enabled(config) else None
+
+    lease = None
+    dog = None
+    stopped = False
+    try:
+        if scheduling_enabled(config):
+            scheduler = start_scheduler(config, plugin, supervisor, image_names)
+
+        if media_proxy_enabled(config):
+            # 媒体代理与后端一同启动 (进程内的后台线程)，分块缓存跨会话保留
+            import media_proxy
+            with rec.span("proxy_start"):
+                proxy = media_proxy.start_from_config(config, base_path)
+            if resolver is not None:
+                resolver.proxy = proxy
+
+        # 3. 并行启动后端与 PotPlayer
+        #    PotPlayer 自身冷启动远比后端慢，两者无需串行；只有真正依赖后端的步骤才等待就绪
+        def start_backend():
+            nonlocal lease
+            if keep_warm_enabled(config):
+                # 保温模式: 由守护进程负责启动/停止后端，这里只申请租约 (未启用时不加载相关模块)
+                import keepwarm
+                daemon_cmd = keepwarm.daemon_command() + ["--profile", config["profile"]]
+                lease = keepwarm.acquire_lease(*keepwarm_channel(base_path), daemon_cmd)
+                print(f"[-] 已取得保温租约 (当前 {lease.refs} 个播放器, 本次{'冷启动' if lease.started else '复用已运行的后端'})")
+                return lease
+            if journal is not None:
+                # 上次启动器异常退出时遗留的后端: 健康则直接沿用，否则清理后照常启动
+                with rec.span("orphan_check") as sp:
+                    orphan = journal.recover(plugin, config)
+                    sp.attrs["action"] = orphan.action
+                journal.begin(config, plugin)
+                if orphan.adopted:
+                    journal.record_backend(plugin)
+                    return orphan
+            return plugin.start()
+
+        orch = orchestrator.LaunchOrchestrator()
+        orch.add("backend_start", start_backend)
+        orch.add("backend_ready", lambda: wait_backend_ready(config, plugin), requires=["backend_start"])
+        # 配置 player_requires_backend=true 时，PotPlayer 等后端就绪后再启动 (如播放器会自动打开网盘中的上次列表)
+        player_deps = ["backend_ready"] if config.get("player_requires_backend", False) else []
+        resolving = resolver is not None and any(resolver.wants(m) for m in media)
+        if warmer is not None:
+            # 预热与后端启动并行: PotPlayer 本就要等后端时顺带等预热完成 (最多 deadline 秒)，
+            # 否则与 PotPlayer 同时进行，不拖延启动
+            orch.add("page_warm", warmer.warm)
+            if player_deps or resolving:
+                player_deps.append("page_warm")
+        if resolving:
+            # 有需要解析的目录链接时，PotPlayer 等解析完成后带着播放列表启动；
+            # 后端未就绪或解析出错时不影响播放器，按原始参数启动
+            def resolved_media():
+                if "resolve" in orch.results:
+                    return orch.results["resolve"]
+                return proxy.rewrite(media) if proxy is not None else media
+
+            orch.add("resolve", lambda: prepare_media(media), requires=["backend_ready"])
+            orch.add("player_spawn",
+                     lambda: spawn_player(potplayer_path, supervisor, resolved_media(), scheduler, capture),
+                     requires=player_deps, after=["resolve"])
+        else:
+            orch.add("player_spawn",
+                     lambda: spawn_player(potplayer_path, supervisor, prepare_media(media), scheduler, capture),
+                     requires=player_deps)
+        if prefetcher is not None:
+            # 预热在后台线程中进行，这一步只负责在就绪后发起，不拖慢启动
+            orch.add("prefetch", lambda: start_prefetch(prefetcher, orch.results["backend_ready"]),
+                     requires=["backend_ready"])
+
+        print(f"[+] 后端: {plugin.name}")
+        print(f"[+] 正在启动 PotPlayer: {potplayer_path}")
+        orch_t0 = time.perf_counter()
+        timings = orch.run_sync()
+        rec.add_steps(timings, orch_t0)
+        if journal is not None and timings["backend_ready"].ok:
+            journal.record_backend(plugin, state="running")
+        # 启动总耗时: 从进入本函数到播放器已启动且后端已就绪
+        rec.add("launch", rec.t0, time.perf_counter(), ok=all(t.ok for t in timings.values()),
+                cold=lease is None or lease.started)
+        print("[*] 启动步骤耗时:")
+        print(orchestrator.format_timings(timings))
+        failed = [t.name for t in timings.values() if not t.ok and not t.skipped]
+        if timings["backend_ready"].ok and not orch.results["backend_ready"].ready:
+            failed.append("backend_ready (超时)")
+        if capture is not None and failed:
+            capture.error(f"启动步骤失败: {', '.join(failed)}")
+
+        if not timings["player_spawn"].ok:
+            raise RuntimeError(f"PotPlayer 启动失败: {timings['player_spawn'].error}")
+        potplayer_process = orch.results["player_spawn"]
+
+        print(f"[*] PotPlayer (PID: {potplayer_process.pid}) 运行中... 脚本正在监控状态")
+        if warmer is not None:
+            warmer.learn(lambda: list(supervisor.seen))
+
+        if lease is None and watchdog_enabled(config) and timings["backend_ready"].ok:
+            # 保温模式下后端归守护进程管理，不在这里重启
+            import backend_watchdog
+            dog = backend_watchdog.Watchdog(plugin, config)
+            dog.start()
+
+        # 4. 阻塞等待 PotPlayer 关闭 (含其子进程与认领的实例)
+        with rec.span("session") as sp:
+            summary = supervisor.wait()
+            if server is not None:
+                # 停止接收转交；关闭前一刻转交来的播放器也要等它退出
+                server.close()
+                if supervisor.tracker_pids():
+                    summary = supervisor.wait()
+            sp.attrs["adopted"] = len(summary["adopted"])
+            sp.attrs["sessions"] = server.sessions if server is not None else 1
+
+        print(f"\n[*] 检测到 PotPlayer 已关闭 (运行 {summary['elapsed']:.1f}s, 认领实例 {len(summary['adopted'])} 个, "
+              f"会话 {sp.attrs['sessions']} 个)")
+
+    except KeyboardInterrupt:
+        print("\n[!] 用户中断操作")
+    except Exception as e:
+        # 运行时发生其他未知错误，弹窗提示 (此时才加载 GUI 模块)
+        if capture is not None:
+            capture.error(f"运行错误: {e}")
+        import launcher_ui
+        launcher_ui.show_error("运行错误", f"程序运行过程中发生错误:\n{e}")
+    finally:
+        # 5. 执行清理操作 (先停止接收转交与看门狗，再关闭后端)
+        if server is not None:
+            server.close()
+        if dog is not None:
+            dog.stop()
+            for event in dog.events:
+                rec.add("watchdog_recover", event.declared, event.recovered or event.declared, ok=event.ok,
+                        kind=event.kind, detect=round(event.detect, 4), error=event.error)
+            if capture is not None and dog.events:
+                capture.error(f"看门狗重启后端 {len(dog.events)} 次")
+        supervisor.close()
+        if warmer is not None:
+            warmer.finish()
+        if scheduler is not None:
+            scheduler.stop()
+            rec.attrs["scheduled"] = dict(scheduler.counts)
+        if resolver is not None:
+            resolver.close()
+        if proxy is not None:
+            proxy.close()
+        if prefetcher is not None:
+            prefetcher.finish()
+            if prefetcher.ended is not None:
+                rec.add("prefetch_warm", prefetcher.started, prefetcher.ended,
+                        ok=all(r.ok for r in prefetcher.results), folders=len(prefetcher.results))
+        with rec.span("shutdown", lease=lease is not None) as sp:
+            if lease is not None:
+                # 保温模式: 归还租约，最后一个播放器退出 N 分钟后由守护进程关闭后端
+                lease.release()
+                print("\n[+] 已归还保温租约，后端将在空闲超时后关闭")
+            else:
+                print("\n[+] 正在关闭后端...")
+                try:
+                    plugin.stop()
+                    stopped = True
+                except Exception as e:
+                    sp.attrs["error"] = str(e)
+                    print(f"[!] 关闭后端时发生错误: {e}")
+        if capture is not None:
+            # 后端已关闭，读完剩余输出；出过错或 flush="always" 时写出
+            capture.finish()
+        if journal is not None:
+            # 后端已正常关闭才删除记录，否则留给下次启动检查
+            journal.close(clean=stopped)
+        telemetry.flush(rec, log_file)
+
+        print("[*] 全部完成，脚本退出。")
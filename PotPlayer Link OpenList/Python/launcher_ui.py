@@ -0,0 +1,169 @@
+# ================= 代码说明 =================
+# 文件名: launcher_ui.py
+# 功能: 启动器的 GUI 部分 (配置窗口、错误弹窗)
+#       仅在需要显示界面时由主脚本延迟导入，正常启动路径不加载 tkinter
+# 作者: H_Knight
+# 日期: 2026-10-18
+# ===========================================
+
+import os
+import tkinter as tk
+import tkinter.ttk as ttk
+from tkinter import filedialog, messagebox
+from ctypes import byref, c_int, sizeof
+
+import config_store
+
+try:
+    from ctypes import windll
+except ImportError:
+    # 非 Windows 环境没有 windll，跳过圆角等系统样式
+    windll = None
+
+# 默认只需要 PotPlayer 路径: (配置键, 标签, 文件选择框标题)
+POTPLAYER_FIELD = ("potplayer_path", "PotPlayer 路径:", "选择 PotPlayer.exe")
+
+def initial_setup_dialog(config, save_config, fields=None, title="PotPlayer Link OpenList    By：H_Knight"):
+    """
+    弹出配置窗口，允许用户手动输入或选择路径
+    如果是第一次运行或配置文件丢失，将会调用此函数
+    save_config: 保存配置的函数，确认后以 save_config(config) 调用
+    fields: 需要设置的路径 [(配置键, 标签, 文件选择框标题)]，由后端插件决定 (如 AlistHelper 版多一行)
+    """
+    fields = list(fields or [POTPLAYER_FIELD])
+
+    # (不再重置无效路径为空，而是保留并在后续界面中标记为红色)
+
+    # 创建 GUI 主窗口 (tkinter)
+    root = tk.Tk()
+    root.title(title)
+    
+    # --- Windows 11 风格优化 ---
+    # 尝试开启 Windows 11 窗口圆角 (DWMWA_WINDOW_CORNER_PREFERENCE = 33, DWMWCP_ROUND = 2)
+    try:
+        DWMWA_WINDOW_CORNER_PREFERENCE = 33
+        VAL = c_int(2)
+        windll.dwmapi.DwmSetWindowAttribute(c_int(root.winfo_id()), DWMWA_WINDOW_CORNER_PREFERENCE, byref(VAL), sizeof(VAL))
+    except Exception:
+        pass
+    
+    # 配置 ttk 样式
+    style = ttk.Style()
+    # 'vista' 主题在 Windows 上通常对应较现代的系统控件样式
+    if 'vista' in style.theme_names():
+        style.theme_use('vista')
+    
+    # 配置通用字体
+    default_font = ("Microsoft YaHei", 9)
+    style.configure(".", font=default_font)
+    style.configure("TButton", font=default_font)
+    style.configure("TLabel", font=default_font)
+    style.configure("TEntry", font=default_font)
+
+    # 计算屏幕中心位置，使窗口居中显示
+    window_w, window_h = 600, 120 + 40 * len(fields)      # 窗口尺寸 (每多一行路径增加 40 像素)
+    screen_w = root.winfo_screenwidth()                   # 屏幕宽度
+    screen_h = root.winfo_screenheight()                  # 屏幕高度
+    x = (screen_w - window_w) // 2                        # 计算居中位置的 X 坐标
+    y = (screen_h - window_h) // 2                        # 计算居中位置的 Y 坐标
+    root.geometry(f"{window_w}x{window_h}+{x}+{y}")       # 设置窗口大小和位置
+    
+    # 禁止调整窗口大小，并保持窗口在最前端
+    root.resizable(False, False)
+    root.attributes("-topmost", True)
+
+    # 创建布局容器 Frame
+    frame = tk.Frame(root, padx=20, pady=20)
+    frame.pack(fill=tk.BOTH, expand=True)
+    
+    # Grid 网格布局配置，让输入框(column 1)自动拉伸
+    frame.columnconfigure(1, weight=1)
+
+    # --- 每个路径一行: 标签 / 输入框 / 选择按钮 ---
+    path_vars = {}
+    for row, (key, label, picker_title) in enumerate(fields):
+        current = config.get(key, "")
+        var = tk.StringVar(value=current)
+        path_vars[key] = var
+
+        ttk.Label(frame, text=label).grid(row=row, column=0, sticky="w", pady=5)
+        entry = tk.Entry(frame, textvariable=var, font=("Microsoft YaHei", 9), relief="flat", bd=1, highlightthickness=1, highlightcolor="#0067C0")
+        entry.grid(row=row, column=1, sticky="ew", padx=5, pady=5, ipady=4)
+
+        # 如果初始路径无效且非空，显示为红色
+        if current and not config_store.is_valid_file(current):
+            entry.config(fg="#E81123")
+
+        # 当用户修改时恢复黑色
+        var.trace("w", lambda *args, e=entry: e.config(fg="#000000"))
+
+        # 选择文件按钮的回调函数
+        def select(v=var, t=picker_title):
+            p = filedialog.askopenfilename(title=t, filetypes=[("Executable", "*.exe")])
+            if p: v.set(os.path.normpath(p)) # 规范化路径分隔符
+
+        ttk.Button(frame, text="选择...", command=select).grid(row=row, column=2, padx=5, pady=5)
+
+    # --- 说明文字 ---
+    n = len(fields)
+    # 第一句红色提示
+    if n == 1:
+        hint = f"请重新指定 {fields[0][1].replace(' 路径:', '')} 的执行文件路径 (.exe)"
+    else:
+        hint = "请重新指定错误程序的执行文件路径 (.exe)"
+    ttk.Label(frame, text=hint, foreground="#E81123").grid(row=n + 1, column=0, columnspan=3, pady=(5, 0), sticky="w")
+    # 第二句黑色/深灰色说明
+    ttk.Label(frame, text="注：指定后将自动保存配置并在下次直接运行,不再显示此窗口。", foreground="#6A6A6A").grid(row=n + 2, column=0, columnspan=3, pady=(0, 5), sticky="w")
+
+    # --- 底部按钮 ---
+    btn_frame = ttk.Frame(frame)
+    btn_frame.grid(row=n + 3, column=0, columnspan=3, pady=10 if n == 1 else 5)
+
+    # 用于在闭包中保存结果状态
+    result_state = {"saved": False}
+
+    # "保存并启动" 按钮的回调函数
+    def on_confirm():
+        # 获取输入框内容并去除首尾空白和引号
+        values = {key: path_vars[key].get().strip().strip('"') for key, _, _ in fields}
+        
+        err_msgs = []
+        # 简单验证路径是否存在
+        for key, label, _ in fields:
+            if not config_store.is_valid_file(values[key]):
+                err_msgs.append(f"{label.replace(' 路径:', '')} 路径无效或不存在。")
+        if err_msgs:
+            messagebox.showwarning("路径错误", "\n".join(err_msgs), parent=root)
+            return
+
+        # 更新配置字典
+        config.update(values)
+        # 保存到本地 JSON 文件
+        save_config(config)
+        result_state["saved"] = True
+        root.destroy() # 关闭窗口
+
+    # "取消" 按钮的回调函数
+    def on_cancel():
+        root.destroy()
+
+    # 放置按钮
+    ttk.Button(btn_frame, text="保存并启动", command=on_confirm, width=15).pack(side=tk.LEFT, padx=10)
+    ttk.Button(btn_frame, text="取消", command=on_cancel, width=15).pack(side=tk.LEFT, padx=10)
+
+    # 处理窗口右上角关闭按钮事件，等同于取消
+    root.protocol("WM_DELETE_WINDOW", on_cancel)
+    
+    # 进入 GUI 事件循环，等待用户操作
+    root.mainloop()
+    
+    # 返回保存状态：True 表示已保存配置可继续，False 表示用户取消
+    return result_state["saved"]
+
+def show_error(title, message):
+    """弹出置顶的错误提示框"""
+    root = tk.Tk()
+    root.withdraw()
+    root.attributes("-topmost", True)
+    messagebox.showerror(title, message)
+    root.destroy()
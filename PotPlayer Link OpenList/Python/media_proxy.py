@@ -0,0 +1,625 @@
+# ================= 代码说明 =================
+# 文件名: media_proxy.py
+# 功能: 本地分块缓存媒体代理 (可选)
+#       PotPlayer 通过 http://127.0.0.1:端口/s/<编码后的原始 URL>/<文件名> 访问网盘视频，
+#       代理按固定大小分块向源站发起 Range 请求，分块持久化在磁盘上 (退出后仍保留，按总大小 LRU 淘汰)，
+#       命中缓存的部分直接以零拷贝 (sendfile，不支持时用 mmap) 发给播放器；
+#       未命中的分块边回源边转发，不等整块下载完 (冷启动、跳转进度时更快出画面)
+#       预读: 顺序播放时预读当前文件后续若干块；开始播放某一集时预读播放列表中下一集的开头
+#       源站不支持 Range (返回 200) 时不读取整个文件，改为把播放器重定向到原始 URL 直接播放
+#       配置项 media_proxy: {"enabled": false, "port": 0, "cache_dir": "media_cache", "max_size_mb": 10240,
+#                            "chunk_mb": 2, "readahead_chunks": 4, "next_head_mb": 16, "workers": 4}
+# 作者: H_Knight
+# 日期: 2026-10-18
+# ===========================================
+
+import base64
+import hashlib
+import http.client
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, quote, urlencode, urljoin, urlsplit
+
+from prefetch import ConnectionPool
+
+CACHE_DIR = "media_cache"
+MB = 1024 * 1024
+CHUNK_SIZE = 2 * MB
+MAX_CACHE_SIZE = 10240 * MB
+READAHEAD_CHUNKS = 4
+NEXT_HEAD_SIZE = 16 * MB
+WORKERS = 4
+MAX_REDIRECTS = 5
+PLAYLIST_EXTENSIONS = (".dpl", ".m3u", ".m3u8", ".pls", ".asx")
+# 直链中每次解析都会变化的签名 / 过期时间参数 (OpenList 的 sign，以及常见对象存储的签名参数)
+VOLATILE_PARAMS = {"sign", "signature", "expires", "expire", "ossaccesskeyid", "accesskeyid",
+                   "auth_key", "x-expires", "x-signature"}
+VOLATILE_PREFIXES = ("x-amz-", "x-oss-", "x-cos-", "x-obs-", "q-sign-")
+
+
+class ProxyError(Exception):
+    """源站返回错误或无法访问"""
+
+
+class RangeUnsupported(ProxyError):
+    """源站忽略 Range 请求 (返回 200)，无法分块缓存"""
+
+
+def encode_url(url):
+    return base64.urlsafe_b64encode(url.encode('utf-8')).decode().rstrip("=")
+
+
+def decode_url(token):
+    return base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)).decode('utf-8')
+
+
+def cache_key(url):
+    """
+    分块缓存的键: 去掉签名 / 过期时间参数后的 URL 的摘要
+    这些参数每次解析都不同，去掉后同一文件在不同会话中仍命中同一份缓存；
+    其他查询参数 (如 ?id=) 可能正是区分文件的部分，保留并排序
+    """
+    parts = urlsplit(url)
+    query = sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+                   if k.lower() not in VOLATILE_PARAMS and not k.lower().startswith(VOLATILE_PREFIXES))
+    stable = parts._replace(query=urlencode(query), fragment="").geturl()
+    return hashlib.sha1(stable.encode('utf-8')).hexdigest()[:32]
+
+
+def parse_range(header, size):
+    """解析单段 Range 请求头，返回 (起始, 结束) (含结束位置)；无 Range 时返回 None，范围无效时抛出 ValueError"""
+    if not header:
+        return None
+    m = re.fullmatch(r"\s*bytes=(\d*)-(\d*)\s*", header)
+    if not m or m.group(1) == m.group(2) == "":
+        raise ValueError(header)
+    if m.group(1) == "":
+        start, end = max(0, size - int(m.group(2))), size - 1
+    else:
+        start = int(m.group(1))
+        end = min(int(m.group(2)), size - 1) if m.group(2) else size - 1
+    if start > end or start >= size:
+        raise ValueError(header)
+    return start, end
+
+
+# ================= 分块缓存 =================
+class ChunkCache:
+    """
+    磁盘分块缓存: <root>/<key>/<序号>.chunk，<key>/meta.json 记录文件大小等信息
+    按分块的最近访问顺序 (启动时取文件修改时间) 淘汰，总大小不超过 max_bytes
+    """
+
+    def __init__(self, root, max_bytes=MAX_CACHE_SIZE, chunk_size=CHUNK_SIZE):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.chunk_size = chunk_size
+        self.lru = OrderedDict()    # 相对路径 -> 大小
+        self.total = 0
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+        self._scan()
+
+    def _scan(self):
+        found = []
+        for key in os.listdir(self.root):
+            folder = os.path.join(self.root, key)
+            if not os.path.isdir(folder):
+                continue
+            for fn in os.listdir(folder):
+                if fn.endswith(".chunk"):
+                    st = os.stat(os.path.join(folder, fn))
+                    found.append((st.st_mtime, f"{key}/{fn}", st.st_size))
+        for _, rel, size in sorted(found):
+            self.lru[rel] = size
+            self.total += size
+        self._evict()
+
+    def has(self, key, index):
+        with self._lock:
+            return f"{key}/{index:08d}.chunk" in self.lru
+
+    def chunk_path(self, key, index):
+        return os.path.join(self.root, key, f"{index:08d}.chunk")
+
+    def get(self, key, index):
+        """返回已缓存分块的路径并标记为最近使用，未缓存时返回 None"""
+        rel = f"{key}/{index:08d}.chunk"
+        with self._lock:
+            if rel not in self.lru:
+                return None
+            self.lru.move_to_end(rel)
+        path = self.chunk_path(key, index)
+        try:
+            # 修改时间即下次启动时的 LRU 顺序
+            os.utime(path)
+        except OSError:
+            with self._lock:
+                self.total -= self.lru.pop(rel, 0)
+            return None
+        return path
+
+    def put(self, key, index, data):
+        path = self.chunk_path(key, index)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp, 'wb') as f:
+            f.write(data)
+        os.replace(tmp, path)
+        rel = f"{key}/{index:08d}.chunk"
+        with self._lock:
+            self.total += len(data) - self.lru.pop(rel, 0)
+            self.lru[rel] = len(data)
+            self._evict()
+        return path
+
+    def _evict(self):
+        while self.total > self.max_bytes and len(self.lru) > 1:
+            rel, size = self.lru.popitem(last=False)
+            self.total -= size
+            try:
+                os.remove(os.path.join(self.root, rel))
+            except OSError:
+                # Windows 下正在发送的分块无法删除，留给下次启动时再淘汰
+                pass
+
+    def drop(self, key):
+        """删除某个文件的全部分块与 meta.json"""
+        prefix = f"{key}/"
+        with self._lock:
+            for rel in [rel for rel in self.lru if rel.startswith(prefix)]:
+                self.total -= self.lru.pop(rel)
+        folder = os.path.join(self.root, key)
+        try:
+            names = os.listdir(folder)
+        except OSError:
+            return
+        for fn in names:
+            try:
+                os.remove(os.path.join(folder, fn))
+            except OSError:
+                pass
+
+    def meta(self, key):
+        try:
+            with open(os.path.join(self.root, key, "meta.json"), encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def save_meta(self, key, meta):
+        import config_store
+        os.makedirs(os.path.join(self.root, key), exist_ok=True)
+        config_store.atomic_write_json(os.path.join(self.root, key, "meta.json"), meta)
+
+
+def send_file_range(sock, path, offset, count):
+    """把文件的一段发送到 socket: 优先 sendfile 零拷贝，不支持时从 mmap 直接发送"""
+    with open(path, 'rb') as f:
+        if hasattr(os, "sendfile"):
+            sock.sendfile(f, offset, count)
+            return
+        import mmap
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+            sock.sendall(memoryview(m)[offset:offset + count])
+
+
+class _Partial:
+    """正在回源的分块: 已收到的数据 (从分块开头起) 与完成状态，等待者可以边收边发"""
+
+    def __init__(self):
+        self.data = bytearray()
+        self.done = False
+        self.error = None
+        self._cond = threading.Condition()
+
+    def append(self, piece):
+        with self._cond:
+            self.data += piece
+            self._cond.notify_all()
+
+    def finish(self, error=None):
+        with self._cond:
+            self.done = True
+            self.error = error
+            self._cond.notify_all()
+
+    def wait(self):
+        with self._cond:
+            self._cond.wait_for(lambda: self.done)
+
+    def read(self, start, stop):
+        """返回 [start, stop) 中已收到的部分，尚未收到时等待；回源结束仍没有数据时返回 b"" """
+        with self._cond:
+            self._cond.wait_for(lambda: len(self.data) > start or self.done)
+            return bytes(self.data[start:stop])
+
+
+# ================= 代理 =================
+class MediaProxy:
+    """
+    分块缓存代理
+    播放器地址中带有编码后的原始 URL，分块按 cache_key() 缓存；同一分块同时只向源站请求一次，其余请求等待结果
+    """
+
+    def __init__(self, cache, readahead_chunks=READAHEAD_CHUNKS, next_head=NEXT_HEAD_SIZE,
+                 workers=WORKERS, log=print):
+        self.cache = cache
+        self.readahead_chunks = readahead_chunks
+        self.next_head = next_head
+        self.log = log
+        self.port = None
+        self.stats = {"hits": 0, "misses": 0, "readahead": 0}
+        self._pools = {}            # (scheme, host, port) -> ConnectionPool
+        self._sources = {}          # key -> 原始 URL (最近一次出现的)
+        self._final = {}            # key -> 重定向后的实际 URL (本次运行内复用)
+        self._auth = {}             # key -> 播放器请求中带的 Authorization
+        self._next = {}             # key -> 播放列表中下一项的 key
+        self._headed = set()        # 已预读过开头的 key
+        self._inflight = {}         # (key, index) -> _Partial
+        self._checked = set()       # 已核对过分块大小的 key
+        self._check_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._workers = workers
+        self._executor = ThreadPoolExecutor(max_workers=workers)
+        self._server = None
+
+    def _count(self, name):
+        """统计计数 (在各请求线程中调用)"""
+        with self._lock:
+            self.stats[name] += 1
+
+    # ---------- 对外接口 ----------
+    def start(self, port=0):
+        """在后台线程中开始监听 127.0.0.1，返回端口"""
+        handler = type("Handler", (ProxyHandler,), {"proxy": self})
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self.port
+
+    def url_for(self, url, name=None):
+        """返回经由代理访问 url 的地址 (文件名部分只为了让播放器显示正确的标题与扩展名)"""
+        self.register(url)
+        name = name or os.path.basename(urlsplit(url).path) or "media"
+        return f"http://127.0.0.1:{self.port}/s/{encode_url(url)}/{quote(name)}"
+
+    def register(self, url):
+        """记录 URL 对应的缓存键；同一文件换了新的直链时，丢弃旧直链的跳转结果"""
+        key = cache_key(url)
+        with self._lock:
+            if self._sources.get(key) != url:
+                self._sources[key] = url
+                self._final.pop(key, None)
+        return key
+
+    def wants(self, item):
+        """是否应经由代理访问: 远程 http(s) 媒体，播放列表文件与本代理自身的地址除外"""
+        parts = urlsplit(item)
+        if parts.scheme not in ("http", "https") or parts.path.lower().endswith(PLAYLIST_EXTENSIONS):
+            return False
+        return not (parts.hostname == "127.0.0.1" and parts.port == self.port)
+
+    def playlist(self, items):
+        """
+        把播放列表 [(标题, URL)] 改写为经由代理的地址，并记录顺序 (用于预读下一集)
+        返回改写后的 [(标题, URL)]
+        """
+        keys = [cache_key(url) for _, url in items]
+        with self._lock:
+            for cur, nxt in zip(keys, keys[1:]):
+                self._next[cur] = nxt
+        return [(name, self.url_for(url, name)) for name, url in items]
+
+    def rewrite(self, media):
+        """改写命令行中的媒体 URL (多个 URL 视为一个播放列表)"""
+        urls = [m for m in media if self.wants(m)]
+        proxied = dict(zip(urls, (u for _, u in self.playlist([(None, u) for u in urls]))))
+        return [proxied.get(m, m) for m in media]
+
+    def close(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        for pool in list(self._pools.values()):
+            pool.close()
+        st = self.stats
+        self.log(f"[-] 媒体代理已关闭 (命中缓存 {st['hits']} 块, 回源 {st['misses']} 块, 预读 {st['readahead']} 块)")
+
+    # ---------- 源站 ----------
+    def _pool(self, url):
+        parts = urlsplit(url)
+        key = (parts.scheme, parts.hostname, parts.port)
+        with self._lock:
+            if key not in self._pools:
+                self._pools[key] = ConnectionPool(f"{parts.scheme}://{parts.netloc}", size=self._workers)
+            return self._pools[key]
+
+    def _fetch(self, key, start, end, on_data=None):
+        """
+        向源站请求 [start, end]，跟随重定向；返回 (数据, 文件总大小，未知时为 None)
+        最多只读取 end - start + 1 字节: 源站忽略 Range 返回整个文件时不会把它读完，而是抛出 RangeUnsupported
+        on_data(数据): 收到 206 响应体的每一段时调用
+        """
+        def received(status, piece):
+            if status == 206:
+                on_data(piece)
+
+        url = self._final.get(key) or self._sources[key]
+        headers = {"Range": f"bytes={start}-{end}"}
+        if key in self._auth:
+            headers["Authorization"] = self._auth[key]
+        for _ in range(MAX_REDIRECTS + 1):
+            parts = urlsplit(url)
+            path = parts.path + (f"?{parts.query}" if parts.query else "")
+            try:
+                status, resp_headers, data = self._pool(url).fetch(
+                    "GET", path or "/", headers=headers, limit=end - start + 1,
+                    on_data=received if on_data is not None else None)
+            except (OSError, http.client.HTTPException) as e:
+                raise ProxyError(f"无法连接源站: {e}")
+            if status in (301, 302, 303, 307, 308) and resp_headers.get("Location"):
+                url = urljoin(url, resp_headers["Location"])
+                # 跳转到其他主机 (网盘直链) 时不再带上 OpenList 的认证
+                if urlsplit(url).netloc != parts.netloc:
+                    headers.pop("Authorization", None)
+                continue
+            if status in (401, 403, 410) and key in self._final:
+                # 直链过期，从原始 URL 重新获取
+                del self._final[key]
+                return self._fetch(key, start, end, on_data)
+            if status == 206:
+                self._final[key] = url
+                total = resp_headers.get("Content-Range", "").rsplit("/", 1)[-1]
+                return data, int(total) if total.isdigit() else None
+            if status == 200:
+                raise RangeUnsupported("源站不支持 Range 请求")
+            raise ProxyError(f"源站返回 HTTP {status}")
+        raise ProxyError("重定向次数过多")
+
+    def size(self, key):
+        """文件总大小 (首次访问时随第 0 块一起获取并记录)"""
+        self._check_chunk_size(key)
+        meta = self.cache.meta(key)
+        if meta is None:
+            # 大小未知时先按预读块数并行请求开头几块 (超出文件末尾的请求会失败并被忽略)
+            for i in range(1, self.readahead_chunks + 1):
+                self._schedule(key, i)
+            self.chunk(key, 0)
+            meta = self.cache.meta(key)
+        if meta is None or not isinstance(meta.get("size"), int):
+            raise ProxyError("无法确定文件总大小")
+        return meta["size"]
+
+    def _check_chunk_size(self, key):
+        """按其他分块大小 (修改过 chunk_mb) 缓存的文件，其分块序号已不对应，整份丢弃 (每个 key 每次运行核对一次)"""
+        with self._check_lock:
+            if key in self._checked:
+                return
+            meta = self.cache.meta(key)
+            if meta is not None and meta.get("chunk_size") != self.cache.chunk_size:
+                self.log(f"[*] 媒体代理: 分块大小已改变，丢弃旧缓存 {key}")
+                self.cache.drop(key)
+            self._checked.add(key)
+
+    def _claim(self, key, index):
+        """登记正在回源的分块，返回 (_Partial, 是否由调用方负责回源)"""
+        with self._lock:
+            partial = self._inflight.get((key, index))
+            if partial is not None:
+                return partial, False
+            partial = self._inflight[(key, index)] = _Partial()
+            return partial, True
+
+    def _fill(self, key, index, partial):
+        """向源站获取分块并写入缓存，收到的数据同时交给 partial；返回分块路径"""
+        error = None
+        try:
+            self._count("misses")
+            size = self.cache.chunk_size
+            data, total = self._fetch(key, index * size, (index + 1) * size - 1, partial.append)
+            if not data:
+                raise ProxyError("超出文件末尾")
+            if index == 0 and self.cache.meta(key) is None:
+                if total is None:
+                    # Content-Range 中没有总大小 (如 bytes 0-1/*)，无法按 Range 提供给播放器
+                    raise ProxyError("源站未返回文件总大小")
+                self.cache.save_meta(key, {"url": self._sources[key], "size": total, "chunk_size": size,
+                                           "created": round(time.time(), 3)})
+            return self.cache.put(key, index, data)
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            with self._lock:
+                del self._inflight[(key, index)]
+            partial.finish(error)
+
+    def _fill_background(self, key, index, partial):
+        try:
+            self._fill(key, index, partial)
+        except (ProxyError, OSError):
+            # 错误已记录在 partial 中，由等待的请求处理
+            pass
+
+    def chunk(self, key, index):
+        """返回分块在磁盘上的路径，未缓存时向源站获取 (同一分块只请求一次)"""
+        self._check_chunk_size(key)
+        path = self.cache.get(key, index)
+        if path is not None:
+            self._count("hits")
+            return path
+        partial, owner = self._claim(key, index)
+        if owner:
+            return self._fill(key, index, partial)
+        partial.wait()
+        path = self.cache.get(key, index)
+        if path is None:
+            raise ProxyError("分块获取失败")
+        return path
+
+    def send_chunk(self, sock, key, index, offset, count):
+        """
+        把分块中 [offset, offset + count) 发给播放器
+        已缓存时零拷贝发送；未缓存时在后台线程回源，收到多少发多少，不等整块下载完
+        """
+        self._check_chunk_size(key)
+        path = self.cache.get(key, index)
+        if path is not None:
+            self._count("hits")
+            send_file_range(sock, path, offset, count)
+            return
+        partial, owner = self._claim(key, index)
+        if owner:
+            threading.Thread(target=self._fill_background, args=(key, index, partial), daemon=True).start()
+        pos, stop = offset, offset + count
+        while pos < stop:
+            piece = partial.read(pos, stop)
+            if not piece:
+                raise ProxyError(f"分块获取失败: {partial.error or '数据不足'}")
+            sock.sendall(piece)
+            pos += len(piece)
+
+    # ---------- 预读 ----------
+    def _prefetch(self, key, index):
+        try:
+            self.chunk(key, index)
+        except ProxyError:
+            pass
+
+    def _schedule(self, key, index):
+        """已缓存或正在获取的分块不重复提交"""
+        with self._lock:
+            if (key, index) in self._inflight:
+                return
+        if not self.cache.has(key, index):
+            self._count("readahead")
+            self._executor.submit(self._prefetch, key, index)
+
+    def readahead(self, key, index, size):
+        """读取到第 index 块时，预读其后 readahead_chunks 块"""
+        last = (size - 1) // self.cache.chunk_size
+        for i in range(index + 1, min(index + self.readahead_chunks, last) + 1):
+            self._schedule(key, i)
+
+    def read_next_head(self, key):
+        """开始播放某一集时，预读播放列表中下一集的开头 (每集只触发一次)"""
+        with self._lock:
+            nxt = self._next.get(key)
+            if nxt is None or key in self._headed:
+                return
+            self._headed.add(key)
+        for i in range(max(1, self.next_head // self.cache.chunk_size)):
+            self._schedule(nxt, i)
+
+
+class ProxyHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    proxy = None
+
+    def _key(self):
+        m = re.match(r"^/s/([A-Za-z0-9_-]+)(/|$)", self.path)
+        if not m:
+            return None
+        try:
+            return self.proxy.register(decode_url(m.group(1)))
+        except ValueError:
+            return None
+
+    def _error(self, status, message=""):
+        body = message.encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_HEAD(self):
+        self._serve(head=True)
+
+    def do_GET(self):
+        self._serve(head=False)
+
+    def _serve(self, head):
+        proxy = self.proxy
+        key = self._key()
+        if key is None:
+            self._error(404)
+            return
+        if self.headers.get("Authorization"):
+            proxy._auth[key] = self.headers["Authorization"]
+        try:
+            size = proxy.size(key)
+            rng = parse_range(self.headers.get("Range"), size)
+        except RangeUnsupported:
+            # 无法分块缓存: 让播放器直接访问原始地址
+            self.send_response(302)
+            self.send_header("Location", proxy._sources[key])
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        except ProxyError as e:
+            self._error(502, str(e))
+            return
+        except ValueError:
+            self.send_response(416)
+            self.send_header("Content-Range", f"bytes */{size}")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        start, end = rng or (0, size - 1)
+        self.send_response(206 if rng else 200)
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("Content-Type", "application/octet-stream")
+        self.send_header("Content-Length", str(end - start + 1))
+        if rng:
+            self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+        self.end_headers()
+        if head:
+            return
+        chunk_size = proxy.cache.chunk_size
+        if start < chunk_size:
+            # 从头开始读视为开始播放这一集
+            proxy.read_next_head(key)
+        pos = start
+        try:
+            while pos <= end:
+                index = pos // chunk_size
+                # 先提交预读，后续分块与当前分块并行回源
+                proxy.readahead(key, index, size)
+                offset = pos - index * chunk_size
+                count = min(chunk_size - offset, end - pos + 1)
+                proxy.send_chunk(self.connection, key, index, offset, count)
+                pos += count
+        except ProxyError as e:
+            proxy.log(f"[!] 媒体代理: {e}")
+            self.close_connection = True
+        except (ConnectionError, OSError):
+            # 播放器跳转进度时会直接断开连接
+            self.close_connection = True
+
+    def log_message(self, *args):
+        pass
+
+
+def start_from_config(config, base_path, log=print):
+    """按配置项 media_proxy 创建并启动代理，返回 MediaProxy"""
+    cfg = config.get("media_proxy", {})
+    cache_dir = cfg.get("cache_dir", CACHE_DIR)
+    if not os.path.isabs(cache_dir):
+        cache_dir = os.path.join(base_path, cache_dir)
+    cache = ChunkCache(cache_dir, int(cfg.get("max_size_mb", MAX_CACHE_SIZE // MB) * MB),
+                       int(cfg.get("chunk_mb", CHUNK_SIZE // MB) * MB))
+    proxy = MediaProxy(cache, cfg.get("readahead_chunks", READAHEAD_CHUNKS),
+                       int(cfg.get("next_head_mb", NEXT_HEAD_SIZE // MB) * MB), cfg.get("workers", WORKERS), log)
+    port = proxy.start(cfg.get("port", 0))
+    log(f"[+] 媒体代理已启动: http://127.0.0.1:{port} (缓存 {cache.total / MB:.0f} MB / {cache.max_bytes / MB:.0f} MB)")
+    return proxy
@@ -0,0 +1,169 @@
+# ================= 代码说明 =================
+# 文件名: orchestrator.py
+# 功能: 基于 asyncio 的启动编排器
+#       将启动过程拆成带依赖关系的步骤 (如 启动服务 -> 等待就绪)，
+#       没有依赖关系的步骤 (如 启动 PotPlayer) 并行执行，并记录每一步的耗时
+# 作者: H_Knight
+# 日期: 2026-10-18
+# ===========================================
+
+import asyncio
+import inspect
+import time
+
+
+class StepTiming:
+    """单个步骤的执行结果与耗时 (时间均为相对编排开始的秒数)"""
+
+    def __init__(self, name):
+        self.name = name
+        self.start = None
+        self.end = None
+        self.ok = False
+        self.skipped = False
+        self.error = None
+
+    @property
+    def duration(self):
+        if self.start is None or self.end is None:
+            return None
+        return self.end - self.start
+
+    def as_dict(self):
+        return {
+            "name": self.name,
+            "start": None if self.start is None else round(self.start, 4),
+            "duration": None if self.duration is None else round(self.duration, 4),
+            "ok": self.ok,
+            "skipped": self.skipped,
+            "error": None if self.error is None else str(self.error),
+        }
+
+
+class LaunchStep:
+    """
+    启动步骤
+    action: 无参数的普通函数 (放到线程中执行，不阻塞事件循环) 或协程函数
+    requires: 依赖的步骤名，全部成功后才会执行本步骤
+    after: 弱依赖的步骤名，等它们结束后再执行，但它们失败或被跳过时本步骤照常执行
+    """
+
+    def __init__(self, name, action, requires=(), after=()):
+        self.name = name
+        self.action = action
+        self.requires = tuple(requires)
+        self.after = tuple(after)
+
+
+class LaunchOrchestrator:
+    """按依赖图并发执行启动步骤"""
+
+    def __init__(self):
+        self.steps = {}
+        self.results = {}    # 步骤名 -> action 的返回值
+        self.timings = {}    # 步骤名 -> StepTiming
+
+    def add(self, name, action, requires=(), after=()):
+        if name in self.steps:
+            raise ValueError(f"步骤重复: {name}")
+        self.steps[name] = LaunchStep(name, action, requires, after)
+        return self
+
+    def graph(self):
+        """返回依赖图 {步骤名: [依赖步骤名, ...]} (含弱依赖)"""
+        return {name: list(step.requires + step.after) for name, step in self.steps.items()}
+
+    def _check_graph(self):
+        """检查未知依赖和循环依赖"""
+        for step in self.steps.values():
+            for dep in step.requires + step.after:
+                if dep not in self.steps:
+                    raise ValueError(f"步骤 {step.name} 依赖了不存在的步骤 {dep}")
+        visiting, done = set(), set()
+
+        def visit(name, path):
+            if name in done:
+                return
+            if name in visiting:
+                raise ValueError("存在循环依赖: " + " -> ".join(path + [name]))
+            visiting.add(name)
+            for dep in self.steps[name].requires + self.steps[name].after:
+                visit(dep, path + [name])
+            visiting.discard(name)
+            done.add(name)
+
+        for name in self.steps:
+            visit(name, [])
+
+    async def _run_step(self, step, tasks, t_origin):
+        timing = self.timings[step.name]
+        for dep in step.requires:
+            dep_timing = await tasks[dep]
+            if not dep_timing.ok:
+                # 依赖失败或被跳过，本步骤不再执行
+                timing.skipped = True
+                timing.error = f"依赖 {dep} 未成功"
+                return timing
+        for dep in step.after:
+            await tasks[dep]
+        timing.start = time.perf_counter() - t_origin
+        try:
+            if inspect.iscoroutinefunction(step.action):
+                result = await step.action()
+            else:
+                result = await asyncio.to_thread(step.action)
+            self.results[step.name] = result
+            timing.ok = True
+        except Exception as e:
+            timing.error = e
+        timing.end = time.perf_counter() - t_origin
+        return timing
+
+    async def run(self):
+        """执行全部步骤，返回 {步骤名: StepTiming}"""
+        self._check_graph()
+        self.results.clear()
+        self.timings = {name: StepTiming(name) for name in self.steps}
+        t_origin = time.perf_counter()
+        tasks = {}
+        for name, step in self.steps.items():
+            tasks[name] = asyncio.ensure_future(self._run_step(step, tasks, t_origin))
+        await asyncio.gather(*tasks.values())
+        return self.timings
+
+    def run_sync(self):
+        """在新的事件循环中执行 (供同步的 main() 调用)"""
+        return asyncio.run(self.run())
+
+    def failed(self):
+        """返回执行失败 (不含被跳过) 的步骤"""
+        return [t for t in self.timings.values() if not t.ok and not t.skipped]
+
+
+def command_step(args, cwd=None):
+    """
+    生成一个执行外部命令的协程步骤，命令返回非 0 时视为失败
+    用于以替身命令在 Linux 下演练编排流程
+    """
+    async def action():
+        proc = await asyncio.create_subprocess_exec(
+            *args, cwd=cwd, stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.DEVNULL)
+        code = await proc.wait()
+        if code != 0:
+            raise RuntimeError(f"命令 {args[0]} 返回 {code}")
+        return code
+    return action
+
+
+def format_timings(timings):
+    """把步骤耗时格式化成多行文本，按开始时间排序"""
+    lines = []
+    ordered = sorted(timings.values(), key=lambda t: (t.start is None, t.start or 0))
+    for t in ordered:
+        if t.skipped:
+            lines.append(f"    - {t.name}: 跳过 ({t.error})")
+        elif t.ok:
+            lines.append(f"    - {t.name}: +{t.start:.3f}s 开始, 耗时 {t.duration:.3f}s")
+        else:
+            lines.append(f"    - {t.name}: 失败 ({t.error})")
+    return "\n".join(lines)
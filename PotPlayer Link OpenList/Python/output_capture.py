@@ -0,0 +1,225 @@
+# ================= 代码说明 =================
+# 文件名: output_capture.py
+# 功能: 后端与播放器输出的异步捕获
+#       此前子进程的 stdout / stderr 不是丢进 DEVNULL 就是直接混在控制台里，后端启动慢或失败时没有任何可查的线索
+#       现在两者接到管道，每个管道由一个后台线程持续读取 (管道永远不会写满，子进程不会因此阻塞)，
+#       读到的数据块连同时间戳原样放进按字节数限定大小的环形缓冲，超出上限时丢弃最早的数据块，内存占用有上限
+#       后端与播放器各用一个缓冲 (max_kb 为每个缓冲的上限)，输出很多的后端不会把播放器的输出挤掉
+#       读取线程只做 os.read + 追加，不切分行、不解码；只有写出日志时才按行切分并解码
+#       缓冲中的输出平时不落盘，只在出错 (后端启动 / 就绪失败、PotPlayer 启动失败、看门狗重启后端、运行错误)
+#       或 flush="always" 时写入轮转日志 launcher_output.jsonl，出错时另在控制台显示各来源的最后几行
+#       每行记录 t (相对本次启动开始的秒数，与 launcher_timings.jsonl 中 span 的 start 同一基准) 与 session，
+#       可直接对照各启动阶段的耗时
+#       Linux 下后端进程继承忽略 SIGPIPE: 启动器崩溃后读取端消失，遗留的后端写输出只会失败，不会因此被结束
+#       (仍可被下次启动认领，见 session_journal.py)；播放器不需要在启动器退出后存活，保持默认的信号处理
+#       默认关闭，配置项 output_capture: {"enabled": true, "max_kb": 256, "flush": "error", "tail": 10,
+#                               "path": "...", "max_bytes": 1048576, "backups": 3}
+# 作者: H_Knight
+# 日期: 2026-10-18
+# ===========================================
+
+import collections
+import locale
+import os
+import subprocess
+import threading
+import time
+
+import telemetry
+
+LOG_NAME = "launcher_output.jsonl"
+MAX_KB = 256                # 环形缓冲的大小上限
+READ_SIZE = 64 * 1024       # 每次从管道读取的最大字节数
+MAX_LINE = 4096             # 写出日志时单行的最大长度 (字符)
+TAIL = 10                   # 出错时在控制台显示的每个来源的最后几行
+JOIN_TIMEOUT = 0.5          # 会话结束时等待读取线程读完剩余输出的时间
+
+
+class RingBuffer:
+    """
+    按字节数限定大小的输出环形缓冲
+    每个数据块记为 (序号, perf_counter 时间, 来源, PID, 流, 数据)，总大小超过 max_bytes 时从最早的块开始丢弃
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max(1, max_bytes)
+        self.chunks = collections.deque()
+        self.size = 0
+        self.total = 0              # 累计读到的字节数
+        self.dropped = 0            # 因超出上限被丢弃的字节数
+        self._seq = 0
+        self._lock = threading.Lock()
+
+    def append(self, t, source, pid, stream, data):
+        with self._lock:
+            self.total += len(data)
+            if len(data) > self.max_bytes:
+                self.dropped += len(data) - self.max_bytes
+                data = data[-self.max_bytes:]
+            self._seq += 1
+            self.chunks.append((self._seq, t, source, pid, stream, data))
+            self.size += len(data)
+            while self.size > self.max_bytes:
+                old = self.chunks.popleft()
+                self.size -= len(old[5])
+                self.dropped += len(old[5])
+
+    def snapshot(self, after=0):
+        """返回序号大于 after 的数据块"""
+        with self._lock:
+            return [c for c in self.chunks if c[0] > after]
+
+
+def _decode(data):
+    """后端输出多为 UTF-8，Windows 下部分程序按本地代码页 (如 GBK) 输出"""
+    try:
+        return data.decode('utf-8')
+    except UnicodeDecodeError:
+        return data.decode(locale.getpreferredencoding(False) or 'utf-8', 'replace')
+
+
+def split_lines(chunks):
+    """
+    把数据块按 (来源, PID, 流) 拼接后切分成行，返回 [(perf_counter 时间, 来源, PID, 流, 文本)]
+    每行的时间取该行结束所在数据块的读取时间；未以换行结束的最后一段也作为一行
+    """
+    pending = {}
+    lines = []
+    for _, t, source, pid, stream, data in chunks:
+        key = (source, pid, stream)
+        parts = data.split(b"\n")
+        if len(parts) > 1:
+            head = pending.pop(key, (b"", t))[0]
+            lines.append((t, source, pid, stream, head + parts[0]))
+            lines.extend((t, source, pid, stream, p) for p in parts[1:-1])
+        if parts[-1]:
+            pending[key] = (pending.get(key, (b"", t))[0] + parts[-1], t)
+    for (source, pid, stream), (data, t) in pending.items():
+        lines.append((t, source, pid, stream, data))
+    lines.sort(key=lambda line: line[0])
+    result = []
+    for t, source, pid, stream, data in lines:
+        text = _decode(data.rstrip(b"\r"))
+        if len(text) > MAX_LINE:
+            text = text[:MAX_LINE] + f" ...(截断 {len(text) - MAX_LINE} 字符)"
+        result.append((t, source, pid, stream, text))
+    return result
+
+
+class OutputCapture:
+    """
+    popen_kwargs(ignore_sigpipe): 创建进程时附加的 Popen 参数 (stdout / stderr 接到管道；后端另外继承忽略 SIGPIPE)
+    popen_kwargs(): 创建进程时附加的 Popen 参数 (stdout / stderr 接到管道)
+    attach(source, proc): 进程创建后立即调用，开始在后台读取其输出
+    error(reason): 出错时调用，把尚未写出的输出写入日志并在控制台显示各来源的最后几行
+    flush(reason): 按需写出尚未写出的输出，返回写出的行数
+    finish(): 会话结束时调用，等读取线程读完剩余输出，出过错或 flush="always" 时写出
+    """
+
+    def __init__(self, config, base_path, recorder=None, log=print):
+        cfg = config.get("output_capture", {})
+        self.max_bytes = int(float(cfg.get("max_kb", MAX_KB)) * 1024)
+        self.buffers = {}           # {来源: RingBuffer}
+        self.flush_mode = cfg.get("flush", "error")
+        self.tail = int(cfg.get("tail", TAIL))
+        path = cfg.get("path") or os.path.join(base_path, LOG_NAME)
+        self.log_file = telemetry.RotatingLog(path, cfg.get("max_bytes", telemetry.MAX_BYTES),
+                                              cfg.get("backups", telemetry.BACKUPS))
+        self.log = log
+        self.session = recorder.session if recorder is not None else None
+        self.t0 = recorder.t0 if recorder is not None else time.perf_counter()
+        self.ts = recorder.ts if recorder is not None else time.time()
+        self.errors = []
+        self.written = 0            # 已写出日志的行数
+        self._flushed = {}          # {来源: 已写出的最后一个数据块的序号}
+        self._threads = []
+        self._flush_lock = threading.Lock()
+
+    @staticmethod
+    def popen_kwargs(ignore_sigpipe=False):
+        """
+        子进程输出接到管道的 Popen 参数
+        ignore_sigpipe: 只用于后端 —— 让它在启动器崩溃、管道读取端消失后继续运行 (等待下次启动认领)
+        """
+        kwargs = {"stdout": subprocess.PIPE, "stderr": subprocess.PIPE}
+        if ignore_sigpipe and os.name != 'nt':
+            # Python 自身忽略 SIGPIPE，不恢复默认处理即让子进程继承忽略
+            # (restore_signals=False 同样保留 SIGXFSZ 的忽略状态，因此不用于播放器等其他子进程)
+            kwargs["restore_signals"] = False
+        return kwargs
+
+    def attach(self, source, proc):
+        if source not in self.buffers:
+            self.buffers[source] = RingBuffer(self.max_bytes)
+        for stream in ("stdout", "stderr"):
+            pipe = getattr(proc, stream, None)
+            if pipe is None:
+                continue
+            thread = threading.Thread(target=self._pump, args=(source, proc.pid, stream, pipe),
+                                      name=f"capture-{source}-{stream}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def _pump(self, source, pid, stream, pipe):
+        fd = pipe.fileno()
+        append = self.buffers[source].append
+        try:
+            while True:
+                data = os.read(fd, READ_SIZE)
+                if not data:
+                    break
+                append(time.perf_counter(), source, pid, stream, data)
+        except (OSError, ValueError):
+            pass
+        finally:
+            try:
+                pipe.close()
+            except OSError:
+                pass
+
+    def flush(self, reason="request"):
+        """把尚未写出的输出写入日志，返回写出的行数"""
+        with self._flush_lock:
+            chunks = []
+            for source, buf in list(self.buffers.items()):
+                new = buf.snapshot(self._flushed.get(source, 0))
+                if new:
+                    self._flushed[source] = new[-1][0]
+                    chunks += new
+            if not chunks:
+                return 0
+            lines = split_lines(chunks)
+            # 每次写出前先记一条说明: 原因、各来源累计读到与因超出上限丢弃的字节数
+            records = [{"ts": round(time.time(), 3), "session": self.session, "event": "flush", "reason": reason,
+                        "captured": {k: b.total for k, b in self.buffers.items()},
+                        "dropped": {k: b.dropped for k, b in self.buffers.items()}}]
+            records += [{"ts": round(self.ts + t - self.t0, 3), "session": self.session, "t": round(t - self.t0, 4),
+                         "source": source, "pid": pid, "stream": stream, "line": text}
+                        for t, source, pid, stream, text in lines]
+            try:
+                self.log_file.write(records)
+            except Exception as e:
+                self.log(f"[!] 无法写入输出日志: {e}")
+                return 0
+            self.written += len(lines)
+            return len(lines)
+
+    def error(self, reason):
+        """出错时写出输出，并在控制台显示最后几行"""
+        self.errors.append(reason)
+        tails = {k: split_lines(b.snapshot())[-self.tail:] for k, b in self.buffers.items()} if self.tail > 0 else {}
+        count = self.flush(reason)
+        for source, tail in tails.items():
+            if tail:
+                self.log(f"[!] {source} 最近的输出:")
+            for t, _, pid, stream, text in tail:
+                self.log(f"    +{t - self.t0:.3f}s [{pid} {stream}] {text}")
+        if count:
+            self.log(f"[*] {count} 行输出已写入 {self.log_file.path}")
+
+    def finish(self):
+        deadline = time.monotonic() + JOIN_TIMEOUT
+        for thread in self._threads:
+            thread.join(max(0.0, deadline - time.monotonic()))
+        if self.errors or self.flush_mode == "always":
+            self.flush("error" if self.errors else "exit")
@@ -0,0 +1,287 @@
+# ================= 代码说明 =================
+# 文件名: page_warm.py
+# 功能: PotPlayer 程序文件的页缓存预热
+#       PotPlayer 冷启动的大部分时间花在从磁盘读入主程序、DLL 与解码器模块上
+#       学习: 播放器启动后按 learn_delays 采样其进程树映射 / 打开的文件 (Linux: /proc/<pid>/maps 与 fd，
+#             Windows: 模块快照)，只保留 PotPlayer 目录下的文件，连同大小与修改时间记入 page_warm_manifest.json
+#       预热: 下次启动时与后端启动并行，用线程池把清单中的文件读入系统页缓存；
+#             PotPlayer 要等后端就绪时 (player_requires_backend / 目录解析) 预热完成后再启动，否则两者同时进行
+#             Linux: posix_fadvise(WILLNEED) 发起预读后顺序读取等待完成；Windows 及其他平台: 顺序读取整个文件
+#             预热最多等待 deadline 秒，超时后 PotPlayer 照常启动，未完成的预读在后台继续
+#       清单中大小 / 修改时间变化的文件 (PotPlayer 升级) 照常预热并更新记录，已删除的文件移出清单
+#       配置项 page_warm: {"enabled": false, "deadline": 1, "workers": 8, "learn_delays": [3, 15], "max_mb": 512}
+# 作者: H_Knight
+# 日期: 2026-10-18
+# ===========================================
+
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+MANIFEST_NAME = "page_warm_manifest.json"
+DEADLINE = 1.0              # 预热最多拖延 PotPlayer 启动的时间 (秒)
+WORKERS = 8
+LEARN_DELAYS = (3, 15)      # 播放器启动后采样加载文件的时刻 (秒)
+MAX_MB = 512                # 每次最多预热的数据量
+CHUNK = 1024 * 1024
+
+
+# ================= 清单 =================
+class Manifest:
+    """
+    启动时用到的文件清单
+    键为相对 PotPlayer 目录的路径，值为 {"size": 字节数, "mtime": 修改时间, "seen": 最近一次被加载的时间}
+    """
+
+    def __init__(self, path, root):
+        self.path = path
+        self.root = os.path.normcase(os.path.abspath(root))
+        self.files = {}
+        self.dirty = False
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        # PotPlayer 换了安装目录时旧清单作废
+        if isinstance(data, dict) and data.get("root") == self.root:
+            self.files = data.get("files", {})
+
+    def relative(self, path):
+        """PotPlayer 目录下的文件返回相对路径，其余返回 None"""
+        path = os.path.normcase(os.path.abspath(path))
+        if not path.startswith(self.root + os.sep):
+            return None
+        return os.path.relpath(path, self.root)
+
+    def targets(self, max_bytes):
+        """刷新大小与修改时间并返回需要预热的 [(绝对路径, 大小)]，最近加载过的在前"""
+        result, total = [], 0
+        with self._lock:
+            for rel, meta in sorted(self.files.items(), key=lambda kv: -kv[1].get("seen", 0)):
+                path = os.path.join(self.root, rel)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    del self.files[rel]
+                    self.dirty = True
+                    continue
+                if (meta.get("size"), meta.get("mtime")) != (st.st_size, st.st_mtime):
+                    meta.update(size=st.st_size, mtime=st.st_mtime)
+                    self.dirty = True
+                if total + st.st_size > max_bytes:
+                    continue
+                total += st.st_size
+                result.append((path, st.st_size))
+        return result
+
+    def learn(self, paths):
+        """记入一批被加载的文件，返回新增数量"""
+        added = 0
+        now = round(time.time(), 3)
+        with self._lock:
+            for path in paths:
+                rel = self.relative(path)
+                if rel is None:
+                    continue
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                if rel not in self.files:
+                    added += 1
+                self.files[rel] = {"size": st.st_size, "mtime": st.st_mtime, "seen": now}
+                self.dirty = True
+        return added
+
+    def save(self):
+        if not self.dirty:
+            return
+        import config_store
+        with self._lock:
+            data = {"root": self.root, "files": dict(self.files)}
+            self.dirty = False
+        try:
+            config_store.atomic_write_json(self.path, data)
+        except OSError as e:
+            print(f"[!] 保存预热清单失败: {e}")
+
+
+# ================= 预热 =================
+def warm_file(path):
+    """
+    把一个文件读入页缓存，返回字节数
+    Linux 先用 posix_fadvise(WILLNEED) 让内核以大块顺序预读整个文件，再顺序读一遍等待数据真正进入缓存
+    (只发起预读时播放器可能赶在预读完成前启动，仍会逐页缺页等待)；Windows 没有对应的接口，直接顺序读取
+    """
+    buf = bytearray(CHUNK)
+    total = 0
+    with open(path, 'rb', buffering=0) as f:
+        if hasattr(os, "posix_fadvise"):
+            os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_WILLNEED)
+        while True:
+            n = f.readinto(buf)
+            if not n:
+                return total
+            total += n
+
+
+class WarmResult:
+    def __init__(self, files, size):
+        self.files = files
+        self.size = size
+        self.done = 0
+        self.errors = 0
+        self.elapsed = 0.0
+        self.timed_out = False
+
+
+def warm(targets, workers=WORKERS, deadline=DEADLINE):
+    """并发预热 [(路径, 大小)]，最多等待 deadline 秒，返回 WarmResult"""
+    result = WarmResult(len(targets), sum(size for _, size in targets))
+    if not targets:
+        return result
+    t0 = time.perf_counter()
+    pool = ThreadPoolExecutor(max_workers=min(workers, len(targets)), thread_name_prefix="page-warm")
+    futures = [pool.submit(warm_file, path) for path, _ in targets]
+    finished, pending = wait(futures, timeout=deadline)
+    # 超时未完成的预读留在后台线程中继续，不阻塞启动
+    pool.shutdown(wait=False)
+    result.elapsed = time.perf_counter() - t0
+    result.timed_out = bool(pending)
+    for fut in finished:
+        if fut.exception() is None:
+            result.done += 1
+        else:
+            result.errors += 1
+    return result
+
+
+# ================= 学习 =================
+def _linux_loaded(pid):
+    paths = set()
+    try:
+        with open(f"/proc/{pid}/maps") as f:
+            for line in f:
+                parts = line.split(None, 5)
+                if len(parts) == 6 and parts[5].startswith("/"):
+                    paths.add(parts[5].rstrip("\n"))
+    except OSError:
+        pass
+    try:
+        for fd in os.listdir(f"/proc/{pid}/fd"):
+            try:
+                target = os.readlink(f"/proc/{pid}/fd/{fd}")
+            except OSError:
+                continue
+            if target.startswith("/"):
+                paths.add(target)
+    except OSError:
+        pass
+    return paths
+
+
+def _windows_loaded(pid):
+    """模块快照: 进程已加载的 exe / dll / ax 等模块路径"""
+    import ctypes
+    from ctypes import wintypes
+    TH32CS_SNAPMODULE = 0x08
+    TH32CS_SNAPMODULE32 = 0x10
+
+    class MODULEENTRY32W(ctypes.Structure):
+        _fields_ = [("dwSize", wintypes.DWORD), ("th32ModuleID", wintypes.DWORD),
+                    ("th32ProcessID", wintypes.DWORD), ("GlblcntUsage", wintypes.DWORD),
+                    ("ProccntUsage", wintypes.DWORD), ("modBaseAddr", ctypes.c_void_p),
+                    ("modBaseSize", wintypes.DWORD), ("hModule", wintypes.HMODULE),
+                    ("szModule", wintypes.WCHAR * 256), ("szExePath", wintypes.WCHAR * 260)]
+
+    k = ctypes.WinDLL("kernel32", use_last_error=True)
+    k.CreateToolhelp32Snapshot.argtypes = [wintypes.DWORD, wintypes.DWORD]
+    k.CreateToolhelp32Snapshot.restype = wintypes.HANDLE
+    k.Module32FirstW.argtypes = [wintypes.HANDLE, ctypes.POINTER(MODULEENTRY32W)]
+    k.Module32FirstW.restype = wintypes.BOOL
+    k.Module32NextW.argtypes = [wintypes.HANDLE, ctypes.POINTER(MODULEENTRY32W)]
+    k.Module32NextW.restype = wintypes.BOOL
+    k.CloseHandle.argtypes = [wintypes.HANDLE]
+    snap = k.CreateToolhelp32Snapshot(TH32CS_SNAPMODULE | TH32CS_SNAPMODULE32, pid)
+    if snap == wintypes.HANDLE(-1).value:
+        return set()
+    paths = set()
+    try:
+        entry = MODULEENTRY32W()
+        entry.dwSize = ctypes.sizeof(entry)
+        ok = k.Module32FirstW(snap, ctypes.byref(entry))
+        while ok:
+            paths.add(entry.szExePath)
+            ok = k.Module32NextW(snap, ctypes.byref(entry))
+    finally:
+        k.CloseHandle(snap)
+    return paths
+
+
+def loaded_files(pid):
+    """进程当前映射 / 打开的文件路径"""
+    return _windows_loaded(pid) if os.name == 'nt' else _linux_loaded(pid)
+
+
+class PageWarmer:
+    """
+    启动器使用的页缓存预热
+    warm(): 启动阶段调用，预热清单中的文件 (清单为空时只预热主程序)
+    learn(pids): 播放器启动后调用，pids 为返回播放器进程 PID 列表的函数，在后台按 learn_delays 采样
+    finish(): 会话结束时保存清单
+    """
+
+    def __init__(self, config, base_path, potplayer_path):
+        cfg = config.get("page_warm", {})
+        self.player = potplayer_path
+        self.deadline = float(cfg.get("deadline", DEADLINE))
+        self.workers = int(cfg.get("workers", WORKERS))
+        self.learn_delays = [float(d) for d in cfg.get("learn_delays", LEARN_DELAYS)]
+        self.max_bytes = int(float(cfg.get("max_mb", MAX_MB)) * 1024 * 1024)
+        self.manifest = Manifest(os.path.join(base_path, MANIFEST_NAME), os.path.dirname(potplayer_path))
+        self.result = None
+        self.learned = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def warm(self):
+        """PotPlayer 启动依赖这一步，预热本身出错时只提示，不抛出异常"""
+        try:
+            targets = self.manifest.targets(self.max_bytes)
+            if not targets and os.path.isfile(self.player):
+                targets = [(self.player, os.path.getsize(self.player))]
+            self.result = warm(targets, self.workers, self.deadline)
+        except Exception as e:
+            print(f"[!] 页缓存预热失败: {e}")
+            return None
+        r = self.result
+        print(f"[*] 页缓存预热: {r.done}/{r.files} 个文件, {r.size / 1024 / 1024:.1f} MB, 耗时 {r.elapsed * 1000:.0f} ms"
+              + (" (超时，其余在后台继续)" if r.timed_out else ""))
+        return r
+
+    def _learn(self, pids):
+        t0 = time.monotonic()
+        for delay in self.learn_delays:
+            if self._stop.wait(max(0.0, t0 + delay - time.monotonic())):
+                return
+            paths = set()
+            for pid in pids():
+                paths |= loaded_files(pid)
+            self.learned += self.manifest.learn(paths)
+
+    def learn(self, pids):
+        self._thread = threading.Thread(target=self._learn, args=(pids,), name="page-warm-learn", daemon=True)
+        self._thread.start()
+
+    def finish(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.manifest.save()
@@ -0,0 +1,299 @@
+# ================= 代码说明 =================
+# 文件名: prefetch.py
+# 功能: 目录列表预热
+#       记录最近播放过的 WebDAV 目录 (LRU，条目数有上限，持久化到 prefetch_index.json)，
+#       后端就绪后用有上限的线程池 + 复用的 keep-alive 连接并发发送 PROPFIND，
+#       让后端提前向网盘拉取目录列表，PotPlayer 首次浏览时直接命中后端缓存
+#       索引只能从命令行传入的媒体 URL (关联文件、转交、.dpl) 学到目录；多数情况下是在 PotPlayer 里浏览 WebDAV 打开视频，
+#       启动器看不到这些目录，因此每次启动都先预热配置的根目录 roots (默认 "/"，即 PotPlayer 打开 WebDAV 时第一个列出的目录)
+#       与固定目录 folders，再预热索引中最近播放的目录
+#       配置项 prefetch: {"enabled": false, "dav_url": "http://127.0.0.1:5244/dav", "username": "", "password": "",
+#                         "workers": 4, "max_folders": 16, "index_size": 200, "roots": ["/"], "folders": [固定预热的目录]}
+# 作者: H_Knight
+# 日期: 2026-10-18
+# ===========================================
+
+import base64
+import http.client
+import json
+import os
+import queue
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote, unquote, urlsplit
+
+INDEX_NAME = "prefetch_index.json"
+DEFAULT_DAV_URL = "http://127.0.0.1:5244/dav"
+INDEX_SIZE = 200        # 索引最多保存的目录数
+MAX_FOLDERS = 16        # 每次启动最多预热的目录数
+WORKERS = 4
+STREAM_PIECE = 64 * 1024    # 边收边处理时每次读取的最大字节数
+
+PROPFIND_BODY = (b'<?xml version="1.0" encoding="utf-8"?>'
+                 b'<D:propfind xmlns:D="DAV:"><D:prop><D:resourcetype/><D:getcontentlength/>'
+                 b'<D:getlastmodified/></D:prop></D:propfind>')
+
+
+# ================= 目录索引 =================
+class FolderIndex:
+    """
+    最近播放目录的 LRU 索引
+    键为 WebDAV 下的目录路径 (如 "/阿里云盘/剧集/S01")，值为 {"last": 最近访问时间, "hits": 次数}
+    """
+
+    def __init__(self, path, max_entries=INDEX_SIZE):
+        self.path = path
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.dirty = False
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                data = json.load(f)
+            items = sorted(data.get("folders", {}).items(), key=lambda kv: kv[1].get("last", 0))
+        except (OSError, ValueError, AttributeError):
+            return
+        for folder, meta in items[-self.max_entries:]:
+            self.entries[folder] = meta
+
+    def touch(self, folder):
+        """记录一次访问，移到最近端；超出上限时淘汰最久未访问的目录"""
+        folder = "/" + folder.strip("/")
+        with self._lock:
+            meta = self.entries.pop(folder, {"hits": 0})
+            meta["last"] = round(time.time(), 3)
+            meta["hits"] = meta.get("hits", 0) + 1
+            self.entries[folder] = meta
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+            self.dirty = True
+
+    def recent(self, limit):
+        """最近访问的 limit 个目录，最近的在前"""
+        with self._lock:
+            return list(reversed(self.entries))[:limit]
+
+    def save(self):
+        if not self.dirty:
+            return
+        import config_store
+        with self._lock:
+            data = {"version": 1, "folders": dict(self.entries)}
+            self.dirty = False
+        config_store.atomic_write_json(self.path, data)
+
+
+def folder_of(media, dav_url=DEFAULT_DAV_URL):
+    """媒体 URL 位于 WebDAV 共享下时，返回其所在目录的路径，否则返回 None"""
+    base = urlsplit(dav_url)
+    parts = urlsplit(media)
+    if parts.scheme not in ("http", "https") or (parts.hostname, parts.port) != (base.hostname, base.port):
+        return None
+    prefix = base.path.rstrip("/")
+    path = unquote(parts.path)
+    if not path.startswith(prefix + "/"):
+        return None
+    folder = path[len(prefix):].rsplit("/", 1)[0]
+    return folder or "/"
+
+
+# ================= 连接池 =================
+class ConnectionPool:
+    """同一主机的 keep-alive 连接池，连接数上限为 size"""
+
+    def __init__(self, url, size=WORKERS, timeout=10.0, headers=None):
+        parts = urlsplit(url)
+        self.scheme = parts.scheme or "http"
+        self.host = parts.hostname or "127.0.0.1"
+        self.port = parts.port
+        self.base_path = parts.path.rstrip("/")
+        self.timeout = timeout
+        self.headers = headers or {}
+        self._idle = queue.LifoQueue(maxsize=size)
+        self.created = 0
+
+    def _new(self):
+        cls = http.client.HTTPSConnection if self.scheme == "https" else http.client.HTTPConnection
+        self.created += 1
+        return cls(self.host, self.port, timeout=self.timeout)
+
+    def request(self, method, path, body=None, headers=None):
+        """发送请求并读完响应，返回 (状态码, 响应体)"""
+        status, _, data = self.fetch(method, path, body, headers)
+        return status, data
+
+    def fetch(self, method, path, body=None, headers=None, limit=None, on_data=None):
+        """
+        发送请求并读取响应，返回 (状态码, 响应头, 响应体)
+        limit: 最多读取的响应体字节数；响应体更长时只读 limit 字节并关闭该连接，不会把剩余部分全部读完
+        on_data(状态码, 数据): 响应体每收到一段就调用一次 (调用方可以边收边转发)，返回值仍为完整的响应体
+        复用的空闲连接可能已被服务端关闭，失败时换新连接重试一次
+        """
+        all_headers = dict(self.headers, **(headers or {}))
+        for attempt in (0, 1):
+            try:
+                conn = self._idle.get_nowait()
+                reused = True
+            except queue.Empty:
+                conn = self._new()
+                reused = False
+            try:
+                conn.request(method, path, body=body, headers=all_headers)
+                resp = conn.getresponse()
+                if on_data is not None:
+                    data = _read_pieces(resp, limit, on_data)
+                else:
+                    data = resp.read() if limit is None else resp.read(limit)
+                # 长度已知且已读完时 read(1) 直接返回 b""，不会再读网络
+                truncated = limit is not None and resp.read(1) != b""
+            except (OSError, http.client.HTTPException):
+                conn.close()
+                if reused and not attempt:
+                    continue
+                raise
+            if resp.will_close or truncated:
+                conn.close()
+            else:
+                try:
+                    self._idle.put_nowait(conn)
+                except queue.Full:
+                    conn.close()
+            return resp.status, resp.headers, data
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+def _read_pieces(resp, limit, on_data):
+    """分段读取响应体 (每段为一次网络读取所得，不等凑满)，最多 limit 字节"""
+    pieces, left = [], limit
+    while left is None or left > 0:
+        piece = resp.read1(STREAM_PIECE if left is None else min(STREAM_PIECE, left))
+        if not piece:
+            break
+        pieces.append(piece)
+        on_data(resp.status, piece)
+        if left is not None:
+            left -= len(piece)
+    return b"".join(pieces)
+
+
+# ================= 预热 =================
+class PrefetchResult:
+    """单个目录的预热结果"""
+
+    def __init__(self, folder, status=None, size=0, elapsed=0.0, error=None):
+        self.folder = folder
+        self.status = status
+        self.size = size
+        self.elapsed = elapsed
+        self.error = error
+
+    @property
+    def ok(self):
+        return self.status is not None and 200 <= self.status < 300
+
+    def as_dict(self):
+        return {"folder": self.folder, "status": self.status, "size": self.size,
+                "elapsed": round(self.elapsed, 4), "error": self.error}
+
+
+def auth_headers(cfg):
+    user = cfg.get("username")
+    if not user:
+        return {}
+    token = base64.b64encode(f"{user}:{cfg.get('password', '')}".encode()).decode()
+    return {"Authorization": f"Basic {token}"}
+
+
+def propfind(pool, folder):
+    """对目录发送 Depth: 1 的 PROPFIND"""
+    t0 = time.perf_counter()
+    path = pool.base_path + quote(folder.rstrip("/") + "/")
+    try:
+        status, data = pool.request("PROPFIND", path, PROPFIND_BODY,
+                                    {"Depth": "1", "Content-Type": "application/xml; charset=utf-8"})
+    except (OSError, http.client.HTTPException) as e:
+        return PrefetchResult(folder, elapsed=time.perf_counter() - t0, error=str(e))
+    return PrefetchResult(folder, status, len(data), time.perf_counter() - t0)
+
+
+def warm(folders, dav_url=DEFAULT_DAV_URL, workers=WORKERS, headers=None, timeout=10.0):
+    """并发预热目录列表，返回 [PrefetchResult] (顺序与 folders 相同)"""
+    if not folders:
+        return []
+    pool = ConnectionPool(dav_url, size=workers, timeout=timeout, headers=headers)
+    try:
+        with ThreadPoolExecutor(max_workers=min(workers, len(folders))) as executor:
+            return list(executor.map(lambda f: propfind(pool, f), folders))
+    finally:
+        pool.close()
+
+
+class Prefetcher:
+    """
+    启动器一侧的入口
+    record(): 记录本次播放的目录；start(): 后端就绪后在后台线程中预热；finish(): 等待预热结束并保存索引
+    """
+
+    def __init__(self, config, base_path, log=print):
+        self.cfg = config.get("prefetch", {})
+        self.dav_url = self.cfg.get("dav_url", DEFAULT_DAV_URL)
+        self.index = FolderIndex(os.path.join(base_path, INDEX_NAME), self.cfg.get("index_size", INDEX_SIZE))
+        self.log = log
+        self.results = []
+        self.started = self.ended = None     # perf_counter 时间戳，供耗时记录使用
+        self._thread = None
+
+    def record(self, media):
+        """把位于 WebDAV 共享下的媒体所在目录记入索引 (只能看到命令行 / 转交传入的媒体)"""
+        for item in media:
+            folder = folder_of(item, self.dav_url)
+            if folder is not None:
+                self.index.touch(folder)
+
+    def folders(self):
+        """本次要预热的目录: 根目录 + 固定目录 + 最近播放的目录 (去重，总数不超过 max_folders)"""
+        limit = self.cfg.get("max_folders", MAX_FOLDERS)
+        pinned = ["/" + f.strip("/") for f in self.cfg.get("roots", ["/"]) + self.cfg.get("folders", [])]
+        folders = list(dict.fromkeys(pinned + self.index.recent(limit)))
+        return folders[:limit]
+
+    def _run(self, folders):
+        self.started = time.perf_counter()
+        self.results = warm(folders, self.dav_url, self.cfg.get("workers", WORKERS), auth_headers(self.cfg))
+        self.ended = time.perf_counter()
+        ok = sum(r.ok for r in self.results)
+        self.log(f"[*] 目录预热完成: {ok}/{len(self.results)} 个，耗时 {self.ended - self.started:.3f}s")
+        for r in self.results:
+            if not r.ok:
+                self.log(f"    - {r.folder}: {r.status or r.error}")
+
+    def start(self):
+        """在后台线程中预热，不阻塞启动流程；未启用或没有目录时返回 None"""
+        if not self.cfg.get("enabled", False):
+            return None
+        folders = self.folders()
+        if not folders:
+            return None
+        self._thread = threading.Thread(target=self._run, args=(folders,), daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def finish(self, timeout=1.0):
+        """等待仍在进行的预热 (最多 timeout 秒) 并保存索引"""
+        if self._thread is not None:
+            self._thread.join(timeout)
+        try:
+            self.index.save()
+        except OSError as e:
+            self.log(f"[!] 无法保存目录索引: {e}")
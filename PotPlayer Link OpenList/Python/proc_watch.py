@@ -0,0 +1,520 @@
+# ================= 代码说明 =================
+# 文件名: proc_watch.py
+# 功能: 事件驱动的进程树监控
+#       PotPlayer 经常把启动请求转交给已运行的实例或自行重启，只等待自己启动的 PID 并不可靠
+#       本模块跟踪启动进程的整棵进程树，以及按映像名认领 (adopt) 的同名实例，全部退出后才返回
+#       Windows: 作业对象 (Job Object) + 完成端口，整棵树退出时收到 ACTIVE_PROCESS_ZERO 通知
+#       (进程以 CREATE_SUSPENDED 创建，加入作业后才恢复运行，期间创建的子进程不会漏在作业之外)
+#       Linux: pidfd + poll 阻塞等待，配合 PR_SET_CHILD_SUBREAPER 接收中途脱离父进程的子孙进程
+#       (该属性作用于整个启动器进程，见 _set_child_subreaper)
+#       等待期间线程全部阻塞在内核调用上，不做定时轮询
+# 作者: H_Knight
+# 日期: 2026-10-18
+# ===========================================
+
+import os
+import signal
+import subprocess
+import threading
+import time
+
+
+def _norm(name):
+    return os.path.basename(name).lower()
+
+
+# ================= Windows =================
+class _WinApi:
+    """kernel32 中用到的函数与结构体"""
+
+    PROCESS_TERMINATE = 0x0001
+    PROCESS_SET_QUOTA = 0x0100
+    PROCESS_QUERY_LIMITED_INFORMATION = 0x1000
+    SYNCHRONIZE = 0x00100000
+    THREAD_SUSPEND_RESUME = 0x0002
+    CREATE_SUSPENDED = 0x00000004
+    INFINITE = 0xFFFFFFFF
+    TH32CS_SNAPPROCESS = 0x00000002
+    TH32CS_SNAPTHREAD = 0x00000004
+    JOB_OBJECT_MSG_ACTIVE_PROCESS_ZERO = 4
+    JobObjectBasicProcessIdList = 3
+    JobObjectAssociateCompletionPortInformation = 7
+    MAX_JOB_PIDS = 1024
+
+    def __init__(self):
+        import ctypes
+        from ctypes import wintypes
+
+        self.ctypes = ctypes
+        k = self.k = ctypes.WinDLL("kernel32", use_last_error=True)
+
+        class JOBOBJECT_ASSOCIATE_COMPLETION_PORT(ctypes.Structure):
+            _fields_ = [("CompletionKey", ctypes.c_void_p), ("CompletionPort", wintypes.HANDLE)]
+
+        class JOBOBJECT_BASIC_PROCESS_ID_LIST(ctypes.Structure):
+            _fields_ = [("NumberOfAssignedProcesses", wintypes.DWORD), ("NumberOfProcessIdsInList", wintypes.DWORD),
+                        ("ProcessIdList", ctypes.c_size_t * self.MAX_JOB_PIDS)]
+
+        class PROCESSENTRY32W(ctypes.Structure):
+            _fields_ = [("dwSize", wintypes.DWORD), ("cntUsage", wintypes.DWORD),
+                        ("th32ProcessID", wintypes.DWORD), ("th32DefaultHeapID", ctypes.c_size_t),
+                        ("th32ModuleID", wintypes.DWORD), ("cntThreads", wintypes.DWORD),
+                        ("th32ParentProcessID", wintypes.DWORD), ("pcPriClassBase", wintypes.LONG),
+                        ("dwFlags", wintypes.DWORD), ("szExeFile", wintypes.WCHAR * 260)]
+
+        class THREADENTRY32(ctypes.Structure):
+            _fields_ = [("dwSize", wintypes.DWORD), ("cntUsage", wintypes.DWORD),
+                        ("th32ThreadID", wintypes.DWORD), ("th32OwnerProcessID", wintypes.DWORD),
+                        ("tpBasePri", wintypes.LONG), ("tpDeltaPri", wintypes.LONG), ("dwFlags", wintypes.DWORD)]
+
+        self.JOBOBJECT_ASSOCIATE_COMPLETION_PORT = JOBOBJECT_ASSOCIATE_COMPLETION_PORT
+        self.JOBOBJECT_BASIC_PROCESS_ID_LIST = JOBOBJECT_BASIC_PROCESS_ID_LIST
+        self.PROCESSENTRY32W = PROCESSENTRY32W
+        self.THREADENTRY32 = THREADENTRY32
+        self.INVALID_HANDLE_VALUE = wintypes.HANDLE(-1).value
+
+        k.CreateJobObjectW.argtypes = [ctypes.c_void_p, wintypes.LPCWSTR]
+        k.CreateJobObjectW.restype = wintypes.HANDLE
+        k.CreateIoCompletionPort.argtypes = [wintypes.HANDLE, wintypes.HANDLE, ctypes.c_size_t, wintypes.DWORD]
+        k.CreateIoCompletionPort.restype = wintypes.HANDLE
+        k.SetInformationJobObject.argtypes = [wintypes.HANDLE, ctypes.c_int, ctypes.c_void_p, wintypes.DWORD]
+        k.SetInformationJobObject.restype = wintypes.BOOL
+        k.QueryInformationJobObject.argtypes = [wintypes.HANDLE, ctypes.c_int, ctypes.c_void_p, wintypes.DWORD,
+                                                ctypes.POINTER(wintypes.DWORD)]
+        k.QueryInformationJobObject.restype = wintypes.BOOL
+        k.AssignProcessToJobObject.argtypes = [wintypes.HANDLE, wintypes.HANDLE]
+        k.AssignProcessToJobObject.restype = wintypes.BOOL
+        k.TerminateJobObject.argtypes = [wintypes.HANDLE, wintypes.UINT]
+        k.TerminateJobObject.restype = wintypes.BOOL
+        k.GetQueuedCompletionStatus.argtypes = [wintypes.HANDLE, ctypes.POINTER(wintypes.DWORD),
+                                                ctypes.POINTER(ctypes.c_size_t),
+                                                ctypes.POINTER(ctypes.c_void_p), wintypes.DWORD]
+        k.GetQueuedCompletionStatus.restype = wintypes.BOOL
+        k.OpenProcess.argtypes = [wintypes.DWORD, wintypes.BOOL, wintypes.DWORD]
+        k.OpenProcess.restype = wintypes.HANDLE
+        k.TerminateProcess.argtypes = [wintypes.HANDLE, wintypes.UINT]
+        k.TerminateProcess.restype = wintypes.BOOL
+        k.WaitForSingleObject.argtypes = [wintypes.HANDLE, wintypes.DWORD]
+        k.WaitForSingleObject.restype = wintypes.DWORD
+        k.CloseHandle.argtypes = [wintypes.HANDLE]
+        k.CloseHandle.restype = wintypes.BOOL
+        k.CreateToolhelp32Snapshot.argtypes = [wintypes.DWORD, wintypes.DWORD]
+        k.CreateToolhelp32Snapshot.restype = wintypes.HANDLE
+        k.Process32FirstW.argtypes = [wintypes.HANDLE, ctypes.POINTER(PROCESSENTRY32W)]
+        k.Process32FirstW.restype = wintypes.BOOL
+        k.Process32NextW.argtypes = [wintypes.HANDLE, ctypes.POINTER(PROCESSENTRY32W)]
+        k.Process32NextW.restype = wintypes.BOOL
+        k.Thread32First.argtypes = [wintypes.HANDLE, ctypes.POINTER(THREADENTRY32)]
+        k.Thread32First.restype = wintypes.BOOL
+        k.Thread32Next.argtypes = [wintypes.HANDLE, ctypes.POINTER(THREADENTRY32)]
+        k.Thread32Next.restype = wintypes.BOOL
+        k.OpenThread.argtypes = [wintypes.DWORD, wintypes.BOOL, wintypes.DWORD]
+        k.OpenThread.restype = wintypes.HANDLE
+        k.ResumeThread.argtypes = [wintypes.HANDLE]
+        k.ResumeThread.restype = wintypes.DWORD
+
+    def snapshot(self):
+        """返回 [(pid, ppid, 映像名)]"""
+        ctypes = self.ctypes
+        snap = self.k.CreateToolhelp32Snapshot(self.TH32CS_SNAPPROCESS, 0)
+        if snap == self.INVALID_HANDLE_VALUE:
+            return []
+        entries = []
+        try:
+            entry = self.PROCESSENTRY32W()
+            entry.dwSize = ctypes.sizeof(entry)
+            ok = self.k.Process32FirstW(snap, ctypes.byref(entry))
+            while ok:
+                entries.append((entry.th32ProcessID, entry.th32ParentProcessID, entry.szExeFile))
+                ok = self.k.Process32NextW(snap, ctypes.byref(entry))
+        finally:
+            self.k.CloseHandle(snap)
+        return entries
+
+    def thread_ids(self, pid):
+        """进程的全部线程 ID"""
+        ctypes = self.ctypes
+        snap = self.k.CreateToolhelp32Snapshot(self.TH32CS_SNAPTHREAD, 0)
+        if snap == self.INVALID_HANDLE_VALUE:
+            return []
+        tids = []
+        try:
+            entry = self.THREADENTRY32()
+            entry.dwSize = ctypes.sizeof(entry)
+            ok = self.k.Thread32First(snap, ctypes.byref(entry))
+            while ok:
+                if entry.th32OwnerProcessID == pid:
+                    tids.append(entry.th32ThreadID)
+                ok = self.k.Thread32Next(snap, ctypes.byref(entry))
+        finally:
+            self.k.CloseHandle(snap)
+        return tids
+
+
+class _WinTracker:
+    """作业对象实现: 加入作业的进程及其之后创建的所有子孙进程都由作业统一跟踪"""
+
+    def __init__(self):
+        self.api = _WinApi()
+        k, ctypes = self.api.k, self.api.ctypes
+        self.job = k.CreateJobObjectW(None, None)
+        self.port = k.CreateIoCompletionPort(self.api.INVALID_HANDLE_VALUE, None, 0, 1)
+        info = self.api.JOBOBJECT_ASSOCIATE_COMPLETION_PORT(None, self.port)
+        k.SetInformationJobObject(self.job, self.api.JobObjectAssociateCompletionPortInformation,
+                                  ctypes.byref(info), ctypes.sizeof(info))
+        self.in_job = 0              # 当前轮次成功加入作业的进程数
+        self.fallback = []           # 无法加入作业的进程 (如已属于其他作业)，单独等待其句柄: [(pid, 句柄)]
+
+    def add(self, pid, root=True):
+        api = self.api
+        access = api.PROCESS_SET_QUOTA | api.PROCESS_TERMINATE | api.SYNCHRONIZE
+        h = api.k.OpenProcess(access, False, pid)
+        if not h:
+            return False
+        if api.k.AssignProcessToJobObject(self.job, h):
+            self.in_job += 1
+            api.k.CloseHandle(h)
+        else:
+            self.fallback.append((pid, h))
+        return True
+
+    def resume(self, pid):
+        """
+        恢复以 CREATE_SUSPENDED 创建的进程 (subprocess 不保留主线程句柄，按线程快照逐个恢复)
+        返回恢复的线程数
+        """
+        api = self.api
+        resumed = 0
+        for tid in api.thread_ids(pid):
+            h = api.k.OpenThread(api.THREAD_SUSPEND_RESUME, False, tid)
+            if not h:
+                continue
+            try:
+                if api.k.ResumeThread(h) != 0xFFFFFFFF:
+                    resumed += 1
+            finally:
+                api.k.CloseHandle(h)
+        return resumed
+
+    def job_pids(self):
+        """作业内仍在运行的进程 (含作业自动收入的子孙进程)"""
+        api, ctypes = self.api, self.api.ctypes
+        info = api.JOBOBJECT_BASIC_PROCESS_ID_LIST()
+        # 进程数超过 MAX_JOB_PIDS 时调用失败 (ERROR_MORE_DATA)，但已填入的部分仍然有效
+        api.k.QueryInformationJobObject(self.job, api.JobObjectBasicProcessIdList, ctypes.byref(info),
+                                        ctypes.sizeof(info), None)
+        return [int(pid) for pid in info.ProcessIdList[:min(info.NumberOfProcessIdsInList, api.MAX_JOB_PIDS)]]
+
+    def pids(self):
+        """当前仍在跟踪的 PID: 作业内的进程与单独等待的进程中尚未退出的"""
+        api = self.api
+        alive = [pid for pid, h in self.fallback if api.k.WaitForSingleObject(h, 0) != 0]
+        return self.job_pids() + alive
+
+    def wait_round(self):
+        """阻塞直到本轮所有跟踪的进程 (含子孙) 退出"""
+        api, ctypes = self.api, self.api.ctypes
+        threads = []
+        for _, h in self.fallback:
+            t = threading.Thread(target=api.k.WaitForSingleObject, args=(h, api.INFINITE), daemon=True)
+            t.start()
+            threads.append(t)
+        # 上一轮结束后才加入作业的进程 (in_job 已清零) 也要等待
+        if self.in_job or self.job_pids():
+            msg = ctypes.c_ulong(0)
+            key = ctypes.c_size_t(0)
+            ovl = ctypes.c_void_p()
+            while True:
+                if not api.k.GetQueuedCompletionStatus(self.port, ctypes.byref(msg), ctypes.byref(key),
+                                                       ctypes.byref(ovl), api.INFINITE):
+                    break
+                if msg.value == api.JOB_OBJECT_MSG_ACTIVE_PROCESS_ZERO:
+                    break
+        for t in threads:
+            t.join()
+        for _, h in self.fallback:
+            api.k.CloseHandle(h)
+        self.in_job = 0
+        self.fallback = []
+
+    def find_by_image(self, names, exclude):
+        return [pid for pid, _, exe in self.api.snapshot() if _norm(exe) in names and pid not in exclude]
+
+    def terminate(self):
+        self.api.k.TerminateJobObject(self.job, 1)
+        for _, h in self.fallback:
+            self.api.k.TerminateProcess(h, 1)
+
+    def close(self):
+        self.api.k.CloseHandle(self.port)
+        self.api.k.CloseHandle(self.job)
+
+
+# ================= Linux =================
+def _read_proc_stat(pid):
+    """返回 (ppid, 会话 ID)，进程不存在时返回 None"""
+    try:
+        with open(f"/proc/{pid}/stat", 'rb') as f:
+            data = f.read().decode(errors='replace')
+    except OSError:
+        return None
+    # comm 字段可能包含空格和括号，从最后一个 ')' 之后开始解析
+    fields = data[data.rfind(")") + 2:].split()
+    return int(fields[1]), int(fields[3])
+
+
+def _proc_image(pid):
+    try:
+        return os.path.basename(os.readlink(f"/proc/{pid}/exe"))
+    except OSError:
+        pass
+    try:
+        with open(f"/proc/{pid}/comm") as f:
+            return f.read().strip()
+    except OSError:
+        return ""
+
+
+def _is_zombie(pid):
+    try:
+        with open(f"/proc/{pid}/stat", 'rb') as f:
+            data = f.read()
+    except OSError:
+        return True
+    return data[data.rfind(b")") + 2:data.rfind(b")") + 3] == b"Z"
+
+
+def _list_pids():
+    return [int(d) for d in os.listdir("/proc") if d.isdigit()]
+
+
+def _set_child_subreaper():
+    """
+    让脱离父进程的子孙进程过继给本进程，而不是 init
+    注意这是整个启动器进程的属性，不限于 PotPlayer: 后端等其他子进程留下的孤儿进程同样会过继过来，
+    它们不在跟踪范围内，退出后以僵尸进程留到启动器退出 (由 init 回收)；启动器是短生命周期进程，影响有限
+    """
+    try:
+        import ctypes
+        libc = ctypes.CDLL(None, use_errno=True)
+        PR_SET_CHILD_SUBREAPER = 36
+        return libc.prctl(PR_SET_CHILD_SUBREAPER, 1, 0, 0, 0) == 0
+    except (OSError, AttributeError):
+        return False
+
+
+class _LinuxTracker:
+    """pidfd 实现: poll 阻塞等待任一被跟踪进程退出，退出后重新扫描子孙进程"""
+
+    def __init__(self):
+        self.subreaper = _set_child_subreaper()
+        self.fds = {}                 # pid -> pidfd
+        self.seen = set()             # 曾经跟踪过的全部 PID
+        self.root_sids = set()        # 各根进程 (启动或认领的进程) 的会话 ID，用于识别过继来的子孙进程
+        self.exclude = {os.getpid()}
+        # 等待期间其他线程加入新进程 (如单实例转交后启动的播放器) 时，通过此管道唤醒 poll
+        self._lock = threading.Lock()
+        self._wake_r, self._wake_w = os.pipe()
+
+    def add(self, pid, root=True):
+        """root=False 表示由 _discover 找到的子孙进程，不记录其会话 ID"""
+        with self._lock:
+            if pid in self.fds:
+                return True
+            stat = _read_proc_stat(pid)
+            if stat is None:
+                return False
+            if root:
+                # 每个根进程各自一个会话 (spawn 时 start_new_session)，如单实例转交后再启动的播放器
+                self.root_sids.add(stat[1])
+            try:
+                fd = os.pidfd_open(pid)
+            except (OSError, AttributeError):
+                return False
+            self.fds[pid] = fd
+            self.seen.add(pid)
+        os.write(self._wake_w, b"\0")
+        return True
+
+    def _reap(self, pid):
+        try:
+            os.waitpid(pid, os.WNOHANG)
+        except ChildProcessError:
+            pass
+
+    def _discover(self):
+        """查找被跟踪进程的子进程，以及过继到本进程名下的子孙进程"""
+        parents = set(self.fds)
+        me = os.getpid()
+        found = []
+        for pid in _list_pids():
+            if pid in self.fds or pid in self.exclude:
+                continue
+            stat = _read_proc_stat(pid)
+            if stat is None:
+                continue
+            ppid, sid = stat
+            if ppid in parents:
+                found.append(pid)
+            elif self.subreaper and ppid == me and pid not in self.seen and sid in self.root_sids:
+                # 父进程已退出、过继给本进程的子孙 (与某个根进程同一会话)
+                found.append(pid)
+        return found
+
+    def wait_round(self):
+        """阻塞直到本轮所有跟踪的进程 (含子孙) 退出"""
+        import select
+        poller = select.poll()
+        poller.register(self._wake_r, select.POLLIN)
+        by_fd = {}
+        while self.fds:
+            for pid in self._discover():
+                self.add(pid, root=False)
+            with self._lock:
+                for pid, fd in self.fds.items():
+                    if fd not in by_fd:
+                        poller.register(fd, select.POLLIN)
+                        by_fd[fd] = pid
+            if not self.fds:
+                break
+            for fd, _ in poller.poll():
+                if fd == self._wake_r:
+                    os.read(self._wake_r, 4096)
+                    continue
+                pid = by_fd.pop(fd)
+                poller.unregister(fd)
+                with self._lock:
+                    os.close(fd)
+                    del self.fds[pid]
+                # 先找出它留下的子进程 (已过继给本进程或 init)，再回收僵尸
+                self._reap(pid)
+        # 回收退出后过继给本进程的僵尸子孙
+        for pid in list(self.seen):
+            self._reap(pid)
+
+    def pids(self):
+        with self._lock:
+            return list(self.fds)
+
+    def find_by_image(self, names, exclude):
+        return [pid for pid in _list_pids()
+                if pid not in exclude and pid not in self.exclude
+                and _norm(_proc_image(pid)) in names and not _is_zombie(pid)]
+
+    def terminate(self):
+        pids = list(self.fds)
+        for pid in pids:
+            try:
+                os.kill(pid, signal.SIGKILL)
+            except OSError:
+                pass
+
+    def close(self):
+        for fd in self.fds.values():
+            os.close(fd)
+        self.fds.clear()
+        os.close(self._wake_r)
+        os.close(self._wake_w)
+
+
+class ProcessSupervisor:
+    """
+    跟踪一棵进程树及按映像名认领的实例，直到全部退出
+    image_names: 需要认领的映像名，如 ["PotPlayerMini64.exe"]
+    settle: 整棵树退出后再等待的时间，用于捕捉自行重启或转交给其他实例的情况
+    """
+
+    def __init__(self, image_names=(), settle=0.5, log=print):
+        self.image_names = {_norm(n) for n in image_names}
+        self.settle = settle
+        self.log = log
+        self.tracker = _WinTracker() if os.name == 'nt' else _LinuxTracker()
+        self.root = None
+        self.seen = set()
+        self.adopted = set()
+
+    def spawn(self, args, **kwargs):
+        """启动进程并立即加入跟踪 (可在 wait() 期间从其他线程调用，第一个进程为根进程)"""
+        if os.name != 'nt':
+            # 独立会话，便于把过继来的子孙进程与启动器的其他子进程区分开
+            kwargs.setdefault("start_new_session", True)
+            proc = subprocess.Popen(args, **kwargs)
+            self.attach(proc.pid)
+        else:
+            # 先挂起创建、加入作业后再恢复: 否则进程在加入作业之前创建的子进程不受作业跟踪
+            kwargs["creationflags"] = kwargs.get("creationflags", 0) | _WinApi.CREATE_SUSPENDED
+            proc = subprocess.Popen(args, **kwargs)
+            try:
+                self.attach(proc.pid)
+            finally:
+                if not self.tracker.resume(proc.pid):
+                    proc.kill()
+                    raise OSError(f"无法恢复挂起创建的进程 (PID: {proc.pid})")
+        if self.root is None:
+            self.root = proc
+        return proc
+
+    def attach(self, pid):
+        if self.tracker.add(pid):
+            self.seen.add(pid)
+            return True
+        return False
+
+    def _adopt(self):
+        """按映像名认领尚未跟踪的实例，返回认领数量"""
+        if not self.image_names:
+            return 0
+        count = 0
+        for pid in self.tracker.find_by_image(self.image_names, set(self.tracker_pids())):
+            if self.attach(pid):
+                self.adopted.add(pid)
+                count += 1
+                self.log(f"[*] 认领已运行的实例 (PID: {pid})")
+        return count
+
+    def wait(self):
+        """阻塞直到整棵进程树及认领的实例全部退出，返回摘要"""
+        t0 = time.monotonic()
+        rounds = 0
+        while True:
+            rounds += 1
+            self.tracker.wait_round()
+            if self.root is not None:
+                self.root.poll()
+            # 本轮结束的同时又有新进程加入
+            if self.tracker_pids():
+                continue
+            # 整棵树已退出: 检查是否转交给了已运行的实例，或刚刚自行重启
+            if self._adopt():
+                continue
+            if self.settle:
+                time.sleep(self.settle)
+                if self._adopt():
+                    continue
+            break
+        return {
+            "elapsed": time.monotonic() - t0,
+            "rounds": rounds,
+            "adopted": sorted(self.adopted),
+            "root_exit_code": None if self.root is None else self.root.returncode,
+        }
+
+    def tracker_pids(self):
+        """当前仍在跟踪的 PID (Windows 下含作业自动收入的子孙进程)"""
+        return self.tracker.pids()
+
+    def terminate(self):
+        """强制结束整棵进程树 (替代 taskkill /F /T)"""
+        self.tracker.terminate()
+
+    def close(self):
+        self.tracker.close()
+
+
+def find_pids_by_image(names):
+    """按映像名查找进程 PID，不经过 shell 或 tasklist"""
+    wanted = {_norm(n) for n in names}
+    if os.name == 'nt':
+        return [pid for pid, _, exe in _WinApi().snapshot() if _norm(exe) in wanted]
+    return [pid for pid in _list_pids()
+            if pid != os.getpid() and _norm(_proc_image(pid)) in wanted and not _is_zombie(pid)]
@@ -0,0 +1,227 @@
+# ================= 代码说明 =================
+# 文件名: readiness.py
+# 功能: 后端就绪探测 (TCP / HTTP / 服务状态 / 挂载点)，替代启动服务后的固定 sleep
+# 作者: H_Knight
+# 日期: 2026-10-18
+# ===========================================
+
+import re
+import socket
+import subprocess
+import time
+import os
+import http.client
+from urllib.parse import urlsplit
+
+# OpenList 默认监听端口，/ping 接口返回 "pong"
+DEFAULT_PING_URL = "http://127.0.0.1:5244/ping"
+# 默认整体超时 (秒)，超过后不再等待，直接启动播放器
+DEFAULT_DEADLINE = 10.0
+
+
+class TcpProbe:
+    """TCP 连接探测: 端口能建立连接即视为就绪"""
+
+    def __init__(self, host, port, timeout=0.5):
+        self.host = host
+        self.port = int(port)
+        self.timeout = timeout
+        self.name = f"tcp://{host}:{self.port}"
+
+    def check(self):
+        try:
+            with socket.create_connection((self.host, self.port), timeout=self.timeout):
+                return True, "已连接"
+        except OSError as e:
+            return False, str(e)
+
+
+class HttpProbe:
+    """HTTP GET 探测: 返回状态码在 expect_status 内即视为就绪"""
+
+    def __init__(self, url, timeout=1.0, expect_status=range(200, 400)):
+        self.url = url
+        self.timeout = timeout
+        self.expect_status = expect_status
+        self.name = f"http:{url}"
+        parts = urlsplit(url)
+        self._scheme = parts.scheme or "http"
+        self._host = parts.hostname or "127.0.0.1"
+        self._port = parts.port
+        self._path = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+
+    def check(self):
+        conn_cls = http.client.HTTPSConnection if self._scheme == "https" else http.client.HTTPConnection
+        conn = conn_cls(self._host, self._port, timeout=self.timeout)
+        try:
+            conn.request("GET", self._path)
+            resp = conn.getresponse()
+            resp.read()
+            if resp.status in self.expect_status:
+                return True, f"HTTP {resp.status}"
+            return False, f"HTTP {resp.status}"
+        except (OSError, http.client.HTTPException) as e:
+            return False, str(e)
+        finally:
+            conn.close()
+
+
+def query_service_state(service_name):
+    """
+    通过 sc query 读取 Windows 服务状态
+    返回 "RUNNING" / "START_PENDING" / "STOPPED" 等，查询失败返回 None
+    """
+    startupinfo = None
+    if os.name == 'nt':
+        startupinfo = subprocess.STARTUPINFO()
+        startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+    try:
+        out = subprocess.run(["sc", "query", service_name], capture_output=True, text=True,
+                             startupinfo=startupinfo).stdout
+    except OSError:
+        return None
+    m = re.search(r"STATE\s*:\s*\d+\s+(\w+)", out)
+    return m.group(1) if m else None
+
+
+class ServiceProbe:
+    """
+    服务状态探测: 服务处于 RUNNING 即视为就绪
+    query 可替换为任意返回状态字符串的函数 (Linux 下测试时使用)
+    """
+
+    def __init__(self, service_name, query=None):
+        self.service_name = service_name
+        self.query = query or query_service_state
+        self.name = f"service:{service_name}"
+
+    def check(self):
+        state = self.query(self.service_name)
+        return state == "RUNNING", f"状态 {state}"
+
+
+class MountProbe:
+    """
+    挂载点探测 (rclone mount 等): 路径已成为挂载点即视为就绪
+    Windows 下挂载到盘符 (如 "X:") 时，盘符出现即视为就绪
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.name = f"mount:{path}"
+
+    def check(self):
+        if os.path.ismount(self.path) or (os.name == 'nt' and os.path.exists(self.path)):
+            return True, "已挂载"
+        return False, "未挂载"
+
+
+class ProbeStats:
+    """单个探测器的计时统计"""
+
+    def __init__(self, name):
+        self.name = name
+        self.attempts = 0
+        self.failures = 0
+        self.total_time = 0.0    # 所有探测调用累计耗时
+        self.ready_at = None     # 从开始等待到首次成功的耗时，未成功为 None
+        self.last_detail = ""
+
+    def as_dict(self):
+        return {
+            "name": self.name,
+            "attempts": self.attempts,
+            "failures": self.failures,
+            "total_time": round(self.total_time, 4),
+            "ready_at": None if self.ready_at is None else round(self.ready_at, 4),
+            "last_detail": self.last_detail,
+        }
+
+
+class ReadinessReport:
+    """一次就绪等待的结果"""
+
+    def __init__(self, ready, elapsed, stats):
+        self.ready = ready
+        self.elapsed = elapsed
+        self.stats = stats
+
+    def as_dict(self):
+        return {
+            "ready": self.ready,
+            "elapsed": round(self.elapsed, 4),
+            "probes": [s.as_dict() for s in self.stats],
+        }
+
+
+def wait_until_ready(probes, deadline=DEFAULT_DEADLINE, initial_delay=0.01, max_delay=0.5,
+                     factor=2.0, clock=time.monotonic, sleep=time.sleep):
+    """
+    依次执行全部探测器，直到全部成功或超过整体 deadline
+    已成功的探测器不再重复执行；每轮失败后按指数退避等待 (initial_delay 起，不超过 max_delay)
+    """
+    start = clock()
+    stats = [ProbeStats(p.name) for p in probes]
+    pending = list(range(len(probes)))
+    delay = initial_delay
+
+    while True:
+        still_pending = []
+        for i in pending:
+            t0 = clock()
+            try:
+                ok, detail = probes[i].check()
+            except Exception as e:
+                ok, detail = False, f"探测异常: {e}"
+            t1 = clock()
+            st = stats[i]
+            st.attempts += 1
+            st.total_time += t1 - t0
+            st.last_detail = detail
+            if ok:
+                st.ready_at = t1 - start
+            else:
+                st.failures += 1
+                still_pending.append(i)
+        pending = still_pending
+
+        elapsed = clock() - start
+        if not pending:
+            return ReadinessReport(True, elapsed, stats)
+        if elapsed >= deadline:
+            return ReadinessReport(False, elapsed, stats)
+
+        # 指数退避，但不越过整体 deadline
+        sleep(min(delay, max(deadline - elapsed, 0)))
+        delay = min(delay * factor, max_delay)
+
+
+def build_probes(specs, service_name=None, service_query=None):
+    """
+    根据配置构造探测器列表
+    service_query: 服务状态查询函数 (如 ServiceController.query_state)，默认使用 sc query
+    specs 示例: [{"type": "service"}, {"type": "http", "url": "http://127.0.0.1:5244/ping"},
+                 {"type": "tcp", "host": "127.0.0.1", "port": 5244}, {"type": "mount", "path": "X:"}]
+    """
+    probes = []
+    for spec in specs:
+        kind = spec.get("type")
+        timeout = spec.get("timeout")
+        if kind == "tcp":
+            probes.append(TcpProbe(spec.get("host", "127.0.0.1"), spec["port"], timeout or 0.5))
+        elif kind == "http":
+            probes.append(HttpProbe(spec.get("url", DEFAULT_PING_URL), timeout or 1.0))
+        elif kind == "service":
+            name = spec.get("name", service_name)
+            if name:
+                probes.append(ServiceProbe(name, service_query))
+        elif kind == "mount":
+            probes.append(MountProbe(spec["path"]))
+        else:
+            raise ValueError(f"未知的探测类型: {kind}")
+    return probes
+
+
+def default_probe_specs():
+    """OpenList 服务的默认探测: 服务 RUNNING 且 /ping 可访问"""
+    return [{"type": "service"}, {"type": "http", "url": DEFAULT_PING_URL}]
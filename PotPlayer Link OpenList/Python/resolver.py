@@ -0,0 +1,278 @@
+# ================= 代码说明 =================
+# 文件名: resolver.py
+# 功能: 目录 / 分享链接批量解析为可直接播放的 .dpl 播放列表
+#       通过 OpenList API 列出目录 (/api/fs/list)，再用线程池 + 复用连接并发获取每个视频的直链 (/api/fs/get 的 raw_url)，
+#       写成 PotPlayer 播放列表交给播放器，换集时不再经过 WebDAV 的重定向与签名
+#       直链连同过期时间缓存在 resolver_cache.json 中，未过期前直接复用
+#       配置项 resolver: {"enabled": false, "api_url": "http://127.0.0.1:5244", "token": "", "username": "", "password": "",
+#                         "workers": 8, "ttl": 900, "extensions": [...]}
+# 作者: H_Knight
+# 日期: 2026-10-18
+# ===========================================
+
+import calendar
+import http.client
+import json
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from prefetch import ConnectionPool
+
+CACHE_NAME = "resolver_cache.json"
+PLAYLIST_DIR = "playlists"
+DEFAULT_API_URL = "http://127.0.0.1:5244"
+WORKERS = 8
+DEFAULT_TTL = 900           # 无法从直链中得知过期时间时的缓存时长 (秒)
+EXPIRY_MARGIN = 60          # 距过期不足该秒数的直链视为已过期
+VIDEO_EXTENSIONS = (".mkv", ".mp4", ".avi", ".mov", ".wmv", ".flv", ".ts", ".m2ts", ".rmvb", ".webm", ".iso")
+
+
+class ResolveError(Exception):
+    """OpenList API 返回错误或无法访问"""
+
+
+def natural_key(name):
+    """自然排序: "第2集" 排在 "第10集" 之前"""
+    return [int(part) if part.isdigit() else part.lower() for part in re.split(r"(\d+)", name)]
+
+
+def url_expiry(url, now=None, ttl=DEFAULT_TTL):
+    """
+    从直链推断过期时间 (Unix 时间戳)
+    支持 OpenList 签名 (sign=xxx:过期时间，0 为永不过期) 与常见对象存储的签名参数，推断不出时按 ttl 计
+    """
+    now = time.time() if now is None else now
+    query = {k.lower(): v[0] for k, v in parse_qs(urlsplit(url).query).items()}
+    try:
+        if "sign" in query and ":" in query["sign"]:
+            expire = int(query["sign"].rsplit(":", 1)[1])
+            return expire or float("inf")
+        for key in ("expires", "x-oss-expires", "e"):
+            if key in query:
+                return int(query[key])
+        if "x-amz-expires" in query and "x-amz-date" in query:
+            signed = calendar.timegm(time.strptime(query["x-amz-date"], "%Y%m%dT%H%M%SZ"))
+            return signed + int(query["x-amz-expires"])
+    except ValueError:
+        pass
+    return now + ttl
+
+
+# ================= 直链缓存 =================
+class LinkCache:
+    """文件路径 -> {"url": 直链, "expires": 过期时间} 的持久化缓存"""
+
+    def __init__(self, path):
+        self.path = path
+        self.entries = {}
+        self.dirty = False
+        self._lock = threading.Lock()
+        try:
+            with open(path, encoding='utf-8') as f:
+                self.entries = json.load(f).get("links", {})
+        except (OSError, ValueError, AttributeError):
+            pass
+
+    def get(self, file_path, now=None):
+        now = time.time() if now is None else now
+        with self._lock:
+            entry = self.entries.get(file_path)
+        if entry and (entry["expires"] is None or entry["expires"] - EXPIRY_MARGIN > now):
+            return entry["url"]
+        return None
+
+    def put(self, file_path, url, expires):
+        with self._lock:
+            # JSON 中没有 inf，永不过期记为 None
+            self.entries[file_path] = {"url": url, "expires": None if expires == float("inf") else expires}
+            self.dirty = True
+
+    def save(self):
+        """写回缓存 (顺带清除已过期的直链)"""
+        if not self.dirty:
+            return
+        import config_store
+        now = time.time()
+        with self._lock:
+            self.entries = {k: v for k, v in self.entries.items() if v["expires"] is None or v["expires"] > now}
+            data = {"version": 1, "links": dict(self.entries)}
+            self.dirty = False
+        config_store.atomic_write_json(self.path, data)
+
+
+# ================= OpenList API =================
+class OpenListClient:
+    """OpenList API 的最小客户端，所有请求共用一个连接池"""
+
+    def __init__(self, api_url=DEFAULT_API_URL, token=None, workers=WORKERS, timeout=15.0):
+        self.pool = ConnectionPool(api_url, size=workers, timeout=timeout)
+        self.token = token
+
+    def call(self, endpoint, payload):
+        headers = {"Content-Type": "application/json"}
+        if self.token:
+            headers["Authorization"] = self.token
+        try:
+            status, data = self.pool.request("POST", self.pool.base_path + endpoint,
+                                             json.dumps(payload).encode('utf-8'), headers)
+            reply = json.loads(data)
+        except (OSError, ValueError, http.client.HTTPException) as e:
+            raise ResolveError(f"{endpoint}: {e}")
+        if status != 200 or reply.get("code") != 200:
+            raise ResolveError(f"{endpoint}: {reply.get('message') or status}")
+        return reply.get("data") or {}
+
+    def login(self, username, password):
+        self.token = self.call("/api/auth/login", {"username": username, "password": password})["token"]
+
+    def list_dir(self, path, password=""):
+        data = self.call("/api/fs/list", {"path": path, "password": password, "page": 1, "per_page": 0})
+        return data.get("content") or []
+
+    def get(self, path, password=""):
+        return self.call("/api/fs/get", {"path": path, "password": password})
+
+    def close(self):
+        self.pool.close()
+
+
+def parse_target(target, api_url=DEFAULT_API_URL):
+    """
+    把 OpenList 目录路径或网页链接 (如 http://127.0.0.1:5244/网盘/剧集?pwd=xxx) 拆成 (目录路径, 密码)
+    链接不属于 api_url 所指的 OpenList 时返回 None
+    """
+    if "://" not in target:
+        return "/" + target.strip("/"), ""
+    parts, base = urlsplit(target), urlsplit(api_url)
+    if (parts.hostname, parts.port) != (base.hostname, base.port):
+        return None
+    path = unquote(parts.path)
+    prefix = base.path.rstrip("/")
+    if prefix and path.startswith(prefix + "/"):
+        path = path[len(prefix):]
+    # /d/、/p/ 是单个文件的下载链接，/dav/ 是 WebDAV，均不在此解析
+    if path.startswith(("/d/", "/p/", "/dav/")) or path.lower().endswith(VIDEO_EXTENSIONS):
+        return None
+    password = parse_qs(parts.query).get("pwd", [""])[0]
+    return "/" + path.strip("/"), password
+
+
+# ================= 解析 =================
+class Resolver:
+    """
+    把目录解析为 [(标题, 直链)]
+    未命中缓存的文件用线程池并发获取直链 (并发数即连接池大小)
+    """
+
+    def __init__(self, config, base_path, log=print):
+        self.cfg = config.get("resolver", {})
+        self.api_url = self.cfg.get("api_url", DEFAULT_API_URL)
+        self.workers = self.cfg.get("workers", WORKERS)
+        self.extensions = tuple(e.lower() for e in self.cfg.get("extensions", VIDEO_EXTENSIONS))
+        self.base_path = base_path
+        self.cache = LinkCache(os.path.join(base_path, CACHE_NAME))
+        self.log = log
+        self.proxy = None           # 启用媒体代理时由启动器设置，播放列表改为经由代理访问
+        self._client = None
+        self._lock = threading.Lock()
+
+    def client(self):
+        with self._lock:
+            if self._client is None:
+                client = OpenListClient(self.api_url, self.cfg.get("token"), self.workers)
+                if not client.token and self.cfg.get("username"):
+                    client.login(self.cfg["username"], self.cfg.get("password", ""))
+                self._client = client
+            return self._client
+
+    def _link(self, file_path, password):
+        data = self.client().get(file_path, password)
+        url = data.get("raw_url")
+        if not url:
+            raise ResolveError(f"{file_path}: 没有返回直链")
+        expires = url_expiry(url, ttl=self.cfg.get("ttl", DEFAULT_TTL))
+        self.cache.put(file_path, url, expires)
+        return url
+
+    def resolve(self, folder, password=""):
+        """返回 (条目 [(文件名, 直链)], 统计 {"files", "cached", "elapsed"})"""
+        t0 = time.perf_counter()
+        entries = [e for e in self.client().list_dir(folder, password)
+                   if not e.get("is_dir") and e["name"].lower().endswith(self.extensions)]
+        entries.sort(key=lambda e: natural_key(e["name"]))
+        paths = [f"{folder.rstrip('/')}/{e['name']}" for e in entries]
+        links = {p: self.cache.get(p) for p in paths}
+        missing = [p for p in paths if links[p] is None]
+        if missing:
+            with ThreadPoolExecutor(max_workers=min(self.workers, len(missing))) as executor:
+                for p, url in zip(missing, executor.map(lambda p: self._link(p, password), missing)):
+                    links[p] = url
+        stats = {"files": len(paths), "cached": len(paths) - len(missing), "elapsed": time.perf_counter() - t0}
+        return [(e["name"], links[p]) for e, p in zip(entries, paths)], stats
+
+    def wants(self, item):
+        """命令行参数是否为本 OpenList 的目录链接 (只处理 URL，本地路径与播放器开关不解析)"""
+        return "://" in item and parse_target(item, self.api_url) is not None
+
+    def playlist_for(self, target):
+        """解析目录并写出 .dpl，返回播放列表路径；target 不是本 OpenList 的目录时返回 None"""
+        parsed = parse_target(target, self.api_url)
+        if parsed is None:
+            return None
+        folder, password = parsed
+        items, stats = self.resolve(folder, password)
+        if not items:
+            self.log(f"[!] 目录中没有可播放的视频: {folder}")
+            return None
+        name = folder.strip("/").rsplit("/", 1)[-1] or "OpenList"
+        if self.proxy is not None:
+            items = self.proxy.playlist(items)
+        path = write_dpl(os.path.join(self.base_path, PLAYLIST_DIR, f"{safe_name(name)}.dpl"), name, items)
+        self.log(f"[+] 已解析 {folder}: {stats['files']} 个视频 (缓存命中 {stats['cached']} 个)，"
+                 f"耗时 {stats['elapsed']:.3f}s")
+        return path
+
+    def expand(self, media):
+        """把媒体参数中的 OpenList 目录 / 链接替换为解析出的播放列表，解析失败的参数原样保留"""
+        result = []
+        for item in media:
+            if not self.wants(item):
+                result.append(item)
+                continue
+            try:
+                playlist = self.playlist_for(item)
+            except Exception as e:
+                # 除 ResolveError 外还可能是写播放列表的 OSError、服务端返回缺少字段等，均不影响其他参数
+                self.log(f"[!] 无法解析 {item}: {e}")
+                playlist = None
+            result.append(playlist or item)
+        return result
+
+    def close(self):
+        if self._client is not None:
+            self._client.close()
+        try:
+            self.cache.save()
+        except OSError as e:
+            self.log(f"[!] 无法保存直链缓存: {e}")
+
+
+# ================= 播放列表 =================
+def safe_name(name):
+    """去掉文件名中 Windows 不允许的字符"""
+    return re.sub(r'[\\/:*?"<>|]', "_", name)
+
+
+def write_dpl(path, title, items):
+    """写出 PotPlayer 播放列表 (.dpl，UTF-8 带 BOM)，items 为 [(标题, URL)]"""
+    lines = ["DAUMPLAYLIST", f"playname={title}"]
+    for i, (name, url) in enumerate(items, 1):
+        lines += [f"{i}*file*{url}", f"{i}*title*{name}"]
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8-sig', newline='\r\n') as f:
+        f.write("\n".join(lines) + "\n")
+    return path
@@ -0,0 +1,256 @@
+# ================= 代码说明 =================
+# 文件名: sched_policy.py
+# 功能: 播放器与后端进程的 CPU / IO 优先级与 CPU 亲和性策略
+#       后端 (rclone / OpenList) 扫描目录、写缓存时会与 PotPlayer 的解码线程争抢 CPU 与磁盘，
+#       核心数少的机器上表现为掉帧；按策略提高播放器、降低后端的优先级，并可把两者限定在指定核心上
+#       进程启动后立即应用 (Windows 下播放器在创建时即带上优先级类)，
+#       之后后台线程定期扫描进程表，对新出现的子孙进程 (如 AlistHelper -> rclone) 及按映像名匹配的进程补上策略
+#       Windows: SetPriorityClass + NtSetInformationProcess(ProcessIoPriority) + SetProcessAffinityMask
+#       Linux: setpriority (nice) + ioprio_set + sched_setaffinity，三者在 Linux 下都按线程生效，逐个线程设置
+#       配置项 scheduling: {"enabled": false, "interval": 2,
+#                           "player": {"cpu": "above_normal", "io": "normal", "affinity": null},
+#                           "backend": {"cpu": "below_normal", "io": "low", "affinity": null, "images": []}}
+#       cpu: idle / below_normal / normal / above_normal / high；io: idle / low / normal / high
+#       affinity: CPU 编号列表 (如 [2, 3])，null 表示不限制；images: 额外按映像名匹配的后端进程
+#       保温模式下后端由守护进程启动，只能通过 backend.images 按映像名匹配
+# 作者: H_Knight
+# 日期: 2026-10-18
+# ===========================================
+
+import os
+import threading
+
+import proc_watch
+import shutdown
+
+CPU_LEVELS = ("idle", "below_normal", "normal", "above_normal", "high")
+IO_LEVELS = ("idle", "low", "normal", "high")
+DEFAULTS = {
+    "player": {"cpu": "above_normal", "io": "normal", "affinity": None},
+    "backend": {"cpu": "below_normal", "io": "low", "affinity": None},
+}
+INTERVAL = 2.0              # 扫描子孙进程的间隔 (秒)
+
+
+class RolePolicy:
+    """一类进程 (player / backend) 的调度策略"""
+
+    def __init__(self, role, cpu="normal", io="normal", affinity=None, images=()):
+        if cpu not in CPU_LEVELS:
+            raise ValueError(f"scheduling.{role}.cpu 无效: {cpu}")
+        if io not in IO_LEVELS:
+            raise ValueError(f"scheduling.{role}.io 无效: {io}")
+        self.role = role
+        self.cpu = cpu
+        self.io = io
+        self.affinity = sorted(set(int(c) for c in affinity)) if affinity else None
+        self.images = [proc_watch._norm(n) for n in images]
+
+    def describe(self):
+        cores = ",".join(map(str, self.affinity)) if self.affinity else "不限"
+        return f"CPU {self.cpu}, IO {self.io}, 核心 {cores}"
+
+
+def load_policies(config):
+    """按配置生成 {角色: RolePolicy}，未配置的字段使用 DEFAULTS"""
+    cfg = config.get("scheduling", {})
+    policies = {}
+    for role, defaults in DEFAULTS.items():
+        spec = dict(defaults, **cfg.get(role, {}))
+        policies[role] = RolePolicy(role, spec["cpu"], spec["io"], spec.get("affinity"), spec.get("images", ()))
+    return policies
+
+
+# ================= Windows =================
+class _WinApi:
+    """kernel32 / ntdll 中用到的函数"""
+
+    PROCESS_SET_INFORMATION = 0x0200
+    PROCESS_QUERY_LIMITED_INFORMATION = 0x1000
+    ProcessIoPriority = 33
+    PRIORITY_CLASS = {"idle": 0x40, "below_normal": 0x4000, "normal": 0x20, "above_normal": 0x8000, "high": 0x80}
+    IO_PRIORITY = {"idle": 0, "low": 1, "normal": 2, "high": 3}
+
+    def __init__(self):
+        import ctypes
+        from ctypes import wintypes
+
+        self.ctypes = ctypes
+        k = self.k = ctypes.WinDLL("kernel32", use_last_error=True)
+        nt = self.nt = ctypes.WinDLL("ntdll")
+        k.OpenProcess.argtypes = [wintypes.DWORD, wintypes.BOOL, wintypes.DWORD]
+        k.OpenProcess.restype = wintypes.HANDLE
+        k.CloseHandle.argtypes = [wintypes.HANDLE]
+        k.CloseHandle.restype = wintypes.BOOL
+        k.SetPriorityClass.argtypes = [wintypes.HANDLE, wintypes.DWORD]
+        k.SetPriorityClass.restype = wintypes.BOOL
+        k.SetProcessAffinityMask.argtypes = [wintypes.HANDLE, ctypes.c_size_t]
+        k.SetProcessAffinityMask.restype = wintypes.BOOL
+        nt.NtSetInformationProcess.argtypes = [wintypes.HANDLE, ctypes.c_int, ctypes.c_void_p, wintypes.ULONG]
+        nt.NtSetInformationProcess.restype = ctypes.c_long
+
+    def popen_kwargs(self, policy):
+        """创建进程时即带上优先级类 (subprocess 支持把优先级类放在 creationflags 中)"""
+        return {"creationflags": self.PRIORITY_CLASS[policy.cpu]}
+
+    def apply(self, pid, policy):
+        """返回失败项 [(方面, 原因)]"""
+        ctypes = self.ctypes
+        h = self.k.OpenProcess(self.PROCESS_SET_INFORMATION | self.PROCESS_QUERY_LIMITED_INFORMATION, False, pid)
+        if not h:
+            return [("open", f"OpenProcess 失败 ({ctypes.get_last_error()})")]
+        failed = []
+        try:
+            if not self.k.SetPriorityClass(h, self.PRIORITY_CLASS[policy.cpu]):
+                failed.append(("cpu", f"SetPriorityClass 失败 ({ctypes.get_last_error()})"))
+            value = ctypes.c_ulong(self.IO_PRIORITY[policy.io])
+            status = self.nt.NtSetInformationProcess(h, self.ProcessIoPriority, ctypes.byref(value), 4)
+            if status != 0:
+                failed.append(("io", f"NtSetInformationProcess 失败 (0x{status & 0xFFFFFFFF:08X})"))
+            if policy.affinity:
+                mask = sum(1 << c for c in policy.affinity)
+                if not self.k.SetProcessAffinityMask(h, mask):
+                    failed.append(("affinity", f"SetProcessAffinityMask 失败 ({ctypes.get_last_error()})"))
+        finally:
+            self.k.CloseHandle(h)
+        return failed
+
+
+# ================= Linux =================
+class _LinuxApi:
+    """nice / ioprio / 亲和性在 Linux 下都是线程属性，对 /proc/<pid>/task 下的每个线程分别设置"""
+
+    NICE = {"idle": 19, "below_normal": 10, "normal": 0, "above_normal": -5, "high": -10}
+    # (IO 调度类, 级别): 1 = 实时, 2 = 尽力而为 (0 最高 ~ 7 最低), 3 = 空闲；类 0 表示跟随 nice 值
+    IOPRIO = {"idle": (3, 0), "low": (2, 7), "normal": (0, 0), "high": (2, 0)}
+    IOPRIO_WHO_PROCESS = 1
+    IOPRIO_CLASS_SHIFT = 13
+    SYS_IOPRIO_SET = {"x86_64": 251, "i386": 289, "i686": 289, "aarch64": 30, "armv7l": 314, "armv6l": 314}
+
+    def __init__(self):
+        import ctypes
+        import platform
+        self.libc = ctypes.CDLL(None, use_errno=True)
+        self.ctypes = ctypes
+        self.sys_ioprio_set = self.SYS_IOPRIO_SET.get(platform.machine())
+        self.cpus = os.cpu_count() or 1
+
+    def popen_kwargs(self, policy):
+        # preexec_fn 在多线程程序中不安全，改为启动后立即设置 (此时子进程只有一个线程)
+        return {}
+
+    @staticmethod
+    def threads(pid):
+        try:
+            return [int(t) for t in os.listdir(f"/proc/{pid}/task")]
+        except OSError:
+            return [pid]
+
+    def ioprio_set(self, tid, io):
+        if self.sys_ioprio_set is None:
+            raise OSError("当前架构不支持 ioprio_set")
+        cls, level = self.IOPRIO[io]
+        if self.libc.syscall(self.sys_ioprio_set, self.IOPRIO_WHO_PROCESS, tid,
+                             (cls << self.IOPRIO_CLASS_SHIFT) | level) != 0:
+            err = self.ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+
+    def apply(self, pid, policy):
+        """返回失败项 [(方面, 原因)]"""
+        failed = {}
+        cpus = [c for c in policy.affinity or () if c < self.cpus]
+        steps = [("cpu", lambda tid: os.setpriority(os.PRIO_PROCESS, tid, self.NICE[policy.cpu])),
+                 ("io", lambda tid: self.ioprio_set(tid, policy.io))]
+        if cpus:
+            steps.append(("affinity", lambda tid: os.sched_setaffinity(tid, cpus)))
+        for tid in self.threads(pid):
+            for aspect, step in steps:
+                if aspect in failed:
+                    continue
+                try:
+                    step(tid)
+                except ProcessLookupError:
+                    pass            # 线程已退出
+                except OSError as e:
+                    failed[aspect] = e.strerror or str(e)
+        return list(failed.items())
+
+
+class Scheduler:
+    """
+    按角色把调度策略应用到进程上
+    watch(role, roots, images): roots 为返回根进程 PID 列表的函数，根进程、其子孙与按映像名匹配的进程都应用该角色的策略
+    """
+
+    def __init__(self, config, log=print):
+        self.policies = load_policies(config)
+        self.interval = float(config.get("scheduling", {}).get("interval", INTERVAL))
+        self.log = log
+        self.api = _WinApi() if os.name == 'nt' else _LinuxApi()
+        self.applied = {}           # pid -> 角色
+        self.failures = {}          # (角色, 方面) -> 原因，每种失败只提示一次
+        self.counts = {}            # 角色 -> 累计应用过策略的进程数
+        self._watches = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        for policy in self.policies.values():
+            self.log(f"[*] 调度策略 {policy.role}: {policy.describe()}")
+
+    def popen_kwargs(self, role):
+        """创建进程时附加的 Popen 参数"""
+        return self.api.popen_kwargs(self.policies[role])
+
+    def apply(self, role, pid):
+        """对一个进程应用策略，返回是否全部成功"""
+        policy = self.policies[role]
+        with self._lock:
+            self.applied[pid] = role
+            self.counts[role] = self.counts.get(role, 0) + 1
+        failed = self.api.apply(pid, policy)
+        for aspect, reason in failed:
+            if (role, aspect) not in self.failures:
+                self.failures[role, aspect] = reason
+                self.log(f"[!] 无法设置 {role} 进程 (PID: {pid}) 的 {aspect}: {reason}")
+        return not failed
+
+    def watch(self, role, roots, images=()):
+        self._watches[role] = (roots, {proc_watch._norm(n) for n in images} | set(self.policies[role].images))
+
+    def sweep(self):
+        """扫描一次进程表，对尚未应用过策略的子孙进程与匹配映像名的进程应用策略，返回本次应用的数量"""
+        table = [row for row in shutdown._process_table() if row[0] != os.getpid()]
+        alive = {pid for pid, _, _ in table}
+        pairs = [(pid, ppid) for pid, ppid, _ in table]
+        count = 0
+        with self._lock:
+            # 已退出的进程移出记录，避免 PID 复用后被跳过
+            for pid in set(self.applied) - alive:
+                del self.applied[pid]
+        for role, (roots, images) in self._watches.items():
+            pids = {pid for pid in roots() if pid in alive}
+            if images:
+                pids |= {pid for pid, _, exe in table if proc_watch._norm(exe) in images}
+            pids |= shutdown._descendants(pids, pairs)
+            for pid in sorted(pids):
+                if pid not in self.applied:
+                    self.apply(role, pid)
+                    count += 1
+        return count
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.sweep()
+            except Exception as e:
+                self.log(f"[!] 调度策略扫描失败: {e}")
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="sched-policy", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
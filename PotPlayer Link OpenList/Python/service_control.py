@@ -0,0 +1,332 @@
+# ================= 代码说明 =================
+# 文件名: service_control.py
+# 功能: Windows 服务控制
+#       ScmBackend 直接调用 SCM API (advapi32)，不再经由 cmd.exe + net.exe
+#       FakeBackend 为进程内模拟实现，可在 Linux 下演练启动/停止流程
+#       所有操作返回带状态与耗时的 ServiceResult
+# 作者: H_Knight
+# 日期: 2026-10-18
+# ===========================================
+
+import os
+import threading
+import time
+
+# 服务状态 (与 SERVICE_STATUS.dwCurrentState 对应)
+STATE_NAMES = {
+    1: "STOPPED",
+    2: "START_PENDING",
+    3: "STOP_PENDING",
+    4: "RUNNING",
+    5: "CONTINUE_PENDING",
+    6: "PAUSE_PENDING",
+    7: "PAUSED",
+}
+
+
+class ServiceError(Exception):
+    """服务控制失败"""
+
+
+class ServicePendingError(ServiceError):
+    """服务正处于切换中的状态，暂不接受该请求；settle 为需要先等到的状态"""
+
+    def __init__(self, message, settle):
+        super().__init__(message)
+        self.settle = settle
+
+
+class ServiceResult:
+    """一次服务操作的结果"""
+
+    def __init__(self, action, service, ok, state=None, pid=None, already=False, elapsed=0.0, error=None):
+        self.action = action        # "start" | "stop" | "status"
+        self.service = service
+        self.ok = ok
+        self.state = state          # 操作完成时的服务状态名
+        self.pid = pid              # 服务进程 PID (未运行时为 None)
+        self.already = already      # 启动时已在运行 / 停止时已是停止状态
+        self.elapsed = elapsed      # 操作耗时 (秒)
+        self.error = error
+
+    def as_dict(self):
+        return {
+            "action": self.action,
+            "service": self.service,
+            "ok": self.ok,
+            "state": self.state,
+            "pid": self.pid,
+            "already": self.already,
+            "elapsed": round(self.elapsed, 4),
+            "error": None if self.error is None else str(self.error),
+        }
+
+    def __repr__(self):
+        return f"ServiceResult({self.as_dict()})"
+
+
+class ScmBackend:
+    """通过 ctypes 调用 Windows 服务控制管理器 (SCM)"""
+
+    SC_MANAGER_CONNECT = 0x0001
+    SERVICE_QUERY_STATUS = 0x0004
+    SERVICE_START = 0x0010
+    SERVICE_STOP = 0x0020
+    SERVICE_CONTROL_STOP = 0x00000001
+    SC_STATUS_PROCESS_INFO = 0
+    ERROR_SERVICE_ALREADY_RUNNING = 1056
+    ERROR_SERVICE_CANNOT_ACCEPT_CTRL = 1061
+    ERROR_SERVICE_NOT_ACTIVE = 1062
+
+    def __init__(self):
+        import ctypes
+        from ctypes import wintypes
+
+        self._ctypes = ctypes
+        self._advapi = ctypes.WinDLL("advapi32", use_last_error=True)
+
+        class SERVICE_STATUS_PROCESS(ctypes.Structure):
+            _fields_ = [(name, wintypes.DWORD) for name in (
+                "dwServiceType", "dwCurrentState", "dwControlsAccepted", "dwWin32ExitCode",
+                "dwServiceSpecificExitCode", "dwCheckPoint", "dwWaitHint", "dwProcessId", "dwServiceFlags")]
+
+        class SERVICE_STATUS(ctypes.Structure):
+            _fields_ = [(name, wintypes.DWORD) for name in (
+                "dwServiceType", "dwCurrentState", "dwControlsAccepted", "dwWin32ExitCode",
+                "dwServiceSpecificExitCode", "dwCheckPoint", "dwWaitHint")]
+
+        self._SERVICE_STATUS_PROCESS = SERVICE_STATUS_PROCESS
+        self._SERVICE_STATUS = SERVICE_STATUS
+
+        adv = self._advapi
+        adv.OpenSCManagerW.argtypes = [wintypes.LPCWSTR, wintypes.LPCWSTR, wintypes.DWORD]
+        adv.OpenSCManagerW.restype = wintypes.HANDLE
+        adv.OpenServiceW.argtypes = [wintypes.HANDLE, wintypes.LPCWSTR, wintypes.DWORD]
+        adv.OpenServiceW.restype = wintypes.HANDLE
+        adv.CloseServiceHandle.argtypes = [wintypes.HANDLE]
+        adv.CloseServiceHandle.restype = wintypes.BOOL
+        adv.StartServiceW.argtypes = [wintypes.HANDLE, wintypes.DWORD, ctypes.c_void_p]
+        adv.StartServiceW.restype = wintypes.BOOL
+        adv.ControlService.argtypes = [wintypes.HANDLE, wintypes.DWORD, ctypes.POINTER(SERVICE_STATUS)]
+        adv.ControlService.restype = wintypes.BOOL
+        adv.QueryServiceStatusEx.argtypes = [wintypes.HANDLE, ctypes.c_int, ctypes.c_void_p,
+                                             wintypes.DWORD, ctypes.POINTER(wintypes.DWORD)]
+        adv.QueryServiceStatusEx.restype = wintypes.BOOL
+
+    def _error(self, what):
+        code = self._ctypes.get_last_error()
+        return ServiceError(f"{what} 失败: {self._ctypes.FormatError(code)} ({code})")
+
+    def _open(self, name, access):
+        """打开服务句柄，返回 (scm 句柄, 服务句柄)"""
+        scm = self._advapi.OpenSCManagerW(None, None, self.SC_MANAGER_CONNECT)
+        if not scm:
+            raise self._error("OpenSCManager")
+        svc = self._advapi.OpenServiceW(scm, name, access)
+        if not svc:
+            err = self._error(f"OpenService({name})")
+            self._advapi.CloseServiceHandle(scm)
+            raise err
+        return scm, svc
+
+    def _close(self, scm, svc):
+        self._advapi.CloseServiceHandle(svc)
+        self._advapi.CloseServiceHandle(scm)
+
+    def _query(self, svc):
+        ctypes = self._ctypes
+        status = self._SERVICE_STATUS_PROCESS()
+        needed = ctypes.c_ulong(0)
+        if not self._advapi.QueryServiceStatusEx(svc, self.SC_STATUS_PROCESS_INFO, ctypes.byref(status),
+                                                 ctypes.sizeof(status), ctypes.byref(needed)):
+            raise self._error("QueryServiceStatusEx")
+        return STATE_NAMES.get(status.dwCurrentState, str(status.dwCurrentState)), status.dwProcessId or None
+
+    def query(self, name):
+        """返回 (状态名, PID)"""
+        scm, svc = self._open(name, self.SERVICE_QUERY_STATUS)
+        try:
+            return self._query(svc)
+        finally:
+            self._close(scm, svc)
+
+    def start(self, name):
+        """发送启动请求，返回 True 表示服务此前已在运行"""
+        scm, svc = self._open(name, self.SERVICE_START | self.SERVICE_QUERY_STATUS)
+        try:
+            if not self._advapi.StartServiceW(svc, 0, None):
+                if self._ctypes.get_last_error() == self.ERROR_SERVICE_ALREADY_RUNNING:
+                    # 1056 也会在服务正在停止时返回，此时服务随后会变为 STOPPED，需等它停下再启动
+                    if self._query(svc)[0] == "STOP_PENDING":
+                        raise ServicePendingError(f"服务 {name} 正在停止，暂不能启动", "STOPPED")
+                    return True
+                raise self._error(f"StartService({name})")
+            return False
+        finally:
+            self._close(scm, svc)
+
+    def stop(self, name):
+        """发送停止请求，返回 True 表示服务此前已停止"""
+        scm, svc = self._open(name, self.SERVICE_STOP | self.SERVICE_QUERY_STATUS)
+        try:
+            status = self._SERVICE_STATUS()
+            if not self._advapi.ControlService(svc, self.SERVICE_CONTROL_STOP, self._ctypes.byref(status)):
+                code = self._ctypes.get_last_error()
+                if code == self.ERROR_SERVICE_NOT_ACTIVE:
+                    return True
+                if code == self.ERROR_SERVICE_CANNOT_ACCEPT_CTRL:
+                    # 1061: 服务正在启动或已在停止，按当前状态区分
+                    state = self._query(svc)[0]
+                    if state == "STOP_PENDING":
+                        return True
+                    if state == "START_PENDING":
+                        raise ServicePendingError(f"服务 {name} 正在启动，暂不接受停止请求", "RUNNING")
+                raise self._error(f"ControlService({name}, STOP)")
+            return False
+        finally:
+            self._close(scm, svc)
+
+
+class FakeBackend:
+    """
+    进程内模拟的服务后端 (用于 Linux 下测试)
+    start_delay / stop_delay 模拟服务从 PENDING 变为最终状态所需的时间
+    """
+
+    def __init__(self, start_delay=0.05, stop_delay=0.05, fail_start=False):
+        self.start_delay = start_delay
+        self.stop_delay = stop_delay
+        self.fail_start = fail_start
+        self._lock = threading.Lock()
+        self._states = {}
+        self._next_pid = 40000
+        self.calls = []      # 记录收到的请求，便于测试断言
+
+    def _set_later(self, name, delay, state, expect):
+        def apply():
+            with self._lock:
+                if self._states.get(name, ("STOPPED", None))[0] == expect:
+                    pid = self._next_pid if state == "RUNNING" else None
+                    self._next_pid += 1
+                    self._states[name] = (state, pid)
+        timer = threading.Timer(delay, apply)
+        timer.daemon = True
+        timer.start()
+
+    def query(self, name):
+        with self._lock:
+            return self._states.get(name, ("STOPPED", None))
+
+    def start(self, name):
+        self.calls.append(("start", name))
+        if self.fail_start:
+            raise ServiceError(f"模拟启动失败: {name}")
+        with self._lock:
+            state = self._states.get(name, ("STOPPED", None))[0]
+            if state in ("RUNNING", "START_PENDING"):
+                return True
+            if state == "STOP_PENDING":
+                # 与 SCM 一致: 停止中的服务不能启动 (1056)
+                raise ServicePendingError(f"服务 {name} 正在停止，暂不能启动", "STOPPED")
+            self._states[name] = ("START_PENDING", None)
+        self._set_later(name, self.start_delay, "RUNNING", "START_PENDING")
+        return False
+
+    def stop(self, name):
+        self.calls.append(("stop", name))
+        with self._lock:
+            state, pid = self._states.get(name, ("STOPPED", None))
+            if state in ("STOPPED", "STOP_PENDING"):
+                return True
+            if state == "START_PENDING":
+                # 与 SCM 一致: 启动中的服务不接受停止控制 (1061)
+                raise ServicePendingError(f"服务 {name} 正在启动，暂不接受停止请求", "RUNNING")
+            self._states[name] = ("STOP_PENDING", pid)
+        self._set_later(name, self.stop_delay, "STOPPED", "STOP_PENDING")
+        return False
+
+
+class ServiceController:
+    """服务控制入口，封装等待与计时逻辑"""
+
+    def __init__(self, backend, clock=time.monotonic, sleep=time.sleep):
+        self.backend = backend
+        self.clock = clock
+        self.sleep = sleep
+
+    def query_state(self, name):
+        """只返回状态名，查询失败返回 None (可直接作为 readiness.ServiceProbe 的 query)"""
+        try:
+            return self.backend.query(name)[0]
+        except ServiceError:
+            return None
+
+    def status(self, name):
+        t0 = self.clock()
+        try:
+            state, pid = self.backend.query(name)
+            return ServiceResult("status", name, True, state, pid, elapsed=self.clock() - t0)
+        except ServiceError as e:
+            return ServiceResult("status", name, False, elapsed=self.clock() - t0, error=e)
+
+    def _wait_for(self, name, target, timeout):
+        """轮询直到服务进入 target 状态，返回 (状态名, PID)"""
+        deadline = self.clock() + timeout
+        delay = 0.01
+        state, pid = self.backend.query(name)
+        while state != target and self.clock() < deadline:
+            self.sleep(delay)
+            delay = min(delay * 2, 0.25)
+            state, pid = self.backend.query(name)
+        return state, pid
+
+    def start(self, name, wait=False, timeout=10.0):
+        """
+        启动服务；已在运行时直接返回 (already=True)
+        wait=False 只发出启动请求立即返回，由后续的就绪探测负责等待
+        服务仍在停止 (STOP_PENDING) 时先等它进入 STOPPED 再启动，等待时间计入 timeout
+        """
+        return self._control("start", name, "RUNNING", wait, timeout)
+
+    def stop(self, name, wait=False, timeout=10.0):
+        """
+        停止服务；已停止时直接返回 (already=True)
+        服务仍在启动 (START_PENDING) 时先等它进入 RUNNING 再停止，等待时间计入 timeout
+        """
+        return self._control("stop", name, "STOPPED", wait, timeout)
+
+    def _control(self, action, name, target, wait, timeout):
+        t0 = self.clock()
+        try:
+            try:
+                already = getattr(self.backend, action)(name)
+            except ServicePendingError as e:
+                state, _ = self._wait_for(name, e.settle, timeout)
+                if state != e.settle:
+                    raise ServiceError(f"等待服务 {name} 进入 {e.settle} 超时 (当前 {state})")
+                already = getattr(self.backend, action)(name)
+            if wait:
+                state, pid = self._wait_for(name, target, max(0.0, timeout - (self.clock() - t0)))
+                if state != target:
+                    raise ServiceError(f"等待服务 {name} 进入 {target} 超时 (当前 {state})")
+            else:
+                state, pid = self.backend.query(name)
+            return ServiceResult(action, name, True, state, pid, already, self.clock() - t0)
+        except ServiceError as e:
+            return ServiceResult(action, name, False, elapsed=self.clock() - t0, error=e)
+
+
+def create_controller(kind=None):
+    """
+    按名称创建控制器: "scm" (Windows 默认) | "fake"
+    其他平台没有 SCM，必须显式指定 "fake"，不会悄悄换成模拟服务
+    """
+    if kind is None:
+        if os.name != 'nt':
+            raise ServiceError('当前平台没有 Windows 服务控制管理器，测试时请配置 service_backend: "fake"')
+        kind = "scm"
+    if kind == "scm":
+        return ServiceController(ScmBackend())
+    if kind == "fake":
+        return ServiceController(FakeBackend())
+    raise ValueError(f"未知的服务控制后端: {kind}")
@@ -0,0 +1,288 @@
+# ================= 代码说明 =================
+# 文件名: session_journal.py
+# 功能: 防崩溃的会话记录与遗留后端的认领
+#       启动器被强制结束 (关闭控制台、崩溃、断电) 时 finally 中的清理不会执行，后端进程 / 服务会遗留下来；
+#       下次启动若照常 net start / Popen，要么白白等一次完整的冷启动，要么与遗留进程争抢端口
+#       运行期间在配置目录下维护:
+#         .launcher_session.lock   启动器存活期间持有的文件锁 (进程退出时由系统释放，崩溃也不例外)
+#         launcher_session.json    会话记录: 启动器与后端进程的 PID + 进程创建时间 (防止 PID 复用误判)、端口、状态
+#       启动时能拿到锁且存在会话记录，说明上次的启动器异常退出:
+#         记录中的后端仍在运行 (PID 与创建时间都吻合) 且通过就绪探测 -> 认领 (adopt)，本次不再启动后端
+#         仍在运行但不健康 -> 关闭遗留进程 (服务类后端为停止服务) 并等待端口释放，然后照常启动
+#         已全部退出 -> 清除过期记录 (reclaim)
+#       正常关闭后端后删除会话记录；保温模式下后端归守护进程管理，不使用会话记录
+#       默认关闭，配置项 session_journal: {"enabled": true, "adopt_deadline": 3}
+# 作者: H_Knight
+# 日期: 2026-10-18
+# ===========================================
+
+import json
+import os
+import socket
+import threading
+import time
+from urllib.parse import urlsplit
+
+import readiness
+import shutdown
+
+JOURNAL_NAME = "launcher_session.json"
+LOCK_NAME = ".launcher_session.lock"
+ADOPT_DEADLINE = 3.0        # 认领前确认遗留后端健康的最长等待 (秒)
+PORT_WAIT = 3.0             # 关闭遗留后端后等待端口释放的最长时间
+
+
+# ================= 进程身份 =================
+def _linux_start_time(pid):
+    try:
+        with open(f"/proc/{pid}/stat", 'rb') as f:
+            data = f.read()
+    except OSError:
+        return None
+    fields = data[data.rfind(b")") + 2:].split()
+    if fields[0] == b"Z":
+        return None
+    return int(fields[19])      # starttime: 开机后的时钟滴答数
+
+
+def _windows_start_time(pid):
+    import ctypes
+    from ctypes import wintypes
+    PROCESS_QUERY_LIMITED_INFORMATION = 0x1000
+    STILL_ACTIVE = 259
+    k = ctypes.WinDLL("kernel32", use_last_error=True)
+    k.OpenProcess.argtypes = [wintypes.DWORD, wintypes.BOOL, wintypes.DWORD]
+    k.OpenProcess.restype = wintypes.HANDLE
+    k.GetProcessTimes.argtypes = [wintypes.HANDLE] + [ctypes.POINTER(ctypes.c_ulonglong)] * 4
+    k.GetProcessTimes.restype = wintypes.BOOL
+    k.GetExitCodeProcess.argtypes = [wintypes.HANDLE, ctypes.POINTER(wintypes.DWORD)]
+    k.GetExitCodeProcess.restype = wintypes.BOOL
+    k.CloseHandle.argtypes = [wintypes.HANDLE]
+    h = k.OpenProcess(PROCESS_QUERY_LIMITED_INFORMATION, False, pid)
+    if not h:
+        return None
+    try:
+        code = wintypes.DWORD()
+        if not k.GetExitCodeProcess(h, ctypes.byref(code)) or code.value != STILL_ACTIVE:
+            return None
+        created, exited, kernel, user = (ctypes.c_ulonglong() for _ in range(4))
+        if not k.GetProcessTimes(h, ctypes.byref(created), ctypes.byref(exited), ctypes.byref(kernel),
+                                 ctypes.byref(user)):
+            return None
+        return created.value
+    finally:
+        k.CloseHandle(h)
+
+
+def process_start_time(pid):
+    """进程创建时间 (与 PID 一起唯一标识一个进程)，进程不存在或已退出时返回 None"""
+    return _windows_start_time(pid) if os.name == 'nt' else _linux_start_time(pid)
+
+
+def process_alive(pid, started):
+    return started is not None and process_start_time(pid) == started
+
+
+class AdoptedProcess:
+    """认领的遗留进程，提供插件用到的 Popen 接口 (pid / poll / wait)"""
+
+    def __init__(self, pid, started):
+        self.pid = pid
+        self.started = started
+        self.returncode = None
+
+    def poll(self):
+        if self.returncode is None and not process_alive(self.pid, self.started):
+            self.returncode = -1        # 不是本进程的子进程，拿不到真实的退出码
+        return self.returncode
+
+    def wait(self, timeout=None):
+        end = None if timeout is None else time.monotonic() + timeout
+        while self.poll() is None:
+            if end is not None and time.monotonic() > end:
+                import subprocess
+                raise subprocess.TimeoutExpired(str(self.pid), timeout)
+            time.sleep(0.05)
+        return self.returncode
+
+
+# ================= 端口 =================
+def probe_ports(plugin):
+    """后端就绪探测中用到的本机端口"""
+    ports = set()
+    specs = plugin.config.get("readiness", {}).get("probes", plugin.default_probe_specs())
+    for spec in specs:
+        if spec.get("type") == "tcp":
+            ports.add(int(spec["port"]))
+        elif spec.get("type") == "http":
+            parts = urlsplit(spec.get("url", readiness.DEFAULT_PING_URL))
+            if parts.hostname in ("127.0.0.1", "localhost", "::1"):
+                ports.add(parts.port or 80)
+    return sorted(ports)
+
+
+def port_in_use(port):
+    try:
+        with socket.create_connection(("127.0.0.1", port), timeout=0.2):
+            return True
+    except OSError:
+        return False
+
+
+class OrphanReport:
+    """启动时检查遗留后端的结果"""
+
+    def __init__(self, action=None, detail=""):
+        self.action = action        # None: 无遗留 / "adopted" / "reclaimed" (含关闭不健康的遗留进程)
+        self.detail = detail
+        self.elapsed = 0.0
+
+    @property
+    def adopted(self):
+        return self.action == "adopted"
+
+
+# ================= 会话记录 =================
+class SessionJournal:
+    """
+    会话记录
+    acquire(): 取得文件锁，失败说明另一个启动器正在运行
+    recover(plugin): 检查上次异常退出留下的后端，认领或清理，返回 OrphanReport
+    begin / record_backend: 写入本次会话的启动器、后端进程与端口
+    close(clean): clean 时删除记录 (后端已正常关闭)，否则保留给下次启动检查
+    """
+
+    def __init__(self, base_path, log=print):
+        self.path = os.path.join(base_path, JOURNAL_NAME)
+        self.lock_path = os.path.join(base_path, LOCK_NAME)
+        self.log = log
+        self.data = {}
+        self._fd = None
+        self._lock = threading.Lock()
+
+    # ---------- 文件锁 ----------
+    def acquire(self):
+        fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            if os.name == 'nt':
+                import msvcrt
+                msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+            else:
+                import fcntl
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+        self._fd = fd
+        return True
+
+    def close(self, clean):
+        if clean:
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
+        if self._fd is not None:
+            # 关闭文件描述符即释放锁
+            os.close(self._fd)
+            self._fd = None
+
+    # ---------- 读写 ----------
+    def read(self):
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return data if isinstance(data, dict) else None
+
+    def _write(self, **fields):
+        import config_store
+        with self._lock:
+            self.data.update(fields, updated=round(time.time(), 3))
+            try:
+                config_store.atomic_write_json(self.path, self.data)
+            except OSError as e:
+                self.log(f"[!] 写入会话记录失败: {e}")
+
+    def begin(self, config, plugin):
+        self._write(launcher={"pid": os.getpid(), "started": process_start_time(os.getpid())},
+                    profile=config.get("profile"), backend=plugin.name, service=plugin.service_name,
+                    ports=probe_ports(plugin), processes=[], state="starting")
+
+    def record_backend(self, plugin, state=None):
+        """记录后端进程及其当前的子孙进程 (如 AlistHelper -> alist / rclone)"""
+        process = getattr(plugin, "process", None)
+        processes = []
+        if process is not None:
+            table = [row for row in shutdown._process_table() if row[0] != os.getpid()]
+            names = {pid: exe for pid, _, exe in table}
+            pids = [process.pid] + sorted(shutdown._descendants({process.pid}, [(p, pp) for p, pp, _ in table]))
+            for pid in pids:
+                started = process_start_time(pid)
+                if started is not None:
+                    processes.append({"pid": pid, "started": started, "image": names.get(pid, "")})
+        self._write(processes=processes, **({"state": state} if state else {}))
+
+    # ---------- 遗留后端 ----------
+    def recover(self, plugin, config):
+        t0 = time.perf_counter()
+        report = self._recover(plugin, config)
+        report.elapsed = time.perf_counter() - t0
+        if report.action:
+            self.log(f"[*] 上次会话异常退出: {report.detail} ({report.elapsed * 1000:.0f} ms)")
+        return report
+
+    def _recover(self, plugin, config):
+        old = self.read()
+        if old is None:
+            return OrphanReport()
+        alive = [p for p in old.get("processes", []) if process_alive(p["pid"], p["started"])]
+        root = old.get("processes", [None])[0] if old.get("processes") else None
+        same = old.get("backend") == plugin.name
+        deadline = float(config.get("session_journal", {}).get("adopt_deadline", ADOPT_DEADLINE))
+
+        if same and old.get("service") and not old.get("processes"):
+            # 服务类后端: 服务仍在运行且健康时直接沿用
+            if not plugin.is_running():
+                return OrphanReport("reclaimed", "遗留的服务已停止，照常启动")
+            if self._healthy(plugin, deadline):
+                return OrphanReport("adopted", f"服务 {old['service']} 仍在运行且健康，沿用")
+            # 运行中但不健康: 先停止，否则之后的启动请求因服务已在运行而不起作用
+            try:
+                plugin.stop(wait=True)
+            except Exception as e:
+                return OrphanReport("reclaimed", f"遗留的服务 {old['service']} 不健康，停止失败 ({e})，照常启动")
+            return OrphanReport("reclaimed", f"遗留的服务 {old['service']} 不健康，已停止后照常启动")
+
+        if not alive:
+            return OrphanReport("reclaimed", "遗留的后端进程均已退出，已清除过期记录")
+
+        if same and root in alive and hasattr(plugin, "adopt"):
+            plugin.adopt(root["pid"], root["started"])
+            if self._healthy(plugin, deadline):
+                return OrphanReport("adopted", f"后端 (PID: {root['pid']}) 仍在运行且健康，沿用")
+            plugin.process = None
+
+        # 不健康 / 后端类型已更换 / 主进程已退出只剩子进程: 关闭遗留进程，等端口释放后照常启动
+        targets = [(p.get("image") or str(p["pid"]), p["pid"]) for p in alive]
+        shutdown.shutdown_processes(targets, config.get("shutdown_deadline", shutdown.DEFAULT_DEADLINE),
+                                    log=self.log)
+        busy = self._wait_ports(old.get("ports", []))
+        detail = f"已关闭 {len(targets)} 个不可用的遗留后端进程"
+        if busy:
+            detail += f"，端口 {', '.join(map(str, busy))} 仍被占用"
+        return OrphanReport("reclaimed", detail)
+
+    def _healthy(self, plugin, deadline):
+        report = readiness.wait_until_ready(plugin.readiness_probes(), deadline=deadline)
+        return report.ready and plugin.is_running()
+
+    @staticmethod
+    def _wait_ports(ports):
+        end = time.monotonic() + PORT_WAIT
+        busy = [p for p in ports if port_in_use(p)]
+        while busy and time.monotonic() < end:
+            time.sleep(0.05)
+            busy = [p for p in busy if port_in_use(p)]
+        return busy
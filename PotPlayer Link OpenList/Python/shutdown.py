@@ -0,0 +1,349 @@
+# ================= 代码说明 =================
+# 文件名: shutdown.py
+# 功能: 后端进程的关闭流水线
+#       同时向所有目标发送正常关闭请求，在同一个截止时间内并行等待，超时仍未退出的才强制结束
+#       总耗时取决于最慢的进程 (且不超过截止时间)，而不是所有进程耗时之和
+#       Windows: 向进程的顶层窗口发送 WM_CLOSE (等同于不带 /F 的 taskkill)；没有窗口的控制台程序若是
+#                以 CREATE_NEW_PROCESS_GROUP 启动的进程组组长 (groups)，发送 CTRL_BREAK_EVENT；强制结束用 TerminateProcess
+#       Linux: SIGTERM，强制结束用 SIGKILL
+# 作者: H_Knight
+# 日期: 2026-10-18
+# ===========================================
+
+import os
+import signal
+import threading
+import time
+
+import proc_watch
+
+DEFAULT_DEADLINE = 3.0      # 正常关闭的共享截止时间 (秒)
+KILL_WAIT = 1.0             # 强制结束后等待进程消失的时间 (秒)
+
+
+class ShutdownResult:
+    """单个进程的关闭结果"""
+
+    def __init__(self, name, pid):
+        self.name = name
+        self.pid = pid
+        self.graceful_sent = False   # 是否发出了正常关闭请求
+        self.exited = False          # 最终是否已退出
+        self.forced = False          # 是否被强制结束
+        self.latency = None          # 从发出请求到退出的耗时 (秒)
+        self.error = None
+
+    def as_dict(self):
+        return {
+            "name": self.name,
+            "pid": self.pid,
+            "graceful_sent": self.graceful_sent,
+            "exited": self.exited,
+            "forced": self.forced,
+            "latency": None if self.latency is None else round(self.latency, 4),
+            "error": self.error,
+        }
+
+
+# ================= 平台相关 =================
+class _WinOps:
+    WM_CLOSE = 0x0010
+    CTRL_BREAK_EVENT = 1
+    SYNCHRONIZE = 0x00100000
+    PROCESS_TERMINATE = 0x0001
+    WAIT_OBJECT_0 = 0
+    ERROR_ACCESS_DENIED = 5
+    ERROR_INVALID_PARAMETER = 87      # OpenProcess: 进程已不存在
+
+    def __init__(self):
+        import ctypes
+        from ctypes import wintypes
+
+        self.ctypes = ctypes
+        self.k = ctypes.WinDLL("kernel32", use_last_error=True)
+        self.u = ctypes.WinDLL("user32", use_last_error=True)
+        self.WNDENUMPROC = ctypes.WINFUNCTYPE(wintypes.BOOL, wintypes.HWND, wintypes.LPARAM)
+        self.u.EnumWindows.argtypes = [self.WNDENUMPROC, wintypes.LPARAM]
+        self.u.GetWindowThreadProcessId.argtypes = [wintypes.HWND, ctypes.POINTER(wintypes.DWORD)]
+        self.u.PostMessageW.argtypes = [wintypes.HWND, wintypes.UINT, wintypes.WPARAM, wintypes.LPARAM]
+        self.k.OpenProcess.argtypes = [wintypes.DWORD, wintypes.BOOL, wintypes.DWORD]
+        self.k.OpenProcess.restype = wintypes.HANDLE
+        self.k.WaitForSingleObject.argtypes = [wintypes.HANDLE, wintypes.DWORD]
+        self.k.WaitForSingleObject.restype = wintypes.DWORD
+        self.k.TerminateProcess.argtypes = [wintypes.HANDLE, wintypes.UINT]
+        self.k.CloseHandle.argtypes = [wintypes.HANDLE]
+        self.k.GenerateConsoleCtrlEvent.argtypes = [wintypes.DWORD, wintypes.DWORD]
+        self.k.GenerateConsoleCtrlEvent.restype = wintypes.BOOL
+        self._handles = {}
+        self._errors = {}
+
+    def _handle(self, pid):
+        if pid not in self._handles:
+            h = self.k.OpenProcess(self.SYNCHRONIZE | self.PROCESS_TERMINATE, False, pid)
+            if not h and self.ctypes.get_last_error() == self.ERROR_ACCESS_DENIED:
+                # 无权结束 (如以更高权限运行的进程) 时至少要能等待它退出
+                h = self.k.OpenProcess(self.SYNCHRONIZE, False, pid)
+            if not h:
+                self._errors[pid] = self.ctypes.get_last_error()
+            self._handles[pid] = h
+        return self._handles[pid]
+
+    def prepare(self, pid):
+        """提前打开进程句柄，避免等待期间 PID 被复用"""
+        self._handle(pid)
+
+    def request_close(self, pid, group=False):
+        """
+        向进程的所有顶层窗口投递 WM_CLOSE，返回是否发出了关闭请求
+        WM_CLOSE 只对有窗口的程序有效；group=True 时 pid 为与本进程共用控制台的进程组组长，
+        没有窗口则向该进程组发送 CTRL_BREAK_EVENT (CTRL_C 在新进程组中默认被忽略)
+        """
+        ctypes = self.ctypes
+        posted = []
+
+        def on_window(hwnd, _):
+            owner = ctypes.c_ulong(0)
+            self.u.GetWindowThreadProcessId(hwnd, ctypes.byref(owner))
+            if owner.value == pid:
+                self.u.PostMessageW(hwnd, self.WM_CLOSE, 0, 0)
+                posted.append(hwnd)
+            return True
+
+        self.u.EnumWindows(self.WNDENUMPROC(on_window), 0)
+        if posted:
+            return True
+        if group:
+            return bool(self.k.GenerateConsoleCtrlEvent(self.CTRL_BREAK_EVENT, pid))
+        return False
+
+    def wait(self, pid, timeout):
+        """等待进程退出；进程已不存在时返回 True，无权访问时抛出 PermissionError (不当作已退出)"""
+        h = self._handle(pid)
+        if not h:
+            code = self._errors.get(pid)
+            if code == self.ERROR_INVALID_PARAMETER:
+                return True
+            if code == self.ERROR_ACCESS_DENIED:
+                raise PermissionError(f"无权访问进程 {pid}，无法确认其是否退出")
+            raise OSError(f"无法打开进程 {pid} (错误 {code})")
+        return self.k.WaitForSingleObject(h, int(max(timeout, 0) * 1000)) == self.WAIT_OBJECT_0
+
+    def kill(self, pid):
+        h = self._handle(pid)
+        if h:
+            self.k.TerminateProcess(h, 1)
+
+    def close(self):
+        for h in self._handles.values():
+            if h:
+                self.k.CloseHandle(h)
+        self._handles.clear()
+
+
+class _PosixOps:
+    def prepare(self, pid):
+        pass
+
+    def request_close(self, pid, group=False):
+        try:
+            os.kill(pid, signal.SIGTERM)
+            return True
+        except ProcessLookupError:
+            return True
+        except OSError:
+            return False
+
+    def wait(self, pid, timeout):
+        """等待进程退出 (pidfd 阻塞等待；不可用时退化为短间隔检查)"""
+        try:
+            fd = os.pidfd_open(pid)
+        except ProcessLookupError:
+            return True
+        except (OSError, AttributeError):
+            fd = None
+        if fd is not None:
+            import select
+            try:
+                poller = select.poll()
+                poller.register(fd, select.POLLIN)
+                if not poller.poll(max(timeout, 0) * 1000):
+                    return False
+            finally:
+                os.close(fd)
+            self._reap(pid)
+            return True
+        deadline = time.monotonic() + timeout
+        while True:
+            self._reap(pid)
+            try:
+                os.kill(pid, 0)
+            except ProcessLookupError:
+                return True
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.02)
+
+    def _reap(self, pid):
+        # 目标若是本进程的子进程，回收僵尸
+        try:
+            os.waitpid(pid, os.WNOHANG)
+        except ChildProcessError:
+            pass
+
+    def kill(self, pid):
+        try:
+            os.kill(pid, signal.SIGKILL)
+        except OSError:
+            pass
+
+    def close(self):
+        pass
+
+
+def _ops():
+    return _WinOps() if os.name == 'nt' else _PosixOps()
+
+
+# ================= 流水线 =================
+def shutdown_processes(targets, deadline=DEFAULT_DEADLINE, kill_wait=KILL_WAIT, parents=None, groups=(), log=print):
+    """
+    关闭一组进程
+    targets: [(名称, PID), ...]
+    parents: {PID: 父 PID}，没有正常关闭通道 (无窗口) 的进程若父进程也在目标内，
+             先给父进程机会去关闭它，否则立即强制结束
+    groups: 以 CREATE_NEW_PROCESS_GROUP 启动的进程组组长 PID (Windows 下可发送 CTRL_BREAK_EVENT)
+    返回 [ShutdownResult, ...]
+    """
+    ops = _ops()
+    parents = parents or {}
+    target_pids = {pid for _, pid in targets}
+    results = [ShutdownResult(name, pid) for name, pid in targets]
+    t0 = time.monotonic()
+    end = t0 + deadline
+
+    # 1. 同时发出所有正常关闭请求
+    for r in results:
+        ops.prepare(r.pid)
+    immediate = []
+    for r in results:
+        try:
+            r.graceful_sent = ops.request_close(r.pid, r.pid in groups)
+        except Exception as e:
+            r.error = str(e)
+        if not r.graceful_sent and parents.get(r.pid) not in target_pids:
+            immediate.append(r)
+
+    def finish(r, forced):
+        r.exited = True
+        r.forced = forced
+        r.latency = time.monotonic() - t0
+
+    # 2. 共享截止时间内并行等待；超时或无法正常关闭的进程强制结束
+    def worker(r):
+        try:
+            if r not in immediate and ops.wait(r.pid, end - time.monotonic()):
+                finish(r, False)
+                return
+            ops.kill(r.pid)
+            if ops.wait(r.pid, kill_wait):
+                finish(r, True)
+            else:
+                r.forced = True
+        except Exception as e:
+            r.error = str(e)
+
+    threads = [threading.Thread(target=worker, args=(r,), daemon=True) for r in results]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    ops.close()
+
+    for r in results:
+        if r.exited:
+            how = "强制结束" if r.forced else "正常退出"
+            log(f"[-] {r.name} (PID: {r.pid}) {how}，耗时 {r.latency * 1000:.0f} ms")
+        else:
+            log(f"[!] {r.name} (PID: {r.pid}) 未能结束 {r.error or ''}")
+    return results
+
+
+def _descendants(roots, pairs):
+    """根据 (pid, ppid) 列表计算 roots 的全部子孙"""
+    children = {}
+    for pid, ppid in pairs:
+        children.setdefault(ppid, []).append(pid)
+    found, stack = set(), list(roots)
+    while stack:
+        for child in children.get(stack.pop(), []):
+            if child not in found and child not in roots:
+                found.add(child)
+                stack.append(child)
+    return found
+
+
+def _process_table():
+    """返回 [(pid, ppid, 映像名)]"""
+    if os.name == 'nt':
+        return proc_watch._WinApi().snapshot()
+    table = []
+    for pid in proc_watch._list_pids():
+        stat = proc_watch._read_proc_stat(pid)
+        if stat is not None:
+            table.append((pid, stat[0], proc_watch._proc_image(pid)))
+    return table
+
+
+def image_targets(image_names, table, include_children=True):
+    """按映像名 (及其子孙) 选出关闭目标，返回 {PID: 名称}"""
+    wanted = {proc_watch._norm(n) for n in image_names}
+    names = {pid: exe for pid, _, exe in table}
+    roots = {pid for pid, _, exe in table if proc_watch._norm(exe) in wanted}
+    pids = set(roots)
+    if include_children:
+        pids |= _descendants(roots, [(pid, ppid) for pid, ppid, _ in table])
+    return {pid: names.get(pid, str(pid)) for pid in pids}
+
+
+def tree_targets(name, root_pid, table):
+    """一个进程及其全部子孙，返回 {PID: 名称}"""
+    names = {pid: exe for pid, _, exe in table}
+    pids = {root_pid} | _descendants({root_pid}, [(pid, ppid) for pid, ppid, _ in table])
+    return {pid: name if pid == root_pid else names.get(pid, str(pid)) for pid in pids}
+
+
+def shutdown_table():
+    """关闭前的进程表 (不含本进程) 与 {PID: 父 PID}"""
+    table = [row for row in _process_table() if row[0] != os.getpid()]
+    return table, {pid: ppid for pid, ppid, _ in table}
+
+
+def shutdown_images(image_names, deadline=DEFAULT_DEADLINE, include_children=True, log=print):
+    """
+    按映像名关闭进程 (替代 taskkill /F /IM ... /T)
+    include_children: 同时关闭这些进程的子孙进程
+    """
+    table, parents = shutdown_table()
+    found = image_targets(image_names, table, include_children)
+    if not found:
+        log("[-] 没有需要关闭的后端进程")
+        return []
+    targets = [(found[pid], pid) for pid in sorted(found)]
+    return shutdown_processes(targets, deadline, parents=parents, log=log)
+
+
+def shutdown_tree(name, root_pid, deadline=DEFAULT_DEADLINE, group=False, log=print):
+    """
+    关闭一个进程及其全部子孙进程 (用于启动器自己拉起的后端)
+    group: 根进程以 CREATE_NEW_PROCESS_GROUP 启动 (Windows 下无窗口时改发 CTRL_BREAK_EVENT)
+    """
+    table, parents = shutdown_table()
+    found = tree_targets(name, root_pid, table)
+    targets = [(found[pid], pid) for pid in sorted(found)]
+    return shutdown_processes(targets, deadline, parents=parents, groups={root_pid} if group else (), log=log)
+
+
+def summarize(results):
+    """返回 (总耗时, 强制结束数量)"""
+    latencies = [r.latency for r in results if r.latency is not None]
+    return (max(latencies) if latencies else 0.0), sum(1 for r in results if r.forced)
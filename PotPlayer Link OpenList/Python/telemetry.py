@@ -0,0 +1,147 @@
+# ================= 代码说明 =================
+# 文件名: telemetry.py
+# 功能: 启动耗时记录
+#       把每次启动的各阶段耗时 (配置加载、提权、后端启动、就绪、播放器启动、会话时长、关闭) 记为 span，
+#       会话结束时以 JSONL 一次性追加到本地日志，日志超过大小上限后轮转 (.1 .2 ...)
+#       配置项 telemetry: {"enabled": true, "path": "...", "max_bytes": 1048576, "backups": 3}
+#       与其他可选功能不同，默认启用: 它不改变启动行为，每次会话只在结束时本地追加一次 (不联网)，
+#       磁盘占用被轮转限制在 max_bytes * (backups + 1) 以内；各项优化是否有效都要靠这份耗时记录对比
+# 作者: H_Knight
+# 日期: 2026-10-18
+# ===========================================
+
+import json
+import os
+import time
+import uuid
+
+LOG_NAME = "launcher_timings.jsonl"
+MAX_BYTES = 1024 * 1024
+BACKUPS = 3
+# 提权重启时由原进程传入的时间戳，用于计算提权 (UAC) 耗时
+LAUNCH_T0_FLAG = "--launch-t0="
+
+
+class Span:
+    """
+    计时上下文
+    with recorder.span("backend_stop", backend="alisthelper") as sp:
+        sp.attrs["forced"] = 1
+    代码块抛出异常时记为 ok=False
+    """
+
+    def __init__(self, recorder, name, attrs):
+        self.recorder = recorder
+        self.name = name
+        self.attrs = attrs
+        self.start = None
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.recorder.add(self.name, self.start, time.perf_counter(), ok=exc_type is None, **self.attrs)
+        return False
+
+
+class SpanRecorder:
+    """
+    一次启动会话的 span 记录器
+    每条 span 的 start 为相对会话开始的秒数 (perf_counter)，会话开始的墙钟时间记在 ts 中
+    """
+
+    def __init__(self, session=None, **attrs):
+        self.session = session or uuid.uuid4().hex[:12]
+        self.ts = time.time()
+        self.t0 = time.perf_counter()
+        self.attrs = attrs          # 写入每条记录的公共字段 (profile、backend 等)
+        self.spans = []
+
+    def span(self, name, **attrs):
+        return Span(self, name, attrs)
+
+    def add(self, name, start, end, ok=True, **attrs):
+        """记录一个 span (start / end 为 perf_counter 时间)"""
+        self.spans.append({"span": name, "start": round(start - self.t0, 6),
+                           "duration": round(end - start, 6), "ok": ok, **attrs})
+
+    def add_offset(self, name, offset, duration, ok=True, **attrs):
+        """记录一个以相对会话开始的秒数表示的 span (用于合并编排器的步骤耗时)"""
+        self.spans.append({"span": name, "start": round(offset, 6),
+                           "duration": round(duration, 6), "ok": ok, **attrs})
+
+    def add_steps(self, timings, base):
+        """
+        合并 LaunchOrchestrator 的步骤耗时
+        base: 编排开始时的 perf_counter 时间
+        """
+        offset = base - self.t0
+        for t in timings.values():
+            if t.skipped or t.start is None:
+                self.add_offset(t.name, offset, 0.0, ok=False, skipped=True)
+            else:
+                self.add_offset(t.name, offset + t.start, t.duration or 0.0, ok=t.ok)
+
+    def records(self):
+        return [{"ts": round(self.ts, 3), "session": self.session, **self.attrs, **s} for s in self.spans]
+
+
+class RotatingLog:
+    """按大小轮转的 JSONL 日志: path 超过 max_bytes 时依次改名为 path.1 ... path.N"""
+
+    def __init__(self, path, max_bytes=MAX_BYTES, backups=BACKUPS):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+
+    def _rotate(self):
+        for i in range(self.backups - 1, 0, -1):
+            src = f"{self.path}.{i}"
+            if os.path.exists(src):
+                os.replace(src, f"{self.path}.{i + 1}")
+        if self.backups > 0:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.unlink(self.path)
+
+    def write(self, records):
+        data = "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in records)
+        try:
+            size = os.path.getsize(self.path)
+        except OSError:
+            size = 0
+        if size and size + len(data) > self.max_bytes:
+            self._rotate()
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(data)
+
+
+def launch_t0_from_argv(argv):
+    """读取提权重启前记录的时间戳，没有时返回 None"""
+    for arg in argv:
+        if arg.startswith(LAUNCH_T0_FLAG):
+            try:
+                return float(arg[len(LAUNCH_T0_FLAG):])
+            except ValueError:
+                return None
+    return None
+
+
+def open_log(config, base_path):
+    """按配置返回 RotatingLog，关闭记录时返回 None"""
+    cfg = config.get("telemetry", {})
+    if not cfg.get("enabled", True):
+        return None
+    path = cfg.get("path") or os.path.join(base_path, LOG_NAME)
+    return RotatingLog(path, cfg.get("max_bytes", MAX_BYTES), cfg.get("backups", BACKUPS))
+
+
+def flush(recorder, log_file):
+    """写出本次会话的全部 span；记录失败不影响启动器本身"""
+    if log_file is None:
+        return
+    try:
+        log_file.write(recorder.records())
+    except Exception as e:
+        print(f"[!] 无法写入耗时日志: {e}")
@@ -0,0 +1,59 @@
+# ================= 代码说明 =================
+# 文件名: tests/conftest.py
+# 功能: pytest 公共设置 —— 把启动器目录加入导入路径，提供本机 HTTP / TCP 替身服务
+# 作者: H_Knight
+# 日期: 2026-10-18
+# 用法: 在 Python 目录下运行 python -m pytest -q tests
+# ===========================================
+
+import os
+import socket
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        status = self.server.status
+        body = b"pong" if status == 200 else b"error"
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def http_server():
+    """本机 HTTP 替身: server.status 控制返回的状态码，server.port 为端口"""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    server.status = 200
+    server.port = server.server_address[1]
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def tcp_listener():
+    """本机 TCP 监听端口 (只接受连接)"""
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    sock.listen(16)
+    yield sock.getsockname()[1]
+    sock.close()
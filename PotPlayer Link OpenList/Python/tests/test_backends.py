@@ -0,0 +1,95 @@
+# ================= 代码说明 =================
+# 文件名: tests/test_backends.py
+# 功能: 后端插件测试 (插件注册表；以 benchmarks/stub_backend.py 替身运行进程类后端的启动、认领与关闭，Linux 下运行)
+# 作者: H_Knight
+# 日期: 2026-10-18
+# ===========================================
+
+import os
+import shutil
+import subprocess
+import sys
+
+import pytest
+
+import backends
+import readiness
+import session_journal
+import shutdown
+from conftest import free_port
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+import stub_backend  # noqa: E402
+
+linux_only = pytest.mark.skipif(not sys.platform.startswith("linux"), reason="替身程序为 shell 脚本，使用 /proc")
+
+
+def load(tmp_path, name, **extra):
+    config = dict(stub_backend.standin_config(name, str(tmp_path), free_port()), shutdown_deadline=2, **extra)
+    return backends.load_backend(config["backend"], config, log=lambda msg: None, state_dir=str(tmp_path))
+
+
+def wait_ready(plugin):
+    assert readiness.wait_until_ready(plugin.readiness_probes(), deadline=10).ready
+
+
+def alive(pids):
+    return [pid for pid in pids if session_journal.process_start_time(pid) is not None]
+
+
+def test_unknown_backend_is_a_clear_error():
+    with pytest.raises(ValueError, match="未知的后端类型: nope .*command"):
+        backends.load_backend("nope", {})
+
+
+@pytest.mark.parametrize("name, cls", [("openlist_service", "OpenListServiceBackend"),
+                                       ("alisthelper", "AlistHelperBackend"),
+                                       ("rclone_mount", "RcloneMountBackend"), ("command", "CommandBackend")])
+def test_registry_loads_plugin(name, cls):
+    plugin = backends.load_backend(name, {}, log=lambda msg: None)
+    assert type(plugin).__name__ == cls and plugin.name == name
+
+
+@linux_only
+def test_stop_closes_tree_and_image_targets(tmp_path):
+    # 映像名目标: 复制 sleep 为独立的映像名，不属于插件拉起的进程树
+    image = tmp_path / "pwstub_extra"
+    shutil.copy(shutil.which("sleep"), image)
+    extra = subprocess.Popen([str(image), "30"])
+    plugin = load(tmp_path, "alisthelper", backend_stop_images=["pwstub_extra"])
+    try:
+        plugin.start()
+        wait_ready(plugin)
+        tree = shutdown.tree_targets(plugin.name, plugin.process.pid, shutdown.shutdown_table()[0])
+        assert len(tree) >= 3           # 替身本身 + STUB_CHILDREN 个子进程
+        results = plugin.stop()
+        assert {r.pid for r in results} == set(tree) | {extra.pid}
+        assert all(r.exited for r in results)
+        assert extra.wait(2) is not None
+        assert not alive(tree) and plugin.process is None and not plugin.is_running()
+    finally:
+        extra.kill()
+        extra.wait()
+
+
+@linux_only
+def test_adopt_then_is_running(tmp_path):
+    plugin = load(tmp_path, "command")
+    orphan = subprocess.Popen(plugin.command())
+    try:
+        started = session_journal.process_start_time(orphan.pid)
+        fresh = backends.load_backend("command", plugin.config, log=lambda msg: None)
+        fresh.adopt(orphan.pid, started)
+        assert fresh.is_running()
+        wait_ready(fresh)
+        # 创建时间不符 (PID 已被复用) 的认领视为已退出
+        stale = backends.load_backend("command", plugin.config, log=lambda msg: None)
+        stale.adopt(orphan.pid, started + 1)
+        assert not stale.is_running()
+        # 关闭作用于认领的进程
+        results = fresh.stop()
+        assert [r.pid for r in results] == [orphan.pid] and results[0].exited
+        assert orphan.wait(2) is not None and not fresh.is_running()
+    finally:
+        orphan.kill()
+        orphan.wait()
@@ -0,0 +1,132 @@
+# ================= 代码说明 =================
+# 文件名: tests/test_broker.py
+# 功能: 特权代理测试 (策略文件与请求处理；代理在线程中运行，使用模拟服务，Linux 下可运行)
+# 作者: H_Knight
+# 日期: 2026-10-18
+# ===========================================
+
+import os
+import threading
+import time
+
+import pytest
+
+import broker
+import config_store
+import service_control
+from service_control import ServiceError
+
+pytestmark = pytest.mark.skipif(os.name == 'nt', reason="Windows 下代理使用 TCP 端口文件与 ACL")
+
+
+def write_config(path, service_name="openlist_desktop_service", **shared):
+    config_store.atomic_write_json(str(path), {"version": 2, "active_profile": "a", **shared, "profiles": {
+        "a": {"backend": "openlist_service", "service_name": service_name},
+        "b": {"backend": "command"}}})
+    return config_store.ConfigStore(str(path), warn=lambda msg: None)
+
+
+def start_broker(policy):
+    """在线程中运行代理，等待其可以连接"""
+    thread = threading.Thread(target=broker.serve, args=(policy,), daemon=True)
+    thread.start()
+    end = time.monotonic() + 5
+    while not broker.available(broker.runtime_dir(policy), refresh=True):
+        assert time.monotonic() < end, "代理未能启动"
+        time.sleep(0.02)
+    return thread
+
+
+def test_freeze_policy_from_config(tmp_path):
+    store = write_config(tmp_path / "launcher_config.json", "svc_a", service_backend="broker")
+    assert broker.freeze_policy(store) == {"services": ["svc_a"], "service_backend": None}
+    store = write_config(tmp_path / "launcher_config.json", "svc_a", service_backend="fake")
+    assert broker.freeze_policy(store)["service_backend"] == "fake"
+
+
+def test_policy_roundtrip_and_permissions(tmp_path):
+    path = broker.write_policy({"services": ["svc"], "service_backend": "fake"}, str(tmp_path / "p" / "policy.json"))
+    assert broker.load_policy(path) == {"services": ["svc"], "service_backend": "fake"}
+    os.chmod(path, 0o666)
+    with pytest.raises(ServiceError, match="其他用户"):
+        broker.load_policy(path)
+
+
+@pytest.mark.parametrize("content", ["[]", '{"services": "svc"}', '{"services": [1]}', "not json"])
+def test_invalid_policy_rejected(tmp_path, content):
+    path = tmp_path / "policy.json"
+    path.write_text(content)
+    os.chmod(path, 0o644)
+    with pytest.raises(ServiceError):
+        broker.load_policy(str(path))
+
+
+def test_serve_refuses_without_policy(tmp_path):
+    assert broker.serve(str(tmp_path / "missing.json")) is False
+
+
+def test_allowlist_is_frozen(tmp_path):
+    """代理只认策略中的服务名，运行期间修改配置文件不会放开其他服务"""
+    store = write_config(tmp_path / "launcher_config.json", "svc_a", service_backend="fake")
+    policy = broker.write_policy(broker.freeze_policy(store), str(tmp_path / "policy.json"))
+    thread = start_broker(policy)
+    ctl = broker.BrokerController(str(tmp_path))
+    try:
+        assert ctl.start("svc_a", wait=True, timeout=2).state == "RUNNING"
+        write_config(tmp_path / "launcher_config.json", "svc_b", service_backend="fake")
+        result = ctl.start("svc_b")
+        assert not result.ok and "策略" in str(result.error)
+        assert ctl.stop("svc_a", wait=True, timeout=2).state == "STOPPED"
+    finally:
+        ctl.close()
+        broker.stop(str(tmp_path))
+        thread.join(5)
+    assert not thread.is_alive()
+
+
+def test_runtime_files_live_next_to_policy(tmp_path, monkeypatch):
+    """端口 / socket 与密钥放在策略文件所在目录，不读写启动器的状态目录"""
+    state_dir = tmp_path / "state"
+    state_dir.mkdir()
+    monkeypatch.chdir(state_dir)
+    policy = broker.write_policy({"services": ["svc"], "service_backend": "fake"}, str(tmp_path / "p" / "policy.json"))
+    directory = broker.runtime_dir(policy)
+    assert directory == str(tmp_path / "p")
+    assert broker.runtime_dir() != directory
+    thread = start_broker(policy)
+    try:
+        assert os.path.exists(os.path.join(directory, broker.KEY_NAME))
+        assert os.path.exists(broker.address(directory))
+        assert os.stat(os.path.join(directory, broker.KEY_NAME)).st_mode & 0o022 == 0
+        assert os.listdir(state_dir) == []
+    finally:
+        broker.stop(directory)
+        thread.join(5)
+    # 代理目录中没有密钥时视为代理不可用
+    os.remove(os.path.join(directory, broker.KEY_NAME))
+    assert not broker.available(directory, refresh=True)
+
+
+def test_available_is_cached(tmp_path, monkeypatch):
+    policy = broker.write_policy({"services": ["svc"], "service_backend": "fake"}, str(tmp_path / "policy.json"))
+    thread = start_broker(policy)
+    try:
+        import ipc
+        calls = []
+        connect = ipc.connect
+        monkeypatch.setattr(ipc, "connect", lambda *a: calls.append(a) or connect(*a))
+        assert broker.available(str(tmp_path)) and broker.available(str(tmp_path))
+        assert calls == []
+        assert broker.available(str(tmp_path), refresh=True) and len(calls) == 1
+    finally:
+        broker.stop(str(tmp_path))
+        thread.join(5)
+    # 代理退出后缓存失效
+    assert not broker.available(str(tmp_path))
+
+
+def test_broker_handle_without_store():
+    b = broker.Broker(["svc"], "/nonexistent", service_control.create_controller("fake"), log=lambda msg: None)
+    assert b._handle({"op": "status", "service": "svc"})["state"] == "STOPPED"
+    assert not b._handle({"op": "start", "service": "other"})["ok"]
+    assert not hasattr(b, "store")
@@ -0,0 +1,122 @@
+# ================= 代码说明 =================
+# 文件名: tests/test_config_store.py
+# 功能: 配置读写测试 (旧版配置迁移、损坏文件处理、原子写入与同一进程内的复用)
+# 作者: H_Knight
+# 日期: 2026-10-18
+# ===========================================
+
+import json
+import os
+
+import pytest
+
+import config_store
+from config_store import CONFIG_VERSION, ConfigError, ConfigStore
+
+
+def write(path, data):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(data if isinstance(data, str) else json.dumps(data))
+
+
+def make_store(path, **kwargs):
+    warnings = []
+    return ConfigStore(str(path), warn=warnings.append, **kwargs), warnings
+
+
+def test_migrate_legacy_openlist():
+    data = config_store.migrate({"potplayer_path": "C:\\PotPlayerMini64.exe", "player_requires_backend": True})
+    assert data["version"] == CONFIG_VERSION and data["active_profile"] == "openlist"
+    assert data["profiles"]["openlist"] == {"backend": "openlist_service", "potplayer_path": "C:\\PotPlayerMini64.exe"}
+    assert data["player_requires_backend"] is True
+
+
+def test_migrate_legacy_alist():
+    data = config_store.migrate({"potplayer_path": "p.exe", "alist_helper_path": "a.exe"})
+    assert data["active_profile"] == "alist"
+    assert data["profiles"]["alist"]["backend"] == "alisthelper"
+    assert data["profiles"]["alist"]["alist_helper_path"] == "a.exe"
+
+
+def test_migrate_current_version_unchanged():
+    data = {"version": CONFIG_VERSION, "active_profile": "x", "profiles": {"x": {"backend": "command"}}}
+    assert config_store.migrate(data) is data
+
+
+@pytest.mark.parametrize("bad", [
+    [],
+    {"version": "2"},
+    {"version": None},
+    {"version": True},
+    {"version": 2.0},
+    {"version": CONFIG_VERSION + 1},
+    {"version": CONFIG_VERSION, "profiles": []},
+    {"version": CONFIG_VERSION, "profiles": {"x": "openlist"}},
+])
+def test_migrate_rejects_invalid(bad):
+    with pytest.raises(ConfigError):
+        config_store.migrate(bad)
+
+
+@pytest.mark.parametrize("content", ["{not json", '{"version": "2"}', '{"version": null}', "[1, 2]"])
+def test_corrupt_file_is_kept_and_defaults_used(tmp_path, content):
+    path = tmp_path / "launcher_config.json"
+    write(path, content)
+    store, warnings = make_store(path)
+    config = store.load()
+    assert config["profile"] == "openlist" and config["backend"] == "openlist_service"
+    assert not path.exists() and (tmp_path / "launcher_config.json.corrupt").read_text() == content
+    assert len(warnings) == 1 and ".corrupt" in warnings[0]
+
+
+def test_missing_file_uses_defaults(tmp_path):
+    store, warnings = make_store(tmp_path / "none.json", default_profile="alist")
+    config = store.load()
+    assert config["profile"] == "alist" and config["backend"] == "alisthelper" and not warnings
+
+
+def test_type_errors_are_dropped_with_warning(tmp_path):
+    path = tmp_path / "launcher_config.json"
+    write(path, {"version": CONFIG_VERSION, "active_profile": "a", "single_instance": "yes",
+                 "profiles": {"a": {"backend": "command", "potplayer_path": 5}}})
+    store, warnings = make_store(path)
+    config = store.load()
+    assert config["single_instance"] is False and config["potplayer_path"] == ""
+    assert config["backend"] == "command" and len(warnings) == 2
+
+
+def test_save_migrates_and_writes_atomically(tmp_path):
+    path = tmp_path / "launcher_config.json"
+    write(path, {"potplayer_path": "old.exe"})
+    store, _ = make_store(path)
+    config = store.load()
+    config["potplayer_path"] = "new.exe"
+    config["player_requires_backend"] = True
+    store.save(config)
+    saved = json.loads(path.read_text(encoding='utf-8'))
+    assert saved["version"] == CONFIG_VERSION
+    assert saved["profiles"]["openlist"]["potplayer_path"] == "new.exe"
+    assert saved["player_requires_backend"] is True
+    # 与默认值相同且原本没有的字段不写入；不留下临时文件
+    assert "single_instance" not in saved
+    assert os.listdir(tmp_path) == ["launcher_config.json"]
+    assert make_store(path)[0].load()["potplayer_path"] == "new.exe"
+
+
+def test_profile_selection(tmp_path):
+    path = tmp_path / "launcher_config.json"
+    write(path, {"version": CONFIG_VERSION, "active_profile": "a",
+                 "profiles": {"a": {"backend": "command"}, "b": {"backend": "rclone_mount"}}})
+    assert make_store(path)[0].load()["backend"] == "command"
+    store = make_store(path, profile="b")[0]
+    assert store.load()["backend"] == "rclone_mount" and store.profiles() == ["a", "b"]
+
+
+def test_reload_after_external_change(tmp_path):
+    path = tmp_path / "launcher_config.json"
+    write(path, {"version": CONFIG_VERSION, "active_profile": "a", "profiles": {"a": {"potplayer_path": "1.exe"}}})
+    store, _ = make_store(path)
+    assert store.load()["potplayer_path"] == "1.exe"
+    assert store.data() is store.data()
+    write(path, {"version": CONFIG_VERSION, "active_profile": "a", "profiles": {"a": {"potplayer_path": "22.exe"}}})
+    assert store.load()["potplayer_path"] == "22.exe"
@@ -0,0 +1,69 @@
+# ================= 代码说明 =================
+# 文件名: tests/test_instance.py
+# 功能: 单实例转交测试 (监听在线程中运行，Linux 下为 Unix socket)
+# 作者: H_Knight
+# 日期: 2026-10-18
+# ===========================================
+
+import os
+import time
+
+import pytest
+
+import instance
+import ipc
+
+
+@pytest.fixture
+def server(tmp_path):
+    opened = []
+    srv = instance.InstanceServer(str(tmp_path), opened.append, log=lambda msg: None)
+    srv.start()
+    end = time.monotonic() + 5
+    while srv._listener is None:
+        assert time.monotonic() < end, "监听未能建立"
+        time.sleep(0.01)
+    srv.opened = opened
+    yield srv
+    srv.close()
+
+
+def test_media_args_strip_launcher_flags(tmp_path):
+    argv = ["--profile", "p", "--launch-t0=1.5", "--broker-policy=x.json", "a.mkv", "http://h/v.mp4", "/add"]
+    assert instance.media_args(argv, str(tmp_path)) == [str(tmp_path / "a.mkv"), "http://h/v.mp4", "/add"]
+
+
+def test_forward_to_running_instance(server, tmp_path):
+    assert instance.forward(str(tmp_path), ["x.mkv"], cwd=str(tmp_path))
+    assert server.opened == [[str(tmp_path / "x.mkv")]] and server.sessions == 2
+
+
+def test_wrong_key_does_not_kill_server(server, tmp_path):
+    with open(tmp_path / instance.AUTHKEY_NAME, 'rb') as f:
+        good = f.read()
+    with open(tmp_path / instance.AUTHKEY_NAME, 'wb') as f:
+        f.write(b"x" * 32)
+    # 密钥不一致: 转交失败 (调用方照常独立启动)，而不是抛出 AuthenticationError
+    assert not instance.forward(str(tmp_path), ["x.mkv"], cwd=str(tmp_path))
+    with open(tmp_path / instance.AUTHKEY_NAME, 'wb') as f:
+        f.write(good)
+    assert server._thread.is_alive()
+    assert instance.forward(str(tmp_path), ["y.mkv"], cwd=str(tmp_path))
+    assert server.opened == [[str(tmp_path / "y.mkv")]]
+
+
+@pytest.mark.parametrize("argv", [[], ["--profile", "p"], ["--install-broker"], ["--uninstall-broker", "x.mkv"]])
+def test_setup_or_empty_args_not_forwarded(server, tmp_path, argv):
+    assert not instance.forward(str(tmp_path), argv, cwd=str(tmp_path))
+    assert server.opened == [] and server.sessions == 1
+
+
+def test_no_server_means_no_forward(tmp_path):
+    assert not instance.forward(str(tmp_path), ["x.mkv"])
+
+
+def test_pipe_name_matches_ipc(monkeypatch, tmp_path):
+    monkeypatch.setattr(os, "name", "nt")
+    for d in ("a", "b"):
+        assert instance._address(str(tmp_path / d)) == ipc.address(instance.CHANNEL_NAME, str(tmp_path / d))
+    assert instance._address(str(tmp_path / "a")) != instance._address(str(tmp_path / "b"))
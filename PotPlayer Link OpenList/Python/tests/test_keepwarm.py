@@ -0,0 +1,139 @@
+# ================= 代码说明 =================
+# 文件名: tests/test_keepwarm.py
+# 功能: 保温守护进程与本机 IPC 测试 (守护进程在线程中运行，Linux 下可运行)
+# 作者: H_Knight
+# 日期: 2026-10-18
+# ===========================================
+
+import os
+import threading
+
+import pytest
+
+import ipc
+import keepwarm
+from service_control import ServiceError
+
+
+class StubBackend:
+    """记录调用的后端插件替身；fail_start 为 True 时 start() 抛出 ServiceError"""
+
+    def __init__(self, fail_start=False):
+        self.fail_start = fail_start
+        self.running = False
+        self.starts = 0
+
+    def start(self):
+        self.starts += 1
+        if self.fail_start:
+            raise ServiceError("模拟启动失败")
+        self.running = True
+
+    def stop(self):
+        self.running = False
+
+    def is_running(self):
+        return self.running
+
+
+@pytest.fixture
+def daemon(tmp_path):
+    """在线程中运行守护进程，返回 (守护进程, 地址, 密钥)"""
+    backend = StubBackend()
+    addr = ipc.address(keepwarm.CHANNEL_NAME, str(tmp_path))
+    authkey = ipc.load_authkey(str(tmp_path / "key"))
+    d = keepwarm.KeepWarmDaemon(backend, addr, authkey, grace=60, log=lambda msg: None)
+    thread = threading.Thread(target=d.serve_forever, daemon=True)
+    thread.start()
+    for _ in range(200):
+        if keepwarm.query_status(addr, authkey) is not None:
+            break
+        threading.Event().wait(0.01)
+    yield d, addr, authkey
+    keepwarm.stop_daemon(addr, authkey)
+    thread.join(2)
+
+
+def test_lease_refcount(daemon):
+    d, addr, authkey = daemon
+    first = keepwarm.acquire_lease(addr, authkey, ["false"])
+    second = keepwarm.acquire_lease(addr, authkey, ["false"])
+    assert first.started and not second.started and second.refs == 2
+    first.release()
+    assert keepwarm.query_status(addr, authkey)["refs"] == 1
+    second.release()
+    status = keepwarm.query_status(addr, authkey)
+    assert status["refs"] == 0 and status["idle_left"] is not None and status["backend_running"]
+
+
+def test_backend_start_failure_is_reported(daemon):
+    d, addr, authkey = daemon
+    d.backend.fail_start = True
+    with pytest.raises(RuntimeError, match="模拟启动失败"):
+        keepwarm.acquire_lease(addr, authkey, ["false"])
+    # 处理线程与守护进程仍然存活，失败的会话没有留下租约
+    assert keepwarm.query_status(addr, authkey)["refs"] == 0
+    d.backend.fail_start = False
+    lease = keepwarm.acquire_lease(addr, authkey, ["false"])
+    assert lease.started and lease.refs == 1
+    lease.release()
+
+
+def test_wrong_key_is_rejected_without_killing_listener(daemon, tmp_path):
+    d, addr, authkey = daemon
+    other = ipc.load_authkey(str(tmp_path / "other_key"))
+    assert ipc.connect(addr, other) is None
+    # 地址上的监听端仍存活: 不抢占，也不删除其 socket 文件
+    assert ipc.listen(addr, other) is None
+    assert keepwarm.query_status(addr, authkey)["ok"]
+
+
+def test_pipe_name_depends_on_state_dir(monkeypatch, tmp_path):
+    monkeypatch.setattr(os, "name", "nt")
+    a = ipc.address("keepwarm", str(tmp_path / "a"))
+    b = ipc.address("keepwarm", str(tmp_path / "b"))
+    assert a != b and a.startswith(r"\\.\pipe\PotPlayerLinkOpenList_keepwarm_")
+    assert a == ipc.address("keepwarm", str(tmp_path / "a"))
+
+
+def test_acquire_after_idle_exit_does_not_restart_backend(daemon):
+    """空闲超时关闭后端后，已建立的连接上再申请租约: 不能重启后端，回复 retry"""
+    d, addr, authkey = daemon
+    conn = ipc.connect(addr, authkey)
+    try:
+        # 先完成一次请求，确保该连接已交给处理线程 (否则主循环在 accept 之后看到正在退出会直接关闭它)
+        conn.send({"op": "status"})
+        conn.recv()
+        d._on_idle()
+        conn.send({"op": "acquire", "session": "late"})
+        reply = conn.recv()
+    finally:
+        conn.close()
+    assert not reply["ok"] and reply["retry"]
+    assert d.backend.starts == 0 and not d.backend.running
+
+
+class FakeConn:
+    def __init__(self, reply):
+        self.reply = reply
+        self.closed = False
+
+    def send(self, msg):
+        pass
+
+    def recv(self):
+        if self.reply is None:
+            raise EOFError
+        return self.reply
+
+    def close(self):
+        self.closed = True
+
+
+def test_acquire_lease_reconnects_on_retry(monkeypatch):
+    conns = [FakeConn(None), FakeConn({"ok": False, "retry": True}), FakeConn({"ok": True, "started": True})]
+    pending = list(conns)
+    monkeypatch.setattr(keepwarm, "_connect_or_spawn", lambda *args: pending.pop(0))
+    lease = keepwarm.acquire_lease("addr", b"key", ["false"])
+    assert lease.conn is conns[2] and lease.started
+    assert conns[0].closed and conns[1].closed and not pending
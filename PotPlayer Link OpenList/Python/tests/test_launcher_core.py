@@ -0,0 +1,26 @@
+# ================= 代码说明 =================
+# 文件名: tests/test_launcher_core.py
+# 功能: 启动器功能开关测试 (可选功能均默认关闭，配置 enabled: true 后启用)
+# 作者: H_Knight
+# 日期: 2026-10-18
+# ===========================================
+
+import pytest
+
+import launcher_core
+
+
+@pytest.mark.parametrize("helper, section", [
+    (launcher_core.watchdog_enabled, "watchdog"),
+    (launcher_core.journal_enabled, "session_journal"),
+    (launcher_core.capture_enabled, "output_capture"),
+])
+def test_optional_features_default_off(helper, section):
+    assert not helper({})
+    assert not helper({section: {}})
+    assert helper({section: {"enabled": True}})
+
+
+def test_journal_not_used_with_keep_warm():
+    # 保温模式下后端归守护进程管理
+    assert not launcher_core.journal_enabled({"session_journal": {"enabled": True}, "keep_warm": {"enabled": True}})
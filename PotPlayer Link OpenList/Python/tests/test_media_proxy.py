@@ -0,0 +1,189 @@
+# ================= 代码说明 =================
+# 文件名: tests/test_media_proxy.py
+# 功能: 媒体代理测试 (本机源站替身: 正常 Range / 忽略 Range / Content-Range 无总大小 / 先发一部分后停顿)
+# 作者: H_Knight
+# 日期: 2026-10-18
+# ===========================================
+
+import http.client
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from media_proxy import ChunkCache, MediaProxy, cache_key
+from prefetch import ConnectionPool
+
+KB = 1024
+CHUNK = 64 * KB
+DATA = bytes(range(256)) * (CHUNK * 4 // 256)
+
+
+class _OriginHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.server.seen.append(self.path)
+        m = re.match(r"bytes=(\d+)-(\d*)", self.headers.get("Range", ""))
+        if self.path.startswith("/norange") or not m:
+            # 忽略 Range，返回整个文件
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(DATA) * 64))
+            self.end_headers()
+            try:
+                for _ in range(64):
+                    self.wfile.write(DATA)
+            except OSError:
+                pass
+            return
+        start = int(m.group(1))
+        end = min(int(m.group(2) or len(DATA) - 1), len(DATA) - 1)
+        total = "*" if self.path.startswith("/nototal") else str(len(DATA))
+        body = DATA[start:end + 1]
+        self.send_response(206)
+        self.send_header("Content-Range", f"bytes {start}-{end}/{total}")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if self.path.startswith("/slow") and start > 0:
+            # 先发一小段，等测试放行后再发其余部分
+            self.wfile.write(body[:KB])
+            self.wfile.flush()
+            self.server.release.wait(10)
+            body = body[KB:]
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def origin():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _OriginHandler)
+    server.daemon_threads = True
+    server.seen = []
+    server.release = threading.Event()
+    server.base = f"http://127.0.0.1:{server.server_address[1]}"
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def make_proxy(tmp_path, chunk=CHUNK):
+    proxy = MediaProxy(ChunkCache(str(tmp_path / "cache"), 64 * CHUNK, chunk), readahead_chunks=0, log=lambda m: None)
+    proxy.start()
+    return proxy
+
+
+def get(proxy, url, rng=None):
+    conn = http.client.HTTPConnection("127.0.0.1", proxy.port, timeout=10)
+    path = proxy.url_for(url).split(str(proxy.port), 1)[1]
+    conn.request("GET", path, headers={"Range": rng} if rng else {})
+    resp = conn.getresponse()
+    body = resp.read()
+    conn.close()
+    return resp.status, resp.headers, body
+
+
+def test_range_request_served_and_cached(tmp_path, origin):
+    proxy = make_proxy(tmp_path)
+    try:
+        status, _, body = get(proxy, f"{origin.base}/ok/v.mkv?sign=abc", f"bytes={CHUNK - 10}-{CHUNK + 9}")
+        assert status == 206 and body == DATA[CHUNK - 10:CHUNK + 10]
+        seen = len(origin.seen)
+        # 换了签名仍命中同一份缓存
+        status, _, body = get(proxy, f"{origin.base}/ok/v.mkv?sign=xyz", f"bytes={CHUNK - 10}-{CHUNK + 9}")
+        assert status == 206 and body == DATA[CHUNK - 10:CHUNK + 10] and len(origin.seen) == seen
+    finally:
+        proxy.close()
+
+
+def test_cache_miss_streams_before_chunk_completes(tmp_path, origin):
+    proxy = make_proxy(tmp_path)
+    try:
+        url = f"{origin.base}/slow/v.mkv"
+        assert get(proxy, url, "bytes=0-9")[2] == DATA[:10]
+        # 第 1 块回源停在前 1 KB: 播放器应先收到这部分，而不是等整块下载完
+        conn = http.client.HTTPConnection("127.0.0.1", proxy.port, timeout=2)
+        conn.request("GET", proxy.url_for(url).split(str(proxy.port), 1)[1],
+                     headers={"Range": f"bytes={CHUNK}-{CHUNK + 2 * KB - 1}"})
+        resp = conn.getresponse()
+        assert resp.status == 206 and resp.read(100) == DATA[CHUNK:CHUNK + 100]
+        origin.release.set()
+        assert resp.read() == DATA[CHUNK + 100:CHUNK + 2 * KB]
+        conn.close()
+        # 整块收完后才写入缓存 (在回源线程中)
+        end = time.monotonic() + 5
+        while not proxy.cache.has(cache_key(url), 1):
+            assert time.monotonic() < end, "分块未写入缓存"
+            time.sleep(0.01)
+        assert proxy.stats["misses"] == 2
+    finally:
+        origin.release.set()
+        proxy.close()
+
+
+def test_origin_ignoring_range_redirects_without_reading_file(tmp_path, origin):
+    proxy = make_proxy(tmp_path)
+    try:
+        url = f"{origin.base}/norange/v.mkv"
+        status, headers, _ = get(proxy, url, "bytes=0-99")
+        assert status == 302 and headers["Location"] == url
+        assert not (tmp_path / "cache" / cache_key(url)).exists()
+    finally:
+        proxy.close()
+
+
+def test_pool_limit_stops_reading(origin):
+    pool = ConnectionPool(origin.base)
+    status, _, data = pool.fetch("GET", "/norange/v.mkv", limit=100)
+    assert status == 200 and data == DATA[:100]
+    # 被截断的连接不放回连接池
+    assert pool._idle.empty()
+    status, _, data = pool.fetch("GET", "/ok/v.mkv", headers={"Range": "bytes=0-9"}, limit=10)
+    assert status == 206 and data == DATA[:10] and pool._idle.qsize() == 1
+    pool.close()
+
+
+def test_missing_total_is_bad_gateway(tmp_path, origin):
+    proxy = make_proxy(tmp_path)
+    try:
+        url = f"{origin.base}/nototal/v.mkv"
+        status, _, _ = get(proxy, url, "bytes=0-99")
+        assert status == 502
+        assert proxy.cache.meta(cache_key(url)) is None
+    finally:
+        proxy.close()
+
+
+def test_chunk_size_change_drops_old_chunks(tmp_path, origin):
+    url = f"{origin.base}/ok/v.mkv"
+    proxy = make_proxy(tmp_path, chunk=CHUNK // 2)
+    try:
+        assert get(proxy, url, "bytes=0-9")[2] == DATA[:10]
+    finally:
+        proxy.close()
+    key = cache_key(url)
+    assert proxy.cache.meta(key)["chunk_size"] == CHUNK // 2
+    proxy = make_proxy(tmp_path)
+    try:
+        status, _, body = get(proxy, url, f"bytes={CHUNK - 10}-{CHUNK + 9}")
+        assert status == 206 and body == DATA[CHUNK - 10:CHUNK + 10]
+        with open(tmp_path / "cache" / key / "meta.json", encoding='utf-8') as f:
+            assert json.load(f)["chunk_size"] == CHUNK
+    finally:
+        proxy.close()
+
+
+@pytest.mark.parametrize("a, b, same", [
+    ("http://h/d/a.mkv?sign=1", "http://h/d/a.mkv?sign=2", True),
+    ("http://h/a.mkv?X-Amz-Signature=1&X-Amz-Expires=5", "http://h/a.mkv", True),
+    ("http://h/a.mkv?b=2&a=1", "http://h/a.mkv?a=1&b=2", True),
+    ("http://h/get?id=1&sign=x", "http://h/get?id=2&sign=x", False),
+    ("http://h/a.mkv", "http://h/b.mkv", False),
+])
+def test_cache_key(a, b, same):
+    assert (cache_key(a) == cache_key(b)) is same
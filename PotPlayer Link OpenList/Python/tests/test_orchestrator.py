@@ -0,0 +1,122 @@
+# ================= 代码说明 =================
+# 文件名: tests/test_orchestrator.py
+# 功能: 启动编排器测试 (步骤为替身外部命令与普通函数，Linux 下可运行)
+# 作者: H_Knight
+# 日期: 2026-10-18
+# ===========================================
+
+import sys
+import time
+
+import pytest
+
+import orchestrator
+
+
+def sleeper(seconds, code=0):
+    """替身命令: 睡 seconds 秒后以 code 退出"""
+    return orchestrator.command_step([sys.executable, "-c", f"import time, sys; time.sleep({seconds}); sys.exit({code})"])
+
+
+def test_independent_steps_run_in_parallel():
+    orch = orchestrator.LaunchOrchestrator()
+    orch.add("backend", sleeper(0.4)).add("player", sleeper(0.4))
+    t0 = time.perf_counter()
+    timings = orch.run_sync()
+    elapsed = time.perf_counter() - t0
+    assert all(t.ok for t in timings.values())
+    # 串行至少 0.8 秒
+    assert elapsed < 0.75
+    assert orch.results == {"backend": 0, "player": 0}
+
+
+def test_dependent_step_waits_for_its_requirement():
+    orch = orchestrator.LaunchOrchestrator()
+    orch.add("backend_start", sleeper(0.2))
+    orch.add("backend_ready", lambda: "ready", requires=["backend_start"])
+    timings = orch.run_sync()
+    assert timings["backend_ready"].start >= timings["backend_start"].end
+    assert orch.results["backend_ready"] == "ready"
+
+
+def test_failed_command_skips_dependents_only():
+    orch = orchestrator.LaunchOrchestrator()
+    orch.add("backend_start", sleeper(0, code=3))
+    orch.add("backend_ready", lambda: None, requires=["backend_start"])
+    orch.add("prefetch", lambda: None, requires=["backend_ready"])
+    orch.add("player_spawn", lambda: "player")
+    timings = orch.run_sync()
+    assert not timings["backend_start"].ok and "返回 3" in str(timings["backend_start"].error)
+    assert timings["backend_ready"].skipped and timings["prefetch"].skipped
+    assert timings["player_spawn"].ok
+    assert [t.name for t in orch.failed()] == ["backend_start"]
+
+
+def test_exception_in_function_step_is_recorded():
+    def boom():
+        raise RuntimeError("启动失败")
+
+    orch = orchestrator.LaunchOrchestrator()
+    orch.add("a", boom)
+    timings = orch.run_sync()
+    assert not timings["a"].ok and str(timings["a"].error) == "启动失败"
+    assert timings["a"].duration is not None
+
+
+def test_after_waits_but_runs_when_dependency_fails():
+    """弱依赖: 等解析结束，解析失败或被跳过时播放器照常启动"""
+    def boom():
+        raise KeyError("name")
+
+    orch = orchestrator.LaunchOrchestrator()
+    orch.add("backend_ready", sleeper(0, code=1))
+    orch.add("resolve", lambda: ["list.dpl"], requires=["backend_ready"])
+    orch.add("resolve_bad", boom)
+    orch.add("slow", sleeper(0.1))
+    orch.add("player_spawn", lambda: orch.results.get("resolve", ["raw"]), after=["resolve", "resolve_bad", "slow"])
+    timings = orch.run_sync()
+    assert timings["resolve"].skipped and not timings["resolve_bad"].ok
+    assert timings["player_spawn"].ok and orch.results["player_spawn"] == ["raw"]
+    assert timings["player_spawn"].start >= timings["slow"].end
+
+    orch = orchestrator.LaunchOrchestrator()
+    orch.add("a", lambda: None, after=["b"]).add("b", lambda: None, requires=["a"])
+    with pytest.raises(ValueError, match="循环依赖"):
+        orch.run_sync()
+
+
+def test_coroutine_steps_are_awaited():
+    async def step():
+        return 42
+
+    orch = orchestrator.LaunchOrchestrator()
+    orch.add("a", step)
+    orch.run_sync()
+    assert orch.results["a"] == 42
+
+
+def test_duplicate_unknown_and_cyclic_steps_are_rejected():
+    orch = orchestrator.LaunchOrchestrator()
+    orch.add("a", lambda: None)
+    with pytest.raises(ValueError):
+        orch.add("a", lambda: None)
+
+    orch = orchestrator.LaunchOrchestrator()
+    orch.add("a", lambda: None, requires=["missing"])
+    with pytest.raises(ValueError, match="不存在"):
+        orch.run_sync()
+
+    orch = orchestrator.LaunchOrchestrator()
+    orch.add("a", lambda: None, requires=["b"]).add("b", lambda: None, requires=["a"])
+    with pytest.raises(ValueError, match="循环依赖"):
+        orch.run_sync()
+
+
+def test_format_timings_orders_by_start():
+    orch = orchestrator.LaunchOrchestrator()
+    orch.add("late", lambda: None, requires=["early"]).add("early", sleeper(0.05))
+    orch.add("never", sleeper(0, code=1)).add("skipped", lambda: None, requires=["never"])
+    text = orchestrator.format_timings(orch.run_sync())
+    lines = text.splitlines()
+    assert lines.index(next(l for l in lines if "early" in l)) < lines.index(next(l for l in lines if "late" in l))
+    assert "跳过" in text and "失败" in text
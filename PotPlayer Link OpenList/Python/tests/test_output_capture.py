@@ -0,0 +1,111 @@
+# ================= 代码说明 =================
+# 文件名: tests/test_output_capture.py
+# 功能: 输出捕获测试 (环形缓冲的大小上限、跨读取的行拼接、只在出错或 flush="always" 时写出日志；
+#       只有后端继承忽略 SIGPIPE，播放器保持默认信号处理 (Linux 下运行))
+# 作者: H_Knight
+# 日期: 2026-10-18
+# ===========================================
+
+import json
+import subprocess
+import sys
+
+import pytest
+
+from output_capture import OutputCapture, RingBuffer, split_lines
+
+linux_only = pytest.mark.skipif(not sys.platform.startswith("linux"), reason="使用 /proc 查看信号处理")
+
+SIGPIPE_MASK = 1 << 12      # SIGPIPE = 13
+
+
+def ignored_signals(**kwargs):
+    out = subprocess.run(["sh", "-c", "grep SigIgn /proc/self/status"], **kwargs).stdout
+    return int(out.split()[1], 16)
+
+
+@linux_only
+def test_only_backend_ignores_sigpipe():
+    backend = ignored_signals(**OutputCapture.popen_kwargs(ignore_sigpipe=True))
+    player = ignored_signals(**OutputCapture.popen_kwargs())
+    assert backend & SIGPIPE_MASK
+    assert not player & SIGPIPE_MASK
+
+
+def test_ring_buffer_bound_and_eviction():
+    buf = RingBuffer(10)
+    for i, data in enumerate((b"aaaa", b"bbbb", b"cc")):
+        buf.append(i, "backend", 1, "stdout", data)
+    assert buf.size == 10 and buf.dropped == 0
+    buf.append(3, "backend", 1, "stdout", b"ddd")
+    # 超出上限时从最早的块开始丢弃
+    assert [c[5] for c in buf.snapshot()] == [b"bbbb", b"cc", b"ddd"] and buf.size == 9 and buf.dropped == 4
+    # 单块超过上限时只保留末尾
+    buf.append(4, "backend", 1, "stdout", b"0123456789AB")
+    assert [c[5] for c in buf.snapshot()] == [b"23456789AB"] and buf.size == 10
+    assert buf.total == 25 and buf.dropped == 15
+    assert [c[0] for c in buf.snapshot(after=4)] == [5]
+
+
+def test_split_lines_joins_partial_reads():
+    chunks = [(1, 1.0, "backend", 7, "stdout", b"hel"), (2, 1.1, "player", 8, "stdout", b"p1\n"),
+              (3, 1.2, "backend", 7, "stderr", b"err"), (4, 1.3, "backend", 7, "stdout", b"lo\r\nwor"),
+              (5, 1.4, "backend", 7, "stdout", b"ld\n" + "中".encode('utf-8')),
+              (6, 1.5, "backend", 7, "stdout", b"\n")]
+    lines = [(t, source, stream, text) for t, source, _, stream, text in split_lines(chunks)]
+    # 每行的时间取该行结束所在数据块的读取时间；没有换行结束的最后一段也是一行
+    assert lines == [(1.1, "player", "stdout", "p1"), (1.2, "backend", "stderr", "err"),
+                     (1.3, "backend", "stdout", "hello"), (1.4, "backend", "stdout", "world"),
+                     (1.5, "backend", "stdout", "中")]
+
+
+def make_capture(tmp_path, flush):
+    logs = []
+    cap = OutputCapture({"output_capture": {"flush": flush, "tail": 2}}, str(tmp_path), log=logs.append)
+    cap.buffers["backend"] = RingBuffer(cap.max_bytes)
+    cap.buffers["backend"].append(cap.t0 + 0.5, "backend", 7, "stdout", b"line1\nline2\nline3\n")
+    return cap, logs
+
+
+def read_log(tmp_path):
+    path = tmp_path / "launcher_output.jsonl"
+    if not path.exists():
+        return []
+    return [json.loads(line) for line in path.read_text(encoding='utf-8').splitlines()]
+
+
+def test_output_written_only_on_error(tmp_path):
+    cap, _ = make_capture(tmp_path, "error")
+    cap.finish()
+    assert read_log(tmp_path) == []
+
+    cap, logs = make_capture(tmp_path, "error")
+    cap.error("后端启动失败")
+    records = read_log(tmp_path)
+    assert records[0]["event"] == "flush" and records[0]["reason"] == "后端启动失败"
+    assert [r["line"] for r in records[1:]] == ["line1", "line2", "line3"] and records[1]["t"] == 0.5
+    # 控制台只显示最后 tail 行
+    assert [line for line in logs if line.startswith("    ")] == ["    +0.500s [7 stdout] line2",
+                                                                "    +0.500s [7 stdout] line3"]
+    # 已写出的部分不重复写出
+    cap.buffers["backend"].append(cap.t0 + 1, "backend", 7, "stdout", b"line4\n")
+    cap.finish()
+    assert [r.get("line") for r in read_log(tmp_path)[4:]] == [None, "line4"]
+
+
+def test_flush_always_writes_on_exit(tmp_path):
+    cap, _ = make_capture(tmp_path, "always")
+    cap.finish()
+    records = read_log(tmp_path)
+    assert records[0]["reason"] == "exit" and len(records) == 4
+
+
+def test_attach_reads_process_output(tmp_path):
+    cap, _ = make_capture(tmp_path, "always")
+    code = "import sys; sys.stdout.write('out\\n'); sys.stdout.flush(); sys.stderr.write('err')"
+    proc = subprocess.Popen([sys.executable, "-c", code], **OutputCapture.popen_kwargs())
+    cap.attach("player", proc)
+    proc.wait()
+    cap.finish()
+    lines = {(r["source"], r["stream"], r["line"]) for r in read_log(tmp_path) if "line" in r}
+    assert {("player", "stdout", "out"), ("player", "stderr", "err")} <= lines
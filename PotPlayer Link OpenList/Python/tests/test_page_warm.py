@@ -0,0 +1,81 @@
+# ================= 代码说明 =================
+# 文件名: tests/test_page_warm.py
+# 功能: 页缓存预热测试 (清单的目录限制、数据量上限、文件变化与删除、PotPlayer 换目录)
+# 作者: H_Knight
+# 日期: 2026-10-18
+# ===========================================
+
+import os
+
+import page_warm
+from page_warm import Manifest
+
+
+def make_files(root, sizes):
+    root.mkdir(exist_ok=True)
+    for name, size in sizes.items():
+        (root / name).write_bytes(b"x" * size)
+    return [str(root / name) for name in sizes]
+
+
+def test_relative_only_inside_root(tmp_path):
+    root = tmp_path / "PotPlayer"
+    (root / "Module").mkdir(parents=True)
+    manifest = Manifest(str(tmp_path / page_warm.MANIFEST_NAME), str(root))
+    assert manifest.relative(str(root / "Module" / "FFmpeg.dll")) == os.path.join("Module", "FFmpeg.dll")
+    # 同名前缀的兄弟目录、上级目录与根目录本身都不算
+    assert manifest.relative(str(tmp_path / "PotPlayer2" / "a.dll")) is None
+    assert manifest.relative(str(root / ".." / "a.dll")) is None
+    assert manifest.relative(str(root)) is None
+    assert manifest.learn([str(tmp_path / "outside.dll")]) == 0 and manifest.files == {}
+
+
+def test_targets_cap_and_order(tmp_path):
+    root = tmp_path / "PotPlayer"
+    paths = make_files(root, {"a.dll": 600, "b.dll": 500, "c.dll": 300})
+    manifest = Manifest(str(tmp_path / page_warm.MANIFEST_NAME), str(root))
+    for path in paths:
+        manifest.learn([path])
+    for rel, seen in (("a.dll", 3), ("b.dll", 2), ("c.dll", 1)):
+        manifest.files[rel]["seen"] = seen
+    # 最近加载过的在前；放不下的文件跳过，后面更小的照常预热
+    assert manifest.targets(1000) == [(paths[0], 600), (paths[2], 300)]
+    assert manifest.targets(10 ** 6) == [(paths[0], 600), (paths[1], 500), (paths[2], 300)]
+
+
+def test_targets_refresh_changed_and_drop_deleted(tmp_path):
+    root = tmp_path / "PotPlayer"
+    paths = make_files(root, {"a.dll": 100, "b.dll": 100})
+    manifest = Manifest(str(tmp_path / page_warm.MANIFEST_NAME), str(root))
+    manifest.learn(paths)
+    manifest.save()
+    assert not manifest.dirty
+    os.remove(paths[1])
+    (root / "a.dll").write_bytes(b"y" * 250)
+    os.utime(paths[0], (1, 1))
+    assert manifest.targets(10 ** 6) == [(paths[0], 250)]
+    assert set(manifest.files) == {"a.dll"} and manifest.dirty
+    assert manifest.files["a.dll"]["size"] == 250 and manifest.files["a.dll"]["mtime"] == 1
+    manifest.save()
+    reloaded = Manifest(manifest.path, str(root))
+    assert reloaded.files["a.dll"]["size"] == 250 and "b.dll" not in reloaded.files
+
+
+def test_manifest_invalidated_when_root_changes(tmp_path):
+    old, new = tmp_path / "PotPlayer", tmp_path / "PotPlayer64"
+    make_files(old, {"a.dll": 10})
+    make_files(new, {"a.dll": 10})
+    path = str(tmp_path / page_warm.MANIFEST_NAME)
+    manifest = Manifest(path, str(old))
+    manifest.learn([str(old / "a.dll")])
+    manifest.save()
+    assert Manifest(path, str(old)).files
+    assert Manifest(path, str(new)).files == {}
+
+
+def test_warmer_falls_back_to_player_exe(tmp_path):
+    root = tmp_path / "PotPlayer"
+    player, = make_files(root, {"PotPlayerMini64.exe": 4096})
+    warmer = page_warm.PageWarmer({"page_warm": {"max_mb": 1}}, str(tmp_path), player)
+    result = warmer.warm()
+    assert result.files == 1 and result.done == 1 and result.size == 4096 and not result.timed_out
@@ -0,0 +1,89 @@
+# ================= 代码说明 =================
+# 文件名: tests/test_prefetch.py
+# 功能: 目录预热测试 (本机 WebDAV 替身只记录收到的 PROPFIND)
+# 作者: H_Knight
+# 日期: 2026-10-18
+# ===========================================
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote
+
+import pytest
+
+import prefetch
+
+
+class _DavHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_PROPFIND(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.server.seen.append((unquote(self.path), self.headers.get("Depth")))
+        body = b"<multistatus/>"
+        self.send_response(207)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def dav():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _DavHandler)
+    server.seen = []
+    server.url = f"http://127.0.0.1:{server.server_address[1]}/dav"
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def make(tmp_path, dav, **cfg):
+    config = {"prefetch": {"enabled": True, "dav_url": dav.url, **cfg}}
+    return prefetch.Prefetcher(config, str(tmp_path), log=lambda msg: None)
+
+
+def run(p):
+    thread = p.start()
+    if thread is not None:
+        thread.join(5)
+    p.finish()
+
+
+def test_root_is_warmed_without_any_history(tmp_path, dav):
+    p = make(tmp_path, dav)
+    assert p.folders() == ["/"]
+    run(p)
+    assert dav.seen == [("/dav/", "1")] and all(r.ok for r in p.results)
+
+
+def test_record_learns_folder_for_next_launch(tmp_path, dav):
+    p = make(tmp_path, dav, folders=["/固定"])
+    p.record([f"{dav.url}/网盘/剧集/S01/E01.mkv", "http://other.host/x.mkv", "D:\\local.mkv"])
+    run(p)
+    assert sorted(dav.seen) == [("/dav/", "1"), ("/dav/固定/", "1"), ("/dav/网盘/剧集/S01/", "1")]
+    # 索引已保存，下次启动 (新进程) 仍会预热
+    assert make(tmp_path, dav).folders() == ["/", "/网盘/剧集/S01"]
+
+
+def test_roots_and_limit(tmp_path, dav):
+    p = make(tmp_path, dav, roots=["/a", "/b/"], max_folders=2)
+    p.index.touch("/c")
+    assert p.folders() == ["/a", "/b"]
+    assert make(tmp_path, dav, roots=[]).folders() == []
+
+
+def test_disabled_does_nothing(tmp_path, dav):
+    p = prefetch.Prefetcher({"prefetch": {"enabled": False, "dav_url": dav.url}}, str(tmp_path), log=lambda m: None)
+    assert p.start() is None and dav.seen == []
+
+
+def test_folder_of():
+    base = "http://127.0.0.1:5244/dav"
+    assert prefetch.folder_of(f"{base}/a/b%20c/v.mkv", base) == "/a/b c"
+    assert prefetch.folder_of(f"{base}/v.mkv", base) == "/"
+    assert prefetch.folder_of("http://127.0.0.1:5245/dav/a/v.mkv", base) is None
+    assert prefetch.folder_of("http://127.0.0.1:5244/other/v.mkv", base) is None
@@ -0,0 +1,90 @@
+# ================= 代码说明 =================
+# 文件名: tests/test_proc_watch.py
+# 功能: 进程树监控测试 (pidfd 实现，Linux 下运行)
+# 作者: H_Knight
+# 日期: 2026-10-18
+# ===========================================
+
+import sys
+import time
+
+import pytest
+
+import proc_watch
+
+pytestmark = pytest.mark.skipif(not sys.platform.startswith("linux"), reason="pidfd 实现仅用于 Linux")
+
+
+@pytest.fixture
+def supervisor():
+    sup = proc_watch.ProcessSupervisor(settle=0, log=lambda msg: None)
+    yield sup
+    sup.terminate()
+    sup.close()
+
+
+def test_tracker_pids_lists_running_root(supervisor):
+    proc = supervisor.spawn(["sleep", "0.3"])
+    assert supervisor.tracker_pids() == [proc.pid]
+    summary = supervisor.wait()
+    assert supervisor.tracker_pids() == [] and summary["root_exit_code"] == 0
+
+
+def test_waits_for_orphaned_descendant_of_later_root(supervisor):
+    if not supervisor.tracker.subreaper:
+        pytest.skip("内核不支持 PR_SET_CHILD_SUBREAPER")
+    supervisor.spawn(["sleep", "0.1"])
+    # 第二个根进程 (独立会话) 留下一个脱离父进程的子孙，它过继给本进程后仍要等它退出
+    supervisor.spawn(["sh", "-c", "(sleep 0.8 &); exit 0"])
+    assert len(supervisor.tracker.root_sids) == 2
+    t0 = time.monotonic()
+    supervisor.wait()
+    assert time.monotonic() - t0 >= 0.6
+
+
+class _OrderTracker:
+    """记录 add / resume 顺序的跟踪器替身"""
+
+    def __init__(self, resumed=1):
+        self.calls = []
+        self.resumed = resumed
+
+    def add(self, pid, root=True):
+        self.calls.append(("add", pid))
+        return True
+
+    def resume(self, pid):
+        self.calls.append(("resume", pid))
+        return self.resumed
+
+
+class _FakePopen:
+    def __init__(self, args, **kwargs):
+        self.pid = 4242
+        self.kwargs = kwargs
+        self.killed = False
+
+    def kill(self):
+        self.killed = True
+
+
+def windows_supervisor(monkeypatch, tracker):
+    monkeypatch.setattr(proc_watch.os, "name", "nt")
+    monkeypatch.setattr(proc_watch.subprocess, "Popen", _FakePopen)
+    sup = proc_watch.ProcessSupervisor.__new__(proc_watch.ProcessSupervisor)
+    sup.tracker, sup.root, sup.seen = tracker, None, set()
+    return sup
+
+
+def test_windows_spawn_assigns_job_before_resuming(monkeypatch):
+    tracker = _OrderTracker()
+    proc = windows_supervisor(monkeypatch, tracker).spawn(["PotPlayerMini64.exe"], creationflags=0x200)
+    assert proc.kwargs["creationflags"] == 0x200 | proc_watch._WinApi.CREATE_SUSPENDED
+    assert tracker.calls == [("add", 4242), ("resume", 4242)]
+
+
+def test_windows_spawn_kills_process_that_cannot_resume(monkeypatch):
+    sup = windows_supervisor(monkeypatch, _OrderTracker(resumed=0))
+    with pytest.raises(OSError):
+        sup.spawn(["PotPlayerMini64.exe"])
+    assert sup.root is None
@@ -0,0 +1,145 @@
+# ================= 代码说明 =================
+# 文件名: tests/test_readiness.py
+# 功能: 就绪探测测试 (本机 http.server 与 TCP 监听，Linux 下可运行)
+# 作者: H_Knight
+# 日期: 2026-10-18
+# ===========================================
+
+import threading
+
+import pytest
+
+import readiness
+from conftest import free_port
+
+
+class FakeClock:
+    """可控时钟: sleep 只推进时间并记录每次等待的时长"""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class FlakyProbe:
+    """前 fails 次失败，之后成功"""
+
+    def __init__(self, fails, name="flaky"):
+        self.fails = fails
+        self.calls = 0
+        self.name = name
+
+    def check(self):
+        self.calls += 1
+        return self.calls > self.fails, f"第 {self.calls} 次"
+
+
+def test_tcp_probe_listening_and_closed(tcp_listener):
+    assert readiness.TcpProbe("127.0.0.1", tcp_listener).check()[0]
+    assert not readiness.TcpProbe("127.0.0.1", free_port(), timeout=0.2).check()[0]
+
+
+def test_http_probe_status(http_server):
+    probe = readiness.HttpProbe(f"http://127.0.0.1:{http_server.port}/ping")
+    assert probe.check() == (True, "HTTP 200")
+    http_server.status = 503
+    assert probe.check() == (False, "HTTP 503")
+
+
+def test_http_probe_connection_refused():
+    ok, detail = readiness.HttpProbe(f"http://127.0.0.1:{free_port()}/ping", timeout=0.2).check()
+    assert not ok and detail
+
+
+def test_backoff_doubles_until_cap():
+    clock = FakeClock()
+    probe = FlakyProbe(fails=6)
+    report = readiness.wait_until_ready([probe], deadline=100, initial_delay=0.01, max_delay=0.1,
+                                        clock=clock, sleep=clock.sleep)
+    assert report.ready
+    assert clock.sleeps == pytest.approx([0.01, 0.02, 0.04, 0.08, 0.1, 0.1])
+    st = report.stats[0]
+    assert (st.attempts, st.failures) == (7, 6)
+    assert st.ready_at == pytest.approx(sum(clock.sleeps))
+
+
+def test_timeout_never_sleeps_past_deadline():
+    clock = FakeClock()
+    report = readiness.wait_until_ready([FlakyProbe(fails=10 ** 6)], deadline=1.0, initial_delay=0.3,
+                                        max_delay=0.5, clock=clock, sleep=clock.sleep)
+    assert not report.ready
+    assert report.elapsed == pytest.approx(1.0)
+    assert clock.sleeps == pytest.approx([0.3, 0.5, 0.2])
+
+
+def test_ready_probes_are_not_rechecked():
+    clock = FakeClock()
+    fast, slow = FlakyProbe(0, "fast"), FlakyProbe(3, "slow")
+    report = readiness.wait_until_ready([fast, slow], deadline=10, clock=clock, sleep=clock.sleep)
+    assert report.ready
+    assert (fast.calls, slow.calls) == (1, 4)
+
+
+def test_probe_exception_counts_as_failure():
+    class Broken:
+        name = "broken"
+
+        def check(self):
+            raise RuntimeError("boom")
+
+    clock = FakeClock()
+    report = readiness.wait_until_ready([Broken()], deadline=0.05, clock=clock, sleep=clock.sleep)
+    assert not report.ready
+    assert "boom" in report.stats[0].last_detail
+
+
+def test_waits_for_server_that_starts_late(http_server):
+    # 真实时钟: 服务先返回 503，0.2 秒后恢复
+    http_server.status = 503
+    timer = threading.Timer(0.2, lambda: setattr(http_server, "status", 200))
+    timer.start()
+    try:
+        probes = readiness.build_probes([{"type": "http", "url": f"http://127.0.0.1:{http_server.port}/ping"}])
+        report = readiness.wait_until_ready(probes, deadline=5)
+    finally:
+        timer.cancel()
+    assert report.ready
+    assert 0.15 <= report.elapsed < 2
+    assert report.stats[0].failures >= 1
+
+
+def test_build_probes_mapping():
+    query = lambda name: "RUNNING"
+    probes = readiness.build_probes([
+        {"type": "tcp", "port": 5244},
+        {"type": "tcp", "host": "10.0.0.1", "port": "80", "timeout": 2},
+        {"type": "http"},
+        {"type": "http", "url": "http://127.0.0.1:1/x", "timeout": 3},
+        {"type": "service"},
+        {"type": "service", "name": "other"},
+        {"type": "mount", "path": "/mnt/x"},
+    ], service_name="openlist", service_query=query)
+    tcp1, tcp2, http1, http2, svc1, svc2, mount = probes
+    assert (tcp1.host, tcp1.port, tcp1.timeout) == ("127.0.0.1", 5244, 0.5)
+    assert (tcp2.host, tcp2.port, tcp2.timeout) == ("10.0.0.1", 80, 2)
+    assert (http1.url, http1.timeout) == (readiness.DEFAULT_PING_URL, 1.0)
+    assert (http2.url, http2.timeout) == ("http://127.0.0.1:1/x", 3)
+    assert (svc1.service_name, svc2.service_name) == ("openlist", "other")
+    assert svc1.check() == (True, "状态 RUNNING")
+    assert mount.path == "/mnt/x"
+
+
+def test_build_probes_service_without_name_is_skipped():
+    assert readiness.build_probes([{"type": "service"}]) == []
+
+
+def test_build_probes_unknown_type():
+    with pytest.raises(ValueError):
+        readiness.build_probes([{"type": "udp"}])
@@ -0,0 +1,175 @@
+# ================= 代码说明 =================
+# 文件名: tests/test_resolver.py
+# 功能: 目录解析测试 (链接拆分、直链过期时间、直链缓存、.dpl 格式；本机 OpenList API 替身提供 /api/fs/list 与 /api/fs/get)
+# 作者: H_Knight
+# 日期: 2026-10-18
+# ===========================================
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import resolver
+from resolver import LinkCache, Resolver, parse_target, url_expiry, write_dpl
+
+API = "http://127.0.0.1:5244"
+NOW = 1_700_000_000
+
+
+class _ApiHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.server.calls.append((self.path, payload["path"]))
+        folder = self.server.folders.get(payload["path"].rsplit("/", 1)[0] if self.path == "/api/fs/get"
+                                         else payload["path"])
+        if folder is None or payload.get("password") != self.server.password:
+            reply = {"code": 403, "message": "forbidden"}
+        elif self.path == "/api/fs/list":
+            reply = {"code": 200, "data": {"content": folder}}
+        else:
+            reply = {"code": 200, "data": {"raw_url": f"http://cdn/{payload['path']}?sign=x:{NOW * 2}"}}
+        body = json.dumps(reply).encode('utf-8')
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def api():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _ApiHandler)
+    server.daemon_threads = True
+    server.calls = []
+    server.password = ""
+    server.folders = {"/剧集": [{"name": "第10集.mkv"}, {"name": "第2集.mp4"}, {"name": "说明.txt"},
+                              {"name": "花絮.mkv", "is_dir": True}]}
+    server.url = f"http://127.0.0.1:{server.server_address[1]}"
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def make_resolver(tmp_path, api):
+    logs = []
+    r = Resolver({"resolver": {"api_url": api.url, "workers": 2}}, str(tmp_path), log=logs.append)
+    r.logs = logs
+    return r
+
+
+@pytest.mark.parametrize("target, expected", [
+    ("网盘/剧集/", ("/网盘/剧集", "")),
+    (f"{API}/%E7%BD%91%E7%9B%98/%E5%89%A7%E9%9B%86?pwd=123", ("/网盘/剧集", "123")),
+    (f"{API}/", ("/", "")),
+    (f"{API}/d/网盘/a.mkv", None),
+    (f"{API}/p/网盘/a.mkv", None),
+    (f"{API}/dav/网盘", None),
+    (f"{API}/网盘/A.MKV", None),
+    ("http://127.0.0.1:5245/网盘", None),
+    ("http://other:5244/网盘", None),
+])
+def test_parse_target(target, expected):
+    assert parse_target(target, API) == expected
+
+
+def test_parse_target_strips_api_prefix():
+    base = "http://127.0.0.1:5244/openlist"
+    assert parse_target("http://127.0.0.1:5244/openlist/网盘?pwd=x", base) == ("/网盘", "x")
+    assert parse_target("http://127.0.0.1:5244/openlist/d/网盘/a.mkv", base) is None
+
+
+@pytest.mark.parametrize("url, expected", [
+    ("http://h/d/a.mkv?sign=abc:1700000900", 1700000900),
+    ("http://h/d/a.mkv?sign=abc:0", float("inf")),
+    ("http://h/a.mkv?Expires=1700000500", 1700000500),
+    ("http://h/a.mkv?X-Amz-Date=20231114T221320Z&X-Amz-Expires=300", 1700000000 + 300),
+    ("http://h/a.mkv?sign=abc:soon", NOW + 30),
+    ("http://h/a.mkv", NOW + 30),
+])
+def test_url_expiry(url, expected):
+    assert url_expiry(url, now=NOW, ttl=30) == expected
+
+
+def test_link_cache_expiry_and_save(tmp_path):
+    path = str(tmp_path / resolver.CACHE_NAME)
+    cache = LinkCache(path)
+    cache.put("/a", "http://a", NOW + resolver.EXPIRY_MARGIN + 10)
+    cache.put("/b", "http://b", NOW + resolver.EXPIRY_MARGIN - 10)
+    cache.put("/c", "http://c", float("inf"))
+    cache.put("/old", "http://old", 1)
+    assert cache.get("/a", now=NOW) == "http://a"
+    # 临近过期 (不足 EXPIRY_MARGIN 秒) 的直链不再使用
+    assert cache.get("/b", now=NOW) is None
+    assert cache.get("/c", now=NOW * 10) == "http://c"
+    # 写回时按当前时间清除已过期的直链
+    cache.put("/fresh", "http://fresh", time.time() + 3600)
+    cache.save()
+    reloaded = LinkCache(path)
+    assert set(reloaded.entries) == {"/c", "/fresh"} and reloaded.entries["/c"]["expires"] is None
+    (tmp_path / resolver.CACHE_NAME).write_text("not json")
+    assert LinkCache(path).entries == {}
+
+
+def test_write_dpl_format(tmp_path):
+    path = write_dpl(str(tmp_path / "lists" / "剧集.dpl"), "剧集", [("第1集", "http://a/1"), ("第2集", "http://a/2")])
+    raw = (tmp_path / "lists" / "剧集.dpl").read_bytes()
+    assert raw.startswith(b"\xef\xbb\xbf") and raw.endswith(b"\r\n")
+    assert raw.count(b"\r\n") == raw.count(b"\n") == 6
+    assert raw.decode('utf-8-sig').splitlines() == [
+        "DAUMPLAYLIST", "playname=剧集", "1*file*http://a/1", "1*title*第1集", "2*file*http://a/2", "2*title*第2集"]
+    assert path == str(tmp_path / "lists" / "剧集.dpl")
+
+
+def test_resolve_sorts_filters_and_caches(tmp_path, api):
+    r = make_resolver(tmp_path, api)
+    try:
+        items, stats = r.resolve("/剧集")
+        assert [name for name, _ in items] == ["第2集.mp4", "第10集.mkv"]
+        assert items[0][1].startswith("http://cdn//剧集/第2集.mp4")
+        assert stats["files"] == 2 and stats["cached"] == 0
+        gets = [c for c in api.calls if c[0] == "/api/fs/get"]
+        assert len(gets) == 2
+        # 第二次解析直链全部命中缓存，只列目录
+        _, stats = r.resolve("/剧集")
+        assert stats["cached"] == 2 and len([c for c in api.calls if c[0] == "/api/fs/get"]) == 2
+    finally:
+        r.close()
+    assert LinkCache(str(tmp_path / resolver.CACHE_NAME)).get("/剧集/第2集.mp4") is not None
+
+
+def test_expand_writes_playlist_and_keeps_other_args(tmp_path, api):
+    api.password = "123"
+    r = make_resolver(tmp_path, api)
+    try:
+        media = [f"{api.url}/剧集?pwd=123", "/add", f"{api.url}/d/剧集/第2集.mp4"]
+        result = r.expand(media)
+        assert result[1:] == media[1:]
+        assert result[0] == str(tmp_path / resolver.PLAYLIST_DIR / "剧集.dpl")
+        assert "第10集.mkv" in (tmp_path / resolver.PLAYLIST_DIR / "剧集.dpl").read_text(encoding='utf-8-sig')
+    finally:
+        r.close()
+
+
+def test_expand_keeps_item_when_resolving_fails(tmp_path, api, monkeypatch):
+    api.folders["/坏目录"] = [{"title": "缺少 name 字段"}]
+    r = make_resolver(tmp_path, api)
+    try:
+        # API 错误 (ResolveError)、返回内容缺少字段 (KeyError)、写播放列表失败 (OSError) 都保留原参数
+        media = [f"{api.url}/不存在", f"{api.url}/坏目录", f"{api.url}/剧集"]
+
+        def readonly(*args):
+            raise PermissionError("只读")
+
+        monkeypatch.setattr(resolver, "write_dpl", readonly)
+        assert r.expand(media) == media
+        assert len(r.logs) == 3 and all(line.startswith("[!] 无法解析") for line in r.logs)
+    finally:
+        r.close()
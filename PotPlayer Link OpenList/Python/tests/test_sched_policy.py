@@ -0,0 +1,87 @@
+# ================= 代码说明 =================
+# 文件名: tests/test_sched_policy.py
+# 功能: 调度策略测试 (配置校验；替身进程表 + 替身系统接口，检查扫描时对子孙与映像名匹配的进程各只应用一次)
+# 作者: H_Knight
+# 日期: 2026-10-18
+# ===========================================
+
+import pytest
+
+import sched_policy
+import shutdown
+
+
+class FakeApi:
+    def __init__(self):
+        self.calls = []
+
+    def apply(self, pid, policy):
+        self.calls.append((pid, policy.role))
+        return [("io", "不支持")] if pid == 40 else []
+
+
+@pytest.fixture
+def scheduler(monkeypatch):
+    table = []
+    monkeypatch.setattr(shutdown, "_process_table", lambda: list(table))
+    logs = []
+    sched = sched_policy.Scheduler({"scheduling": {"backend": {"images": ["rclone.exe"]}}}, log=logs.append)
+    sched.api = FakeApi()
+    sched.table, sched.logs = table, logs
+    return sched
+
+
+@pytest.mark.parametrize("role, spec, match", [
+    ("player", {"cpu": "realtime"}, "scheduling.player.cpu 无效: realtime"),
+    ("backend", {"io": "very_low"}, "scheduling.backend.io 无效: very_low"),
+])
+def test_invalid_levels_rejected(role, spec, match):
+    with pytest.raises(ValueError, match=match):
+        sched_policy.load_policies({"scheduling": {role: spec}})
+
+
+def test_defaults_and_overrides():
+    policies = sched_policy.load_policies({"scheduling": {"player": {"affinity": [3, 2, 3]}}})
+    assert policies["player"].cpu == "above_normal" and policies["player"].affinity == [2, 3]
+    assert policies["backend"].io == "low" and policies["backend"].affinity is None
+
+
+def test_sweep_applies_to_descendants_and_images_once(scheduler):
+    # 10 (播放器) -> 11 -> 12；20 (后端) -> 21；30 为按映像名匹配的 rclone，31 为其子进程；99 无关
+    scheduler.table[:] = [(10, 1, "PotPlayerMini64.exe"), (11, 10, "a.exe"), (12, 11, "b.exe"),
+                          (20, 1, "openlist.exe"), (21, 20, "c.exe"), (30, 1, "RClone.exe"), (31, 30, "d.exe"),
+                          (99, 1, "other.exe")]
+    scheduler.watch("player", lambda: [10])
+    scheduler.watch("backend", lambda: [20, 77])        # 77 已退出
+    assert scheduler.sweep() == 7
+    assert sorted(scheduler.api.calls) == [(10, "player"), (11, "player"), (12, "player"), (20, "backend"),
+                                           (21, "backend"), (30, "backend"), (31, "backend")]
+    # 再次扫描不重复应用；新出现的子孙进程补上
+    scheduler.table.append((13, 12, "e.exe"))
+    assert scheduler.sweep() == 1 and scheduler.api.calls[-1] == (13, "player")
+    assert scheduler.counts == {"player": 4, "backend": 4}
+
+
+def test_exited_pids_are_forgotten(scheduler):
+    scheduler.table[:] = [(10, 1, "PotPlayerMini64.exe"), (11, 10, "a.exe")]
+    scheduler.watch("player", lambda: [10])
+    scheduler.sweep()
+    assert set(scheduler.applied) == {10, 11}
+    # 11 退出后 PID 被复用为新的子进程: 应重新应用策略
+    scheduler.table[:] = [(10, 1, "PotPlayerMini64.exe")]
+    assert scheduler.sweep() == 0 and set(scheduler.applied) == {10}
+    scheduler.table.append((11, 10, "reused.exe"))
+    assert scheduler.sweep() == 1 and scheduler.api.calls.count((11, "player")) == 2
+
+
+def test_each_failure_logged_once(scheduler):
+    scheduler.table[:] = [(40, 1, "rclone.exe"), (41, 40, "rclone.exe")]
+    scheduler.watch("backend", lambda: [])
+    scheduler.sweep()
+    scheduler.table[:] = [(41, 1, "rclone.exe")]
+    scheduler.sweep()
+    scheduler.table[:] = [(40, 1, "rclone.exe")]
+    scheduler.sweep()
+    warnings = [line for line in scheduler.logs if line.startswith("[!]")]
+    assert len(warnings) == 1 and "backend 进程 (PID: 40) 的 io" in warnings[0]
+    assert scheduler.failures == {("backend", "io"): "不支持"}
@@ -0,0 +1,103 @@
+# ================= 代码说明 =================
+# 文件名: tests/test_service_control.py
+# 功能: 服务控制测试 (FakeBackend 状态机与 ServiceController 的等待逻辑，Linux 下可运行)
+# 作者: H_Knight
+# 日期: 2026-10-18
+# ===========================================
+
+import os
+
+import pytest
+
+import service_control
+from backends.openlist_service import OpenListServiceBackend
+from service_control import FakeBackend, ServiceController, ServiceError
+
+
+def make(start_delay=0.05, stop_delay=0.05, fail_start=False):
+    backend = FakeBackend(start_delay, stop_delay, fail_start)
+    return backend, ServiceController(backend)
+
+
+def test_start_pending_then_running():
+    backend, ctl = make(start_delay=0.1)
+    result = ctl.start("svc")
+    assert result.ok and not result.already and result.state == "START_PENDING" and result.pid is None
+    result = ctl.start("svc", wait=True, timeout=2)
+    assert result.ok and result.already and result.state == "RUNNING" and result.pid
+    assert backend.calls == [("start", "svc"), ("start", "svc")]
+
+
+def test_stop_running_and_already_stopped():
+    _, ctl = make()
+    assert ctl.start("svc", wait=True, timeout=2).state == "RUNNING"
+    result = ctl.stop("svc", wait=True, timeout=2)
+    assert result.ok and not result.already and result.state == "STOPPED" and result.pid is None
+    result = ctl.stop("svc")
+    assert result.ok and result.already
+
+
+def test_stop_during_stop_pending_is_already():
+    _, ctl = make(stop_delay=0.2)
+    ctl.start("svc", wait=True, timeout=2)
+    assert ctl.stop("svc").state == "STOP_PENDING"
+    result = ctl.stop("svc")
+    assert result.ok and result.already and result.state == "STOP_PENDING"
+
+
+def test_stop_during_start_pending_waits_for_running():
+    backend, ctl = make(start_delay=0.2)
+    ctl.start("svc")
+    with pytest.raises(service_control.ServicePendingError):
+        backend.stop("svc")
+    result = ctl.stop("svc", wait=True, timeout=2)
+    assert result.ok and not result.already and result.state == "STOPPED"
+    assert result.elapsed >= 0.15
+    assert [c for c in backend.calls if c[0] == "stop"] == [("stop", "svc")] * 3
+
+
+def test_stop_during_start_pending_times_out():
+    _, ctl = make(start_delay=5)
+    ctl.start("svc")
+    result = ctl.stop("svc", wait=True, timeout=0.1)
+    assert not result.ok and "RUNNING" in str(result.error)
+
+
+def test_wait_timeout_reports_error():
+    _, ctl = make(start_delay=5)
+    result = ctl.start("svc", wait=True, timeout=0.1)
+    assert not result.ok and "超时" in str(result.error)
+
+
+def test_fail_start():
+    backend, ctl = make(fail_start=True)
+    result = ctl.start("svc", wait=True)
+    assert not result.ok and isinstance(result.error, ServiceError)
+    assert ctl.query_state("svc") == "STOPPED"
+    assert backend.calls == [("start", "svc")]
+
+
+def test_status_and_as_dict():
+    _, ctl = make()
+    ctl.start("svc", wait=True, timeout=2)
+    data = ctl.status("svc").as_dict()
+    assert data["ok"] and data["state"] == "RUNNING" and data["error"] is None
+
+
+@pytest.mark.skipif(os.name == 'nt', reason="Windows 下默认使用 SCM")
+def test_create_controller_requires_explicit_fake():
+    with pytest.raises(ServiceError):
+        service_control.create_controller()
+    assert isinstance(service_control.create_controller("fake").backend, FakeBackend)
+    with pytest.raises(ValueError):
+        service_control.create_controller("nope")
+
+
+@pytest.mark.skipif(os.name == 'nt', reason="Windows 下默认使用 SCM")
+def test_openlist_service_plugin_does_not_fall_back_to_fake(tmp_path):
+    plugin = OpenListServiceBackend({}, log=lambda msg: None, state_dir=str(tmp_path))
+    assert plugin.controller_kind() is None
+    with pytest.raises(ServiceError):
+        plugin.start()
+    plugin = OpenListServiceBackend({"service_backend": "fake"}, log=lambda msg: None, state_dir=str(tmp_path))
+    assert plugin.start().ok
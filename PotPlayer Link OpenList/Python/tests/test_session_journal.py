@@ -0,0 +1,141 @@
+# ================= 代码说明 =================
+# 文件名: tests/test_session_journal.py
+# 功能: 会话记录与遗留后端认领测试 (command 后端 + 本机端口，模拟启动器异常退出后再次启动；Linux 下运行)
+# 作者: H_Knight
+# 日期: 2026-10-18
+# ===========================================
+
+import os
+import sys
+import time
+
+import pytest
+
+import config_store
+import service_control
+import session_journal
+from backends.command import CommandBackend
+from backends.openlist_service import OpenListServiceBackend
+from conftest import free_port
+
+pytestmark = pytest.mark.skipif(not sys.platform.startswith("linux"), reason="使用 /proc 判断进程身份")
+
+
+def make(tmp_path, command, port):
+    config = {"profile": "t", "backend_command": command, "shutdown_deadline": 1,
+              "readiness": {"probes": [{"type": "tcp", "port": port}]},
+              "session_journal": {"adopt_deadline": 1}}
+    return config, CommandBackend(config, log=lambda msg: None)
+
+
+def wait_port(port, timeout=5.0):
+    end = time.monotonic() + timeout
+    while not session_journal.port_in_use(port):
+        assert time.monotonic() < end, "替身后端未能监听端口"
+        time.sleep(0.05)
+
+
+def crashed_session(tmp_path, config, plugin):
+    """启动后端并写入会话记录，然后不关闭后端、不删除记录 (等同于启动器被强制结束)"""
+    journal = session_journal.SessionJournal(str(tmp_path), log=lambda msg: None)
+    assert journal.acquire()
+    journal.begin(config, plugin)
+    proc = plugin.start()
+    journal.record_backend(plugin, state="running")
+    journal.close(clean=False)
+    return proc
+
+
+def relaunch(tmp_path, config, plugin):
+    journal = session_journal.SessionJournal(str(tmp_path), log=lambda msg: None)
+    assert journal.acquire()
+    try:
+        return journal.recover(plugin, config)
+    finally:
+        journal.close(clean=True)
+
+
+def test_no_journal_means_nothing_to_recover(tmp_path):
+    config, plugin = make(tmp_path, ["true"], free_port())
+    report = relaunch(tmp_path, config, plugin)
+    assert report.action is None and not report.adopted
+
+
+def test_lock_held_by_running_launcher(tmp_path):
+    first = session_journal.SessionJournal(str(tmp_path))
+    second = session_journal.SessionJournal(str(tmp_path))
+    assert first.acquire()
+    assert not second.acquire()
+    first.close(clean=True)
+    assert second.acquire()
+    second.close(clean=True)
+
+
+def test_healthy_orphan_is_adopted(tmp_path):
+    port = free_port()
+    config, plugin = make(tmp_path, [sys.executable, "-m", "http.server", str(port), "--bind", "127.0.0.1"], port)
+    proc = crashed_session(tmp_path, config, plugin)
+    try:
+        wait_port(port)
+        fresh = CommandBackend(config, log=lambda msg: None)
+        report = relaunch(tmp_path, config, fresh)
+        assert report.adopted
+        assert fresh.process.pid == proc.pid and fresh.is_running()
+        assert not os.path.exists(tmp_path / session_journal.JOURNAL_NAME)
+    finally:
+        proc.kill()
+        proc.wait()
+
+
+def test_unhealthy_orphan_is_closed(tmp_path):
+    port = free_port()
+    config, plugin = make(tmp_path, ["sleep", "30"], port)
+    proc = crashed_session(tmp_path, config, plugin)
+    try:
+        fresh = CommandBackend(config, log=lambda msg: None)
+        report = relaunch(tmp_path, config, fresh)
+        assert report.action == "reclaimed" and "已关闭 1 个" in report.detail
+        assert fresh.process is None
+        assert proc.wait(2) is not None
+    finally:
+        proc.kill()
+        proc.wait()
+
+
+def test_exited_orphan_and_reused_pid_are_reclaimed(tmp_path):
+    config, plugin = make(tmp_path, ["sleep", "30"], free_port())
+    proc = crashed_session(tmp_path, config, plugin)
+    # 记录中的创建时间与实际进程不符: 视为 PID 已被复用，不能认领也不能关闭
+    journal = session_journal.SessionJournal(str(tmp_path))
+    data = journal.read()
+    data["processes"][0]["started"] += 1
+    config_store.atomic_write_json(journal.path, data)
+    try:
+        report = relaunch(tmp_path, config, CommandBackend(config, log=lambda msg: None))
+        assert report.action == "reclaimed" and "均已退出" in report.detail
+        assert proc.poll() is None
+    finally:
+        proc.kill()
+        proc.wait()
+
+
+def test_unhealthy_service_is_stopped(tmp_path):
+    # 服务在运行，但就绪探测的端口没有监听 (服务卡死)
+    config = {"profile": "t", "service_backend": "fake", "shutdown_deadline": 1,
+              "readiness": {"probes": [{"type": "tcp", "port": free_port()}]},
+              "session_journal": {"adopt_deadline": 0.3}}
+    plugin = OpenListServiceBackend(config, log=lambda msg: None, state_dir=str(tmp_path))
+    backend = service_control.FakeBackend(start_delay=0.01, stop_delay=0.05)
+    plugin._controller = service_control.ServiceController(backend)
+    crashed_session(tmp_path, config, plugin)
+    report = relaunch(tmp_path, config, plugin)
+    assert report.action == "reclaimed" and "已停止后照常启动" in report.detail
+    assert plugin.controller.query_state(plugin.service_name) == "STOPPED"
+    assert [c[0] for c in backend.calls] == ["start", "stop"]
+    # 服务已停止时不再发出停止请求
+    crashed_session(tmp_path, config, plugin)
+    plugin.controller.stop(plugin.service_name, wait=True, timeout=2)
+    calls = len(backend.calls)
+    report = relaunch(tmp_path, config, plugin)
+    assert report.action == "reclaimed" and "已停止，照常启动" in report.detail
+    assert len(backend.calls) == calls
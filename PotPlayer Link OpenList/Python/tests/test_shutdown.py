@@ -0,0 +1,77 @@
+# ================= 代码说明 =================
+# 文件名: tests/test_shutdown.py
+# 功能: 关闭流水线测试 (忽略 SIGTERM 的替身进程，Linux 下运行)
+# 作者: H_Knight
+# 日期: 2026-10-18
+# ===========================================
+
+import shutil
+import subprocess
+import sys
+import time
+
+import pytest
+
+import shutdown
+from backends.base import ProcessBackendPlugin
+
+pytestmark = pytest.mark.skipif(not sys.platform.startswith("linux"), reason="使用 /proc 与 POSIX 信号")
+
+
+def stubborn(tmp_path, image):
+    """复制 sleep 为指定映像名，返回忽略 SIGTERM 运行它的命令"""
+    path = tmp_path / image
+    shutil.copy(shutil.which("sleep"), path)
+    return ["sh", "-c", f'trap "" TERM; exec {path} 30']
+
+
+class StubbornPlugin(ProcessBackendPlugin):
+    name = "stubborn"
+
+    def __init__(self, config, cmd):
+        super().__init__(config, log=lambda msg: None)
+        self.cmd = cmd
+
+    def command(self):
+        return self.cmd
+
+
+def wait_image(name, timeout=2.0):
+    end = time.monotonic() + timeout
+    while time.monotonic() < end:
+        if shutdown.image_targets([name], shutdown.shutdown_table()[0]):
+            return True
+        time.sleep(0.02)
+    return False
+
+
+def test_graceful_exit_is_not_forced():
+    proc = subprocess.Popen(["sleep", "30"])
+    results = shutdown.shutdown_processes([("sleep", proc.pid)], deadline=2, log=lambda msg: None)
+    assert results[0].exited and not results[0].forced and results[0].graceful_sent
+    assert proc.wait(1) is not None
+
+
+def test_stop_shares_one_deadline_between_images_and_tree(tmp_path):
+    other = subprocess.Popen(stubborn(tmp_path, "pwstub_image"))
+    plugin = StubbornPlugin({"backend_stop_images": ["pwstub_image"], "shutdown_deadline": 0.5},
+                            stubborn(tmp_path, "pwstub_tree"))
+    try:
+        plugin.start()
+        assert wait_image("pwstub_image") and wait_image("pwstub_tree")
+        t0 = time.monotonic()
+        results = plugin.stop()
+        elapsed = time.monotonic() - t0
+        # 两组进程都要等满截止时间后强制结束；共享截止时间时总耗时约为一个 deadline
+        assert {r.name for r in results} == {"pwstub_image", "stubborn"}
+        assert all(r.exited and r.forced for r in results)
+        assert elapsed < 0.9
+    finally:
+        other.kill()
+        other.wait()
+
+
+def test_posix_wait_on_missing_process():
+    proc = subprocess.Popen(["true"])
+    proc.wait()
+    assert shutdown._PosixOps().wait(proc.pid, 0.1)
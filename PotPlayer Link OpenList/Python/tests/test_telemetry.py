@@ -0,0 +1,79 @@
+# ================= 代码说明 =================
+# 文件名: tests/test_telemetry.py
+# 功能: 启动耗时记录测试 (日志轮转、提权时间戳解析、日志配置)
+# 作者: H_Knight
+# 日期: 2026-10-18
+# ===========================================
+
+import json
+import os
+
+import pytest
+
+import telemetry
+
+
+def records(n, size=100):
+    return [{"i": i, "pad": "x" * size} for i in range(n)]
+
+
+def test_rotation_keeps_backups_count(tmp_path):
+    path = str(tmp_path / "t.jsonl")
+    log = telemetry.RotatingLog(path, max_bytes=300, backups=2)
+    for i in range(6):
+        log.write([{"i": i, "pad": "x" * 150}])
+    assert sorted(os.listdir(tmp_path)) == ["t.jsonl", "t.jsonl.1", "t.jsonl.2"]
+    # 最新的在 path，越旧编号越大，更早的被丢弃
+    newest = [json.loads(line)["i"] for line in open(path, encoding='utf-8')]
+    oldest = [json.loads(line)["i"] for line in open(path + ".2", encoding='utf-8')]
+    assert newest == [5] and oldest == [3]
+    assert all(os.path.getsize(tmp_path / f) <= 300 for f in os.listdir(tmp_path))
+
+
+def test_rotation_without_backups_truncates(tmp_path):
+    path = str(tmp_path / "t.jsonl")
+    log = telemetry.RotatingLog(path, max_bytes=300, backups=0)
+    log.write(records(2))
+    log.write(records(2))
+    assert os.listdir(tmp_path) == ["t.jsonl"]
+    assert len(open(path, encoding='utf-8').readlines()) == 2
+
+
+def test_single_write_larger_than_limit_is_kept(tmp_path):
+    path = str(tmp_path / "t.jsonl")
+    log = telemetry.RotatingLog(path, max_bytes=50, backups=1)
+    log.write(records(3))
+    assert len(open(path, encoding='utf-8').readlines()) == 3 and os.listdir(tmp_path) == ["t.jsonl"]
+
+
+@pytest.mark.parametrize("argv, expected", [
+    (["a.mkv", "--launch-t0=12.5"], 12.5),
+    (["--launch-t0=1700000000.25", "--launch-t0=3"], 1700000000.25),
+    (["--launch-t0=abc"], None),
+    (["--launch-t0="], None),
+    (["--launch-t0", "5"], None),
+    ([], None),
+])
+def test_launch_t0_from_argv(argv, expected):
+    assert telemetry.launch_t0_from_argv(argv) == expected
+
+
+def test_open_log(tmp_path):
+    log = telemetry.open_log({}, str(tmp_path))
+    assert log.path == str(tmp_path / telemetry.LOG_NAME) and log.backups == telemetry.BACKUPS
+    custom = telemetry.open_log({"telemetry": {"path": str(tmp_path / "x.jsonl"), "max_bytes": 10}}, str(tmp_path))
+    assert custom.path == str(tmp_path / "x.jsonl") and custom.max_bytes == 10
+    assert telemetry.open_log({"telemetry": {"enabled": False}}, str(tmp_path)) is None
+
+
+def test_flush_writes_session_records(tmp_path):
+    rec = telemetry.SpanRecorder(profile="p")
+    with rec.span("backend_start", backend="command"):
+        pass
+    with pytest.raises(RuntimeError):
+        with rec.span("player_spawn"):
+            raise RuntimeError
+    telemetry.flush(rec, telemetry.open_log({}, str(tmp_path)))
+    lines = [json.loads(line) for line in open(tmp_path / telemetry.LOG_NAME, encoding='utf-8')]
+    assert [(r["span"], r["ok"]) for r in lines] == [("backend_start", True), ("player_spawn", False)]
+    assert all(r["session"] == rec.session and r["profile"] == "p" for r in lines)
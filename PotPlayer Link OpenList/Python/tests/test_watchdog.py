@@ -0,0 +1,43 @@
+# ================= 代码说明 =================
+# 文件名: tests/test_watchdog.py
+# 功能: 看门狗恢复测试 (模拟服务停止较慢时，重启须等服务进入 STOPPED 后再启动)
+# 作者: H_Knight
+# 日期: 2026-10-18
+# ===========================================
+
+import time
+
+import backend_watchdog
+import service_control
+from backends.openlist_service import OpenListServiceBackend
+
+
+def make_plugin(tmp_path, stop_delay):
+    config = {"service_backend": "fake", "readiness": {"probes": [{"type": "service"}], "deadline": 3}}
+    plugin = OpenListServiceBackend(config, log=lambda msg: None, state_dir=str(tmp_path))
+    backend = service_control.FakeBackend(start_delay=0.05, stop_delay=stop_delay)
+    plugin._controller = service_control.ServiceController(backend)
+    return plugin, backend, config
+
+
+def test_recover_waits_for_slow_stop(tmp_path):
+    plugin, backend, config = make_plugin(tmp_path, stop_delay=0.3)
+    assert plugin.controller.start(plugin.service_name, wait=True, timeout=2).state == "RUNNING"
+    dog = backend_watchdog.Watchdog(plugin, config, log=lambda msg: None)
+    now = time.perf_counter()
+    event = backend_watchdog.RecoveryEvent("hang", "模拟无响应", now, now, now)
+    dog._recover(event)
+    assert event.ok and event.error is None
+    assert plugin.controller.query_state(plugin.service_name) == "RUNNING"
+    # 停止完成 (约 stop_delay) 之后才发出启动请求
+    assert event.recover >= 0.25
+    assert [c[0] for c in backend.calls] == ["start", "stop", "start"]
+
+
+def test_start_during_stop_pending_waits_for_stopped(tmp_path):
+    plugin, backend, _ = make_plugin(tmp_path, stop_delay=0.2)
+    ctl = plugin.controller
+    ctl.start("svc", wait=True, timeout=2)
+    assert ctl.stop("svc").state == "STOP_PENDING"
+    result = ctl.start("svc", wait=True, timeout=2)
+    assert result.ok and not result.already and result.state == "RUNNING"
@@ -0,0 +1,117 @@
+# ================= 代码说明 =================
+# 文件名: bench_sources.py
+# 功能: source_bench.py 的本地替身测试
+#       为每个音源启动一个有固定延迟 / 失败率的替身接口，再启动一个转发 http 请求的替身代理 (代替 UnblockNeteaseMusic)，
+#       复制一份 config.ini 后运行 source_bench.py，检查写回的 sources= 顺序、strict= 与其余内容是否符合预期
+# 作者: H_Knight
+# 日期: 2026-10-18
+# 用法: python bench_sources.py [-n 每个音源的请求次数]
+# ===========================================
+
+import argparse
+import http.client
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# 音源 -> (延迟秒数, 失败率)
+STUBS = {"kuwo": (0.30, 0.0), "kugou": (0.02, 0.0), "qq": (0.05, 0.5), "migu": (0.08, 0.0)}
+EXPECTED = ["kugou", "migu", "kuwo", "qq"]
+
+
+def make_upstream(delay, fail_rate, seed):
+    rnd = random.Random(seed)
+
+    class Upstream(BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(delay)
+            status = 502 if rnd.random() < fail_rate else 200
+            body = b'{"ok": true}'
+            self.send_response(status)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+    return Upstream
+
+
+class ForwardProxy(BaseHTTPRequestHandler):
+    """只支持 http 绝对地址的转发代理 (UnblockNeteaseMusic 对非网易云请求的行为)"""
+
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        conn = http.client.HTTPConnection(parts.hostname, parts.port, timeout=10)
+        try:
+            conn.request("GET", parts.path + (f"?{parts.query}" if parts.query else ""))
+            resp = conn.getresponse()
+            body = resp.read()
+        finally:
+            conn.close()
+        self.send_response(resp.status)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def serve(handler):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="音源排序工具的本地替身测试")
+    parser.add_argument("-n", type=int, default=10, help="每个音源的请求次数")
+    args = parser.parse_args()
+
+    servers = {name: serve(make_upstream(delay, fail, i)) for i, (name, (delay, fail)) in enumerate(STUBS.items())}
+    proxy = serve(ForwardProxy)
+    workdir = tempfile.mkdtemp(prefix="bench_sources_")
+    try:
+        config = os.path.join(workdir, "config.ini")
+        shutil.copy(os.path.join(HERE, "config.ini"), config)
+        with open(config, 'rb') as f:
+            original = f.read()
+        # 音源列表改为替身所模拟的四个，其余内容保持不变
+        with open(config, 'wb') as f:
+            f.write(original.replace(b"sources=kuwo, kugou, qq", b"sources=kuwo, kugou, qq, migu"))
+        cmd = [sys.executable, os.path.join(HERE, "source_bench.py"), "--config", config, "-n", str(args.n),
+               "--proxy", f"127.0.0.1:{proxy.server_address[1]}", "--strict", "true"]
+        for name, server in servers.items():
+            cmd += ["--upstream", f"{name}=http://127.0.0.1:{server.server_address[1]}/search?keyword=test"]
+        t0 = time.perf_counter()
+        out = subprocess.run(cmd, capture_output=True, text=True, check=True).stdout
+        elapsed = time.perf_counter() - t0
+        with open(config, 'rb') as f:
+            result = f.read()
+    finally:
+        for server in list(servers.values()) + [proxy]:
+            server.shutdown()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print(out.rstrip())
+    expected = (original.replace(b"sources=kuwo, kugou, qq", b"sources=" + ", ".join(EXPECTED).encode())
+                .replace(b"strict=false", b"strict=true"))
+    serial = sum(delay for delay, _ in STUBS.values()) * args.n
+    print(f"[*] 测试耗时 {elapsed:.2f}s (串行测试约需 {serial:.2f}s 以上)")
+    print(f"[*] 写回结果: {'符合预期' if result == expected else '不符合预期'} (期望顺序 {', '.join(EXPECTED)}，其余内容与换行符不变)")
+    if result != expected:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,273 @@
+# ================= 代码说明 =================
+# 文件名: source_bench.py
+# 功能: UnblockNeteaseMusic 音源延迟测试与自动排序
+#       经由本地代理 (config.ini 中 port= 的 HTTP 端口) 并发测试每个音源接口的延迟与成功率，
+#       按 "可靠的在前、延迟低的在前" 重写 sources= 的顺序 (可选同时设置 strict=)，
+#       使每首歌优先向最快的可用音源匹配
+#       同时支持 unblock163.sh 生成的服务端配置 (SOURCE = kuwo kugou 格式)
+#       --every N: 每 N 分钟重新测试一次 (顺序变化时才写入)
+#       --upstream 名称=URL 与 --proxy / --no-proxy 可改为测试本地替身 (见 bench_sources.py)
+# 作者: H_Knight
+# 日期: 2026-10-18
+# 用法: python source_bench.py [--config config.ini] [-n 次数] [--strict true|false] [--every 分钟] [--dry-run]
+# ===========================================
+
+import argparse
+import http.client
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_CONFIG = os.path.join(HERE, "config.ini")
+DEFAULT_ROUNDS = 5
+DEFAULT_TIMEOUT = 5.0
+MIN_SUCCESS = 0.8           # 成功率低于该值的音源视为不可靠，排在后面
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0 Safari/537.36"
+
+# 各音源匹配歌曲时使用的搜索接口 (只用于测量连通性与延迟，不解析返回内容)
+SOURCE_PROBES = {
+    "kuwo": "http://search.kuwo.cn/r.s?ft=music&rformat=json&encoding=utf8&rn=1&pn=0&all=test",
+    "kugou": "http://mobilecdn.kugou.com/api/v3/search/song?keyword=test&page=1&pagesize=1",
+    "qq": "https://u.y.qq.com/cgi-bin/musicu.fcg",
+    "migu": "https://m.music.migu.cn/migu/remoting/scr_search_tag?keyword=test&type=2&rows=1&pgc=1",
+    "bilibili": "https://api.bilibili.com/audio/music-service-c/s?search_type=music&page=1&pagesize=1&keyword=test",
+    "pyncmd": "https://music-api.gdstudio.xyz/api.php?types=search&source=netease&name=test&count=1",
+    "joox": "https://cache.api.joox.com/openjoox/v1/search?keyword=test",
+    "bodian": "http://bd-api.kuwo.cn/api/search/music?keyword=test",
+    "youtube": "https://www.youtube.com/results?search_query=test",
+}
+
+# 两种配置文件格式: 客户端 config.ini 与 unblock163.sh 的服务端配置
+FORMATS = {
+    # 等号两侧只匹配空格 / 制表符: 值为空时 (如 address=) 不能跨到下一行
+    "qt": {"sources": r"^(sources[ \t]*=[ \t]*)(.*?)(\r?)$", "strict": r"^(strict[ \t]*=[ \t]*)(.*?)(\r?)$",
+           "port": r"^port[ \t]*=[ \t]*(.*?)\r?$", "address": r"^address[ \t]*=[ \t]*(.*?)\r?$", "sep": ", ",
+           "bools": {"true": "true", "false": "false"}},
+    "sh": {"sources": r"^(SOURCE = )(.*?)(\r?)$", "strict": r"^(STRICT = )(.*?)(\r?)$",
+           "port": r"^PORT = (.*?)\r?$", "address": None, "sep": " ",
+           "bools": {"true": "YES", "false": "NO"}},
+}
+
+
+# ================= 配置文件 =================
+class SourceConfig:
+    """读写音源配置，只改动 sources / strict 所在的行，其余内容 (含换行符、BOM) 原样保留"""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            raw = f.read()
+        self.bom = raw.startswith(b"\xef\xbb\xbf")
+        self.text = raw.decode('utf-8-sig')
+        self.fmt = FORMATS["qt"] if re.search(FORMATS["qt"]["sources"], self.text, re.M) else FORMATS["sh"]
+        if not re.search(self.fmt["sources"], self.text, re.M):
+            raise ValueError(f"配置文件中没有音源设置: {path}")
+
+    def _get(self, key):
+        m = re.search(self.fmt[key], self.text, re.M) if self.fmt[key] else None
+        if m is None:
+            return ""
+        # sources / strict 的正则分为 (前缀, 值, 行尾 \r) 三组，其余只有值一组
+        return (m.group(2) if key in ("sources", "strict") else m.group(1)).strip()
+
+    @property
+    def sources(self):
+        return [s for s in re.split(r"[,\s]+", self._get("sources")) if s]
+
+    @property
+    def strict(self):
+        """统一返回 true / false (unblock163.sh 中写作 YES / NO)"""
+        value = self._get("strict")
+        return next((k for k, v in self.fmt["bools"].items() if v.lower() == value.lower()), value)
+
+    def proxy(self):
+        """本地代理的 (主机, HTTP 端口)；port=12345:12346 中前者为 HTTP 端口"""
+        port = self._get("port").split(":")[0].strip()
+        if not port.isdigit():
+            return None
+        return (self._get("address") or "127.0.0.1", int(port))
+
+    def _set(self, key, value):
+        self.text = re.sub(self.fmt[key], lambda m: f"{m.group(1)}{value}{m.group(3)}", self.text, count=1, flags=re.M)
+
+    def set_sources(self, sources):
+        self._set("sources", self.fmt["sep"].join(sources))
+
+    def set_strict(self, value):
+        if re.search(self.fmt["strict"], self.text, re.M):
+            self._set("strict", self.fmt["bools"][value])
+
+    def save(self):
+        """先写临时文件再替换，避免写到一半时客户端读到不完整的配置"""
+        tmp = f"{self.path}.tmp"
+        with open(tmp, 'wb') as f:
+            f.write((b"\xef\xbb\xbf" if self.bom else b"") + self.text.encode('utf-8'))
+        os.replace(tmp, self.path)
+
+
+# ================= 测试 =================
+class SourceResult:
+    """单个音源的测试结果"""
+
+    def __init__(self, name, url):
+        self.name = name
+        self.url = url
+        self.latencies = []     # 成功请求的首字节延迟 (秒)
+        self.errors = []
+
+    @property
+    def attempts(self):
+        return len(self.latencies) + len(self.errors)
+
+    @property
+    def success_rate(self):
+        return len(self.latencies) / self.attempts if self.attempts else 0.0
+
+    def percentile(self, p):
+        if not self.latencies:
+            return float("inf")
+        values = sorted(self.latencies)
+        return values[min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))]
+
+    def summary(self):
+        if not self.latencies:
+            return f"{self.name:<10} 全部失败 ({self.errors[-1] if self.errors else '未测试'})"
+        return (f"{self.name:<10} p50 {self.percentile(50) * 1000:8.1f} ms   p95 {self.percentile(95) * 1000:8.1f} ms   "
+                f"成功 {len(self.latencies)}/{self.attempts}")
+
+
+def probe_once(url, proxy=None, timeout=DEFAULT_TIMEOUT):
+    """请求一次，返回首字节延迟 (秒)；经由代理时 http 直接转发、https 使用 CONNECT 隧道"""
+    parts = urlsplit(url)
+    https = parts.scheme == "https"
+    path = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+    cls = http.client.HTTPSConnection if https else http.client.HTTPConnection
+    if proxy is None:
+        conn, target = cls(parts.hostname, parts.port, timeout=timeout), path
+    elif https:
+        conn, target = cls(*proxy, timeout=timeout), path
+        conn.set_tunnel(parts.hostname, parts.port or 443)
+    else:
+        conn, target = cls(*proxy, timeout=timeout), url
+    t0 = time.perf_counter()
+    try:
+        conn.request("GET", target, headers={"User-Agent": USER_AGENT})
+        resp = conn.getresponse()
+        elapsed = time.perf_counter() - t0
+        resp.read(65536)
+    finally:
+        conn.close()
+    # 4xx (接口已下线、被拒绝) 与 5xx 一样说明该音源不可用，不能算作成功的延迟样本
+    if resp.status >= 400:
+        raise OSError(f"HTTP {resp.status}")
+    return elapsed
+
+
+def probe_source(result, proxy, rounds, timeout):
+    """同一音源串行请求 rounds 次 (不同音源之间并发)"""
+    for _ in range(rounds):
+        try:
+            result.latencies.append(probe_once(result.url, proxy, timeout))
+        except (OSError, http.client.HTTPException) as e:
+            result.errors.append(str(e) or type(e).__name__)
+    return result
+
+
+def benchmark(sources, probes, proxy=None, rounds=DEFAULT_ROUNDS, timeout=DEFAULT_TIMEOUT):
+    """并发测试各音源，返回 {名称: SourceResult} (没有测试接口的音源不在其中)"""
+    results = [SourceResult(name, probes[name]) for name in sources if name in probes]
+    if not results:
+        return {}
+    with ThreadPoolExecutor(max_workers=len(results)) as executor:
+        list(executor.map(lambda r: probe_source(r, proxy, rounds, timeout), results))
+    return {r.name: r for r in results}
+
+
+def rank(sources, results, min_success=MIN_SUCCESS):
+    """
+    排序: 可靠的音源按 p50 (相同时按 p95) 升序在前，不可靠的按成功率降序在后，
+    没有测试接口的音源保持原有相对顺序放在最后
+    """
+    tested = [s for s in sources if s in results]
+    reliable = sorted((s for s in tested if results[s].success_rate >= min_success),
+                      key=lambda s: (results[s].percentile(50), results[s].percentile(95)))
+    unreliable = sorted((s for s in tested if results[s].success_rate < min_success),
+                        key=lambda s: -results[s].success_rate)
+    return reliable + unreliable + [s for s in sources if s not in results]
+
+
+# ================= 入口 =================
+def run_once(args, probes):
+    """测试并按需改写配置，返回新的音源顺序"""
+    config = SourceConfig(args.config)
+    sources = config.sources
+    proxy = None if args.no_proxy else (parse_hostport(args.proxy) if args.proxy else config.proxy())
+    print(f"[*] {time.strftime('%Y-%m-%d %H:%M:%S')} 测试音源: {', '.join(sources)} "
+          f"({'直连' if proxy is None else f'经由代理 {proxy[0]}:{proxy[1]}'}，每个 {args.rounds} 次)")
+    results = benchmark(sources, probes, proxy, args.rounds, args.timeout)
+    for name in sources:
+        print(f"    {results[name].summary()}" if name in results else f"    {name:<10} 没有测试接口，保持在末尾")
+    if proxy is not None and results and not any(r.latencies for r in results.values()) and config.strict == "true":
+        print("[!] 全部音源都无法访问: strict=true 时代理只转发网易云的请求，可改用 --no-proxy 测试")
+        return sources
+    order = rank(sources, results, args.min_success)
+    changed = order != sources or (args.strict and args.strict != config.strict)
+    if not changed:
+        print(f"[-] 音源顺序无需调整: {', '.join(order)}")
+        return order
+    if args.dry_run:
+        print(f"[*] 建议的音源顺序: {', '.join(order)} (--dry-run，未写入)")
+        return order
+    config.set_sources(order)
+    if args.strict:
+        config.set_strict(args.strict)
+    config.save()
+    print(f"[+] 已写入音源顺序: {', '.join(order)}" + (f"，strict={args.strict}" if args.strict else ""))
+    print("[*] 重启 QtUnblockNeteaseMusic (或 unblock163 服务) 后生效")
+    return order
+
+
+def parse_hostport(value):
+    host, _, port = value.rpartition(":")
+    return (host or "127.0.0.1", int(port))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="UnblockNeteaseMusic 音源延迟测试与自动排序")
+    parser.add_argument("--config", default=DEFAULT_CONFIG, help="config.ini 或 unblock163 的配置文件")
+    parser.add_argument("-n", "--rounds", type=int, default=DEFAULT_ROUNDS, help="每个音源的请求次数")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT, help="单次请求超时 (秒)")
+    parser.add_argument("--min-success", type=float, default=MIN_SUCCESS, help="可靠音源的最低成功率")
+    parser.add_argument("--strict", choices=("true", "false"), help="同时设置 strict")
+    parser.add_argument("--proxy", help="代理地址 host:port (默认取配置文件中的 port)")
+    parser.add_argument("--no-proxy", action="store_true", help="不经由代理，直接访问音源")
+    parser.add_argument("--upstream", action="append", default=[], metavar="名称=URL", help="替换某个音源的测试接口")
+    parser.add_argument("--every", type=float, help="定时模式: 每隔多少分钟重新测试")
+    parser.add_argument("--dry-run", action="store_true", help="只输出建议的顺序，不写入配置")
+    args = parser.parse_args()
+
+    probes = dict(SOURCE_PROBES)
+    for item in args.upstream:
+        name, _, url = item.partition("=")
+        probes[name.strip()] = url.strip()
+
+    if not args.every:
+        run_once(args, probes)
+        return
+    print(f"[*] 定时模式: 每 {args.every:g} 分钟重新测试，Ctrl+C 退出")
+    try:
+        while True:
+            try:
+                run_once(args, probes)
+            except (OSError, ValueError) as e:
+                print(f"[!] 本轮测试失败: {e}")
+            time.sleep(args.every * 60)
+    except KeyboardInterrupt:
+        print("\n[-] 已退出定时模式")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,12 @@
+# ================= 代码说明 =================
+# 文件名: tests/conftest.py
+# 功能: pytest 公共设置 —— 把 QtUnblockNeteaseMusic 目录加入导入路径
+# 作者: H_Knight
+# 日期: 2026-10-18
+# 用法: 在 QtUnblockNeteaseMusic 目录下运行 python -m pytest -q tests
+# ===========================================
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
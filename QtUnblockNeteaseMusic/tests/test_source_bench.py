@@ -0,0 +1,82 @@
+# ================= 代码说明 =================
+# 文件名: tests/test_source_bench.py
+# 功能: 音源排序测试 (客户端 config.ini 与 unblock163.sh 服务端两种配置格式的读写，按延迟与成功率排序)
+# 作者: H_Knight
+# 日期: 2026-10-18
+# ===========================================
+
+import pytest
+
+from source_bench import SourceConfig, SourceResult, rank
+
+QT_CONFIG = ("[QtUnblockNeteaseMusic]\r\nport=12345:12346\r\naddress=\r\nsources=kuwo, kugou, qq\r\n"
+             "strict=false\r\ntheme=windows11\r\n")
+SH_CONFIG = ("PORT = 8080\nSOURCE = kuwo kugou\nSTRICT = NO\nENDPOINT = \nENDPOINTURL = \nFORCEHOST = \n")
+
+
+def write(tmp_path, text, bom=False):
+    path = tmp_path / "config"
+    path.write_bytes((b"\xef\xbb\xbf" if bom else b"") + text.encode('utf-8'))
+    return str(path)
+
+
+def result(name, latencies=(), errors=0):
+    r = SourceResult(name, f"http://stub/{name}")
+    r.latencies = list(latencies)
+    r.errors = ["HTTP 502"] * errors
+    return r
+
+
+@pytest.mark.parametrize("newline", ["\r\n", "\n"])
+def test_qt_config_roundtrip_keeps_other_lines(tmp_path, newline):
+    text = QT_CONFIG.replace("\r\n", newline)
+    path = write(tmp_path, text, bom=True)
+    config = SourceConfig(path)
+    assert config.sources == ["kuwo", "kugou", "qq"]
+    # address= 为空时使用 127.0.0.1，不能读到下一行的内容
+    assert config.strict == "false" and config.proxy() == ("127.0.0.1", 12345)
+    config.set_sources(["qq", "kugou", "kuwo"])
+    config.set_strict("true")
+    config.save()
+    raw = open(path, 'rb').read()
+    assert raw == b"\xef\xbb\xbf" + text.replace("kuwo, kugou, qq", "qq, kugou, kuwo").replace(
+        "strict=false", "strict=true").encode('utf-8')
+    assert SourceConfig(path).sources == ["qq", "kugou", "kuwo"]
+
+
+def test_sh_config_roundtrip(tmp_path):
+    path = write(tmp_path, SH_CONFIG)
+    config = SourceConfig(path)
+    assert config.sources == ["kuwo", "kugou"]
+    # unblock163.sh 中写作 YES / NO
+    assert config.strict == "false" and config.proxy() == ("127.0.0.1", 8080)
+    config.set_sources(["kugou", "kuwo"])
+    config.set_strict("true")
+    config.save()
+    assert open(path, encoding='utf-8').read() == SH_CONFIG.replace("kuwo kugou", "kugou kuwo").replace(
+        "STRICT = NO", "STRICT = YES")
+
+
+def test_config_without_sources_is_rejected(tmp_path):
+    with pytest.raises(ValueError, match="没有音源设置"):
+        SourceConfig(write(tmp_path, "[QtUnblockNeteaseMusic]\nport=12345\n"))
+
+
+def test_rank_orders_by_latency_then_reliability():
+    results = {
+        "kuwo": result("kuwo", [0.30] * 5),
+        "kugou": result("kugou", [0.02] * 5),
+        "qq": result("qq", [0.01] * 2, errors=3),       # 最快但不可靠
+        "migu": result("migu", [0.08, 0.08, 0.08, 0.08, 0.5]),
+        "bilibili": result("bilibili", errors=5),       # 全部失败
+        "joox": result("joox", [0.08] * 5),
+    }
+    sources = ["youtube", "kuwo", "qq", "bilibili", "kugou", "migu", "joox", "pyncmd"]
+    # p50 相同时按 p95；没有测试接口的 youtube / pyncmd 保持原顺序放在最后
+    assert rank(sources, results) == ["kugou", "joox", "migu", "kuwo", "qq", "bilibili", "youtube", "pyncmd"]
+    assert rank(sources, results, min_success=0.4)[:2] == ["qq", "kugou"]
+
+
+def test_failed_source_summary():
+    assert result("qq").percentile(50) == float("inf")
+    assert "全部失败 (HTTP 502)" in result("qq", errors=1).summary()